@@ -0,0 +1,52 @@
+"""
+Benchmark dependency auth: get_current_token_payload dengan & tanpa VerifiedTokenCache.
+
+    python benchmarks/bench_auth_dependency.py [jumlah_request] [jumlah_token]
+
+Tanpa cache : setiap request = decode + verifikasi signature HS256 (python-jose)
+Dengan cache: request berikutnya untuk token yang sama = sha256 + lookup LRU
+"""
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from std_pack.config.settings import BaseAppSettings
+from std_pack.infrastructure.security.scheme import get_current_token_payload
+from std_pack.infrastructure.security.token import (
+    TokenHelper,
+    VerifiedTokenCache,
+    set_token_verifier,
+)
+
+
+def _rate(fn: Callable[[], Any], count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def main(requests: int = 50_000, tokens: int = 1_000) -> None:
+    settings = BaseAppSettings(SECRET_KEY="bench-secret")
+    helper = TokenHelper(settings)
+    issued = [helper.create_access_token(f"user-{i}") for i in range(tokens)]
+    traffic = [issued[i % tokens] for i in range(requests)]
+
+    def run() -> None:
+        for token in traffic:
+            get_current_token_payload(token)
+
+    print(f"{'verifier':<22}{'req/s':>14}{'hit rate':>12}")
+    for name, cache in (
+        ("tanpa cache", None),
+        ("VerifiedTokenCache", VerifiedTokenCache(maxsize=tokens)),
+    ):
+        set_token_verifier(TokenHelper(settings, cache=cache))
+        rate = _rate(run, requests)
+        hit_rate = f"{cache.hits / requests:.1%}" if cache else "-"
+        print(f"{name:<22}{rate:>14,.0f}{hit_rate:>12}")
+    set_token_verifier(None)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
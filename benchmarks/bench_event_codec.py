@@ -0,0 +1,65 @@
+"""
+Benchmark serialisasi event: jalur lama vs EventCodec.
+
+    python benchmarks/bench_event_codec.py [jumlah_event]
+
+Jalur lama  : model_dump_json() / Model.model_validate_json() (class harus diketahui)
+EventCodec  : envelope {t, v, p} via orjson / msgpack, decode lewat registry
+"""
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from std_pack.domain.events import DomainEvent, EntityCreatedEvent
+from std_pack.infrastructure.cache.codecs import JsonCodec, MsgPackCodec
+from std_pack.infrastructure.events.codec import EventCodec
+
+
+def _rate(fn: Callable[[], Any], count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def _events(count: int) -> list[DomainEvent]:
+    return [
+        EntityCreatedEvent(
+            entity_type="Order",
+            entity_id=i,
+            payload={
+                "sku": f"SKU-{i}",
+                "qty": i % 7,
+                "price": 12.5,
+                "tags": ["a", "b"],
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def main(count: int = 50_000) -> None:
+    events = _events(count)
+    print(f"{'codec':<22}{'encode/s':>14}{'decode/s':>14}{'bytes/event':>14}")
+
+    legacy = [e.model_dump_json() for e in events]
+    encode = _rate(lambda: [e.model_dump_json() for e in events], count)
+    decode = _rate(
+        lambda: [EntityCreatedEvent.model_validate_json(d) for d in legacy], count
+    )
+    size = sum(len(d) for d in legacy) / count
+    print(f"{'model_dump_json':<22}{encode:>14,.0f}{decode:>14,.0f}{size:>14.1f}")
+
+    for name, codec in (
+        ("EventCodec(json)", EventCodec(JsonCodec())),
+        ("EventCodec(msgpack)", EventCodec(MsgPackCodec())),
+    ):
+        encoded = codec.encode_many(events)
+        encode = _rate(lambda c=codec: c.encode_many(events), count)
+        decode = _rate(lambda c=codec, e=encoded: c.decode_many(e), count)
+        size = sum(len(d) for d in encoded) / count
+        print(f"{name:<22}{encode:>14,.0f}{decode:>14,.0f}{size:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,71 @@
+"""
+Benchmark backend JWT: throughput encode & decode per algoritma.
+
+    python benchmarks/bench_jwt_backends.py [jumlah_token]
+
+jose  : python-jose (default)
+pyjwt : PyJWT (opsional, pip install "pyjwt[crypto]")
+cryptography : JWS compact langsung di atas cryptography + orjson
+Cache token dimatikan agar yang terukur murni sign / verify.
+"""
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from std_pack.config import BaseAppSettings
+from std_pack.infrastructure.security.token import TokenHelper
+
+
+def _rate(fn: Callable[[], Any], count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def _pem(key) -> bytes:
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def main(count: int = 5_000) -> None:
+    settings = BaseAppSettings(SECRET_KEY="bench-secret-yang-cukup-panjang-untuk-hs256")
+    keys = {
+        "HS256": None,
+        "RS256": _pem(rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        "ES256": _pem(ec.generate_private_key(ec.SECP256R1())),
+        "EdDSA": _pem(ed25519.Ed25519PrivateKey.generate()),
+    }
+    print(f"{'backend':<14}{'alg':<8}{'encode/s':>14}{'decode/s':>14}")
+    for backend in ("jose", "pyjwt", "cryptography"):
+        for algorithm, private_key in keys.items():
+            try:
+                helper = TokenHelper(
+                    settings,
+                    algorithm=algorithm,
+                    private_key=private_key,
+                    key_id="k1",
+                    backend=backend,
+                )
+            except ValueError:
+                print(f"{backend:<14}{algorithm:<8}{'-':>14}{'-':>14}")
+                continue
+            tokens = [helper.create_access_token(i) for i in range(count)]
+            encode = _rate(
+                lambda h=helper: [h.create_access_token(i) for i in range(count)],
+                count,
+            )
+            decode = _rate(
+                lambda h=helper, ts=tokens: [h.decode_token(t) for t in ts], count
+            )
+            print(f"{backend:<14}{algorithm:<8}{encode:>14,.0f}{decode:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
@@ -0,0 +1,35 @@
+"""
+Benchmark & kalibrasi hasher password di mesin ini.
+
+    python benchmarks/bench_password_hashers.py [target_ms]
+
+1. Latency verify setiap profil bawaan (PROFILES).
+2. Parameter terkuat per scheme yang verify-nya masih <= target_ms
+   -> pakai hasilnya untuk build_hasher(scheme, **params) / profil baru.
+Perkirakan kapasitas login: workers / latency = verify per detik.
+"""
+import sys
+
+from std_pack.infrastructure.security.hashers import (
+    PROFILES,
+    build_hasher,
+    calibrate,
+    measure_verify,
+)
+
+
+def main(target_ms: float = 250.0) -> None:
+    print(f"{'profil':<24}{'verify ms':>12}{'verify/s/core':>16}")
+    for name in PROFILES:
+        seconds = measure_verify(build_hasher(name), samples=3)
+        print(f"{name:<24}{seconds * 1000:>12.1f}{1 / seconds:>16.1f}")
+
+    print(f"\nKalibrasi target {target_ms:.0f} ms:")
+    for scheme in ("bcrypt", "argon2id"):
+        result = calibrate(scheme, target_ms / 1000)
+        params = ", ".join(f"{k}={v}" for k, v in result.params.items())
+        print(f"{scheme:<10}{params:<48}{result.seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 250.0)
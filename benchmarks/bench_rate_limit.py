@@ -0,0 +1,103 @@
+"""
+Benchmark rate limiter: round trip Redis per cek & throughput per algoritma.
+
+    python benchmarks/bench_rate_limit.py [redis_url]
+
+Default memory:// (tanpa server). Dengan Redis asli (redis://localhost:6379)
+angka req/s mencerminkan latency jaringan: lama = 2 round trip untuk
+request pertama di window (pipeline INCR+TTL lalu EXPIRE), Lua = selalu 1,
++local (LocalTokenBuckets, accuracy 10%) = 1 per chunk.
+"""
+import asyncio
+import sys
+import time
+from typing import Any
+
+from redis import asyncio as aioredis
+
+from std_pack.infrastructure.cache.memory import MemoryRedis
+from std_pack.infrastructure.security.rate_limit_algorithms import (
+    ALGORITHMS,
+    load_rate_limit_scripts,
+)
+from std_pack.infrastructure.security.rate_limit_local import LocalTokenBuckets
+
+REQUESTS = 20_000
+IDENTITIES = 500  # Banyak key -> banyak key baru per window (kasus EXPIRE terpisah)
+
+
+class CountingClient:
+    """Hitung round trip: setiap command langsung / pipeline.execute() = 1."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.round_trips = 0
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name == "pipeline":
+            def _pipeline(*args: Any, **kwargs: Any) -> Any:
+                pipe = attr(*args, **kwargs)
+                execute = pipe.execute
+
+                async def _execute(*a: Any, **kw: Any) -> Any:
+                    self.round_trips += 1
+                    return await execute(*a, **kw)
+                pipe.execute = _execute
+                return pipe
+            return _pipeline
+
+        async def _command(*args: Any, **kwargs: Any) -> Any:
+            self.round_trips += 1
+            return await attr(*args, **kwargs)
+        return _command
+
+
+async def legacy_check(redis: Any, key: str, times: int, seconds: int) -> bool:
+    """Implementasi lama: pipeline INCR+TTL, lalu EXPIRE terpisah untuk key baru."""
+    pipe = redis.pipeline()
+    pipe.incr(key, 1)
+    pipe.ttl(key)
+    count, _ = await pipe.execute()
+    if count == 1:
+        await redis.expire(key, seconds)
+    return count <= times
+
+
+async def run(name: str, client: Any, check: Any) -> None:
+    counting = CountingClient(client)
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        await check(counting, f"rl:{{bench-{i % IDENTITIES}}}:{name}")
+    elapsed = time.perf_counter() - started
+    per_check = counting.round_trips / REQUESTS
+    print(f"{name:<22}{REQUESTS / elapsed:>12,.0f}{per_check:>16.2f}")
+
+
+async def main(url: str) -> None:
+    if url.startswith("memory://"):
+        client: Any = MemoryRedis.from_url(url, decode_responses=True)
+    else:
+        client = aioredis.from_url(url, decode_responses=True)
+    await load_rate_limit_scripts(client)
+
+    print(f"{'algoritma':<22}{'cek/s':>12}{'round trip/cek':>16}")
+    await run("legacy", client, lambda r, key: legacy_check(r, key, 100, 60))
+    for algo_name, algorithm in ALGORITHMS.items():
+        await run(
+            algo_name,
+            client,
+            lambda r, key, a=algorithm: a.check(r, [key], [(100, 60)]),
+        )
+    for algo_name in ("fixed_window", "sliding_window"):
+        buckets = LocalTokenBuckets(algo_name, accuracy=0.1)
+        await run(
+            f"{algo_name}+local",
+            client,
+            lambda r, key, b=buckets: b.check(r, [key], [(100, 60)]),
+        )
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "memory://bench"))
@@ -33,4 +33,15 @@ class IMessageBus(Protocol):
         
     async def publish_batch(self, events: list[DomainEvent]) -> None:
         """Publish banyak event sekaligus."""
-        ...
\ No newline at end of file
+        ...
+
+# --- EVENT CONSUMER (Background Runtime) ---
+@runtime_checkable
+class IEventConsumer(Protocol):
+    """
+    Port: Runtime konsumen event yang berjalan di background
+    (RedisEventSubscriber, StreamConsumer, dll).
+    Dijalankan & dihentikan oleh lifespan aplikasi.
+    """
+    async def start(self) -> None: ...
+    async def stop(self) -> None: ...
\ No newline at end of file
@@ -1,37 +1,63 @@
 # src/std_pack/bootstrap/lifespan.py
 
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
 from fastapi import FastAPI
+from std_pack.application.interfaces.ports import IEventConsumer
+from std_pack.infrastructure.cache import RedisManager
+from std_pack.infrastructure.events.redis_bus import RedisMessageBus
 from std_pack.infrastructure.persistence.database import DatabaseManager
+from std_pack.infrastructure.security.rate_limit_algorithms import (
+    load_rate_limit_scripts,
+)
 from std_pack.infrastructure.logging import get_logger
 
 logger = get_logger(__name__)
 
 @asynccontextmanager
 async def standard_lifespan(
-    app: FastAPI, 
-    db_manager: DatabaseManager
+    app: FastAPI,
+    db_manager: DatabaseManager,
+    redis_manager: RedisManager | None = None,
+    consumers: Sequence[IEventConsumer] = (),
+    buses: Sequence[RedisMessageBus] = (),
 ) -> AsyncGenerator[None, None]:
     """
     Helper lifespan standar.
     Aplikasi pengguna bisa menggunakan ini atau membungkusnya.
-    
+
     Fungsi:
     1. Inisialisasi Database Connection Pool saat startup.
-    2. Menutup koneksi saat shutdown.
+    2. (Opsional) Inisialisasi Redis + SCRIPT LOAD script rate limit, lalu
+       menjalankan consumer event (RedisEventSubscriber, StreamConsumer, dll).
+    3. Saat shutdown: consumer di-drain dulu (urutan terbalik), lalu
+       `buses` di-flush & ditutup (aclose) agar event yang masih di buffer
+       batching terkirim, baru koneksi Redis & Database ditutup.
     """
-    
+
     # --- STARTUP ---
     try:
         logger.info("application_startup")
         db_manager.init_db()
+        if redis_manager is not None:
+            await redis_manager.init_cache()
+            await load_rate_limit_scripts(redis_manager.get_client())
+        for consumer in consumers:
+            await consumer.start()
     except Exception as e:
         logger.critical("startup_failed", error=str(e))
         raise e
-        
+
     yield
-    
+
     # --- SHUTDOWN ---
     logger.info("application_shutdown")
-    await db_manager.close()
\ No newline at end of file
+    for consumer in reversed(consumers):
+        await consumer.stop()
+    for bus in buses:
+        await bus.aclose()
+        if bus.events_failed:
+            logger.error("event_bus_undelivered", events_failed=bus.events_failed)
+    if redis_manager is not None:
+        await redis_manager.close()
+    await db_manager.close()
@@ -1,6 +1,15 @@
-from .settings import BaseAppSettings, EnvironmentType
+from .settings import (
+    BaseAppSettings,
+    EnvironmentType,
+    get_settings,
+    refresh_settings,
+    set_settings,
+)
 
 __all__ = [
     "BaseAppSettings",
     "EnvironmentType",
+    "get_settings",
+    "refresh_settings",
+    "set_settings",
 ]
\ No newline at end of file
@@ -3,6 +3,7 @@ Configuration Module.
 Menyediakan BaseSettings yang harus diwarisi oleh aplikasi pengguna.
 Menggunakan pydantic-settings.
 """
+import threading
 from enum import StrEnum
 from typing import Literal
 
@@ -43,11 +44,46 @@ class BaseAppSettings(BaseSettings):
     DATABASE_URL: str | None = Field(default=None)
 
     # --- TAMBAHAN WAJIB UNTUK V2 (Cache & Rate Limit) ---
-    REDIS_URL: str = Field(default="redis://localhost:6379/0") 
+    REDIS_URL: str = Field(default="redis://localhost:6379/0")
     # ----------------------------------------------------
 
+    # Redis Topology & Pool
+    # standalone: REDIS_URL | cluster: REDIS_URL = node awal
+    # sentinel: REDIS_SENTINEL_NODES
+    REDIS_MODE: Literal["standalone", "cluster", "sentinel"] = "standalone"
+    REDIS_SENTINEL_NODES: list[str] = Field(default_factory=list) # ["host:26379", ...]
+    REDIS_SENTINEL_MASTER: str = "mymaster"
+    REDIS_READ_FROM_REPLICAS: bool = False
+    REDIS_MAX_CONNECTIONS: int | None = None # None = tanpa batas (default redis-py)
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_AUTO_PIPELINE: bool = False
+    REDIS_CLIENT_CACHE_PREFIXES: list[str] = Field(default_factory=list)
+
+    # Redis Fail-Fast (Circuit Breaker & Timeout per operasi)
+    REDIS_CIRCUIT_BREAKER: bool = False
+    REDIS_BREAKER_ERROR_RATE: float = 0.5
+    REDIS_BREAKER_SLOW_CALL_SECONDS: float = 0.5
+    REDIS_BREAKER_RESET_SECONDS: float = 10.0
+    REDIS_OPERATION_TIMEOUT: float | None = None  # Default timeout semua command
+    # Timeout per command, misal {"get": 0.05}
+    REDIS_OPERATION_TIMEOUTS: dict[str, float] = Field(default_factory=dict)
+
     # Security
     SECRET_KEY: str = Field(default="unsafe-secret-key-change-me")
+    TOKEN_CACHE_SIZE: int = 10_000  # Cache payload JWT terverifikasi (0 = nonaktif)
+    # HS256 | RS256 | ES256 | EdDSA (EdDSA butuh backend pyjwt)
+    JWT_ALGORITHM: str = "HS256"
+    JWT_BACKEND: str = "jose"  # jose | pyjwt | cryptography (tercepat)
+    # PEM private key (hanya service penerbit token)
+    JWT_PRIVATE_KEY_FILE: str | None = None
+    JWT_KEY_ID: str | None = None # kid di header token (rotasi key)
+    JWT_JWKS_URL: str | None = None # URL / path JWKS untuk verifier
+    JWT_JWKS_REFRESH_SECONDS: float = 300.0
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Cost bcrypt; hash lama di-upgrade saat login
+    # Misal "argon2id-interactive"; None = bcrypt di atas
+    PASSWORD_HASH_PROFILE: str | None = None
+    PASSWORD_HASH_WORKERS: int = 4 # Thread pool khusus hash/verify password
+    PASSWORD_HASH_MAX_WAITING: int = 64 # Antrian maksimal sebelum ditolak 429
     
     # CORS (List of origins)
     # Default: Allow All (*) untuk kemudahan dev lokal
@@ -62,4 +98,49 @@ class BaseAppSettings(BaseSettings):
     
     @property
     def is_production(self) -> bool:
-        return self.ENVIRONMENT == EnvironmentType.PRODUCTION
\ No newline at end of file
+        return self.ENVIRONMENT == EnvironmentType.PRODUCTION
+
+
+# --- SETTINGS PROVIDER (Process-wide) ---
+# Membaca .env + environment cukup sekali per proses, bukan per request.
+_settings_cls: type[BaseAppSettings] = BaseAppSettings
+_settings: BaseAppSettings | None = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> BaseAppSettings:
+    """
+    Settings yang di-cache untuk seluruh proses (dibuat saat pertama dipanggil).
+    Bisa dipakai langsung atau sebagai dependency: Depends(get_settings).
+    """
+    global _settings
+    settings = _settings
+    if settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = _settings_cls()
+            settings = _settings
+    return settings
+
+
+def refresh_settings(
+    settings_cls: type[BaseAppSettings] | None = None,
+) -> BaseAppSettings:
+    """
+    Baca ulang .env & environment (misal setelah rotasi secret).
+    settings_cls: pakai subclass settings milik aplikasi untuk seterusnya.
+    """
+    global _settings, _settings_cls
+    with _settings_lock:
+        if settings_cls is not None:
+            _settings_cls = settings_cls
+        _settings = _settings_cls()
+        return _settings
+
+
+def set_settings(settings: BaseAppSettings) -> None:
+    """Pasang instance settings yang sudah jadi (bootstrap aplikasi / testing)."""
+    global _settings, _settings_cls
+    with _settings_lock:
+        _settings = settings
+        _settings_cls = type(settings)
\ No newline at end of file
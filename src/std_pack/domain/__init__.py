@@ -9,9 +9,12 @@ from .events import (
     EntityCreatedEvent,
     EntityDeletedEvent,
     EntityUpdatedEvent,
+    get_event_class,
+    registered_events,
 )
 from .exceptions import (
     BusinessRuleViolationError,
+    ConcurrencyConflictError,
     DomainException,
     EntityAlreadyExistsError,
     EntityNotFoundError,
@@ -38,6 +41,8 @@ __all__ = [
     "EntityCreatedEvent",
     "EntityUpdatedEvent",
     "EntityDeletedEvent",
+    "get_event_class",
+    "registered_events",
     
     # Exceptions
     "DomainException",
@@ -45,4 +50,5 @@ __all__ = [
     "EntityAlreadyExistsError",
     "BusinessRuleViolationError",
     "UnauthorizedError",
+    "ConcurrencyConflictError",
 ]
\ No newline at end of file
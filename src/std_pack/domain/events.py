@@ -10,10 +10,17 @@ from datetime import datetime, timezone
 from typing import Any, ClassVar
 from pydantic import BaseModel, ConfigDict, Field
 
+# Registry event_type -> class, diisi otomatis oleh DomainEvent.__init_subclass__.
+# Dipakai sisi consumer untuk decode payload kembali ke class yang benar.
+_EVENT_REGISTRY: dict[str, type["DomainEvent"]] = {}
+
 class DomainEvent(BaseModel):
     """
     Base class untuk semua domain events.
     Events bersifat immutable (frozen) karena merepresentasikan fakta masa lalu.
+
+    event_version: naikkan saat skema payload berubah (breaking), lalu
+    daftarkan upcaster untuk versi lama (lihat infrastructure.events.codec).
     """
     event_id : uuid.UUID = Field(
         default_factory=uuid7
@@ -22,16 +29,35 @@ class DomainEvent(BaseModel):
         default_factory=lambda: datetime.now(timezone.utc)
     )
     event_type: ClassVar[str]
+    event_version: ClassVar[int] = 1
+    # datetime sudah di-serialize ke ISO 8601 oleh Pydantic v2
+    # (json_encoders deprecated)
     model_config = ConfigDict(
         frozen= True,
         arbitrary_types_allowed=True,
-        json_encoders={datetime : lambda v: v.isoformat()}
     )
 
     def __init_subclass__(cls, **kwargs):
-        """Otomatis set event_type sesuai nama class"""        
+        """Otomatis set event_type sesuai nama class & daftarkan ke registry"""
         super().__init_subclass__(**kwargs)
         cls.event_type = cls.__name__
+        # Nama sama -> definisi terakhir yang dipakai (misal reload modul)
+        _EVENT_REGISTRY[cls.event_type] = cls
+
+
+def get_event_class(event_type: str) -> type[DomainEvent]:
+    """Cari class event dari nama event_type. KeyError jika belum terdaftar."""
+    try:
+        return _EVENT_REGISTRY[event_type]
+    except KeyError:
+        raise KeyError(
+            f"Event '{event_type}' belum terdaftar (class belum di-import?)"
+        ) from None
+
+
+def registered_events() -> dict[str, type[DomainEvent]]:
+    """Salinan registry event (event_type -> class)."""
+    return dict(_EVENT_REGISTRY)
 
 # ----- Standard CRUD Events -------        
 
@@ -1,6 +1,6 @@
 """
 Domain Custom exceptions Module
-mendefinisikan base exceptions untuk error spesifik domain logic. 
+mendefinisikan base exceptions untuk error spesifik domain logic.
 agnostik terhadap HTTP atau response
 """
 
@@ -12,8 +12,8 @@ class DomainException(Exception):
     """
     def __init__(
             self,
-            message: str = "Domain error occurred", 
-            code: str = "DOMAIN_ERROR" 
+            message: str = "Domain error occurred",
+            code: str = "DOMAIN_ERROR"
     ):
         self.message = message
         self.code = code
@@ -48,12 +48,41 @@ class ForbiddenError(DomainException):
     (HTTP 403 equivalent)
     """
     def __init__(self, message: str = "Access forbidden"):
-        super().__init__(message, code="ACCESS_FORBIDDEN")    
+        super().__init__(message, code="ACCESS_FORBIDDEN")
 
 class TooManyRequestsError(DomainException):
-    def __init__(self, retry_after: int):
+    """
+    Kuota habis. Selain retry_after (detik), boleh membawa info kuota
+    (limit, remaining, reset_after, policy) untuk header RateLimit-*.
+    """
+    def __init__(
+        self,
+        retry_after: int,
+        message: str | None = None,
+        *,
+        limit: int | None = None,
+        remaining: int = 0,
+        reset_after: int | None = None,
+        policy: str | None = None,
+    ):
         super().__init__(
-            message=f"Rate limit exceeded. Try again in {retry_after} seconds.",
+            message=message
+            or f"Rate limit exceeded. Try again in {retry_after} seconds.",
             code="RATE_LIMIT_EXCEEDED"
         )
-        self.retry_after = retry_after            
\ No newline at end of file
+        self.retry_after = retry_after
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.policy = policy
+
+class ConcurrencyConflictError(DomainException):
+    """Optimistic concurrency: versi stream/aggregate sudah berubah sejak dibaca."""
+    def __init__(self, stream_id: Any, expected: int, actual: int):
+        super().__init__(
+            message=f"Stream {stream_id}: expected version {expected}, actual {actual}",
+            code="CONCURRENCY_CONFLICT"
+        )
+        self.stream_id = stream_id
+        self.expected = expected
+        self.actual = actual
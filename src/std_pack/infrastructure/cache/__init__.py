@@ -1,3 +1,23 @@
 from .redis import RedisManager
+from .pipelining import AutoPipelineClient
+from .codecs import Codec, JsonCodec, MsgPackCodec, CompressedCodec, get_codec
+from .store import RedisCache
+from .tracking import ClientSideCache
+from .breaker import CircuitBreaker, CircuitOpenError, GuardedRedisClient
+from .memory import MemoryRedis
 
-__all__ = ["RedisManager"]
\ No newline at end of file
+__all__ = [
+    "RedisManager",
+    "AutoPipelineClient",
+    "Codec",
+    "JsonCodec",
+    "MsgPackCodec",
+    "CompressedCodec",
+    "get_codec",
+    "RedisCache",
+    "ClientSideCache",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "GuardedRedisClient",
+    "MemoryRedis",
+]
\ No newline at end of file
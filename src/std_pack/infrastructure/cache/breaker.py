@@ -0,0 +1,300 @@
+"""
+Redis Circuit Breaker.
+Fail-fast saat Redis lambat/mati: daripada setiap request menunggu
+socket_timeout, breaker 'open' dan command langsung ditolak dengan
+CircuitOpenError sampai Redis dianggap pulih (half-open probing).
+"""
+import asyncio
+import inspect
+import time
+from collections import deque
+from typing import Any
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Method sync (bukan command) yang diteruskan apa adanya tanpa melewati breaker
+_PASSTHROUGH: frozenset[str] = frozenset({
+    "pubsub", "aclose", "close", "lock", "register_script", "monitor",
+    "get_encoder", "get_connection_kwargs",
+})
+
+# Command blocking -> posisi argumen timeout (detik) jika tidak dikirim sebagai keyword
+_BLOCKING_TIMEOUT_ARG: dict[str, int] = {
+    "blpop": 1, "brpop": 1, "bzpopmin": 1, "bzpopmax": 1,
+    "brpoplpush": 2, "blmove": 2, "blmpop": 0, "bzmpop": 0,
+}
+# Stream read -> posisi argumen `block` (milidetik)
+_BLOCKING_STREAM_ARG: dict[str, int] = {"xread": 2, "xreadgroup": 4}
+
+
+class CircuitOpenError(RedisConnectionError):
+    """
+    Dilempar saat breaker open.
+    Turunan redis ConnectionError agar handler `except RedisError`
+    yang sudah ada otomatis ikut menanganinya.
+    """
+
+
+class CircuitBreaker:
+    """
+    Breaker berbasis rolling window (N panggilan terakhir).
+
+    Open jika dalam window (minimal `min_calls` panggilan):
+    - rasio error >= error_rate_threshold, ATAU
+    - rasio panggilan lambat (> slow_call_duration detik) >= slow_call_rate_threshold.
+
+    Setelah `reset_timeout` detik -> half-open: maksimal `half_open_max_calls`
+    probe diizinkan. Semua sukses -> closed, satu gagal -> open lagi.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_duration: float = 0.5,
+        slow_call_rate_threshold: float = 0.8,
+        reset_timeout: float = 10.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CLOSED
+        # (failed, slow) per panggilan
+        self._window: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_inflight = 0
+        self._half_open_successes = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Cek apakah panggilan boleh jalan. Mencatat slot probe saat half-open."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._half_open_inflight >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_inflight += 1
+        return True
+
+    def release(self) -> None:
+        """Kembalikan slot probe tanpa mencatat hasil (panggilan batal / bukan I/O)."""
+        if self.state == HALF_OPEN and self._half_open_inflight > 0:
+            self._half_open_inflight -= 1
+
+    def record_success(self, duration: float) -> None:
+        slow = duration > self.slow_call_duration
+        if self.state == HALF_OPEN:
+            self._half_open_inflight -= 1
+            if slow:
+                # Masih lambat: belum pulih
+                self._transition(OPEN)
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(CLOSED)
+            return
+        self._record(False, slow)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._half_open_inflight -= 1
+            self._transition(OPEN)
+            return
+        self._record(True, False)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        self._window.append((failed, slow))
+        calls = len(self._window)
+        if self.state != CLOSED or calls < self.min_calls:
+            return
+        failures = sum(1 for f, _ in self._window if f)
+        slow_calls = sum(1 for _, s in self._window if s)
+        if (
+            failures / calls >= self.error_rate_threshold
+            or slow_calls / calls >= self.slow_call_rate_threshold
+        ):
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("redis_circuit_state_changed", previous=self.state, state=state)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == HALF_OPEN:
+            self._half_open_inflight = 0
+            self._half_open_successes = 0
+        if state == CLOSED:
+            self._window.clear()
+
+    def stats(self) -> dict[str, Any]:
+        calls = len(self._window)
+        failed = sum(1 for f, _ in self._window if f)
+        slow = sum(1 for _, s in self._window if s)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "error_rate": failed / calls if calls else 0.0,
+            "slow_rate": slow / calls if calls else 0.0,
+            "rejected": self.rejected,
+        }
+
+
+def blocking_seconds(
+    name: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> float | None:
+    """
+    Lama maksimal command menunggu di server (detik). None = bukan blocking,
+    0 = menunggu tanpa batas (BLPOP timeout=0 / XREAD BLOCK 0).
+    """
+    if name in _BLOCKING_STREAM_ARG:
+        index = _BLOCKING_STREAM_ARG[name]
+        block = kwargs.get("block", args[index] if len(args) > index else None)
+        return None if block is None else block / 1000
+    if name in _BLOCKING_TIMEOUT_ARG:
+        index = _BLOCKING_TIMEOUT_ARG[name]
+        timeout = kwargs.get("timeout", args[index] if len(args) > index else 0)
+        return float(timeout or 0)
+    return None
+
+
+class GuardedRedisClient:
+    """
+    Proxy client Redis dengan circuit breaker + timeout per operasi.
+
+    Setiap command awaitable dibungkus:
+    1. Breaker open -> CircuitOpenError langsung. Dicek SEBELUM command
+       dibangun, jadi tidak ada yang sempat diantrikan (auto-pipeline) / dikirim.
+    2. Dijalankan dengan timeout (operation_timeouts[nama] atau default_timeout).
+    3. Hasil (sukses/error/lambat) dicatat ke breaker.
+    Timeout diubah menjadi redis TimeoutError.
+
+    Command blocking (XREAD/XREADGROUP dengan block=, BLPOP, dll) memang
+    menunggu di server: timeout-nya = waktu block + timeout operasi, dan
+    waktu menunggu itu tidak dihitung sebagai panggilan lambat.
+    Method sync di luar _PASSTHROUGH hanya dipanggil saat breaker tidak open;
+    saat open, hasilnya coroutine yang melempar CircuitOpenError.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        breaker: CircuitBreaker,
+        default_timeout: float | None = None,
+        operation_timeouts: dict[str, float] | None = None,
+    ):
+        self._client = client
+        self.breaker = breaker
+        self.default_timeout = default_timeout
+        self.operation_timeouts = dict(operation_timeouts or {})
+
+    @property
+    def raw_client(self) -> Any:
+        return self._client
+
+    def _timeout_for(self, name: str) -> float | None:
+        return self.operation_timeouts.get(name, self.default_timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr) or name in _PASSTHROUGH:
+            return attr
+
+        def _guarded(*args: Any, **kwargs: Any) -> Any:
+            if name == "pipeline":
+                return _GuardedPipeline(attr(*args, **kwargs), self)
+            if not self.breaker.allow():
+                return self._rejected(name)
+            try:
+                result = attr(*args, **kwargs)
+            except BaseException:
+                self.breaker.release()
+                raise
+            if not inspect.isawaitable(result):
+                self.breaker.release()  # Method sync: tidak ada I/O untuk dinilai
+                return result
+            return self._run(name, result, blocking_seconds(name, args, kwargs))
+        return _guarded
+
+    async def _rejected(self, name: str) -> Any:
+        raise CircuitOpenError(f"Redis circuit open, '{name}' ditolak")
+
+    async def _run(self, name: str, awaitable: Any, block: float | None = None) -> Any:
+        """Jalankan command yang slot breaker-nya sudah didapat lewat allow()."""
+        timeout = self._timeout_for(name)
+        if block is not None:
+            timeout = None if timeout is None or block == 0 else block + timeout
+
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(awaitable, timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()  # Dibatalkan pemanggil: bukan sinyal kesehatan Redis
+            raise
+        except TimeoutError as e:
+            self.breaker.record_failure()
+            raise RedisTimeoutError(f"Redis '{name}' timeout") from e
+        except (RedisConnectionError, RedisTimeoutError, OSError):
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            # Error level command (WRONGTYPE, dll) = Redis sehat, hanya salah pakai
+            self.breaker.record_success(self._duration(started, block))
+            raise
+        self.breaker.record_success(self._duration(started, block))
+        return result
+
+    @staticmethod
+    def _duration(started: float, block: float | None) -> float:
+        elapsed = time.monotonic() - started
+        if block is None:
+            return elapsed
+        # Waktu menunggu data (block) bukan tanda Redis lambat
+        return 0.0 if block == 0 else max(0.0, elapsed - block)
+
+
+class _GuardedPipeline:
+    """Pipeline yang execute()-nya melewati breaker (nama operasi: 'execute')."""
+
+    def __init__(self, pipeline: Any, guard: GuardedRedisClient):
+        self._pipeline = pipeline
+        self._guard = guard
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipeline, name)
+
+    async def __aenter__(self) -> "_GuardedPipeline":
+        await self._pipeline.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._pipeline.__aexit__(*exc_info)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        if not self._guard.breaker.allow():
+            raise CircuitOpenError("Redis circuit open, 'execute' ditolak")
+        return await self._guard._run(
+            "execute", self._pipeline.execute(*args, **kwargs)
+        )
@@ -0,0 +1,152 @@
+"""
+Cache Codecs.
+Lapisan serialisasi value Redis (object <-> bytes).
+Dipakai oleh RedisCache dan RedisMessageBus bersama binary client,
+sehingga tidak ada konversi ganda str -> bytes -> object.
+"""
+import uuid
+from datetime import date, datetime
+from typing import Any, Protocol
+
+import orjson
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError: # pragma: no cover
+    msgpack = None # type: ignore
+
+try:
+    import zstandard
+except ImportError: # pragma: no cover
+    zstandard = None # type: ignore
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError: # pragma: no cover
+    lz4_frame = None # type: ignore
+
+
+class Codec(Protocol):
+    """Kontrak codec: object Python <-> bytes."""
+    def encode(self, value: Any) -> bytes: ...
+    def decode(self, data: bytes) -> Any: ...
+
+
+def _default(obj: Any) -> Any:
+    """Fallback untuk tipe yang tidak dikenal serializer (Pydantic model, dll)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type {type(obj).__name__} tidak bisa di-serialize")
+
+
+class JsonCodec:
+    """JSON via orjson (default, paling kompatibel)."""
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgPackCodec:
+    """MessagePack: lebih ringkas dari JSON untuk payload numerik/besar."""
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError(
+                "Library 'msgpack' diperlukan. Install: 'poetry add msgpack'"
+            )
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_default, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+# Header 1 byte di depan payload agar decoder tahu payload dikompres atau tidak
+_RAW = b"\x00"
+_ZSTD = b"\x01"
+_LZ4 = b"\x02"
+
+
+class CompressedCodec:
+    """
+    Wrapper kompresi di atas codec lain.
+    Hanya payload >= `threshold` byte yang dikompres (payload kecil malah membesar).
+    """
+
+    def __init__(
+        self,
+        inner: Codec,
+        algorithm: str = "zstd",
+        threshold: int = 1024,
+        level: int = 3,
+    ):
+        if algorithm == "zstd":
+            if zstandard is None:
+                raise ImportError(
+                    "Library 'zstandard' diperlukan. Install: 'poetry add zstandard'"
+                )
+            self._header = _ZSTD
+            self._compress = zstandard.ZstdCompressor(level=level).compress
+        elif algorithm == "lz4":
+            if lz4_frame is None:
+                raise ImportError(
+                    "Library 'lz4' diperlukan. Install: 'poetry add lz4'"
+                )
+            self._header = _LZ4
+            self._compress = lambda data: lz4_frame.compress(
+                data, compression_level=level
+            )
+        else:
+            raise ValueError(f"Algoritma kompresi tidak dikenal: {algorithm}")
+
+        self.inner = inner
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.name = f"{getattr(inner, 'name', 'custom')}+{algorithm}"
+
+    def encode(self, value: Any) -> bytes:
+        data = self.inner.encode(value)
+        if len(data) < self.threshold:
+            return _RAW + data
+        return self._header + self._compress(data)
+
+    def decode(self, data: bytes) -> Any:
+        header, body = data[:1], data[1:]
+        if header == _ZSTD:
+            # Decompressor tetap bisa dibaca walau writer pakai level lain
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif header == _LZ4:
+            body = lz4_frame.decompress(body)
+        elif header != _RAW:
+            raise ValueError("Header codec tidak valid")
+        return self.inner.decode(body)
+
+
+def get_codec(
+    name: str, compression: str | None = None, threshold: int = 1024
+) -> Codec:
+    """
+    Factory codec dari nama (untuk konfigurasi via settings).
+    Contoh: get_codec("msgpack", compression="zstd")
+    """
+    codecs: dict[str, type[JsonCodec] | type[MsgPackCodec]] = {
+        "json": JsonCodec,
+        "msgpack": MsgPackCodec,
+    }
+    if name not in codecs:
+        raise ValueError(f"Codec tidak dikenal: {name}")
+    codec: Codec = codecs[name]()
+    if compression:
+        codec = CompressedCodec(codec, algorithm=compression, threshold=threshold)
+    return codec
@@ -0,0 +1,50 @@
+"""
+Redis Key Builders.
+Konvensi nama key yang aman untuk Redis Cluster.
+
+Di Cluster, command multi-key (MGET, pipeline transaksi, Lua) hanya boleh
+menyentuh key di slot yang sama. Bagian key di dalam kurung kurawal
+(hash tag) adalah satu-satunya yang di-hash, jadi key dengan tag sama
+dijamin berada di slot yang sama:
+    rl:{user-42}:/orders:GET  dan  rl:{user-42}:/login:POST  -> slot sama
+"""
+from typing import Any
+
+from redis.crc import key_slot as _key_slot
+
+
+def hash_tag(value: Any) -> str:
+    """Bungkus value jadi hash tag. Kurung kurawal di dalam value dibuang."""
+    text = str(value).replace("{", "").replace("}", "")
+    return "{" + text + "}"
+
+
+def make_key(*parts: Any, tag: Any = None) -> str:
+    """
+    Gabungkan bagian key dengan ':'.
+    make_key("cache", "users", 42, tag="tenant-1") -> "cache:{tenant-1}:users:42"
+    """
+    segments = [str(p) for p in parts]
+    if tag is not None:
+        segments.insert(1 if segments else 0, hash_tag(tag))
+    return ":".join(segments)
+
+
+def rate_limit_key(identity: Any, *scope: Any) -> str:
+    """
+    Key rate limit. Identity dijadikan hash tag sehingga semua limit milik
+    satu user/IP berada di slot yang sama (bisa dicek dalam satu pipeline/Lua).
+    """
+    return make_key("rl", *scope, tag=identity)
+
+
+def cache_key(prefix: str, key: Any, tag: Any = None) -> str:
+    """Key cache: '{prefix}:{key}', opsional dengan hash tag grup."""
+    return make_key(prefix, key, tag=tag)
+
+
+def key_slot(key: str | bytes) -> int:
+    """Slot Cluster (0-16383) untuk key, berguna untuk debugging distribusi."""
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    return _key_slot(key)
@@ -0,0 +1,1104 @@
+"""
+In-Memory Redis Backend.
+Pengganti Redis di dalam proses (tanpa server) untuk testing, benchmark,
+dan deployment single-node kecil. Dipilih otomatis oleh RedisManager
+jika REDIS_URL diawali 'memory://'.
+
+Yang didukung (subset yang dipakai std_pack):
+- String : GET/SET (EX/PX/NX/XX/KEEPTTL/GET)/MGET/MSET/GETDEL/INCR/DECR
+- TTL    : EXPIRE/PEXPIRE/TTL/PTTL/PERSIST (expiry nyata, lazy + sampling)
+- Hash, Set, Sorted Set : operasi dasar
+- PIPELINE (transaction=True/False), PUBLISH/SUBSCRIBE/PSUBSCRIBE
+- Streams: XADD (MAXLEN)/XLEN/XRANGE/XREAD/XGROUP CREATE/XREADGROUP/XACK/
+  XPENDING (ringkasan)/XAUTOCLAIM
+- Scripting: EVAL/EVALSHA/SCRIPT LOAD untuk script yang punya emulasi
+  Python (lihat register_lua_script); tidak ada interpreter Lua di sini.
+
+Semua command dieksekusi sinkron di event loop (tidak ada await di
+tengahnya), sehingga setiap command dan setiap pipeline bersifat atomic
+seperti di Redis. Client dengan URL yang sama berbagi data yang sama
+(misal text client dan binary client milik satu RedisManager).
+"""
+import asyncio
+import contextlib
+import fnmatch
+import hashlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import Any
+
+from redis.exceptions import DataError, NoScriptError, ResponseError
+
+MEMORY_SCHEME = "memory://"
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+NOT_INTEGER = "value is not an integer or out of range"
+
+# Setiap N write, buang sebagian key kedaluwarsa (mirip active expiry Redis)
+_SWEEP_EVERY = 256
+_SWEEP_SAMPLE = 64
+
+_stores: dict[str, "MemoryStore"] = {}
+
+# sha1 script Lua -> emulasi Python: handler(store, keys, args)
+LuaEmulation = Callable[["MemoryStore", list[str], list[bytes]], Any]
+_lua_scripts: dict[str, LuaEmulation] = {}
+
+
+def script_sha(script: Any) -> str:
+    """SHA1 hex script, sama seperti yang dikembalikan SCRIPT LOAD."""
+    return hashlib.sha1(_encode(script)).hexdigest()
+
+
+def register_lua_script(script: Any, handler: LuaEmulation) -> str:
+    """
+    Daftarkan emulasi Python untuk satu script Lua agar EVAL/EVALSHA script
+    itu bisa jalan di memory backend. Handler dieksekusi sinkron (atomic,
+    sama seperti script di Redis) dan menerima store, KEYS (str) & ARGV (bytes).
+    """
+    sha = script_sha(script)
+    _lua_scripts[sha] = handler
+    return sha
+
+
+def _encode(value: Any) -> bytes:
+    """Encode value seperti redis-py (bytes apa adanya, angka via repr)."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, bool):
+        raise DataError(
+            "Invalid input of type: 'bool'. "
+            "Convert to a bytes, string, int or float first."
+        )
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    if isinstance(value, (int, float)):
+        return repr(value).encode("utf-8")
+    raise DataError(f"Invalid input of type: '{type(value).__name__}'.")
+
+
+def _key(name: Any) -> str:
+    return name.decode("utf-8") if isinstance(name, bytes) else str(name)
+
+
+def _decode(value: Any) -> Any:
+    """Decode rekursif bytes -> str (untuk decode_responses=True)."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_decode(v) for v in value)
+    if isinstance(value, dict):
+        return {_decode(k): _decode(v) for k, v in value.items()}
+    return value
+
+
+def _to_int(value: bytes) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ResponseError(NOT_INTEGER) from None
+
+
+# ==========================================
+# STREAM STRUCTURES
+# ==========================================
+StreamId = tuple[int, int]
+
+
+def _parse_id(value: Any, default_seq: int = 0) -> StreamId:
+    text = _key(value)
+    if text == "-":
+        return (0, 0)
+    if text == "+":
+        return (2**64 - 1, 2**64 - 1)
+    ms, _, seq = text.partition("-")
+    try:
+        return (int(ms), int(seq) if seq else default_seq)
+    except ValueError:
+        raise ResponseError(
+            "Invalid stream ID specified as stream command argument"
+        ) from None
+
+
+def _format_id(stream_id: StreamId) -> bytes:
+    return f"{stream_id[0]}-{stream_id[1]}".encode()
+
+
+class _ConsumerGroup:
+    def __init__(self, last_delivered: StreamId):
+        self.last_delivered = last_delivered
+        # id -> [consumer, delivered_at (ms), delivery_count]
+        self.pending: dict[StreamId, list[Any]] = {}
+
+
+class _Stream:
+    def __init__(self) -> None:
+        self.entries: deque[tuple[StreamId, dict[bytes, bytes]]] = deque()
+        self.last_id: StreamId = (0, 0)
+        self.groups: dict[str, _ConsumerGroup] = {}
+
+    def after(
+        self, start: StreamId, count: int | None
+    ) -> list[tuple[StreamId, dict[bytes, bytes]]]:
+        result = []
+        for entry in self.entries:
+            if entry[0] > start:
+                result.append(entry)
+                if count is not None and len(result) >= count:
+                    break
+        return result
+
+    def get(self, stream_id: StreamId) -> dict[bytes, bytes] | None:
+        for entry_id, fields in self.entries:
+            if entry_id == stream_id:
+                return fields
+        return None
+
+
+def _entry(
+    stream_id: StreamId, fields: dict[bytes, bytes] | None
+) -> tuple[bytes, dict[bytes, bytes] | None]:
+    return (_format_id(stream_id), dict(fields) if fields is not None else None)
+
+
+# ==========================================
+# STORE
+# ==========================================
+class MemoryStore:
+    """
+    Keyspace bersama. Semua method command sinkron dan mengembalikan
+    nilai mentah (bytes); decode dilakukan oleh MemoryRedis.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}  # key -> deadline (time.monotonic)
+        self._writes = 0
+        self._subscribers: set[MemoryPubSub] = set()
+        self._stream_waiters: list[asyncio.Future[None]] = []
+        self._scripts: set[str] = set()  # Script cache (sha yang sudah di-LOAD / EVAL)
+
+    # --- KEYSPACE HELPERS ---
+    def _alive(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._remove(key)
+            return False
+        return key in self._data
+
+    def _remove(self, key: str) -> bool:
+        self._expires.pop(key, None)
+        return self._data.pop(key, None) is not None
+
+    def _lookup(self, key: str, kind: type) -> Any:
+        if not self._alive(key):
+            return None
+        value = self._data[key]
+        if type(value) is not kind:
+            raise ResponseError(WRONGTYPE)
+        return value
+
+    def _container(self, key: str, kind: type) -> Any:
+        value = self._lookup(key, kind)
+        if value is None:
+            value = self._data[key] = kind()
+        return value
+
+    def _cleanup(self, key: str) -> None:
+        # Redis menghapus hash/set/zset yang kosong
+        if key in self._data and not self._data[key]:
+            self._remove(key)
+
+    def _written(self) -> None:
+        self._writes += 1
+        if self._writes % _SWEEP_EVERY == 0 and self._expires:
+            now = time.monotonic()
+            for key, deadline in list(self._expires.items())[:_SWEEP_SAMPLE]:
+                if deadline <= now:
+                    self._remove(key)
+
+    def _set_expiry(self, key: str, seconds: float | None) -> None:
+        if seconds is None:
+            self._expires.pop(key, None)
+        else:
+            self._expires[key] = time.monotonic() + seconds
+
+    # --- GENERIC ---
+    def ping(self) -> bool:
+        return True
+
+    def delete(self, *names: Any) -> int:
+        removed = sum(
+            1 for n in names if self._alive(_key(n)) and self._remove(_key(n))
+        )
+        self._written()
+        return removed
+
+    unlink = delete
+
+    def exists(self, *names: Any) -> int:
+        return sum(1 for n in names if self._alive(_key(n)))
+
+    def keys(self, pattern: Any = "*") -> list[bytes]:
+        pattern = _key(pattern)
+        return [
+            k.encode("utf-8") for k in list(self._data)
+            if self._alive(k) and fnmatch.fnmatchcase(k, pattern)
+        ]
+
+    def scan(
+        self, cursor: int = 0, match: Any = None, count: int | None = None
+    ) -> tuple[int, list[bytes]]:
+        # Semua key dikembalikan sekaligus: cursor berikutnya selalu 0 (selesai)
+        return 0, self.keys(match or "*")
+
+    def dbsize(self) -> int:
+        return sum(1 for k in list(self._data) if self._alive(k))
+
+    def flushdb(self, asynchronous: bool = False) -> bool:
+        self._data.clear()
+        self._expires.clear()
+        return True
+
+    flushall = flushdb
+
+    # --- TTL ---
+    def expire(self, name: Any, time: Any) -> bool:
+        return self.pexpire(name, int(time) * 1000)
+
+    def pexpire(self, name: Any, time: Any) -> bool:
+        key = _key(name)
+        if not self._alive(key):
+            return False
+        if int(time) <= 0:
+            self._remove(key)
+        else:
+            self._set_expiry(key, int(time) / 1000)
+        self._written()
+        return True
+
+    def pttl(self, name: Any) -> int:
+        key = _key(name)
+        if not self._alive(key):
+            return -2
+        deadline = self._expires.get(key)
+        if deadline is None:
+            return -1
+        return max(0, round((deadline - time.monotonic()) * 1000))
+
+    def ttl(self, name: Any) -> int:
+        remaining = self.pttl(name)
+        return remaining if remaining < 0 else (remaining + 500) // 1000
+
+    def persist(self, name: Any) -> bool:
+        key = _key(name)
+        return self._alive(key) and self._expires.pop(key, None) is not None
+
+    # --- STRING ---
+    def get(self, name: Any) -> bytes | None:
+        return self._lookup(_key(name), bytes)  # type: ignore[no-any-return]
+
+    def set(
+        self,
+        name: Any,
+        value: Any,
+        ex: Any = None,
+        px: Any = None,
+        nx: bool = False,
+        xx: bool = False,
+        keepttl: bool = False,
+        get: bool = False,
+    ) -> Any:
+        key = _key(name)
+        exists = self._alive(key)
+        previous = self.get(key) if get else None
+        if (nx and exists) or (xx and not exists):
+            return previous if get else None
+
+        expiry_ttl = self._expires.get(key) if keepttl else None
+        self._data[key] = _encode(value)
+        if ex is not None:
+            self._set_expiry(key, int(ex))
+        elif px is not None:
+            self._set_expiry(key, int(px) / 1000)
+        elif expiry_ttl is not None:
+            self._expires[key] = expiry_ttl
+        else:
+            self._expires.pop(key, None)
+        self._written()
+        return previous if get else True
+
+    def setex(self, name: Any, time: Any, value: Any) -> bool:
+        return self.set(name, value, ex=time)  # type: ignore[no-any-return]
+
+    def setnx(self, name: Any, value: Any) -> bool:
+        return bool(self.set(name, value, nx=True))
+
+    def getdel(self, name: Any) -> bytes | None:
+        value = self.get(name)
+        if value is not None:
+            self._remove(_key(name))
+        return value
+
+    def mget(self, keys: Any, *args: Any) -> list[bytes | None]:
+        names = list(keys) if isinstance(keys, (list, tuple)) else [keys]
+        names.extend(args)
+        result = []
+        for n in names:
+            key = _key(n)
+            value = self._data.get(key) if self._alive(key) else None
+            result.append(value if isinstance(value, bytes) else None)
+        return result
+
+    def mset(self, mapping: dict[Any, Any]) -> bool:
+        for name, value in mapping.items():
+            self.set(name, value)
+        return True
+
+    def incrby(self, name: Any, amount: int = 1) -> int:
+        key = _key(name)
+        current = self.get(key)
+        value = (_to_int(current) if current is not None else 0) + int(amount)
+        self._data[key] = str(value).encode("utf-8")
+        self._written()
+        return value
+
+    def incr(self, name: Any, amount: int = 1) -> int:
+        return self.incrby(name, amount)
+
+    def decrby(self, name: Any, amount: int = 1) -> int:
+        return self.incrby(name, -int(amount))
+
+    def decr(self, name: Any, amount: int = 1) -> int:
+        return self.incrby(name, -int(amount))
+
+    # --- HASH ---
+    def hset(
+        self,
+        name: Any,
+        key: Any = None,
+        value: Any = None,
+        mapping: dict[Any, Any] | None = None,
+    ) -> int:
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        if not items:
+            raise DataError("'hset' with no key value pairs")
+        data = self._container(_key(name), dict)
+        added = 0
+        for field, val in items.items():
+            field_b = _encode(field)
+            added += field_b not in data
+            data[field_b] = _encode(val)
+        self._written()
+        return added
+
+    def hget(self, name: Any, key: Any) -> bytes | None:
+        data = self._lookup(_key(name), dict)
+        return data.get(_encode(key)) if data else None
+
+    def hmget(self, name: Any, keys: Iterable[Any]) -> list[bytes | None]:
+        data = self._lookup(_key(name), dict) or {}
+        return [data.get(_encode(k)) for k in keys]
+
+    def hgetall(self, name: Any) -> dict[bytes, bytes]:
+        return dict(self._lookup(_key(name), dict) or {})
+
+    def hdel(self, name: Any, *keys: Any) -> int:
+        data = self._lookup(_key(name), dict)
+        if not data:
+            return 0
+        removed = sum(1 for k in keys if data.pop(_encode(k), None) is not None)
+        self._cleanup(_key(name))
+        return removed
+
+    def hincrby(self, name: Any, key: Any, amount: int = 1) -> int:
+        data = self._container(_key(name), dict)
+        field = _encode(key)
+        value = (_to_int(data[field]) if field in data else 0) + int(amount)
+        data[field] = str(value).encode("utf-8")
+        self._written()
+        return value
+
+    # --- SET ---
+    def sadd(self, name: Any, *values: Any) -> int:
+        data = self._container(_key(name), set)
+        before = len(data)
+        data.update(_encode(v) for v in values)
+        self._written()
+        return len(data) - before
+
+    def srem(self, name: Any, *values: Any) -> int:
+        data = self._lookup(_key(name), set)
+        if not data:
+            return 0
+        before = len(data)
+        data.difference_update(_encode(v) for v in values)
+        self._cleanup(_key(name))
+        return before - len(data)
+
+    def smembers(self, name: Any) -> "set[bytes]":
+        return set(self._lookup(_key(name), set) or ())
+
+    def sismember(self, name: Any, value: Any) -> bool:
+        return _encode(value) in (self._lookup(_key(name), set) or ())
+
+    def smismember(self, name: Any, values: Iterable[Any], *args: Any) -> list[bool]:
+        data = self._lookup(_key(name), set) or ()
+        return [_encode(v) in data for v in [*values, *args]]
+
+    def scard(self, name: Any) -> int:
+        return len(self._lookup(_key(name), set) or ())
+
+    # --- SORTED SET (member -> score) ---
+    def zadd(
+        self, name: Any, mapping: dict[Any, float], nx: bool = False, xx: bool = False
+    ) -> int:
+        data = self._container(_key(name), _SortedSet)
+        added = 0
+        for member, score in mapping.items():
+            member_b = _encode(member)
+            exists = member_b in data
+            if (nx and exists) or (xx and not exists):
+                continue
+            added += not exists
+            data[member_b] = float(score)
+        self._cleanup(_key(name))
+        self._written()
+        return added
+
+    def zrem(self, name: Any, *values: Any) -> int:
+        data = self._lookup(_key(name), _SortedSet)
+        if not data:
+            return 0
+        removed = sum(1 for v in values if data.pop(_encode(v), None) is not None)
+        self._cleanup(_key(name))
+        return removed
+
+    def zscore(self, name: Any, value: Any) -> float | None:
+        data = self._lookup(_key(name), _SortedSet) or {}
+        return data.get(_encode(value))  # type: ignore[no-any-return]
+
+    def zcard(self, name: Any) -> int:
+        return len(self._lookup(_key(name), _SortedSet) or ())
+
+    def zrangebyscore(
+        self,
+        name: Any,
+        min: Any,
+        max: Any,
+        start: int | None = None,
+        num: int | None = None,
+        withscores: bool = False,
+    ) -> list[Any]:
+        data = self._lookup(_key(name), _SortedSet) or {}
+        low, high = _score_bound(min), _score_bound(max)
+        items = sorted(
+            ((score, member) for member, score in data.items() if low <= score <= high)
+        )
+        if start is not None and num is not None:
+            items = items[start:start + num] if num >= 0 else items[start:]
+        if withscores:
+            return [(member, score) for score, member in items]
+        return [member for _, member in items]
+
+    def zremrangebyscore(self, name: Any, min: Any, max: Any) -> int:
+        members = self.zrangebyscore(name, min, max)
+        return self.zrem(name, *members) if members else 0
+
+    # --- SCRIPTING ---
+    def script_load(self, script: Any) -> bytes:
+        sha = script_sha(script)
+        if sha not in _lua_scripts:
+            raise ResponseError(
+                "Memory backend tidak punya emulasi untuk script ini "
+                "(register_lua_script)"
+            )
+        self._scripts.add(sha)
+        return sha.encode("ascii")
+
+    def script_exists(self, *args: Any) -> list[bool]:
+        return [_key(sha).lower() in self._scripts for sha in args]
+
+    def script_flush(self, sync_type: Any = None) -> bool:
+        self._scripts.clear()
+        return True
+
+    def evalsha(self, sha: Any, numkeys: int, *keys_and_args: Any) -> Any:
+        sha = _key(sha).lower()
+        if sha not in self._scripts:
+            raise NoScriptError("No matching script. Please use EVAL.")
+        return self._run_script(sha, numkeys, keys_and_args)
+
+    def eval(self, script: Any, numkeys: int, *keys_and_args: Any) -> Any:
+        # Seperti Redis: EVAL ikut menyimpan script ke cache
+        # (EVALSHA berikutnya berhasil)
+        self.script_load(script)
+        return self._run_script(script_sha(script), numkeys, keys_and_args)
+
+    def _run_script(
+        self, sha: str, numkeys: int, keys_and_args: tuple[Any, ...]
+    ) -> Any:
+        keys = [_key(k) for k in keys_and_args[:numkeys]]
+        args = [_encode(a) for a in keys_and_args[numkeys:]]
+        return _lua_scripts[sha](self, keys, args)
+
+    # --- PUB/SUB ---
+    def publish(self, channel: Any, message: Any) -> int:
+        channel_b = _encode(channel)
+        data = _encode(message)
+        receivers = 0
+        for pubsub in list(self._subscribers):
+            receivers += pubsub._deliver(channel_b, data)
+        return receivers
+
+    # --- STREAMS ---
+    def xadd(
+        self,
+        name: Any,
+        fields: dict[Any, Any],
+        id: Any = "*",
+        maxlen: int | None = None,
+        approximate: bool = True,
+        nomkstream: bool = False,
+    ) -> bytes | None:
+        key = _key(name)
+        stream = self._lookup(key, _Stream)
+        if stream is None:
+            if nomkstream:
+                return None
+            stream = self._data[key] = _Stream()
+
+        if _key(id) == "*":
+            now = int(time.time() * 1000)
+            last_ms, last_seq = stream.last_id
+            new_id = (now, 0) if now > last_ms else (last_ms, last_seq + 1)
+        else:
+            new_id = _parse_id(id)
+            if new_id <= stream.last_id:
+                raise ResponseError(
+                    "The ID specified in XADD is equal or smaller than "
+                    "the target stream top item"
+                )
+        stream.entries.append(
+            (new_id, {_encode(k): _encode(v) for k, v in fields.items()})
+        )
+        stream.last_id = new_id
+        if maxlen is not None:
+            # Trim eksak (approximate hanya optimasi di Redis, hasilnya tetap valid)
+            while len(stream.entries) > maxlen:
+                stream.entries.popleft()
+        self._written()
+        self._wake_stream_waiters()
+        return _format_id(new_id)
+
+    def xlen(self, name: Any) -> int:
+        stream = self._lookup(_key(name), _Stream)
+        return len(stream.entries) if stream else 0
+
+    def xrange(
+        self, name: Any, min: Any = "-", max: Any = "+", count: int | None = None
+    ) -> list[Any]:
+        stream = self._lookup(_key(name), _Stream)
+        if not stream:
+            return []
+        low, high = _parse_id(min), _parse_id(max, default_seq=2**64 - 1)
+        result = []
+        for entry_id, fields in stream.entries:
+            if low <= entry_id <= high:
+                result.append(_entry(entry_id, fields))
+                if count is not None and len(result) >= count:
+                    break
+        return result
+
+    def xdel(self, name: Any, *ids: Any) -> int:
+        stream = self._lookup(_key(name), _Stream)
+        if not stream:
+            return 0
+        targets = {_parse_id(i) for i in ids}
+        before = len(stream.entries)
+        stream.entries = deque(e for e in stream.entries if e[0] not in targets)
+        return before - len(stream.entries)
+
+    def xread(self, streams: dict[Any, Any], count: int | None = None) -> list[Any]:
+        result = []
+        for name, last in streams.items():
+            stream = self._lookup(_key(name), _Stream)
+            if not stream:
+                continue
+            start = stream.last_id if _key(last) == "$" else _parse_id(last)
+            entries = stream.after(start, count)
+            if entries:
+                result.append([_encode(name), [_entry(i, f) for i, f in entries]])
+        return result
+
+    def xgroup_create(
+        self, name: Any, groupname: Any, id: Any = "$", mkstream: bool = False
+    ) -> bool:
+        key = _key(name)
+        stream = self._lookup(key, _Stream)
+        if stream is None:
+            if not mkstream:
+                raise ResponseError(
+                    "The XGROUP subcommand requires the key to exist. "
+                    "Note that for CREATE you may want to use the MKSTREAM option"
+                )
+            stream = self._data[key] = _Stream()
+        group = _key(groupname)
+        if group in stream.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        start = stream.last_id if _key(id) == "$" else _parse_id(id)
+        stream.groups[group] = _ConsumerGroup(start)
+        return True
+
+    def _group(self, name: Any, groupname: Any) -> tuple[_Stream, _ConsumerGroup]:
+        stream = self._lookup(_key(name), _Stream)
+        group = stream.groups.get(_key(groupname)) if stream else None
+        if group is None:
+            raise ResponseError(
+                f"NOGROUP No such key '{_key(name)}' "
+                f"or consumer group '{_key(groupname)}'"
+            )
+        return stream, group
+
+    def xreadgroup(
+        self,
+        groupname: Any,
+        consumername: Any,
+        streams: dict[Any, Any],
+        count: int | None = None,
+        noack: bool = False,
+    ) -> list[Any]:
+        consumer = _key(consumername)
+        now = int(time.time() * 1000)
+        result = []
+        for name, last in streams.items():
+            stream, group = self._group(name, groupname)
+            if _key(last) == ">":
+                entries = stream.after(group.last_delivered, count)
+                if entries:
+                    group.last_delivered = entries[-1][0]
+                for entry_id, _ in entries:
+                    if not noack:
+                        group.pending[entry_id] = [consumer, now, 1]
+                items = [_entry(i, f) for i, f in entries]
+            else:
+                # History: pesan pending milik consumer ini (redelivery setelah crash)
+                start = _parse_id(last)
+                ids = sorted(
+                    i
+                    for i, p in group.pending.items()
+                    if p[0] == consumer and i > start
+                )
+                items = [_entry(i, stream.get(i)) for i in ids[:count]]
+            if items or _key(last) != ">":
+                result.append([_encode(name), items])
+        return result
+
+    def xack(self, name: Any, groupname: Any, *ids: Any) -> int:
+        _, group = self._group(name, groupname)
+        return sum(1 for i in ids if group.pending.pop(_parse_id(i), None) is not None)
+
+    def xpending(self, name: Any, groupname: Any) -> dict[str, Any]:
+        _, group = self._group(name, groupname)
+        ids = sorted(group.pending)
+        per_consumer: dict[str, int] = {}
+        for consumer, _, _ in group.pending.values():
+            per_consumer[consumer] = per_consumer.get(consumer, 0) + 1
+        return {
+            "pending": len(ids),
+            "min": _format_id(ids[0]) if ids else None,
+            "max": _format_id(ids[-1]) if ids else None,
+            "consumers": [
+                {"name": c.encode("utf-8"), "pending": n}
+                for c, n in per_consumer.items()
+            ],
+        }
+
+    def xpending_range(
+        self,
+        name: Any,
+        groupname: Any,
+        min: Any,
+        max: Any,
+        count: int,
+        consumername: Any = None,
+        idle: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Detail pesan pending (termasuk times_delivered) dalam rentang id."""
+        _, group = self._group(name, groupname)
+        low, high = _parse_id(min), _parse_id(max, default_seq=2**64 - 1)
+        now = int(time.time() * 1000)
+        result = []
+        for entry_id in sorted(group.pending):
+            consumer, delivered_at, deliveries = group.pending[entry_id]
+            if not low <= entry_id <= high:
+                continue
+            if consumername is not None and consumer != _key(consumername):
+                continue
+            if idle is not None and now - delivered_at < int(idle):
+                continue
+            result.append({
+                "message_id": _format_id(entry_id),
+                "consumer": consumer.encode("utf-8"),
+                "time_since_delivered": now - delivered_at,
+                "times_delivered": deliveries,
+            })
+            if len(result) >= count:
+                break
+        return result
+
+    def xautoclaim(
+        self,
+        name: Any,
+        groupname: Any,
+        consumername: Any,
+        min_idle_time: int,
+        start_id: Any = "0-0",
+        count: int | None = None,
+        justid: bool = False,
+    ) -> list[Any]:
+        """Pindahkan pesan pending yang idle >= min_idle_time ms ke consumer ini."""
+        stream, group = self._group(name, groupname)
+        consumer = _key(consumername)
+        now = int(time.time() * 1000)
+        start = _parse_id(start_id)
+        limit = count or 100
+        claimed: list[Any] = []
+        deleted: list[bytes] = []
+        next_id: StreamId = (0, 0)
+        for entry_id in sorted(group.pending):
+            if entry_id < start:
+                continue
+            if len(claimed) + len(deleted) >= limit:
+                next_id = entry_id
+                break
+            _, delivered_at, deliveries = group.pending[entry_id]
+            if now - delivered_at < int(min_idle_time):
+                continue
+            fields = stream.get(entry_id)
+            if fields is None:
+                # Entry sudah di-trim (MAXLEN): dibuang dari PEL seperti Redis 7
+                del group.pending[entry_id]
+                deleted.append(_format_id(entry_id))
+                continue
+            group.pending[entry_id] = [consumer, now, deliveries + 1]
+            claimed.append(_format_id(entry_id) if justid else _entry(entry_id, fields))
+        return [_format_id(next_id), claimed, deleted]
+
+    def _wake_stream_waiters(self) -> None:
+        waiters, self._stream_waiters = self._stream_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_for_stream(self, timeout: float | None) -> None:
+        """Tunggu sampai ada XADD berikutnya (dipakai oleh XREAD/XREADGROUP BLOCK)."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._stream_waiters.append(waiter)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(waiter, timeout)
+
+
+class _SortedSet(dict):  # type: ignore[type-arg]
+    """Penanda tipe zset (dict member -> score) agar bisa dibedakan dari hash."""
+
+
+def _score_bound(value: Any) -> float:
+    text = _key(value)
+    if text in ("-inf", "+inf", "inf"):
+        return float(text)
+    return float(text.lstrip("("))
+
+
+# Command yang bisa dipanggil di client/pipeline (nama method MemoryStore)
+MEMORY_COMMANDS: frozenset[str] = frozenset(
+    name for name in vars(MemoryStore)
+    if not name.startswith("_") and name != "wait_for_stream"
+)
+
+
+# ==========================================
+# CLIENT
+# ==========================================
+class MemoryConnectionPool:
+    """Stub pool agar kode yang membaca metrik pool tetap jalan."""
+    max_connections = None
+
+
+class MemoryRedis:
+    """
+    Client async dengan API yang sama seperti aioredis.Redis
+    (untuk command yang ada di MEMORY_COMMANDS).
+
+    Penggunaan:
+        client = MemoryRedis.from_url("memory://", decode_responses=True)
+        await client.set("a", 1, ex=10)
+    """
+
+    def __init__(
+        self, store: MemoryStore | None = None, decode_responses: bool = False
+    ):
+        self.store = store or MemoryStore()
+        self.decode_responses = decode_responses
+        self.connection_pool = MemoryConnectionPool()
+
+    @classmethod
+    def from_url(
+        cls, url: str, decode_responses: bool = False, **kwargs: Any
+    ) -> "MemoryRedis":
+        """
+        URL yang sama -> store yang sama ('memory://', 'memory://tenant-a', ...).
+        Opsi koneksi lain (socket_timeout, max_connections, dll) diabaikan.
+        """
+        if not url.startswith(MEMORY_SCHEME):
+            raise ValueError(
+                f"URL memory backend harus diawali '{MEMORY_SCHEME}': {url}"
+            )
+        store = _stores.get(url)
+        if store is None:
+            store = _stores[url] = MemoryStore()
+        return cls(store, decode_responses=decode_responses)
+
+    def _result(self, value: Any) -> Any:
+        return _decode(value) if self.decode_responses else value
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in MEMORY_COMMANDS:
+            raise AttributeError(f"Command '{name}' tidak didukung oleh memory backend")
+        command = getattr(self.store, name)
+
+        async def _execute(*args: Any, **kwargs: Any) -> Any:
+            return self._result(command(*args, **kwargs))
+        return _execute
+
+    async def xread(
+        self,
+        streams: dict[Any, Any],
+        count: int | None = None,
+        block: int | None = None,
+    ) -> list[Any]:
+        # '$' harus di-resolve sekali di awal, bukan di setiap percobaan
+        resolved = {
+            name: self._last_id(name) if _key(last) == "$" else last
+            for name, last in streams.items()
+        }
+        return await self._blocking(lambda: self.store.xread(resolved, count), block)
+
+    def _last_id(self, name: Any) -> bytes:
+        stream = self.store._lookup(_key(name), _Stream)
+        return _format_id(stream.last_id if stream else (0, 0))
+
+    async def xreadgroup(
+        self,
+        groupname: Any,
+        consumername: Any,
+        streams: dict[Any, Any],
+        count: int | None = None,
+        block: int | None = None,
+        noack: bool = False,
+    ) -> list[Any]:
+        return await self._blocking(
+            lambda: self.store.xreadgroup(
+                groupname, consumername, streams, count, noack
+            ),
+            block,
+        )
+
+    async def _blocking(self, read: Any, block: int | None) -> list[Any]:
+        """BLOCK ms: ulangi read setiap ada XADD sampai dapat data atau timeout."""
+        result = read()
+        if result or block is None:
+            return self._result(result)  # type: ignore[no-any-return]
+        deadline = None if block == 0 else time.monotonic() + block / 1000
+        while not result:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            await self.store.wait_for_stream(remaining)
+            result = read()
+        return self._result(result)  # type: ignore[no-any-return]
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: Any = None
+    ) -> "MemoryPipeline":
+        return MemoryPipeline(self, transaction=transaction)
+
+    def pubsub(
+        self, ignore_subscribe_messages: bool = False, **kwargs: Any
+    ) -> "MemoryPubSub":
+        return MemoryPubSub(self, ignore_subscribe_messages=ignore_subscribe_messages)
+
+    async def aclose(self) -> None:
+        """Data tetap tersimpan di store (milik URL), hanya client yang ditutup."""
+
+    close = aclose
+
+    async def __aenter__(self) -> "MemoryRedis":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+class MemoryPipeline:
+    """
+    Pipeline: command diantrikan lalu dieksekusi berurutan saat execute().
+    Eksekusi tanpa await di tengah -> atomic (setara MULTI/EXEC).
+    """
+
+    def __init__(self, client: MemoryRedis, transaction: bool = True):
+        self._client = client
+        self.transaction = transaction
+        self.command_stack: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in MEMORY_COMMANDS:
+            raise AttributeError(f"Command '{name}' tidak didukung oleh memory backend")
+
+        def _queue(*args: Any, **kwargs: Any) -> "MemoryPipeline":
+            self.command_stack.append((name, args, kwargs))
+            return self
+        return _queue
+
+    def __len__(self) -> int:
+        return len(self.command_stack)
+
+    def multi(self) -> None:
+        """No-op: pipeline memory selalu atomic."""
+
+    def reset(self) -> None:
+        self.command_stack = []
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        stack, self.command_stack = self.command_stack, []
+        results: list[Any] = []
+        for name, args, kwargs in stack:
+            try:
+                results.append(
+                    self._client._result(
+                        getattr(self._client.store, name)(*args, **kwargs)
+                    )
+                )
+            except (ResponseError, DataError) as e:
+                # Seperti Redis: error satu command tidak membatalkan command lain
+                results.append(e)
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.reset()
+
+
+class MemoryPubSub:
+    """PubSub dengan format message sama seperti redis-py."""
+
+    def __init__(self, client: MemoryRedis, ignore_subscribe_messages: bool = False):
+        self._client = client
+        self._store = client.store
+        self.ignore_subscribe_messages = ignore_subscribe_messages
+        self.channels: dict[bytes, None] = {}
+        self.patterns: dict[bytes, None] = {}
+        # Tidak ada koneksi fisik (CLIENT TRACKING tidak didukung)
+        self.connection = None
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels or self.patterns)
+
+    async def connect(self) -> None:
+        """No-op (kompatibilitas dengan redis-py)."""
+
+    def _message(
+        self, kind: str, channel: bytes, data: Any, pattern: bytes | None = None
+    ) -> dict[str, Any]:
+        return self._client._result(
+            {"type": kind, "pattern": pattern, "channel": channel, "data": data}
+        )
+
+    def _deliver(self, channel: bytes, data: bytes) -> int:
+        delivered = 0
+        if channel in self.channels:
+            self._queue.put_nowait(self._message("message", channel, data))
+            delivered += 1
+        text = channel.decode("utf-8")
+        for pattern in self.patterns:
+            if fnmatch.fnmatchcase(text, pattern.decode("utf-8")):
+                self._queue.put_nowait(
+                    self._message("pmessage", channel, data, pattern)
+                )
+                delivered += 1
+        return delivered
+
+    def _ack(self, kind: str, name: bytes) -> None:
+        if not self.ignore_subscribe_messages:
+            count = len(self.channels) + len(self.patterns)
+            self._queue.put_nowait(self._message(kind, name, count))
+
+    async def subscribe(self, *channels: Any) -> None:
+        self._store._subscribers.add(self)
+        for channel in channels:
+            self.channels[_encode(channel)] = None
+            self._ack("subscribe", _encode(channel))
+
+    async def psubscribe(self, *patterns: Any) -> None:
+        self._store._subscribers.add(self)
+        for pattern in patterns:
+            self.patterns[_encode(pattern)] = None
+            self._ack("psubscribe", _encode(pattern))
+
+    async def unsubscribe(self, *channels: Any) -> None:
+        for channel in [_encode(c) for c in channels] or list(self.channels):
+            self.channels.pop(channel, None)
+            self._ack("unsubscribe", channel)
+
+    async def punsubscribe(self, *patterns: Any) -> None:
+        for pattern in [_encode(p) for p in patterns] or list(self.patterns):
+            self.patterns.pop(pattern, None)
+            self._ack("punsubscribe", pattern)
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0
+    ) -> dict[str, Any] | None:
+        while True:
+            try:
+                if timeout is None:
+                    message = await self._queue.get()
+                elif timeout <= 0:
+                    message = self._queue.get_nowait()
+                else:
+                    message = await asyncio.wait_for(self._queue.get(), timeout)
+            except (TimeoutError, asyncio.QueueEmpty):
+                return None
+            kind = message["type"]
+            if ignore_subscribe_messages and kind not in ("message", "pmessage"):
+                continue
+            return message
+
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self) -> None:
+        self._store._subscribers.discard(self)
+        self.channels.clear()
+        self.patterns.clear()
+
+    reset = aclose
+    close = aclose
+
+
+def reset_memory_stores() -> None:
+    """Hapus semua store bersama (untuk isolasi antar test)."""
+    _stores.clear()
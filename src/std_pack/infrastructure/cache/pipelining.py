@@ -0,0 +1,125 @@
+"""
+Redis Auto-Pipelining.
+Mengumpulkan command dari banyak coroutine dalam satu 'tick' event loop
+menjadi satu pipeline (satu round trip), lalu membagikan hasilnya kembali
+ke masing-masing pemanggil.
+"""
+import asyncio
+from typing import Any
+
+from redis import asyncio as aioredis
+
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Command yang aman di-batch (tidak butuh koneksi khusus / state blocking).
+# Command lain (pipeline, pubsub, blpop, dll) diteruskan langsung ke client asli.
+PIPELINED_COMMANDS: frozenset[str] = frozenset({
+    "get", "set", "mget", "mset", "getdel", "getex", "setex", "setnx",
+    "delete", "unlink", "exists", "expire", "pexpire", "expireat",
+    "ttl", "pttl", "persist", "incr", "incrby", "decr", "decrby",
+    "hget", "hset", "hmget", "hgetall", "hdel", "hincrby",
+    "sadd", "srem", "smembers", "sismember", "smismember", "scard",
+    "zadd", "zrem", "zscore", "zrangebyscore", "zremrangebyscore", "zcard",
+    "publish", "xadd", "xack", "xlen", "evalsha",
+})
+
+
+class AutoPipelineClient:
+    """
+    Proxy transparan di atas aioredis.Redis.
+
+    Command yang ada di PIPELINED_COMMANDS tidak langsung dikirim, tapi
+    diantrikan. Antrian di-flush di tick event loop berikutnya, atau segera
+    jika sudah mencapai `max_batch` command.
+    """
+
+    def __init__(self, client: aioredis.Redis, max_batch: int = 128):
+        if max_batch < 1:
+            raise ValueError("max_batch minimal 1")
+        self._client = client
+        self._max_batch = max_batch
+        self._pending: list[
+            tuple[str, tuple[Any, ...], dict[str, Any], asyncio.Future[Any]]
+        ] = []
+        self._flush_scheduled = False
+        self._inflight: set[asyncio.Task[None]] = set()
+        self.batches_sent = 0
+        self.commands_sent = 0
+
+    @property
+    def raw_client(self) -> aioredis.Redis:
+        """Client asli (tanpa batching)."""
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name in PIPELINED_COMMANDS:
+            async def _queued(*args: Any, **kwargs: Any) -> Any:
+                # Coroutine (bukan Future) agar sama dengan API aioredis: aman
+                # untuk create_task / inspect.iscoroutine. Masuk antrian saat
+                # di-await.
+                return await self._enqueue(name, args, kwargs)
+            return _queued
+        return attr
+
+    def _enqueue(
+        self, name: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> asyncio.Future[Any]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.append((name, args, kwargs, future))
+
+        if len(self._pending) >= self._max_batch:
+            # Batch penuh: kirim sekarang, jangan tunggu tick berikutnya
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._execute(batch))
+        # Simpan reference agar task tidak di-GC sebelum selesai
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _execute(
+        self,
+        batch: list[tuple[str, tuple[Any, ...], dict[str, Any], asyncio.Future[Any]]],
+    ) -> None:
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for name, args, kwargs, _ in batch:
+                    getattr(pipe, name)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.error("redis_autopipeline_failed", size=len(batch), error=str(e))
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_sent += 1
+        self.commands_sent += len(batch)
+
+        # Fan-out: hasil ke-i milik pemanggil ke-i
+        for (*_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue  # Pemanggil sudah cancel
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Flush sisa antrian, tunggu batch yang sedang jalan, lalu tutup client."""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._client.aclose()  # type: ignore
@@ -2,42 +2,216 @@
 Redis Cache Wrapper.
 Menangani koneksi ke Redis untuk Caching, Rate Limiting, dan Pub/Sub.
 """
-from typing import Optional
+from typing import Any, Iterable, Optional
 
 # Pastikan user sudah install: poetry add redis
 from redis import asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.connection import parse_url
+from redis.asyncio.sentinel import Sentinel
+from redis.cluster import LoadBalancingStrategy
+
+from std_pack.config import BaseAppSettings
+from std_pack.infrastructure.cache.breaker import CircuitBreaker, GuardedRedisClient
+from std_pack.infrastructure.cache.memory import MEMORY_SCHEME, MemoryRedis
+from std_pack.infrastructure.cache.pipelining import AutoPipelineClient
+from std_pack.infrastructure.cache.tracking import ClientSideCache
 from std_pack.infrastructure.logging import get_logger
 
 logger = get_logger(__name__)
 
+REDIS_MODES = ("standalone", "cluster", "sentinel")
+
 class RedisManager:
     """
     Manajer koneksi Redis.
     Bersifat 'Lazy': Koneksi baru dibuat saat init_cache dipanggil.
+
+    Topologi (mode):
+    - "standalone": satu node via REDIS_URL (default).
+    - "cluster": Redis Cluster (slot-aware). REDIS_URL = salah satu node awal.
+    - "sentinel": primary ditemukan otomatis lewat Sentinel; replica untuk read
+      via get_replica_client(). REDIS_URL hanya dipakai untuk db/password.
+
+    REDIS_URL 'memory://...' memakai backend in-process (MemoryRedis) tanpa
+    server Redis: untuk testing, benchmark, dan service single-node kecil.
+
+    auto_pipeline=True: get_client() mengembalikan AutoPipelineClient,
+    sehingga command dari coroutine yang berbeda di-batch otomatis.
+
+    Ada dua mode client:
+    - get_client(): text client (decode_responses=True, return str).
+    - get_binary_client(): bytes client, untuk payload binary / codec.
+
+    client_cache_prefixes (opt-in): key ber-prefix ini di-cache lokal dan
+    di-invalidate oleh Redis (CLIENT TRACKING). Akses via get_local_cache().
+
+    circuit_breaker (opt-in): semua client dibungkus GuardedRedisClient.
+    Saat Redis lambat/mati, command langsung gagal dengan CircuitOpenError
+    (tanpa menunggu socket_timeout). Timeout per operasi diatur lewat
+    operation_timeout (default) dan operation_timeouts ({"get": 0.05, ...}).
     """
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        auto_pipeline: bool = False,
+        pipeline_max_batch: int = 128,
+        client_cache_prefixes: Iterable[str] | None = None,
+        client_cache_size: int = 10_000,
+        client_cache_ttl: float = 5.0,
+        mode: str = "standalone",
+        sentinel_nodes: Iterable[str] | None = None,
+        sentinel_master: str = "mymaster",
+        read_from_replicas: bool = False,
+        max_connections: int | None = None,
+        socket_timeout: float = 5.0,
+        circuit_breaker: CircuitBreaker | None = None,
+        operation_timeout: float | None = None,
+        operation_timeouts: dict[str, float] | None = None,
+    ):
+        if mode not in REDIS_MODES:
+            raise ValueError(
+                f"Mode Redis tidak dikenal: {mode}. Pilihan: {REDIS_MODES}"
+            )
         self.url = url
+        self.mode = mode
+        self.sentinel_nodes = list(sentinel_nodes or [])
+        if mode == "sentinel" and not self.sentinel_nodes:
+            raise ValueError(
+                "Mode sentinel butuh minimal satu sentinel_nodes (host:port)"
+            )
+        if url.startswith(MEMORY_SCHEME) and mode != "standalone":
+            raise ValueError("Backend memory:// hanya mendukung mode standalone")
+        self.sentinel_master = sentinel_master
+        self.read_from_replicas = read_from_replicas
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.auto_pipeline = auto_pipeline
+        self.pipeline_max_batch = pipeline_max_batch
         self.client: Optional[aioredis.Redis] = None
+        self.pipelined_client: Optional[AutoPipelineClient] = None
+        self.binary_client: Optional[aioredis.Redis] = None
+        self.pipelined_binary_client: Optional[AutoPipelineClient] = None
+        self.replica_client: Optional[aioredis.Redis] = None
+        self.client_cache_prefixes = list(client_cache_prefixes or [])
+        self.client_cache_size = client_cache_size
+        self.client_cache_ttl = client_cache_ttl
+        self.local_cache: Optional[ClientSideCache] = None
+        self._sentinel: Optional[Sentinel] = None
+        self.breaker = circuit_breaker
+        self.operation_timeout = operation_timeout
+        self.operation_timeouts = dict(operation_timeouts or {})
+        # Client yang dikembalikan getter (sudah dibungkus pipeline/breaker)
+        self._views: dict[str, Any] = {}
+
+    @classmethod
+    def from_settings(
+        cls, settings: BaseAppSettings, **overrides: Any
+    ) -> "RedisManager":
+        """Buat RedisManager dari konfigurasi REDIS_* di BaseAppSettings."""
+        kwargs: dict[str, Any] = {
+            "url": settings.REDIS_URL,
+            "mode": settings.REDIS_MODE,
+            "sentinel_nodes": settings.REDIS_SENTINEL_NODES,
+            "sentinel_master": settings.REDIS_SENTINEL_MASTER,
+            "read_from_replicas": settings.REDIS_READ_FROM_REPLICAS,
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "auto_pipeline": settings.REDIS_AUTO_PIPELINE,
+            "client_cache_prefixes": settings.REDIS_CLIENT_CACHE_PREFIXES,
+            "operation_timeout": settings.REDIS_OPERATION_TIMEOUT,
+            "operation_timeouts": settings.REDIS_OPERATION_TIMEOUTS,
+        }
+        if settings.REDIS_CIRCUIT_BREAKER:
+            kwargs["circuit_breaker"] = CircuitBreaker(
+                error_rate_threshold=settings.REDIS_BREAKER_ERROR_RATE,
+                slow_call_duration=settings.REDIS_BREAKER_SLOW_CALL_SECONDS,
+                reset_timeout=settings.REDIS_BREAKER_RESET_SECONDS,
+            )
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def _connection_kwargs(self, decode_responses: bool) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            # True: str, False: bytes mentah (codec)
+            "decode_responses": decode_responses,
+            "socket_timeout": self.socket_timeout,
+            "health_check_interval": 30,
+        }
+        if decode_responses:
+            kwargs["encoding"] = "utf-8"
+        if self.max_connections is not None:
+            # Cluster: batas per node. Standalone/Sentinel: batas per pool.
+            kwargs["max_connections"] = self.max_connections
+        return kwargs
+
+    def _get_sentinel(self) -> Sentinel:
+        if self._sentinel is None:
+            # Ambil db/password/username dari REDIS_URL, host-nya dari Sentinel
+            url_kwargs = dict(parse_url(self.url))
+            for key in ("host", "port", "connection_class"):
+                url_kwargs.pop(key, None)
+            nodes = []
+            for node in self.sentinel_nodes:
+                host, _, port = node.rpartition(":")
+                nodes.append((host, int(port)))
+            self._sentinel = Sentinel(
+                nodes,
+                sentinel_kwargs={"socket_timeout": self.socket_timeout},
+                **url_kwargs,
+            )
+        return self._sentinel
+
+    def _create_client(
+        self, decode_responses: bool, replica: bool = False
+    ) -> aioredis.Redis:
+        kwargs = self._connection_kwargs(decode_responses)
+        if self.url.startswith(MEMORY_SCHEME):
+            return MemoryRedis.from_url(self.url, decode_responses=decode_responses)  # type: ignore[return-value]
+        if self.mode == "cluster":
+            if self.read_from_replicas:
+                kwargs["load_balancing_strategy"] = (
+                    LoadBalancingStrategy.ROUND_ROBIN_REPLICAS
+                )
+            return RedisCluster.from_url(self.url, **kwargs)  # type: ignore[return-value]
+        if self.mode == "sentinel":
+            sentinel = self._get_sentinel()
+            if replica:
+                return sentinel.slave_for(self.sentinel_master, **kwargs)
+            return sentinel.master_for(self.sentinel_master, **kwargs)
+        # from_url otomatis mengelola connection pool
+        return aioredis.from_url(self.url, **kwargs)
 
     async def init_cache(self) -> None:
         """Inisialisasi koneksi Redis."""
         # Masking URL untuk log (jika ada password)
         masked_url = self.url.split("@")[-1] if "@" in self.url else self.url
-        logger.info("redis_initializing", url=masked_url)
+        logger.info("redis_initializing", url=masked_url, mode=self.mode)
         
         try:
-            # from_url otomatis mengelola connection pool
-            self.client = aioredis.from_url(
-                self.url,
-                encoding="utf-8",
-                decode_responses=True, # Penting: agar return string, bukan bytes
-                socket_timeout=5.0,
-                health_check_interval=30
-            )
+            self.client = self._create_client(decode_responses=True)
             
             # Test Ping untuk memastikan koneksi hidup
             await self.client.ping()
-            logger.info("redis_connected_success")
+
+            if self.auto_pipeline:
+                self.pipelined_client = AutoPipelineClient(
+                    self.client, max_batch=self.pipeline_max_batch
+                )
+            self._views.pop("text", None)  # View dibuat ulang oleh get_client()
+            if self.client_cache_prefixes:
+                self.local_cache = ClientSideCache(
+                    self.client,
+                    prefixes=self.client_cache_prefixes,
+                    max_size=self.client_cache_size,
+                    fallback_ttl=self.client_cache_ttl,
+                )
+                await self.local_cache.start()
+            logger.info(
+                "redis_connected_success",
+                auto_pipeline=self.auto_pipeline,
+                circuit_breaker=self.breaker is not None,
+            )
             
         except Exception as e:
             logger.critical("redis_connection_failed", error=str(e))
@@ -46,13 +220,36 @@ class RedisManager:
 
     async def close(self) -> None:
         """Tutup koneksi dengan bersih."""
-        if self.client:
+        self._views.clear()
+        if self.local_cache:
+            await self.local_cache.stop()
+            self.local_cache = None
+
+        if self.pipelined_binary_client:
+            await self.pipelined_binary_client.aclose()
+            self.pipelined_binary_client = None
+        elif self.binary_client:
+            await self.binary_client.aclose() # type: ignore
+        self.binary_client = None
+
+        if self.replica_client:
+            await self.replica_client.aclose() # type: ignore
+            self.replica_client = None
+
+        if self.pipelined_client:
+            # Flush antrian yang tersisa sebelum koneksi ditutup
+            await self.pipelined_client.aclose()
+            self.pipelined_client = None
+            logger.info("redis_connection_closed")
+        elif self.client:
             await self.client.aclose() # type: ignore
             logger.info("redis_connection_closed")
 
     def get_client(self) -> aioredis.Redis:
         """
-        Getter untuk mengambil client Redis raw.
+        Getter untuk mengambil client Redis.
+        Jika auto_pipeline aktif, yang dikembalikan adalah proxy batching
+        (API-nya sama dengan aioredis.Redis).
         Akan error jika init_cache belum dipanggil.
         """
         if not self.client:
@@ -60,4 +257,113 @@ class RedisManager:
                 "Redis client belum siap! "
                 "Pastikan Anda memanggil 'await redis_manager.init_cache()' saat startup."
             )
-        return self.client
\ No newline at end of file
+        if "text" not in self._views:
+            self._views["text"] = self._guard(self.pipelined_client or self.client)
+        return self._views["text"]  # type: ignore[no-any-return]
+
+    def get_binary_client(self) -> aioredis.Redis:
+        """
+        Getter client Redis mode bytes (decode_responses=False).
+        Dibuat on-demand (pool terpisah) agar service yang hanya butuh
+        text client tidak membuka koneksi tambahan.
+        """
+        self.get_client()  # Validasi init_cache sudah dipanggil
+        if self.binary_client is None:
+            self.binary_client = self._create_client(decode_responses=False)
+            if self.auto_pipeline:
+                self.pipelined_binary_client = AutoPipelineClient(
+                    self.binary_client, max_batch=self.pipeline_max_batch
+                )
+            self._views["binary"] = self._guard(
+                self.pipelined_binary_client or self.binary_client
+            )
+        return self._views["binary"]  # type: ignore[no-any-return]
+
+    def get_local_cache(self) -> ClientSideCache:
+        """
+        Getter client-side cache (hanya ada jika client_cache_prefixes diisi).
+        Penggunaan: flags = await redis_manager.get_local_cache().get("flags:checkout")
+        """
+        if not self.local_cache:
+            raise RuntimeError(
+                "Client-side cache tidak aktif! Isi 'client_cache_prefixes' "
+                "dan panggil 'await redis_manager.init_cache()'."
+            )
+        return self.local_cache
+
+    def get_replica_client(self) -> aioredis.Redis:
+        """
+        Client untuk read yang boleh sedikit tertinggal (eventual consistency).
+        - sentinel + read_from_replicas: koneksi ke replica (round robin).
+        - cluster: client cluster itu sendiri (read ke replica diatur load balancer).
+        - lainnya: fallback ke client utama.
+        """
+        client = self.get_client()
+        if self.mode != "sentinel" or not self.read_from_replicas:
+            return client
+        if self.replica_client is None:
+            self.replica_client = self._create_client(
+                decode_responses=True, replica=True
+            )
+            self._views["replica"] = self._guard(self.replica_client)
+        return self._views["replica"]  # type: ignore[no-any-return]
+
+    def _guard(self, client: Any) -> Any:
+        if self.breaker is None:
+            return client
+        return GuardedRedisClient(
+            client,
+            self.breaker,
+            default_timeout=self.operation_timeout,
+            operation_timeouts=self.operation_timeouts,
+        )
+
+    def is_available(self) -> bool:
+        """False jika breaker sedang open (konsumen bisa langsung degrade)."""
+        return self.breaker is None or self.breaker.state != "open"
+
+    def pool_stats(self) -> dict[str, Any]:
+        """
+        Metrik connection pool per client (text, binary, replica).
+        Cocok untuk diekspos ke endpoint health/metrics.
+        """
+        stats: dict[str, Any] = {
+            "mode": self.mode,
+            "max_connections": self.max_connections,
+            "pools": {},
+        }
+        if self.breaker is not None:
+            stats["circuit"] = self.breaker.stats()
+        clients = (
+            ("text", self.client),
+            ("binary", self.binary_client),
+            ("replica", self.replica_client),
+        )
+        for label, client in clients:
+            if client is not None:
+                stats["pools"][label] = _describe_pool(client)
+        return stats
+
+
+def _describe_pool(client: Any) -> dict[str, int]:
+    """Baca statistik pool dari client redis-py (atribut internal, defensif)."""
+    if isinstance(client, RedisCluster):
+        created = in_use = idle = 0
+        nodes = client.get_nodes()
+        for node in nodes:
+            node_created = len(getattr(node, "_connections", []))
+            node_idle = len(getattr(node, "_free", []))
+            created += node_created
+            idle += node_idle
+            in_use += node_created - node_idle
+        return {"nodes": len(nodes), "created": created, "in_use": in_use, "idle": idle}
+
+    pool = client.connection_pool
+    in_use = len(getattr(pool, "_in_use_connections", ()))
+    idle = len(getattr(pool, "_available_connections", ()))
+    return {
+        "created": in_use + idle,
+        "in_use": in_use,
+        "idle": idle,
+        "max": pool.max_connections,
+    }
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Redis Cache Store.
+Cache key-value di atas binary client + codec (orjson/msgpack/kompresi).
+Value disimpan sebagai bytes sehingga tidak ada decode UTF-8 yang sia-sia.
+"""
+from collections.abc import Iterable
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from std_pack.infrastructure.cache.codecs import Codec, JsonCodec
+from std_pack.infrastructure.cache.keys import cache_key
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RedisCache:
+    """
+    Cache generik.
+    Penggunaan:
+        cache = RedisCache(redis_manager, prefix="users", codec=MsgPackCodec())
+        await cache.set("42", user.model_dump(), ttl=300)
+        data = await cache.get("42")
+
+    Redis Cluster: isi `hash_tag` (misal tenant id) agar get_many/set_many
+    untuk satu grup key tetap di satu slot. Tanpa tag, get_many dipecah per slot.
+
+    Degradasi: jika Redis error/lambat/circuit open, read dianggap miss dan
+    write di-skip (cache bukan sumber kebenaran). delete() tetap raise agar
+    kegagalan invalidasi terlihat.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        prefix: str = "cache",
+        codec: Codec | None = None,
+        default_ttl: int | None = 300,
+        hash_tag: str | None = None,
+    ):
+        self.redis = redis_manager
+        self.prefix = prefix
+        self.codec = codec or JsonCodec()
+        self.default_ttl = default_ttl
+        self.hash_tag = hash_tag
+
+    def make_key(self, key: str) -> str:
+        return cache_key(self.prefix, key, tag=self.hash_tag)
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        try:
+            data = await self.redis.get_binary_client().get(self.make_key(key))
+        except RedisError as e:
+            logger.warning("cache_degraded", op="get", error=str(e))
+            return default
+        if data is None:
+            return default
+        return self.codec.decode(data)
+
+    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        try:
+            await self.redis.get_binary_client().set(
+                self.make_key(key), self.codec.encode(value), ex=ttl
+            )
+        except RedisError as e:
+            logger.warning("cache_degraded", op="set", error=str(e))
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """MGET sekaligus. Key yang tidak ada tidak dimasukkan ke hasil."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        client = self.redis.get_binary_client()
+        redis_keys = [self.make_key(k) for k in keys]
+        try:
+            if self.redis.mode == "cluster" and self.hash_tag is None:
+                # Key tersebar di banyak slot: MGET biasa ditolak Cluster
+                values = await client.mget_nonatomic(redis_keys)
+            else:
+                values = await client.mget(redis_keys)
+        except RedisError as e:
+            logger.warning("cache_degraded", op="get_many", error=str(e))
+            return {}
+        return {
+            k: self.codec.decode(v)
+            for k, v in zip(keys, values, strict=True)
+            if v is not None
+        }
+
+    async def set_many(self, items: dict[str, Any], ttl: int | None = None) -> None:
+        """Simpan banyak key dalam satu pipeline (satu round trip)."""
+        if not items:
+            return
+        ttl = ttl if ttl is not None else self.default_ttl
+        client = self.redis.get_binary_client()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self.make_key(key), self.codec.encode(value), ex=ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("cache_degraded", op="set_many", error=str(e))
+
+    async def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        return await self.redis.get_binary_client().delete(
+            *(self.make_key(k) for k in keys)
+        )
@@ -0,0 +1,336 @@
+"""
+Redis Client-Side Caching.
+Cache lokal (in-process) untuk key yang dibaca hampir di setiap request
+(feature flag, config tenant, permission set).
+
+Mode:
+- "tracking": Server-assisted via CLIENT TRACKING (BCAST + REDIRECT).
+  Redis mengirim invalidasi ke channel __redis__:invalidate saat key berubah.
+  Entry tetap punya safety TTL (`tracking_ttl`): invalidasi yang hilang
+  tidak pernah membuat value basi bertahan selamanya.
+- "ttl": Fallback jika server tidak mendukung tracking (Redis < 6, proxy, dll).
+  Entry lokal kedaluwarsa setelah `fallback_ttl` detik (polling).
+
+Koneksi tracking di-health-check berkala (CLIENT TRACKINGINFO / PING).
+Jika koneksi invalidasi putus (termasuk pubsub yang diam-diam reconnect
+dan kehilangan REDIRECT), cache lokal dikosongkan, sementara turun ke mode
+TTL, lalu tracking dipasang ulang dengan backoff.
+"""
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+
+
+class ClientSideCache:
+    """
+    Cache lokal ber-ukuran terbatas (LRU) dengan invalidasi dari Redis.
+    Hanya key yang diawali salah satu `prefixes` yang di-cache lokal,
+    key lain langsung diteruskan ke Redis.
+    """
+
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        prefixes: Iterable[str],
+        max_size: int = 10_000,
+        fallback_ttl: float = 5.0,
+        tracking_ttl: float = 60.0,
+        health_check_interval: float = 5.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        self.client = client
+        self.prefixes = tuple(prefixes)
+        if not self.prefixes:
+            raise ValueError("ClientSideCache butuh minimal satu prefix")
+        self.max_size = max_size
+        self.fallback_ttl = fallback_ttl
+        self.tracking_ttl = tracking_ttl
+        self.health_check_interval = health_check_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.mode: str | None = None
+
+        # key -> (value, expires_at)
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        # Naik setiap ada invalidasi; mencegah value basi tersimpan
+        # jika invalidasi datang saat GET masih in-flight.
+        self._invalidation_seq = 0
+        self._pubsub: Any = None
+        self._tracking_conn: Any = None
+        self._redirect_id: int | None = None
+        self._subscriptions = 0  # Konfirmasi SUBSCRIBE yang diterima
+        self._listener: asyncio.Task[None] | None = None
+        self.reconnects = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    # --- LIFECYCLE ---
+    async def start(self) -> None:
+        """Aktifkan tracking. Jika gagal, otomatis turun ke mode TTL."""
+        try:
+            await self._enable_tracking()
+            self.mode = "tracking"
+        except Exception as e:
+            await self._teardown_tracking()
+            self.mode = "ttl"
+            logger.warning(
+                "redis_client_tracking_unavailable",
+                error=str(e),
+                fallback_ttl=self.fallback_ttl,
+            )
+        else:
+            self._listener = asyncio.get_running_loop().create_task(self._supervise())
+        logger.info(
+            "redis_client_cache_started", mode=self.mode, prefixes=list(self.prefixes)
+        )
+
+    async def _enable_tracking(self) -> None:
+        # 1. Koneksi pubsub penerima invalidasi (ambil client id-nya dulu)
+        self._pubsub = self.client.pubsub()
+        await self._pubsub.connect()
+        conn = self._pubsub.connection
+        await conn.send_command("CLIENT", "ID")
+        self._redirect_id = int(await conn.read_response())
+        self._subscriptions = 0
+        await self._pubsub.subscribe(INVALIDATION_CHANNEL)
+
+        # 2. Koneksi khusus yang mengaktifkan tracking. BCAST: semua perubahan
+        #    key ber-prefix dikirim, tidak peduli koneksi mana yang membacanya.
+        self._tracking_conn = await self.client.connection_pool.get_connection()
+        args: list[Any] = [
+            "CLIENT",
+            "TRACKING",
+            "ON",
+            "REDIRECT",
+            self._redirect_id,
+            "BCAST",
+        ]
+        for prefix in self.prefixes:
+            args += ["PREFIX", prefix]
+        await self._tracking_conn.send_command(*args)
+        # Raise ResponseError jika tidak didukung
+        await self._tracking_conn.read_response()
+
+    async def _supervise(self) -> None:
+        """
+        Dengarkan invalidasi; jika koneksi hilang, kosongkan cache dan pasang
+        ulang tracking.
+        """
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Koneksi invalidasi tidak bisa dipercaya lagi. Kosongkan cache dan
+                # turun ke mode TTL agar tidak menyajikan data basi selama reconnect.
+                logger.error("redis_client_tracking_lost", error=str(e))
+                self.invalidate(None)
+                self.mode = "ttl"
+                await self._teardown_tracking(broken=True)
+            await self._reconnect()
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._enable_tracking()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._teardown_tracking(broken=True)
+                logger.warning(
+                    "redis_client_tracking_reconnect_failed",
+                    error=str(e),
+                    retry_in=delay,
+                )
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            # Perubahan selama terputus tidak pernah dikirim -> buang semua
+            self.invalidate(None)
+            self.mode = "tracking"
+            self.reconnects += 1
+            logger.info("redis_client_tracking_restored", reconnects=self.reconnects)
+            return
+
+    async def _listen(self) -> None:
+        """Return hanya lewat exception (koneksi putus / tracking rusak)."""
+        last_check = time.monotonic()
+        while True:
+            message = await self._pubsub.get_message(timeout=self.health_check_interval)
+            if message is not None:
+                self._handle(message)
+            if time.monotonic() - last_check >= self.health_check_interval:
+                await self._check_tracking()
+                last_check = time.monotonic()
+
+    def _handle(self, message: dict[str, Any]) -> None:
+        kind = message.get("type")
+        if kind == "subscribe":
+            self._subscriptions += 1
+            if self._subscriptions > 1:
+                # Pubsub reconnect otomatis & subscribe ulang: client id berubah,
+                # REDIRECT lama mati dan invalidasi selama putus sudah hilang.
+                raise ConnectionError("pubsub invalidasi tersambung ulang")
+        elif kind == "message":
+            # data = list key yang berubah, atau None jika FLUSHALL
+            self.invalidate(message.get("data"))
+
+    async def _check_tracking(self) -> None:
+        """Raise jika koneksi tracking mati atau REDIRECT-nya sudah tidak valid."""
+        conn = self._tracking_conn
+        await conn.send_command("CLIENT", "TRACKINGINFO")
+        try:
+            info = await conn.read_response()
+        except ResponseError:
+            return  # Redis 6.0 (tanpa TRACKINGINFO): koneksi tetap terbukti hidup
+        fields = {_text(k): v for k, v in zip(info[::2], info[1::2], strict=True)}
+        flags = {_text(f) for f in fields.get("flags") or ()}
+        if (
+            "off" in flags
+            or "broken_redirect" in flags
+            or fields.get("redirect") != self._redirect_id
+        ):
+            raise ConnectionError(f"client tracking tidak aktif lagi: {sorted(flags)}")
+
+    async def _teardown_tracking(self, broken: bool = False) -> None:
+        if self._tracking_conn is not None:
+            try:
+                await self._tracking_conn.send_command("CLIENT", "TRACKING", "OFF")
+                await self._tracking_conn.read_response()
+            except Exception:
+                broken = True
+            if broken:
+                # Jangan kembalikan koneksi dengan state tracking / protokol
+                # kacau ke pool
+                await self._tracking_conn.disconnect()
+            await self.client.connection_pool.release(self._tracking_conn)
+            self._tracking_conn = None
+        if self._pubsub is not None:
+            with contextlib.suppress(Exception):  # Koneksi pubsub sudah mati
+                await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        await self._teardown_tracking()
+        self._entries.clear()
+
+    # --- READ PATH ---
+    def _is_tracked(self, key: str) -> bool:
+        return key.startswith(self.prefixes)
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: str, value: Any) -> None:
+        ttl = self.tracking_ttl if self.mode == "tracking" else self.fallback_ttl
+        expires_at = time.monotonic() + ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Any:
+        if not self._is_tracked(key):
+            return await self.client.get(key)
+
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        seq = self._invalidation_seq
+        value = await self.client.get(key)
+        if seq == self._invalidation_seq:
+            self._store(key, value)
+        return value
+
+    async def get_many(self, keys: Iterable[str]) -> list[Any]:
+        """Seperti MGET: key yang sudah ada di lokal tidak dikirim ke Redis."""
+        keys = list(keys)
+        results: list[Any] = [None] * len(keys)
+        missing: list[int] = []
+        for i, key in enumerate(keys):
+            found, value = self._lookup(key) if self._is_tracked(key) else (False, None)
+            if found:
+                self.hits += 1
+                results[i] = value
+            else:
+                missing.append(i)
+
+        if missing:
+            seq = self._invalidation_seq
+            values = await self.client.mget([keys[i] for i in missing])
+            store = seq == self._invalidation_seq
+            for i, value in zip(missing, values, strict=True):
+                results[i] = value
+                if self._is_tracked(keys[i]):
+                    self.misses += 1
+                    if store:
+                        self._store(keys[i], value)
+        return results
+
+    # --- INVALIDATION ---
+    def invalidate(self, keys: Iterable[str | bytes] | None) -> None:
+        """Hapus key dari cache lokal. None = hapus semua."""
+        self._invalidation_seq += 1
+        if keys is None:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            return
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "invalidation_rate": self.invalidations / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "reconnects": self.reconnects,
+        }
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
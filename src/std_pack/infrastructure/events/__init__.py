@@ -1,4 +1,45 @@
-from .memory import MemoryMessageBus
+from .memory import MemoryMessageBus, EventQueueFullError
+from .codec import EventCodec, register_upcaster, upcaster
 from .redis_bus import RedisMessageBus
+from .streams import RedisStreamBus, StreamConsumer
+from .subscriber import RedisEventSubscriber
+from .idempotency import (
+    BloomFilter,
+    IdempotencyStore,
+    RedisIdempotencyStore,
+    SqlIdempotencyStore,
+    idempotent,
+)
+from .store import SqlEventStore, Snapshot, StoredEvent
+from .retry import (
+    RetryPolicy,
+    RetryJob,
+    RetryScheduler,
+    MemoryRetryScheduler,
+    RedisRetryScheduler,
+)
 
-__all__ = ["MemoryMessageBus", "RedisMessageBus"]
\ No newline at end of file
+__all__ = [
+    "MemoryMessageBus",
+    "EventQueueFullError",
+    "EventCodec",
+    "register_upcaster",
+    "upcaster",
+    "RedisMessageBus",
+    "RedisStreamBus",
+    "StreamConsumer",
+    "RedisEventSubscriber",
+    "BloomFilter",
+    "IdempotencyStore",
+    "RedisIdempotencyStore",
+    "SqlIdempotencyStore",
+    "idempotent",
+    "SqlEventStore",
+    "Snapshot",
+    "StoredEvent",
+    "RetryPolicy",
+    "RetryJob",
+    "RetryScheduler",
+    "MemoryRetryScheduler",
+    "RedisRetryScheduler",
+]
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Event Codec.
+Serialisasi DomainEvent ke envelope ringkas dan sebaliknya:
+
+    {"t": "OrderPlaced", "v": 2, "p": {...payload...}}
+
+- Encode/decode lewat TypeAdapter yang di-cache per class.
+- Decode memakai registry DomainEvent (diisi otomatis saat class dibuat),
+  jadi consumer tidak perlu tahu class event sebelumnya.
+- Codec JsonCodec memakai jalur cepat: header envelope di-cache per class dan
+  payload langsung lewat dump_json/validate_json (tanpa dict perantara).
+- Versioning: jika versi di envelope lebih lama dari `event_version` class,
+  payload dilewatkan ke upcaster berantai (v1 -> v2 -> v3) sebelum divalidasi.
+"""
+from collections.abc import Callable, Iterable
+from functools import cache
+from typing import Any
+
+import orjson
+from pydantic import TypeAdapter
+
+from std_pack.domain import DomainEvent
+from std_pack.domain.events import get_event_class
+from std_pack.infrastructure.cache.codecs import Codec, JsonCodec
+
+Upcaster = Callable[[dict[str, Any]], dict[str, Any]]
+
+_HEADER_START = b'{"t":'
+_PAYLOAD_KEY = b',"p":'
+
+# (event_type, from_version) -> fungsi payload lama -> payload versi berikutnya
+_UPCASTERS: dict[tuple[str, int], Upcaster] = {}
+
+
+def register_upcaster(event_type: str, from_version: int, upcaster: Upcaster) -> None:
+    """
+    Daftarkan upcaster payload `event_type` dari versi `from_version` ke
+    versi berikutnya.
+    """
+    _UPCASTERS[(event_type, from_version)] = upcaster
+
+
+def upcaster(event_type: str, from_version: int) -> Callable[[Upcaster], Upcaster]:
+    """
+    Decorator versi register_upcaster.
+
+        @upcaster("UserRegistered", from_version=1)
+        def _v1_to_v2(payload):
+            payload["full_name"] = payload.pop("name")
+            return payload
+    """
+    def _register(fn: Upcaster) -> Upcaster:
+        register_upcaster(event_type, from_version, fn)
+        return fn
+    return _register
+
+
+@cache
+def _adapter(event_class: type[DomainEvent]) -> TypeAdapter[Any]:
+    return TypeAdapter(event_class)
+
+
+@cache
+def _header(event_type: str, version: int) -> bytes:
+    # b'{"t":"OrderPlaced","v":2,"p":' -> payload JSON disambung langsung
+    return (
+        _HEADER_START + orjson.dumps(event_type) + b',"v":%d' % version + _PAYLOAD_KEY
+    )
+
+
+class EventCodec:
+    """
+    Penggunaan:
+        codec = EventCodec()                   # JSON (orjson)
+        codec = EventCodec(MsgPackCodec())     # msgpack, lebih ringkas
+        data = codec.encode(event)             # bytes
+        event = codec.decode(data)             # instance class yang benar
+    """
+
+    def __init__(self, codec: Codec | None = None):
+        self.codec = codec or JsonCodec()
+        self._fast_json = type(self.codec) is JsonCodec
+        # header bytes -> (class, versi), hanya untuk event terdaftar
+        self._headers: dict[bytes, tuple[type[DomainEvent], int]] = {}
+
+    def to_envelope(self, event: DomainEvent) -> dict[str, Any]:
+        return {
+            "t": event.event_type,
+            "v": event.event_version,
+            "p": _adapter(type(event)).dump_python(event, mode="json"),
+        }
+
+    def from_envelope(self, envelope: dict[str, Any]) -> DomainEvent:
+        event_class = get_event_class(envelope["t"])
+        payload = envelope["p"]
+        version = envelope.get("v", 1)
+        while version < event_class.event_version:
+            step = _UPCASTERS.get((event_class.event_type, version))
+            if step is None:
+                raise ValueError(
+                    f"Tidak ada upcaster {event_class.event_type} "
+                    f"v{version} -> v{version + 1}"
+                )
+            payload = step(payload)
+            version += 1
+        return _adapter(event_class).validate_python(payload)  # type: ignore[no-any-return]
+
+    def encode(self, event: DomainEvent) -> bytes:
+        if self._fast_json:
+            cls = type(event)
+            return (
+                _header(cls.event_type, cls.event_version)
+                + _adapter(cls).dump_json(event)
+                + b"}"
+            )
+        return self.codec.encode(self.to_envelope(event))
+
+    def decode(self, data: bytes | str) -> DomainEvent:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self._fast_json and data.startswith(_HEADER_START):
+            event = self._decode_fast(data)
+            if event is not None:
+                return event
+        return self.from_envelope(self.codec.decode(data))
+
+    def _decode_fast(self, data: bytes) -> DomainEvent | None:
+        """None -> bentuk envelope tidak standar / perlu upcast, pakai jalur umum."""
+        end = data.find(_PAYLOAD_KEY)
+        if end < 0:
+            return None
+        header = data[:end]
+        known = self._headers.get(header)
+        if known is None:
+            try:
+                meta = orjson.loads(header + b"}")
+            except orjson.JSONDecodeError:
+                return None
+            if "v" not in meta:  # Urutan key lain, misal {"t", "p", "v"}
+                return None
+            event_class = get_event_class(meta["t"])
+            known = self._headers[header] = (event_class, meta.get("v", 1))
+        event_class, version = known
+        if version != event_class.event_version:
+            return None
+        return _adapter(event_class).validate_json(data[end + len(_PAYLOAD_KEY):-1])  # type: ignore[no-any-return]
+
+    def encode_many(self, events: Iterable[DomainEvent]) -> list[bytes]:
+        return [self.encode(e) for e in events]
+
+    def decode_many(self, items: Iterable[bytes | str]) -> list[DomainEvent]:
+        return [self.decode(d) for d in items]
@@ -0,0 +1,348 @@
+"""
+Idempotency Store.
+Dedupe event berdasarkan DomainEvent.event_id untuk delivery at-least-once
+(Redis Streams, retry, redelivery): handler mahal tidak dijalankan dua kali.
+
+Alur:
+    seen = await store.seen_many(ids, scope)   # satu round trip per batch
+    ... jalankan handler untuk event yang belum pernah diproses ...
+    await store.mark_many(ok_ids, scope)       # satu round trip per batch
+
+Id baru di-mark SETELAH handler sukses, jadi event yang handler-nya gagal
+tetap bisa di-retry. `scope` memisahkan status per handler / consumer group.
+
+Backend:
+- RedisIdempotencyStore : SET key EX ttl (cepat, kedaluwarsa otomatis).
+- SqlIdempotencyStore   : tabel processed_events (durable, purge manual).
+  Tabel ini tidak ikut terdaftar di BaseDBModel.metadata hanya karena modul
+  di-import. Opt-in dengan `processed_event_model()` di modul model aplikasi
+  (agar terlihat oleh create_all / Alembic). SqlIdempotencyStore juga
+  memanggilnya saat dibuat.
+
+Bloom filter (opt-in):
+    Id yang TIDAK ada di bloom dianggap belum pernah diproses tanpa round
+    trip ke store (kasus paling umum). Id yang ada di bloom (duplikat atau
+    false positive) tetap dicek ke store. Hanya aman jika duplikat selalu
+    sampai ke proses yang sama (satu consumer per stream/partisi, bus
+    in-memory). Panggil `await store.warm()` saat startup agar id yang
+    sudah tersimpan dimuat ke bloom. Untuk consumer group multi-instance,
+    biarkan bloom=None.
+"""
+import hashlib
+import math
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from functools import wraps
+from typing import Any
+
+from sqlalchemy import String, UniqueConstraint, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Mapped, mapped_column
+
+from std_pack.domain import DomainEvent
+from std_pack.infrastructure.cache import RedisManager
+from std_pack.infrastructure.logging import get_logger
+from std_pack.infrastructure.persistence.models import BaseDBModel
+
+logger = get_logger(__name__)
+
+EventId = uuid.UUID | str
+
+
+class BloomFilter:
+    """
+    Bloom filter sederhana (bytearray + double hashing blake2b).
+    Melebihi `capacity` tidak membuang data: hanya false positive yang naik
+    (lebih banyak cek ke store), jadi tetap aman.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity minimal 1 dan 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(8, math.ceil(bits))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+
+class IdempotencyStore(ABC):
+    """
+    Base class: logika bloom + batching. Subclass wajib mengimplementasikan
+    `_seen`, `_mark` dan `_load` (untuk warm()).
+    """
+
+    def __init__(self, bloom: BloomFilter | None = None):
+        self.bloom = bloom
+        self.lookups = 0
+        self.bloom_skips = 0
+
+    async def seen_many(
+        self, event_ids: Iterable[EventId], scope: str = ""
+    ) -> set[str]:
+        """Kembalikan id (string) yang SUDAH pernah diproses di scope ini."""
+        ids = list(dict.fromkeys(str(i) for i in event_ids))
+        if self.bloom is not None:
+            candidates = [i for i in ids if f"{scope}:{i}" in self.bloom]
+            self.bloom_skips += len(ids) - len(candidates)
+            ids = candidates
+        if not ids:
+            return set()
+        self.lookups += 1
+        return await self._seen(ids, scope)
+
+    async def mark_many(self, event_ids: Iterable[EventId], scope: str = "") -> None:
+        ids = list(dict.fromkeys(str(i) for i in event_ids))
+        if not ids:
+            return
+        await self._mark(ids, scope)
+        if self.bloom is not None:
+            for i in ids:
+                self.bloom.add(f"{scope}:{i}")
+
+    async def seen(self, event_id: EventId, scope: str = "") -> bool:
+        return bool(await self.seen_many([event_id], scope))
+
+    async def mark(self, event_id: EventId, scope: str = "") -> None:
+        await self.mark_many([event_id], scope)
+
+    async def warm(self) -> int:
+        """Isi bloom dengan id yang sudah tersimpan. Return jumlah id yang dimuat."""
+        if self.bloom is None:
+            return 0
+        loaded = 0
+        async for scope, event_id in self._load():
+            self.bloom.add(f"{scope}:{event_id}")
+            loaded += 1
+        logger.info("idempotency_bloom_warmed", loaded=loaded)
+        return loaded
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "lookups": self.lookups,
+            "bloom_skips": self.bloom_skips,
+            "bloom_count": self.bloom.count if self.bloom is not None else 0,
+        }
+
+    # --- BACKEND ---
+    @abstractmethod
+    async def _seen(self, ids: list[str], scope: str) -> set[str]:
+        """Id (dari `ids`) yang sudah tersimpan di scope ini."""
+
+    @abstractmethod
+    async def _mark(self, ids: list[str], scope: str) -> None:
+        """Simpan id sebagai sudah diproses (duplikat diabaikan)."""
+
+    @abstractmethod
+    def _load(self) -> AsyncIterator[tuple[str, str]]:
+        """Async generator (scope, event_id) semua id tersimpan."""
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """
+    Key: {prefix}:{scope}:{event_id}, value "1", kedaluwarsa setelah `ttl` detik.
+    Cek & mark satu batch = satu pipeline (EXISTS / SET EX NX per id).
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        ttl: int = 86_400,
+        prefix: str = "idem",
+        bloom: BloomFilter | None = None,
+    ):
+        super().__init__(bloom)
+        self.redis = redis_manager
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, scope: str, event_id: str) -> str:
+        return f"{self.prefix}:{scope}:{event_id}"
+
+    async def _seen(self, ids: list[str], scope: str) -> set[str]:
+        client = self.redis.get_binary_client()
+        async with client.pipeline(transaction=False) as pipe:
+            for event_id in ids:
+                pipe.exists(self._key(scope, event_id))
+            results = await pipe.execute()
+        return {event_id for event_id, found in zip(ids, results, strict=True) if found}
+
+    async def _mark(self, ids: list[str], scope: str) -> None:
+        client = self.redis.get_binary_client()
+        async with client.pipeline(transaction=False) as pipe:
+            for event_id in ids:
+                pipe.set(self._key(scope, event_id), b"1", ex=self.ttl, nx=True)
+            await pipe.execute()
+
+    async def _load(self) -> AsyncIterator[tuple[str, str]]:
+        client = self.redis.get_binary_client()
+        cursor = 0
+        while True:
+            cursor, keys = await client.scan(
+                cursor, match=f"{self.prefix}:*", count=1000
+            )
+            for key in keys:
+                # event_id tidak mengandung ':' -> split dari kanan aman
+                # untuk scope yang mengandung titik dua
+                name = key.decode("utf-8")[len(self.prefix) + 1:]
+                scope, _, event_id = name.rpartition(":")
+                yield scope, event_id
+            if not cursor:
+                break
+
+
+_processed_event_model: type[BaseDBModel] | None = None
+
+
+def processed_event_model() -> type[BaseDBModel]:
+    """
+    Model tabel processed_events: satu baris per (scope, event_id) yang
+    sudah diproses. Didaftarkan ke BaseDBModel.metadata saat PERTAMA kali
+    dipanggil (opt-in), panggilan berikutnya mengembalikan class yang sama.
+    """
+    global _processed_event_model
+    if _processed_event_model is None:
+
+        class ProcessedEventModel(BaseDBModel):
+            __tablename__ = "processed_events"
+            __table_args__ = (
+                UniqueConstraint(
+                    "scope", "event_id", name="uq_processed_events_scope_event"
+                ),
+            )
+
+            scope: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+            event_id: Mapped[str] = mapped_column(String(64), nullable=False)
+
+        _processed_event_model = ProcessedEventModel
+    return _processed_event_model
+
+
+class SqlIdempotencyStore(IdempotencyStore):
+    """
+    Durable: tahan restart Redis / flush. Cek satu batch = satu SELECT ... IN,
+    mark = satu INSERT multi-row (ON CONFLICT DO NOTHING di Postgres/SQLite).
+    Baris lama dibersihkan via purge() (misal dari job terjadwal).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        ttl: int = 7 * 86_400,
+        bloom: BloomFilter | None = None,
+    ):
+        super().__init__(bloom)
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.model: Any = processed_event_model()
+
+    async def _seen(self, ids: list[str], scope: str) -> set[str]:
+        stmt = select(self.model.event_id).where(
+            self.model.scope == scope,
+            self.model.event_id.in_(ids),
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return set(result.scalars())
+
+    async def _mark(self, ids: list[str], scope: str) -> None:
+        rows = [{"scope": scope, "event_id": event_id} for event_id in ids]
+        async with self.session_factory() as session:
+            dialect = session.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                stmt = insert(self.model).on_conflict_do_nothing(
+                    index_elements=["scope", "event_id"]
+                )
+                await session.execute(stmt, rows)
+                await session.commit()
+                return
+
+            # Dialect lain: insert per baris, duplikat diabaikan
+            for row in rows:  # pragma: no cover
+                try:
+                    async with session.begin_nested():
+                        session.add(self.model(**row))
+                except IntegrityError:
+                    pass
+            await session.commit()  # pragma: no cover
+
+    async def _load(self) -> AsyncIterator[tuple[str, str]]:
+        stmt = select(self.model.scope, self.model.event_id).where(
+            self.model.created_at >= self._cutoff()
+        )
+        async with self.session_factory() as session:
+            result = await session.stream(stmt)
+            async for scope, event_id in result:
+                yield scope, event_id
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(UTC) - timedelta(seconds=self.ttl)
+
+    async def purge(self) -> int:
+        """Hapus baris yang lebih tua dari ttl. Return jumlah baris terhapus."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(self.model).where(self.model.created_at < self._cutoff())
+            )
+            await session.commit()
+        logger.info("idempotency_purged", rows=result.rowcount)
+        return result.rowcount  # type: ignore[no-any-return]
+
+
+EventHandler = Callable[[Any], Awaitable[None]]
+
+
+def idempotent(
+    store: IdempotencyStore, scope: str | None = None
+) -> Callable[[EventHandler], EventHandler]:
+    """
+    Decorator handler event tunggal (bus apa pun):
+
+        @idempotent(store, scope="projection")
+        async def rebuild_projection(event): ...
+
+    Event yang sudah pernah sukses diproses di-skip. scope default = nama handler.
+    """
+    def _wrap(handler: EventHandler) -> EventHandler:
+        name = scope or getattr(handler, "__qualname__", repr(handler))
+
+        @wraps(handler)
+        async def _handler(event: DomainEvent) -> None:
+            if await store.seen(event.event_id, name):
+                logger.info(
+                    "event_duplicate_skipped", scope=name, id=str(event.event_id)
+                )
+                return
+            await handler(event)
+            await store.mark(event.event_id, name)
+
+        return _handler
+    return _wrap
@@ -2,35 +2,275 @@
 In-Memory Message Bus.
 Cocok untuk testing atau komunikasi antar modul dalam satu service.
 """
-from typing import Callable, Type
+import asyncio
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Literal, Type
 from collections import defaultdict
 
 from std_pack.application.interfaces.ports import IMessageBus
 from std_pack.domain import DomainEvent
+from std_pack.infrastructure.events.retry import RetryScheduler
 from std_pack.infrastructure.logging import get_logger
 
 logger = get_logger(__name__)
 
+OverflowPolicy = Literal["block", "drop_oldest", "reject"]
+
+
+class EventQueueFullError(RuntimeError):
+    """Antrian bus penuh dan overflow='reject'."""
+
+
 class MemoryMessageBus(IMessageBus):
-    def __init__(self):
+    """
+    Dispatch berbasis MRO: subscriber ke DomainEvent / EntityCreatedEvent
+    juga menerima semua subclass-nya. Index handler per tipe event dihitung
+    sekali lalu di-cache (di-reset setiap ada subscribe).
+
+    Handler (async atau sync) untuk satu event dijalankan konkuren:
+    - concurrency     : batas handler yang berjalan bersamaan di seluruh bus
+      (None = bebas).
+      Handler yang mem-publish lagi (nested) memakai slot miliknya sendiri,
+      tidak antre slot baru (concurrency=1 tidak deadlock).
+    - handler_timeout : batas waktu per handler async (detik). Timeout/error
+      hanya di-log, tidak menggagalkan publisher maupun handler lain.
+    - fan_out         : default mode publish_batch. True = banyak event
+      diproses konkuren (maksimal `batch_concurrency`), False = berurutan.
+
+    retry (opsional): handler yang gagal / timeout dijadwalkan ulang oleh
+    RetryScheduler (backoff eksponensial, dead-letter setelah max_attempts)
+    alih-alih hanya di-log lalu hilang.
+
+    Mode antrian (queue_size diisi):
+        publish() hanya memasukkan event ke asyncio.Queue terbatas lalu
+        langsung return; `workers` task di background yang menjalankan handler.
+        Side effect lambat (email, proyeksi) tidak menambah latency request.
+        - overflow="block"       : publish() menunggu sampai ada slot.
+        - overflow="drop_oldest" : event tertua dibuang (dicatat di metrik).
+        - overflow="reject"      : raise EventQueueFullError.
+        Worker dinyalakan otomatis saat publish pertama (atau via start()).
+        Panggil `await bus.stop()` saat shutdown (atau masukkan ke
+        `consumers` di standard_lifespan) agar antrian di-drain.
+    """
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        handler_timeout: float | None = None,
+        fan_out: bool = False,
+        batch_concurrency: int = 64,
+        queue_size: int | None = None,
+        workers: int = 4,
+        overflow: OverflowPolicy = "block",
+        retry: RetryScheduler | None = None,
+    ):
+        if overflow not in ("block", "drop_oldest", "reject"):
+            raise ValueError(f"Overflow policy tidak dikenal: {overflow}")
+        if queue_size is not None and (queue_size < 1 or workers < 1):
+            raise ValueError("queue_size dan workers minimal 1")
         self.subscribers: dict[Type[DomainEvent], list[Callable]] = defaultdict(list)
+        self.handler_timeout = handler_timeout
+        self.fan_out = fan_out
+        self.batch_concurrency = batch_concurrency
+        self.retry = retry
+        self._limit = asyncio.Semaphore(concurrency) if concurrency else None
+        # True di dalam handler bus ini (ikut terwarisi ke task anak via context)
+        self._in_handler: ContextVar[bool] = ContextVar(
+            f"memory_bus_{id(self)}", default=False
+        )
+        self._index: dict[type, tuple[Callable, ...]] = {}
+
+        self.queue_size = queue_size
+        self.workers = workers
+        self.overflow = overflow
+        self._queue: asyncio.Queue[tuple[float, DomainEvent]] | None = None
+        self._worker_tasks: list[asyncio.Task[None]] = []
+        self._accepting = True
+
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.latency_max = 0.0
+        self._latency_total = 0.0
 
     def subscribe(self, event_type: Type[DomainEvent], handler: Callable):
         """Mendaftarkan handler lokal."""
         self.subscribers[event_type].append(handler)
+        if self.retry is not None:
+            self.retry.register(handler)
+        self._index.clear()  # Index MRO dihitung ulang saat publish berikutnya
+
+    def handlers_for(self, event_type: type) -> tuple[Callable, ...]:
+        """Handler untuk tipe event, dari yang paling spesifik ke base class."""
+        handlers = self._index.get(event_type)
+        if handlers is None:
+            resolved: dict[Callable, None] = {}  # dict: unik & urutan terjaga
+            for cls in event_type.__mro__:
+                for handler in self.subscribers.get(cls, ()):
+                    resolved.setdefault(handler, None)
+            handlers = self._index[event_type] = tuple(resolved)
+        return handlers
 
     async def publish(self, event: DomainEvent) -> None:
+        queued = self.queue_size is not None and self._accepting
+        if queued and not self._nested_overflow():
+            await self._enqueue(event)
+            return
+        await self._dispatch(event)
+
+    def _nested_overflow(self) -> bool:
+        """
+        Publish dari dalam handler saat antrian penuh (overflow="block"):
+        jalankan inline. Menunggu slot di sini bisa deadlock karena worker
+        yang seharusnya mengosongkan antrian sedang menjalankan handler ini.
+        """
+        return (
+            self.overflow == "block"
+            and self._in_handler.get()
+            and self._queue is not None
+            and self._queue.full()
+        )
+
+    async def _dispatch(self, event: DomainEvent) -> None:
         event_type = type(event)
-        handlers = self.subscribers.get(event_type, [])
-        
+        handlers = self.handlers_for(event_type)
+
         if handlers:
             logger.info("event_published_memory", name=event_type.__name__)
-            for handler in handlers:
-                try:
-                    await handler(event)
-                except Exception as e:
-                    logger.error("event_handler_failed", error=str(e))
-
-    async def publish_batch(self, events: list[DomainEvent]) -> None:
-        for event in events:
-            await self.publish(event)
\ No newline at end of file
+            if len(handlers) == 1:
+                await self._run(handlers[0], event)
+            else:
+                await asyncio.gather(*(self._run(h, event) for h in handlers))
+
+    async def _run(self, handler: Callable, event: DomainEvent) -> None:
+        if self._limit is None or self._in_handler.get():
+            # Nested publish: slot handler pemanggil masih dipegang, pakai itu
+            await self._call(handler, event)
+            return
+        async with self._limit:
+            await self._call(handler, event)
+
+    async def _call(self, handler: Callable, event: DomainEvent) -> None:
+        token = self._in_handler.set(True)
+        try:
+            result: Any = handler(event)
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, self.handler_timeout)
+        except asyncio.TimeoutError as e:
+            logger.error(
+                "event_handler_timeout",
+                handler=getattr(handler, "__name__", repr(handler)),
+                timeout=self.handler_timeout,
+            )
+            if self.retry is not None:
+                await self.retry.schedule(handler, event, e)
+        except Exception as e:
+            logger.error("event_handler_failed", error=str(e))
+            if self.retry is not None:
+                await self.retry.schedule(handler, event, e)
+        finally:
+            self._in_handler.reset(token)
+
+    async def publish_batch(
+        self, events: list[DomainEvent], fan_out: bool | None = None
+    ) -> None:
+        if self.queue_size is not None and self._accepting:
+            for event in events:
+                await self._enqueue(event)
+            return
+        if not (self.fan_out if fan_out is None else fan_out):
+            for event in events:
+                await self.publish(event)
+            return
+
+        # Fan-out: event diproses konkuren, dibatasi batch_concurrency
+        gate = asyncio.Semaphore(self.batch_concurrency)
+
+        async def _bounded(event: DomainEvent) -> None:
+            async with gate:
+                await self.publish(event)
+
+        await asyncio.gather(*(_bounded(e) for e in events))
+
+    # --- QUEUED MODE ---
+    async def start(self) -> None:
+        """Nyalakan worker (mode antrian). Aman dipanggil berulang."""
+        if self.queue_size is None or self._worker_tasks:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._accepting = True
+        loop = asyncio.get_running_loop()
+        self._worker_tasks = [
+            loop.create_task(self._work()) for _ in range(self.workers)
+        ]
+        logger.info(
+            "memory_bus_workers_started",
+            workers=self.workers,
+            queue_size=self.queue_size,
+        )
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Shutdown rapi: tolak event baru masuk antrian (dijalankan inline),
+        tunggu antrian habis (maksimal drain_timeout detik), lalu matikan worker.
+        """
+        if not self._worker_tasks:
+            return
+        self._accepting = False
+        assert self._queue is not None
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("memory_bus_drain_timeout", remaining=self._queue.qsize())
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        logger.info("memory_bus_workers_stopped", **self.stats())
+
+    async def _enqueue(self, event: DomainEvent) -> None:
+        if not self._worker_tasks:
+            await self.start()
+        assert self._queue is not None
+        item = (time.monotonic(), event)
+        if self._queue.full():
+            if self.overflow == "reject":
+                self.rejected += 1
+                raise EventQueueFullError(f"Antrian event penuh ({self.queue_size})")
+            if self.overflow == "drop_oldest":
+                _, dropped = self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+                logger.warning("memory_bus_event_dropped", name=type(dropped).__name__)
+        await self._queue.put(item)  # overflow="block": menunggu slot di sini
+        self.enqueued += 1
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        while True:
+            enqueued_at, event = await self._queue.get()
+            latency = time.monotonic() - enqueued_at
+            self.latency_max = max(self.latency_max, latency)
+            self._latency_total += latency
+            try:
+                await self._dispatch(event)
+            finally:
+                self.processed += 1
+                self._queue.task_done()
+
+    def stats(self) -> dict[str, Any]:
+        """Metrik mode antrian. latency = waktu tunggu di antrian (detik)."""
+        processed = self.processed
+        latency_avg = self._latency_total / processed if processed else 0.0
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "processed": processed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "latency_avg_seconds": latency_avg,
+            "latency_max_seconds": self.latency_max,
+        }
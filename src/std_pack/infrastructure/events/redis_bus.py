@@ -2,29 +2,116 @@
 Redis Message Bus.
 Untuk komunikasi antar Microservices (Event Driven).
 """
-import json
+import asyncio
+from typing import Any, Awaitable, Callable
+
 from std_pack.application.interfaces.ports import IMessageBus
 from std_pack.domain import DomainEvent
 from std_pack.infrastructure.cache import RedisManager
+from std_pack.infrastructure.cache.breaker import CircuitOpenError
+from std_pack.infrastructure.cache.codecs import Codec
+from std_pack.infrastructure.events.codec import EventCodec
 from std_pack.infrastructure.logging import get_logger
 
 logger = get_logger(__name__)
 
+DeliveryFailureHook = Callable[[DomainEvent, Exception], Awaitable[None]]
+# (channel, payload, future pengiriman, event asli untuk on_delivery_failure)
+_Pending = tuple[str, str | bytes, "asyncio.Future[None]", DomainEvent]
+
 class RedisMessageBus(IMessageBus):
-    def __init__(self, redis_manager: RedisManager):
+    """
+    codec=None  : payload JSON dari model_dump_json() (kompatibel dengan versi lama).
+    codec=Codec : payload bytes dari codec (msgpack, kompresi, dll).
+    event_codec : envelope {t, v, p} ber-versi (EventCodec); consumer bisa
+                  decode tanpa tahu class event-nya. Prioritas di atas codec.
+
+    Jika RedisManager memakai circuit breaker, publish gagal seketika
+    (CircuitOpenError) saat Redis bermasalah, bukan menunggu timeout.
+    Event tidak dibuang diam-diam: pemanggil yang memutuskan (retry/outbox).
+
+    Batching (opt-in, linger_ms diisi):
+        publish() dari semua coroutine ditampung maksimal `linger_ms` ms
+        atau `max_batch` event, lalu dikirim dalam satu pipeline (satu RTT).
+        - Buffer penuh (`max_buffer`) -> publish() menunggu (backpressure).
+        - wait_for_delivery=True -> publish() menunggu sampai event terkirim
+          (dan raise jika gagal). Default False: return setelah masuk buffer.
+        - enqueue() mengembalikan Future per event untuk dicek belakangan.
+        - Batch yang pipeline-nya gagal (koneksi putus, timeout, circuit open)
+          dicoba ulang `max_retries` kali (backoff eksponensial mulai
+          `retry_backoff` detik). Jika tetap gagal (atau error per command):
+          future menerima error, `events_failed` bertambah, dan
+          `on_delivery_failure(event, error)` dipanggil (misal simpan ke
+          outbox), jadi mode fire-and-forget pun tidak kehilangan event diam-diam.
+        - Panggil `await bus.aclose()` saat shutdown (sebelum Redis ditutup)
+          agar sisa buffer ter-flush; standard_lifespan melakukannya untuk
+          bus yang dimasukkan ke `buses`.
+    """
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        codec: Codec | None = None,
+        event_codec: EventCodec | None = None,
+        linger_ms: float | None = None,
+        max_batch: int = 100,
+        max_buffer: int = 10_000,
+        wait_for_delivery: bool = False,
+        max_retries: int = 3,
+        retry_backoff: float = 0.1,
+        on_delivery_failure: DeliveryFailureHook | None = None,
+    ):
+        if max_batch < 1 or max_buffer < max_batch:
+            raise ValueError("Syarat: 1 <= max_batch <= max_buffer")
+        if max_retries < 0:
+            raise ValueError("max_retries minimal 0")
         self.redis = redis_manager
+        self.codec = codec
+        self.event_codec = event_codec
+        self.linger_ms = linger_ms
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        self.wait_for_delivery = wait_for_delivery
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.on_delivery_failure = on_delivery_failure
+
+        self._buffer: list[_Pending] = []
+        self._capacity: asyncio.Semaphore | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task[None]] = set()
+        self.batches_sent = 0
+        self.events_sent = 0
+        self.events_failed = 0
+
+    def _serialize(self, event: DomainEvent) -> str | bytes:
+        if self.event_codec is not None:
+            return self.event_codec.encode(event)
+        if self.codec is None:
+            return event.model_dump_json()
+        return self.codec.encode(event.model_dump(mode="json"))
 
     async def publish(self, event: DomainEvent) -> None:
+        if self.linger_ms is not None:
+            future = await self.enqueue(event)
+            if self.wait_for_delivery:
+                await future
+            return
+
         client = self.redis.get_client()
-        
+
         # Channel name convention: events:{event_name}
         channel = f"events:{event.event_type}"
-        
-        # Serialize Event ke JSON
-        # Asumsi DomainEvent adalah Pydantic Model
-        payload = event.model_dump_json()
-        
-        await client.publish(channel, payload)
+
+        # Serialize Event (JSON default, atau via codec)
+        payload = self._serialize(event)
+
+        try:
+            await client.publish(channel, payload)
+        except CircuitOpenError:
+            logger.warning(
+                "event_publish_rejected", channel=channel, reason="circuit_open"
+            )
+            raise
         logger.info("event_published_redis", channel=channel, id=str(event.event_id))
 
     async def publish_batch(self, events: list[DomainEvent]) -> None:
@@ -33,8 +120,134 @@ class RedisMessageBus(IMessageBus):
         async with client.pipeline() as pipe:
             for event in events:
                 channel = f"events:{event.event_type}"
-                payload = event.model_dump_json()
+                payload = self._serialize(event)
                 pipe.publish(channel, payload)
-            
+
             await pipe.execute()
-            logger.info("event_batch_published_redis", count=len(events))
\ No newline at end of file
+            logger.info("event_batch_published_redis", count=len(events))
+
+    # --- BATCHING ---
+    async def enqueue(self, event: DomainEvent) -> asyncio.Future[None]:
+        """
+        Masukkan event ke buffer batching dan kembalikan Future pengirimannya.
+        Menunggu jika buffer penuh (backpressure).
+        """
+        if self.linger_ms is None:
+            raise RuntimeError("enqueue() hanya tersedia jika linger_ms diisi")
+        if self._capacity is None:
+            self._capacity = asyncio.Semaphore(self.max_buffer)
+        # Serialize sebelum ambil slot: error codec tidak boleh membocorkan slot
+        payload = self._serialize(event)
+        await self._capacity.acquire()
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        future.add_done_callback(_mark_retrieved)
+        channel = f"events:{event.event_type}"
+        self._buffer.append((channel, payload, future, event))
+
+        if len(self._buffer) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger_ms / 1000, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        # Simpan reference agar task tidak di-GC sebelum selesai
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[_Pending]) -> None:
+        attempt = 0
+        try:
+            while True:
+                results, error = await self._deliver(batch)
+                if error is None:
+                    break
+                if attempt >= self.max_retries:
+                    results = [error] * len(batch)
+                    break
+                # Hanya kegagalan pipeline (koneksi, timeout, circuit open) yang
+                # dicoba ulang; error per command (ResponseError) bersifat final.
+                attempt += 1
+                logger.warning(
+                    "event_batch_publish_retry",
+                    count=len(batch),
+                    attempt=attempt,
+                    error=str(error),
+                )
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                self.events_failed += len(errors)
+                logger.error(
+                    "event_batch_publish_failed",
+                    count=len(errors),
+                    attempts=attempt + 1,
+                    error=str(errors[0]),
+                )
+            for (_, _, future, event), result in zip(batch, results, strict=True):
+                if isinstance(result, Exception):
+                    await self._delivery_failed(event, result)
+                    if not future.done():
+                        future.set_exception(result)
+                elif not future.done():
+                    future.set_result(None)
+        finally:
+            assert self._capacity is not None
+            for _ in batch:
+                self._capacity.release()
+
+    async def _deliver(
+        self, batch: list[_Pending]
+    ) -> tuple[list[Any], Exception | None]:
+        """Satu pipeline -> (hasil per event, error pipeline atau None)."""
+        try:
+            client = self.redis.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for channel, payload, _, _ in batch:
+                    pipe.publish(channel, payload)
+                results: list[Any] = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            return [], e
+        self.batches_sent += 1
+        self.events_sent += sum(1 for r in results if not isinstance(r, Exception))
+        logger.info("event_batch_published_redis", count=len(batch), mode="linger")
+        return results, None
+
+    async def _delivery_failed(self, event: DomainEvent, error: Exception) -> None:
+        if self.on_delivery_failure is None:
+            return
+        try:
+            await self.on_delivery_failure(event, error)
+        except Exception as e:
+            logger.error(
+                "event_delivery_failure_hook_failed",
+                id=str(event.event_id),
+                error=str(e),
+            )
+
+    async def flush(self) -> None:
+        """Kirim isi buffer sekarang dan tunggu semua batch yang sedang jalan."""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Flush terakhir saat shutdown."""
+        await self.flush()
+
+
+def _mark_retrieved(future: asyncio.Future[None]) -> None:
+    # Event yang future-nya tidak ditunggu: error sudah di-log di _send,
+    # jangan sampai muncul 'Future exception was never retrieved'.
+    if not future.cancelled():
+        future.exception()
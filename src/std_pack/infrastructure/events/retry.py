@@ -0,0 +1,481 @@
+"""
+Retry Scheduler & Dead-Letter Queue.
+Handler event yang gagal tidak dibuang dan tidak di-retry inline
+(yang menahan worker): kegagalan dijadwalkan ulang dengan backoff
+eksponensial, dijalankan oleh loop scheduler di background.
+
+    attempt 1 gagal -> tunggu base_delay
+    attempt 2 gagal -> tunggu base_delay * multiplier
+    ...
+    attempt == max_attempts gagal -> dead-letter (bisa diinspeksi & di-redrive)
+
+Backend:
+- MemoryRetryScheduler : heap in-process (untuk MemoryMessageBus / testing).
+- RedisRetryScheduler  : jadwal di sorted set (score = waktu jatuh tempo),
+  dead-letter di Redis Stream. Aman dijalankan di banyak instance: job
+  jatuh tempo dipindah ATOMIC (Lua) ke set processing dengan lease, dan
+  baru dihapus setelah handler sukses / masuk dead-letter. Instance yang
+  crash di tengah jalan tidak menghilangkan job: setelah lease habis job
+  kembali ke jadwal.
+
+Handler dikenali lewat nama (module.qualname) agar job di Redis tetap bisa
+dijalankan setelah restart: daftarkan ulang handler via register() saat startup.
+"""
+import asyncio
+import heapq
+import inspect
+import random
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+from redis.exceptions import NoScriptError
+from uuid6 import uuid7
+
+from std_pack.domain import DomainEvent
+from std_pack.infrastructure.cache import RedisManager
+from std_pack.infrastructure.cache.keys import hash_tag
+from std_pack.infrastructure.cache.memory import MemoryStore, register_lua_script
+from std_pack.infrastructure.events.codec import EventCodec
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RetryPolicy:
+    """Backoff eksponensial dengan jitter (mencegah retry serempak)."""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        multiplier: float = 2.0,
+        max_delay: float = 300.0,
+        jitter: float = 0.1,
+    ):
+        if max_attempts < 1 or base_delay < 0 or multiplier < 1 or not 0 <= jitter < 1:
+            raise ValueError(
+                "Syarat: max_attempts >= 1, base_delay >= 0, multiplier >= 1, "
+                "0 <= jitter < 1"
+            )
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """Jeda sebelum percobaan berikutnya setelah `attempt` kali gagal."""
+        delay = min(self.base_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return delay
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+class RetryJob(BaseModel):
+    """Satu handler yang harus dijalankan ulang untuk satu event."""
+    id: str = Field(default_factory=lambda: str(uuid7()))
+    handler: str
+    event_type: str
+    event: str  # Envelope EventCodec (JSON)
+    attempt: int = 1  # Jumlah percobaan yang SUDAH gagal
+    error: str = ""
+    first_failed_at: datetime = Field(default_factory=_utcnow)
+    last_failed_at: datetime = Field(default_factory=_utcnow)
+
+
+def handler_name(handler: Callable[..., Any]) -> str:
+    module = getattr(handler, "__module__", None) or "?"
+    return f"{module}.{getattr(handler, '__qualname__', type(handler).__qualname__)}"
+
+
+class RetryScheduler(ABC):
+    """
+    Logika bersama: penjadwalan, eksekusi job jatuh tempo, dead-letter & redrive.
+    Subclass mengimplementasikan penyimpanan
+    (_push, _pop_due, _complete, _bury, _buried, _unbury).
+
+    Penggunaan:
+        retry = MemoryRetryScheduler(RetryPolicy(max_attempts=5))
+        bus = MemoryMessageBus(retry=retry)
+        await retry.start()   # atau masukkan ke consumers di standard_lifespan
+        ...
+        await retry.dead_letters()        # inspeksi
+        await retry.redrive()             # jadwalkan ulang semua dead-letter
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        poll_interval: float = 0.5,
+        batch_size: int = 100,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.codec = EventCodec()
+        self._handlers: dict[str, Callable[..., Any]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+        self.scheduled = 0
+        self.succeeded = 0
+        self.dead_lettered = 0
+        self.redriven = 0
+
+    # --- HANDLER REGISTRY ---
+    def register(self, handler: Callable[..., Any], name: str | None = None) -> str:
+        """Daftarkan handler; return nama yang dipakai di job. Idempotent."""
+        name = name or handler_name(handler)
+        base, suffix = name, 2
+        while self._handlers.get(name, handler) is not handler:
+            # Nama bentrok (misal dua lambda di fungsi yang sama)
+            name, suffix = f"{base}#{suffix}", suffix + 1
+        self._handlers[name] = handler
+        return name
+
+    def _name_of(self, handler: Callable[..., Any]) -> str:
+        for name, registered in self._handlers.items():
+            if registered is handler:
+                return name
+        return self.register(handler)
+
+    # --- SCHEDULING ---
+    async def schedule(
+        self,
+        handler: Callable[..., Any],
+        event: DomainEvent,
+        error: BaseException | str,
+    ) -> None:
+        """Catat kegagalan pertama handler untuk event ini."""
+        job = RetryJob(
+            handler=self._name_of(handler),
+            event_type=event.event_type,
+            event=self.codec.encode(event).decode("utf-8"),
+            error=str(error) or type(error).__name__,
+        )
+        await self._after_failure(job)
+
+    async def _after_failure(self, job: RetryJob) -> None:
+        if job.attempt >= self.policy.max_attempts:
+            await self._bury(job)
+            self.dead_lettered += 1
+            logger.error(
+                "event_dead_lettered",
+                handler=job.handler,
+                event_type=job.event_type,
+                attempts=job.attempt,
+                error=job.error,
+            )
+            return
+        delay = self.policy.delay(job.attempt)
+        await self._push(job, time.time() + delay)
+        self.scheduled += 1
+        logger.warning(
+            "event_retry_scheduled",
+            handler=job.handler,
+            event_type=job.event_type,
+            attempt=job.attempt,
+            delay=round(delay, 3),
+        )
+
+    async def run_due(self, now: float | None = None) -> int:
+        """Jalankan job yang sudah jatuh tempo (satu batch). Return jumlah job."""
+        jobs = await self._pop_due(time.time() if now is None else now, self.batch_size)
+        if jobs:
+            await asyncio.gather(*(self._execute(job) for job in jobs))
+        return len(jobs)
+
+    async def _execute(self, job: RetryJob) -> None:
+        handler = self._handlers.get(job.handler)
+        try:
+            if handler is None:
+                raise LookupError(f"Handler '{job.handler}' belum di-register")
+            result = handler(self.codec.decode(job.event))
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            job.attempt += 1
+            job.error = str(e) or type(e).__name__
+            job.last_failed_at = datetime.now(UTC)
+            await self._after_failure(job)
+            return
+        await self._complete(job)
+        self.succeeded += 1
+        logger.info(
+            "event_retry_succeeded",
+            handler=job.handler,
+            event_type=job.event_type,
+            attempt=job.attempt + 1,
+        )
+
+    # --- DEAD LETTER ---
+    async def dead_letters(self, limit: int = 100) -> list[RetryJob]:
+        return await self._buried(limit)
+
+    async def redrive(
+        self, ids: Iterable[str] | None = None, delay: float = 0.0
+    ) -> int:
+        """
+        Jadwalkan ulang dead-letter (semua, atau hanya `ids`) dengan hitungan
+        attempt di-reset. Return jumlah job yang di-redrive.
+        """
+        jobs = await self._unbury(set(ids) if ids is not None else None)
+        due = time.time() + delay
+        for job in jobs:
+            job.attempt = 0
+            await self._push(job, due)
+        self.redriven += len(jobs)
+        if jobs:
+            logger.info("dead_letters_redriven", count=len(jobs))
+        return len(jobs)
+
+    # --- LIFECYCLE ---
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("retry_scheduler_started", handlers=len(self._handlers))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("retry_scheduler_stopped", **self.stats())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_due()
+            except Exception as e:
+                logger.error("retry_scheduler_error", error=str(e))
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "scheduled": self.scheduled,
+            "succeeded": self.succeeded,
+            "dead_lettered": self.dead_lettered,
+            "redriven": self.redriven,
+        }
+
+    # --- BACKEND ---
+    @abstractmethod
+    async def _push(self, job: RetryJob, due: float) -> None:
+        """Jadwalkan job (baru, gagal lagi, atau redrive) pada waktu `due`."""
+
+    @abstractmethod
+    async def _pop_due(self, now: float, limit: int) -> list[RetryJob]:
+        """Ambil alih job jatuh tempo (belum dihapus sampai _complete/_bury)."""
+
+    @abstractmethod
+    async def _complete(self, job: RetryJob) -> None:
+        """Handler sukses: hapus job."""
+
+    @abstractmethod
+    async def _bury(self, job: RetryJob) -> None:
+        """Pindahkan job ke dead-letter."""
+
+    @abstractmethod
+    async def _buried(self, limit: int) -> list[RetryJob]:
+        """Isi dead-letter (untuk inspeksi)."""
+
+    @abstractmethod
+    async def _unbury(self, ids: set[str] | None) -> list[RetryJob]:
+        """Keluarkan job dari dead-letter (semua jika ids None)."""
+
+
+class MemoryRetryScheduler(RetryScheduler):
+    """Heap (due, urutan, job) + list dead-letter. Hilang saat proses restart."""
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        poll_interval: float = 0.5,
+        batch_size: int = 100,
+    ):
+        super().__init__(policy, poll_interval, batch_size)
+        self._heap: list[tuple[float, int, RetryJob]] = []
+        self._seq = 0
+        self._dead: dict[str, RetryJob] = {}
+
+    async def _push(self, job: RetryJob, due: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, job))
+
+    async def _pop_due(self, now: float, limit: int) -> list[RetryJob]:
+        jobs = []
+        while self._heap and self._heap[0][0] <= now and len(jobs) < limit:
+            jobs.append(heapq.heappop(self._heap)[2])
+        return jobs
+
+    async def _complete(self, job: RetryJob) -> None:
+        pass  # Sudah keluar dari heap saat _pop_due (in-process, hilang bersama proses)
+
+    async def _bury(self, job: RetryJob) -> None:
+        self._dead[job.id] = job
+
+    async def _buried(self, limit: int) -> list[RetryJob]:
+        return list(self._dead.values())[:limit]
+
+    async def _unbury(self, ids: set[str] | None) -> list[RetryJob]:
+        dead = self._dead
+        targets = list(dead) if ids is None else [i for i in ids if i in dead]
+        return [self._dead.pop(i) for i in targets]
+
+    async def pending(self) -> int:
+        return len(self._heap)
+
+
+# KEYS: schedule, processing, jobs. ARGV: now, lease_until, limit.
+# 1. Job di processing yang lease-nya habis (instance crash) -> kembali ke schedule.
+# 2. Job jatuh tempo: ZREM schedule + ZADD processing (lease) dalam satu langkah
+#    atomic, lalu isi job dikembalikan. Hash job TIDAK dihapus di sini.
+_CLAIM_SCRIPT = """
+local expired = redis.call(
+    'ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('ZADD', KEYS[1], ARGV[1], id)
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+local jobs = {}
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    local job = redis.call('HGET', KEYS[3], id)
+    if job then
+        redis.call('ZADD', KEYS[2], ARGV[2], id)
+        table.insert(jobs, job)
+    end
+end
+return jobs
+"""
+
+
+def _claim(store: MemoryStore, keys: list[str], args: list[bytes]) -> list[bytes]:
+    schedule, processing, jobs_key = keys
+    now, lease_until, limit = float(args[0]), float(args[1]), int(args[2])
+    for job_id in store.zrangebyscore(processing, "-inf", now, start=0, num=limit):
+        store.zrem(processing, job_id)
+        store.zadd(schedule, {job_id: now})
+    jobs = []
+    for job_id in store.zrangebyscore(schedule, "-inf", now, start=0, num=limit):
+        store.zrem(schedule, job_id)
+        job = store.hget(jobs_key, job_id)
+        if job is not None:
+            store.zadd(processing, {job_id: lease_until})
+            jobs.append(job)
+    return jobs
+
+
+_CLAIM_SHA = register_lua_script(_CLAIM_SCRIPT, _claim)
+
+
+class RedisRetryScheduler(RetryScheduler):
+    """
+    Key (prefix default "retry", di-hash-tag agar satu slot Redis Cluster):
+    - {prefix}:schedule   : ZSET job_id -> waktu jatuh tempo (epoch detik)
+    - {prefix}:processing : ZSET job_id -> lease habis (epoch detik), job yang
+                            sedang dijalankan salah satu instance
+    - {prefix}:jobs       : HASH job_id -> RetryJob JSON
+    - {prefix}:dead       : STREAM dead-letter (field id, job), dibatasi dead_maxlen
+
+    `lease` (detik) harus lebih lama dari durasi handler terlama: jika lewat,
+    job dianggap ditinggal instance yang crash dan dijalankan ulang
+    (at-least-once, handler sebaiknya idempotent).
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        policy: RetryPolicy | None = None,
+        prefix: str = "retry",
+        poll_interval: float = 0.5,
+        batch_size: int = 100,
+        dead_maxlen: int | None = 100_000,
+        lease: float = 300.0,
+    ):
+        super().__init__(policy, poll_interval, batch_size)
+        self.redis = redis_manager
+        # Claim script & pipeline transaksi menyentuh beberapa key sekaligus:
+        # hash tag menjaga semuanya di slot yang sama (hindari CROSSSLOT)
+        tag = hash_tag(prefix)
+        self.schedule_key = f"{tag}:schedule"
+        self.processing_key = f"{tag}:processing"
+        self.jobs_key = f"{tag}:jobs"
+        self.dead_key = f"{tag}:dead"
+        self.dead_maxlen = dead_maxlen
+        self.lease = lease
+
+    async def _push(self, job: RetryJob, due: float) -> None:
+        client = self.redis.get_binary_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(self.jobs_key, job.id, job.model_dump_json())
+            pipe.zadd(self.schedule_key, {job.id: due})
+            pipe.zrem(self.processing_key, job.id)
+            await pipe.execute()
+
+    async def _pop_due(self, now: float, limit: int) -> list[RetryJob]:
+        client = self.redis.get_binary_client()
+        keys = [self.schedule_key, self.processing_key, self.jobs_key]
+        args = [now, now + self.lease, limit]
+        try:
+            raw = await client.evalsha(_CLAIM_SHA, len(keys), *keys, *args)
+        except NoScriptError:
+            raw = await client.eval(_CLAIM_SCRIPT, len(keys), *keys, *args)
+        return [RetryJob.model_validate_json(data) for data in raw]
+
+    async def _complete(self, job: RetryJob) -> None:
+        client = self.redis.get_binary_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.processing_key, job.id)
+            pipe.hdel(self.jobs_key, job.id)
+            await pipe.execute()
+
+    async def _bury(self, job: RetryJob) -> None:
+        client = self.redis.get_binary_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                self.dead_key,
+                {"id": job.id, "job": job.model_dump_json()},
+                maxlen=self.dead_maxlen,
+                approximate=True,
+            )
+            pipe.zrem(self.processing_key, job.id)
+            pipe.hdel(self.jobs_key, job.id)
+            await pipe.execute()
+
+    async def _entries(self, limit: int | None) -> list[tuple[Any, RetryJob]]:
+        client = self.redis.get_binary_client()
+        entries = await client.xrange(self.dead_key, count=limit)
+        return [
+            (entry_id, RetryJob.model_validate_json(fields[b"job"]))
+            for entry_id, fields in entries
+        ]
+
+    async def _buried(self, limit: int) -> list[RetryJob]:
+        return [job for _, job in await self._entries(limit)]
+
+    async def _unbury(self, ids: set[str] | None) -> list[RetryJob]:
+        entries = [
+            (eid, job)
+            for eid, job in await self._entries(None)
+            if ids is None or job.id in ids
+        ]
+        if entries:
+            client = self.redis.get_binary_client()
+            await client.xdel(self.dead_key, *(eid for eid, _ in entries))
+        return [job for _, job in entries]
+
+    async def pending(self) -> int:
+        client = self.redis.get_binary_client()
+        return await client.zcard(self.schedule_key)  # type: ignore[no-any-return]
@@ -0,0 +1,334 @@
+"""
+Event Store.
+Penyimpanan event append-only untuk membangun ulang read model / aggregate.
+
+Tabel `event_store`:
+- position    : BIGINT identity (autoincrement) = urutan INSERT ke store,
+  dipakai replay() sebagai checkpoint global. Bukan event_id: UUIDv7 diambil
+  saat event DIBUAT, jadi event yang dibuat lebih dulu tapi di-append belakangan
+  akan terlewat oleh checkpoint berbasis id.
+- id          : event_id (UUIDv7), unique.
+- stream_id   : id aggregate / stream, sequence: 1, 2, 3 ... per stream.
+  Unique (stream_id, sequence) sekaligus menjadi index baca per stream dan
+  penjaga optimistic concurrency (dua writer di versi sama -> satu gagal).
+- event_type, event_version, payload (JSON): didecode lewat EventCodec,
+  jadi upcaster versi lama ikut berlaku saat replay.
+
+Tabel `event_snapshots`: satu snapshot terakhir per stream (state JSON +
+versi). rehydrate() mulai dari snapshot lalu hanya me-replay event sesudahnya.
+
+Kedua tabel tidak ikut terdaftar di BaseDBModel.metadata hanya karena modul
+di-import. Opt-in dengan `event_store_models()` di modul model aplikasi
+(agar terlihat oleh create_all / Alembic). SqlEventStore juga memanggilnya
+saat dibuat.
+
+Store memakai AsyncSession milik pemanggil (sama seperti SqlAlchemyRepository),
+sehingga append ikut transaksi Unit of Work. Commit tetap urusan UoW.
+
+Catatan: position dialokasikan saat INSERT, bukan saat COMMIT. Transaksi
+lain yang masih terbuka bisa commit dengan position lebih kecil dari
+checkpoint pembaca. Projection yang butuh kepastian penuh sebaiknya hanya
+membaca sampai position yang lebih tua dari durasi transaksi terpanjang.
+"""
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from datetime import datetime
+from typing import Any, NamedTuple, TypeVar
+
+import uuid6
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    DateTime,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from std_pack.domain import ConcurrencyConflictError, DomainEvent
+from std_pack.infrastructure.events.codec import EventCodec
+from std_pack.infrastructure.logging import get_logger
+from std_pack.infrastructure.persistence.models import BaseDBModel
+
+logger = get_logger(__name__)
+
+S = TypeVar("S")
+
+
+_event_store_models: tuple[type[BaseDBModel], type[BaseDBModel]] | None = None
+
+
+def event_store_models() -> tuple[type[BaseDBModel], type[BaseDBModel]]:
+    """
+    (StoredEventModel, SnapshotModel) untuk tabel event_store &
+    event_snapshots. Didaftarkan ke BaseDBModel.metadata saat PERTAMA kali
+    dipanggil (opt-in), panggilan berikutnya mengembalikan class yang sama.
+    """
+    global _event_store_models
+    if _event_store_models is None:
+
+        class StoredEventModel(BaseDBModel):
+            __tablename__ = "event_store"
+            __table_args__ = (
+                UniqueConstraint(
+                    "stream_id", "sequence", name="uq_event_store_stream_sequence"
+                ),
+                # SQLite: position tidak dipakai ulang
+                {"sqlite_autoincrement": True},
+            )
+
+            # BIGSERIAL / identity di Postgres; INTEGER PRIMARY KEY (rowid) di SQLite
+            position: Mapped[int] = mapped_column(
+                BigInteger().with_variant(Integer, "sqlite"),
+                primary_key=True,
+                autoincrement=True,
+            )
+            id: Mapped[uuid.UUID] = mapped_column(
+                unique=True, nullable=False, default=uuid6.uuid7
+            )
+
+            stream_id: Mapped[str] = mapped_column(String(255), nullable=False)
+            sequence: Mapped[int] = mapped_column(Integer, nullable=False)
+            event_type: Mapped[str] = mapped_column(
+                String(255), nullable=False, index=True
+            )
+            event_version: Mapped[int] = mapped_column(
+                Integer, nullable=False, default=1
+            )
+            occurred_at: Mapped[datetime] = mapped_column(
+                DateTime(timezone=True), nullable=False
+            )
+            payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+        class SnapshotModel(BaseDBModel):
+            __tablename__ = "event_snapshots"
+
+            stream_id: Mapped[str] = mapped_column(
+                String(255), nullable=False, unique=True
+            )
+            version: Mapped[int] = mapped_column(Integer, nullable=False)
+            state: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+        _event_store_models = (StoredEventModel, SnapshotModel)
+    return _event_store_models
+
+
+class Snapshot(NamedTuple):
+    stream_id: str
+    version: int
+    state: dict[str, Any]
+
+
+class StoredEvent(NamedTuple):
+    """Event hasil replay() beserta posisinya (untuk checkpoint projection)."""
+    position: int
+    stream_id: str
+    sequence: int
+    event: DomainEvent
+
+
+class SqlEventStore:
+    """
+    Penggunaan:
+        store = SqlEventStore(uow.session)
+        version = await store.append("order-1", [OrderPlaced(...)], expected_version=0)
+
+        async for event in store.read_stream("order-1"):   # per aggregate
+            ...
+        async for item in store.replay(after=checkpoint):   # semua stream
+            ...
+
+        state, version = await store.rehydrate(
+            "order-1", initial=Order(), apply=Order.apply,
+            snapshot=lambda o: o.model_dump(mode="json"), restore=Order.model_validate,
+        )
+
+    Baca dilakukan per chunk (keyset pagination: WHERE key > terakhir
+    ORDER BY key LIMIT chunk_size), bukan OFFSET, jadi biaya per chunk
+    konstan berapa pun panjang stream-nya.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        codec: EventCodec | None = None,
+        chunk_size: int = 500,
+        snapshot_every: int = 100,
+    ):
+        if chunk_size < 1 or snapshot_every < 1:
+            raise ValueError("chunk_size dan snapshot_every minimal 1")
+        self.session = session
+        self.codec = codec or EventCodec()
+        self.chunk_size = chunk_size
+        self.snapshot_every = snapshot_every
+        models: tuple[Any, Any] = event_store_models()
+        self.events, self.snapshots = models
+
+    # --- WRITE ---
+    async def current_version(self, stream_id: str) -> int:
+        stmt = select(func.max(self.events.sequence)).where(
+            self.events.stream_id == stream_id
+        )
+        return (await self.session.execute(stmt)).scalar() or 0
+
+    async def append(
+        self,
+        stream_id: str,
+        events: Sequence[DomainEvent],
+        expected_version: int | None = None,
+    ) -> int:
+        """
+        Tambahkan event ke akhir stream dalam satu flush (batch insert).
+        expected_version diisi -> ConcurrencyConflictError jika stream sudah
+        bergeser. Return versi stream setelah append.
+        """
+        version = await self.current_version(stream_id)
+        if expected_version is not None and expected_version != version:
+            raise ConcurrencyConflictError(stream_id, expected_version, version)
+        if not events:
+            return version
+
+        rows = []
+        for offset, event in enumerate(events, start=1):
+            envelope = self.codec.to_envelope(event)
+            rows.append(
+                self.events(
+                    id=event.event_id,
+                    stream_id=stream_id,
+                    sequence=version + offset,
+                    event_type=envelope["t"],
+                    event_version=envelope["v"],
+                    occurred_at=event.occurred_at,
+                    payload=envelope["p"],
+                )
+            )
+        try:
+            async with self.session.begin_nested():
+                self.session.add_all(rows)
+        except IntegrityError:
+            # Writer lain menulis sequence yang sama lebih dulu
+            actual = await self.current_version(stream_id)
+            raise ConcurrencyConflictError(stream_id, version, actual) from None
+
+        logger.info(
+            "events_appended",
+            stream_id=stream_id,
+            count=len(rows),
+            version=version + len(rows),
+        )
+        return version + len(rows)
+
+    # --- READ ---
+    def _to_event(self, row: Any) -> DomainEvent:
+        return self.codec.from_envelope(
+            {"t": row.event_type, "v": row.event_version, "p": row.payload}
+        )
+
+    async def read_stream(
+        self, stream_id: str, after: int = 0
+    ) -> AsyncIterator[DomainEvent]:
+        """Event satu stream dengan sequence > after, urut sequence."""
+        while True:
+            stmt = (
+                select(self.events)
+                .where(
+                    self.events.stream_id == stream_id,
+                    self.events.sequence > after,
+                )
+                .order_by(self.events.sequence)
+                .limit(self.chunk_size)
+            )
+            rows = (await self.session.execute(stmt)).scalars().all()
+            for row in rows:
+                yield self._to_event(row)
+            if len(rows) < self.chunk_size:
+                return
+            after = rows[-1].sequence
+
+    async def replay(
+        self,
+        after: int = 0,
+        event_types: Iterable[str] | None = None,
+    ) -> AsyncIterator[StoredEvent]:
+        """
+        Semua event lintas stream urut position (urutan append ke store).
+        Simpan `position` terakhir sebagai checkpoint lalu lanjutkan via after=.
+        """
+        types = list(event_types) if event_types is not None else None
+        while True:
+            stmt = (
+                select(self.events)
+                .where(self.events.position > after)
+                .order_by(self.events.position)
+                .limit(self.chunk_size)
+            )
+            if types is not None:
+                stmt = stmt.where(self.events.event_type.in_(types))
+            rows = (await self.session.execute(stmt)).scalars().all()
+            for row in rows:
+                event = self._to_event(row)
+                yield StoredEvent(row.position, row.stream_id, row.sequence, event)
+            if len(rows) < self.chunk_size:
+                return
+            after = rows[-1].position
+
+    # --- SNAPSHOT ---
+    async def load_snapshot(self, stream_id: str) -> Snapshot | None:
+        stmt = select(self.snapshots).where(self.snapshots.stream_id == stream_id)
+        row = (await self.session.execute(stmt)).scalar_one_or_none()
+        if row is None:
+            return None
+        return Snapshot(row.stream_id, row.version, row.state)
+
+    async def save_snapshot(
+        self, stream_id: str, version: int, state: dict[str, Any]
+    ) -> None:
+        """Simpan/ganti snapshot stream. Snapshot lama tidak menimpa yang baru."""
+        stmt = select(self.snapshots).where(self.snapshots.stream_id == stream_id)
+        row = (await self.session.execute(stmt)).scalar_one_or_none()
+        if row is None:
+            self.session.add(
+                self.snapshots(stream_id=stream_id, version=version, state=state)
+            )
+        elif version > row.version:
+            row.version = version
+            row.state = state
+        else:
+            return
+        await self.session.flush()
+        logger.info("snapshot_saved", stream_id=stream_id, version=version)
+
+    async def rehydrate(
+        self,
+        stream_id: str,
+        initial: S,
+        apply: Callable[[S, DomainEvent], S],
+        snapshot: Callable[[S], dict[str, Any]] | None = None,
+        restore: Callable[[dict[str, Any]], S] | None = None,
+    ) -> tuple[S, int]:
+        """
+        Bangun state aggregate: snapshot terakhir (jika ada & `restore` diisi)
+        lalu apply event sesudahnya. Jika event yang di-replay >= snapshot_every
+        dan `snapshot` diisi, snapshot baru disimpan otomatis.
+        Return (state, versi).
+        """
+        state, version = initial, 0
+        if restore is not None:
+            found = await self.load_snapshot(stream_id)
+            if found is not None:
+                state, version = restore(found.state), found.version
+
+        replayed = 0
+        async for event in self.read_stream(stream_id, after=version):
+            state = apply(state, event)
+            replayed += 1
+        version += replayed
+
+        if snapshot is not None and replayed >= self.snapshot_every:
+            await self.save_snapshot(stream_id, version, snapshot(state))
+        return state, version
@@ -0,0 +1,459 @@
+"""
+Redis Streams Message Bus.
+Alternatif RedisMessageBus (PUBLISH) dengan jaminan at-least-once:
+event disimpan di stream (XADD + MAXLEN) sehingga tidak hilang walau
+belum ada consumer yang terhubung.
+
+Konsumsi via consumer group (XREADGROUP): beberapa instance service
+dengan group yang sama berbagi beban, tiap event diproses satu instance.
+Pesan yang gagal / ditinggal consumer yang crash diambil alih lewat XAUTOCLAIM.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.exceptions import ResponseError
+
+from std_pack.domain import DomainEvent
+from std_pack.infrastructure.cache import RedisManager
+from std_pack.infrastructure.cache.codecs import Codec
+from std_pack.infrastructure.events.codec import EventCodec
+from std_pack.infrastructure.events.idempotency import IdempotencyStore
+from std_pack.infrastructure.events.redis_bus import RedisMessageBus
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+EventHandler = Callable[[Any], Awaitable[None]]
+
+
+def stream_key(event_type: str) -> str:
+    """Nama stream per tipe event: stream:events:{event_type}."""
+    return f"stream:events:{event_type}"
+
+
+def dead_letter_key(stream: str) -> str:
+    """Stream dead-letter untuk pesan yang melewati max_deliveries."""
+    return f"{stream}:dead"
+
+
+class RedisStreamBus(RedisMessageBus):
+    """
+    Publisher ke Redis Streams.
+    Setiap entry berisi field 'type' dan 'payload' (JSON atau hasil codec).
+
+    maxlen membatasi panjang stream (approximate=True -> trimming '~' yang murah).
+    """
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        codec: Codec | None = None,
+        maxlen: int | None = 10_000,
+        approximate: bool = True,
+        event_codec: EventCodec | None = None,
+    ):
+        super().__init__(redis_manager, codec=codec, event_codec=event_codec)
+        self.maxlen = maxlen
+        self.approximate = approximate
+
+    def _fields(self, event: DomainEvent) -> dict[str, Any]:
+        return {"type": event.event_type, "payload": self._serialize(event)}
+
+    async def publish(self, event: DomainEvent) -> None:
+        client = self.redis.get_binary_client()
+        key = stream_key(event.event_type)
+        entry_id = await client.xadd(
+            key, self._fields(event), maxlen=self.maxlen, approximate=self.approximate
+        )
+        logger.info(
+            "event_published_stream",
+            stream=key,
+            entry_id=entry_id,
+            id=str(event.event_id),
+        )
+
+    async def publish_batch(self, events: list[DomainEvent]) -> None:
+        if not events:
+            return
+        client = self.redis.get_binary_client()
+        async with client.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.xadd(
+                    stream_key(event.event_type),
+                    self._fields(event),
+                    maxlen=self.maxlen,
+                    approximate=self.approximate,
+                )
+            await pipe.execute()
+        logger.info("event_batch_published_stream", count=len(events))
+
+
+class StreamConsumer:
+    """
+    Runner consumer group.
+
+    Penggunaan:
+        consumer = StreamConsumer(redis_manager, group="billing")
+        consumer.subscribe(OrderPlaced, handle_order_placed)
+        await consumer.start()   # saat startup
+        ...
+        await consumer.stop()    # saat shutdown
+
+    Alur per iterasi:
+    1. XAUTOCLAIM (berkala): ambil alih pesan pending yang idle > claim_idle_ms.
+    2. XREADGROUP hingga `batch_size` pesan (BLOCK block_ms).
+    3. Handler dijalankan konkuren (maksimal `concurrency` sekaligus).
+    4. XACK massal (satu pipeline) untuk pesan yang semua handler-nya sukses.
+       Pesan gagal tetap pending dan akan dicoba ulang via XAUTOCLAIM.
+
+    XAUTOCLAIM melanjutkan cursor dari panggilan sebelumnya (per stream),
+    jadi PEL yang lebih besar dari batch_size tetap tersapu seluruhnya.
+    Pesan yang sudah dikirim lebih dari `max_deliveries` kali (poison
+    message) tidak dijalankan lagi: dipindah ke stream dead-letter
+    `{stream}:dead` (field asli + entry_id, group, deliveries) lalu di-ACK.
+
+    idempotency (opsional): sebelum langkah 3, event_id satu batch dicek
+    sekaligus ke store (scope = nama group). Duplikat langsung di-ACK tanpa
+    menjalankan handler; event yang sukses di-mark sebelum XACK.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        group: str,
+        consumer: str | None = None,
+        codec: Codec | None = None,
+        batch_size: int = 100,
+        block_ms: int = 1000,
+        concurrency: int = 16,
+        claim_idle_ms: int = 60_000,
+        claim_interval: float = 30.0,
+        error_backoff: float = 1.0,
+        event_codec: EventCodec | None = None,
+        idempotency: IdempotencyStore | None = None,
+        max_deliveries: int | None = 5,
+        dead_maxlen: int | None = 100_000,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency minimal 1")
+        if max_deliveries is not None and max_deliveries < 1:
+            raise ValueError("max_deliveries minimal 1")
+        self.redis = redis_manager
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.codec = codec
+        self.event_codec = event_codec
+        self.idempotency = idempotency
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.concurrency = concurrency
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.error_backoff = error_backoff
+        self.max_deliveries = max_deliveries
+        self.dead_maxlen = dead_maxlen
+
+        self._event_types: dict[str, type[DomainEvent]] = {}  # stream -> class event
+        self._handlers: dict[str, list[EventHandler]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._reading = False
+        self._next_claim = 0.0
+        self._claim_cursors: dict[str, Any] = {}  # stream -> start_id XAUTOCLAIM
+
+        self.processed = 0
+        self.failed = 0
+        self.acked = 0
+        self.reclaimed = 0
+        self.batches = 0
+        self.duplicates = 0
+        self.dead_lettered = 0
+
+    def subscribe(self, event_type: type[DomainEvent], handler: EventHandler) -> None:
+        """Daftarkan handler async untuk satu tipe event (sebelum start)."""
+        key = stream_key(event_type.event_type)
+        self._event_types[key] = event_type
+        self._handlers.setdefault(key, []).append(handler)
+
+    # --- LIFECYCLE ---
+    async def start(self) -> None:
+        if not self._handlers:
+            raise RuntimeError(
+                "Belum ada handler. Panggil subscribe() sebelum start()."
+            )
+        client = self.redis.get_binary_client()
+        for key in self._handlers:
+            try:
+                # id="0": pesan yang sudah ada sebelum group dibuat ikut diproses
+                await client.xgroup_create(key, self.group, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            "stream_consumer_started",
+            group=self.group,
+            consumer=self.consumer,
+            streams=list(self._handlers),
+        )
+
+    async def stop(self) -> None:
+        """
+        Berhenti dengan rapi: batch yang sedang diproses diselesaikan dan
+        di-ACK dulu. Jika sedang menunggu XREADGROUP, langsung dibatalkan.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        if self._reading:
+            self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        logger.info(
+            "stream_consumer_stopped",
+            group=self.group,
+            consumer=self.consumer,
+            **self.stats(),
+        )
+
+    # --- LOOP ---
+    async def _run(self) -> None:
+        client = self.redis.get_binary_client()
+        streams = {key: ">" for key in self._handlers}
+        while not self._stopping:
+            try:
+                if self.claim_idle_ms and time.monotonic() >= self._next_claim:
+                    await self._reclaim(client)
+                    self._next_claim = time.monotonic() + self.claim_interval
+
+                self._reading = True
+                try:
+                    response = await client.xreadgroup(
+                        self.group,
+                        self.consumer,
+                        streams,
+                        count=self.batch_size,
+                        block=self.block_ms,
+                    )
+                finally:
+                    self._reading = False
+
+                if response:
+                    await self._process(
+                        client, [(key, entries) for key, entries in response]
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("stream_consumer_error", group=self.group, error=str(e))
+                await asyncio.sleep(self.error_backoff)
+
+    async def _reclaim(self, client: Any) -> None:
+        for key in self._handlers:
+            # Redis 7: [cursor, claimed, deleted], Redis 6.2: [cursor, claimed].
+            # Cursor "0-0" = PEL sudah tersapu habis, berikutnya mulai dari awal.
+            result = await client.xautoclaim(
+                key,
+                self.group,
+                self.consumer,
+                self.claim_idle_ms,
+                start_id=self._claim_cursors.get(key, "0-0"),
+                count=self.batch_size,
+            )
+            self._claim_cursors[key] = result[0]
+            claimed = result[1]
+            if not claimed:
+                continue
+            self.reclaimed += len(claimed)
+            logger.warning("stream_messages_reclaimed", stream=key, count=len(claimed))
+            claimed = await self._dead_letter_exhausted(client, key, claimed)
+            if claimed:
+                await self._process(client, [(key, claimed)])
+
+    async def _dead_letter_exhausted(
+        self, client: Any, key: str, claimed: list[Any]
+    ) -> list[Any]:
+        """
+        Entry dengan times_delivered > max_deliveries -> dead-letter;
+        sisanya di-retry.
+        """
+        if self.max_deliveries is None:
+            return claimed
+        async with client.pipeline(transaction=False) as pipe:
+            for entry_id, _ in claimed:
+                pipe.xpending_range(
+                    key, self.group, min=entry_id, max=entry_id, count=1
+                )
+            details = await pipe.execute()
+        deliveries = {
+            detail[0]["message_id"]: detail[0]["times_delivered"]
+            for detail in details
+            if detail
+        }
+
+        retry: list[Any] = []
+        exhausted: list[tuple[Any, dict[Any, Any], int]] = []
+        for entry_id, fields in claimed:
+            count = deliveries.get(entry_id, 0)
+            if count > self.max_deliveries:
+                exhausted.append((entry_id, fields or {}, count))
+            else:
+                retry.append((entry_id, fields))
+        if not exhausted:
+            return retry
+
+        # XADD dulu baru XACK: jika gagal di tengah, pesan tetap pending
+        # (paling buruk tercatat dua kali di dead-letter, tidak pernah hilang).
+        async with client.pipeline(transaction=False) as pipe:
+            for entry_id, fields, count in exhausted:
+                pipe.xadd(
+                    dead_letter_key(key),
+                    {
+                        **fields,
+                        "entry_id": entry_id,
+                        "group": self.group,
+                        "deliveries": count,
+                    },
+                    maxlen=self.dead_maxlen,
+                    approximate=True,
+                )
+            pipe.xack(key, self.group, *(entry_id for entry_id, _, _ in exhausted))
+            await pipe.execute()
+        self.dead_lettered += len(exhausted)
+        self.acked += len(exhausted)
+        logger.error(
+            "stream_messages_dead_lettered",
+            stream=key,
+            group=self.group,
+            count=len(exhausted),
+            max_deliveries=self.max_deliveries,
+        )
+        return retry
+
+    async def _process(self, client: Any, batch: list[tuple[Any, list[Any]]]) -> None:
+        items: list[tuple[str, Any, DomainEvent | None]] = []
+        for raw_key, entries in batch:
+            key = raw_key.decode("utf-8") if isinstance(raw_key, bytes) else raw_key
+            for entry_id, fields in entries:
+                items.append((key, entry_id, self._safe_decode(key, entry_id, fields)))
+
+        duplicates: set[str] = set()
+        if self.idempotency is not None:
+            ids = [event.event_id for _, _, event in items if event is not None]
+            duplicates = await self.idempotency.seen_many(ids, scope=self.group)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _bounded(
+            key: str, entry_id: Any, event: DomainEvent
+        ) -> tuple[str, Any, DomainEvent, bool]:
+            async with semaphore:
+                return key, entry_id, event, await self._handle(key, entry_id, event)
+
+        to_ack: dict[str, list[Any]] = {}
+        jobs = []
+        for key, entry_id, event in items:
+            if event is None:
+                # Pesan rusak tidak akan pernah sukses:
+                # ACK agar tidak di-retry tanpa akhir
+                to_ack.setdefault(key, []).append(entry_id)
+                continue
+            if self.idempotency is not None:
+                event_id = str(event.event_id)
+                if event_id in duplicates:
+                    self.duplicates += 1
+                    logger.info(
+                        "stream_message_duplicate",
+                        stream=key,
+                        entry_id=entry_id,
+                        id=event_id,
+                    )
+                    to_ack.setdefault(key, []).append(entry_id)
+                    continue
+                # Entry lain dengan id sama di batch ini = duplikat
+                duplicates.add(event_id)
+            jobs.append(_bounded(key, entry_id, event))
+        results = await asyncio.gather(*jobs)
+        self.batches += 1
+
+        done: list[Any] = []
+        for key, entry_id, event, ok in results:
+            if ok:
+                to_ack.setdefault(key, []).append(entry_id)
+                done.append(event.event_id)
+        if self.idempotency is not None and done:
+            await self.idempotency.mark_many(done, scope=self.group)
+        if to_ack:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, ids in to_ack.items():
+                    pipe.xack(key, self.group, *ids)
+                await pipe.execute()
+            self.acked += sum(len(ids) for ids in to_ack.values())
+
+    def _decode(self, key: str, fields: dict[Any, Any]) -> DomainEvent:
+        payload = fields.get(b"payload", fields.get("payload"))
+        if self.event_codec is not None:
+            return self.event_codec.decode(payload)
+        event_type = self._event_types[key]
+        if self.codec is None:
+            return event_type.model_validate_json(payload)
+        return event_type.model_validate(self.codec.decode(payload))
+
+    def _safe_decode(
+        self, key: str, entry_id: Any, fields: dict[Any, Any] | None
+    ) -> DomainEvent | None:
+        try:
+            return self._decode(key, fields or {})
+        except Exception as e:
+            logger.error(
+                "stream_message_invalid", stream=key, entry_id=entry_id, error=str(e)
+            )
+            return None
+
+    async def _handle(self, key: str, entry_id: Any, event: DomainEvent) -> bool:
+        """True = boleh di-ACK."""
+        ok = True
+        for handler in self._handlers[key]:
+            try:
+                await handler(event)
+            except Exception as e:
+                ok = False
+                logger.error(
+                    "event_handler_failed",
+                    stream=key,
+                    entry_id=entry_id,
+                    handler=getattr(handler, "__name__", repr(handler)),
+                    error=str(e),
+                )
+        if ok:
+            self.processed += 1
+        else:
+            self.failed += 1
+        return ok
+
+    # --- METRICS ---
+    def stats(self) -> dict[str, int]:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "acked": self.acked,
+            "reclaimed": self.reclaimed,
+            "batches": self.batches,
+            "duplicates": self.duplicates,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    async def pending(self) -> dict[str, int]:
+        """Jumlah pesan pending (belum di-ACK) per stream untuk group ini."""
+        client = self.redis.get_binary_client()
+        result = {}
+        for key in self._handlers:
+            summary = await client.xpending(key, self.group)
+            result[key] = summary["pending"]
+        return result
@@ -0,0 +1,335 @@
+"""
+Redis Pub/Sub Subscriber Runtime.
+Sisi konsumen untuk RedisMessageBus: subscribe ke channel events:{event_type}
+(atau pattern), decode payload ke subclass DomainEvent yang terdaftar, lalu
+dispatch lewat worker pool dengan konkurensi terbatas.
+
+Alur:
+    pubsub reader -> antrian terbatas (backpressure) -> N worker -> handler
+    tipe dengan type_limits: N worker -> antrian lane -> worker lane -> handler
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from std_pack.domain import DomainEvent
+from std_pack.infrastructure.cache import RedisManager
+from std_pack.infrastructure.cache.codecs import Codec
+from std_pack.infrastructure.events.codec import EventCodec
+from std_pack.infrastructure.events.retry import RetryScheduler
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+EventHandler = Callable[[Any], Awaitable[None]]
+
+CHANNEL_PREFIX = "events:"
+
+
+def event_channel(event_type: str) -> str:
+    """Channel pub/sub per tipe event (sama dengan RedisMessageBus)."""
+    return f"{CHANNEL_PREFIX}{event_type}"
+
+
+class RedisEventSubscriber:
+    """
+    Penggunaan:
+        subscriber = RedisEventSubscriber(redis_manager, concurrency=32,
+                                          type_limits={OrderPlaced: 4})
+        subscriber.subscribe(OrderPlaced, handle_order)
+        subscriber.subscribe_pattern("events:Order*", audit_log)
+        await subscriber.start()
+        ...
+        await subscriber.stop()  # drain antrian dulu
+
+    - concurrency : jumlah worker pool bersama.
+    - type_limits : batas konkurensi per tipe event (misal handler yang
+      memukul API eksternal). Tipe ini punya lane sendiri: antrian + worker
+      khusus sebanyak limit. Worker pool hanya decode lalu menyerahkan event
+      ke lane, jadi handler yang lambat tidak menahan worker tipe lain
+      (pool baru ikut menunggu jika antrian lane penuh: backpressure).
+    - event_codec : decode envelope EventCodec (harus sama dengan publisher).
+    - queue_size  : kapasitas antrian. Jika penuh, reader berhenti membaca
+      (backpressure) sehingga memori proses tetap terbatas.
+    - retry       : RetryScheduler untuk handler yang gagal (backoff + dead-letter).
+
+    Pub/sub bersifat best-effort (pesan saat service mati hilang).
+    Untuk at-least-once gunakan RedisStreamBus + StreamConsumer.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        codec: Codec | None = None,
+        concurrency: int = 32,
+        type_limits: dict[type[DomainEvent] | str, int] | None = None,
+        queue_size: int = 1000,
+        poll_timeout: float = 1.0,
+        event_codec: EventCodec | None = None,
+        retry: RetryScheduler | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency minimal 1")
+        if any(limit < 1 for limit in (type_limits or {}).values()):
+            raise ValueError("type_limits minimal 1")
+        self.redis = redis_manager
+        self.retry = retry
+        self.codec = codec
+        self.event_codec = event_codec
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.poll_timeout = poll_timeout
+
+        self._event_types: dict[str, type[DomainEvent]] = {}
+        self._handlers: dict[str, list[EventHandler]] = {}  # channel -> handlers
+        # pattern -> handlers
+        self._pattern_handlers: dict[str, list[EventHandler]] = {}
+        self._type_limits: dict[str, int] = {
+            (k if isinstance(k, str) else k.event_type): v
+            for k, v in (type_limits or {}).items()
+        }
+        self._lanes: dict[
+            str, asyncio.Queue[tuple[DomainEvent, list[EventHandler]]]
+        ] = {}
+
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._pubsub: Any = None
+        self._reader: asyncio.Task[None] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._started_at = 0.0
+
+        self.received = 0
+        self.processed = 0
+        self.failed = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self._lag_total = 0.0
+        self._lag_samples = 0
+
+    # --- REGISTRASI ---
+    def register(self, *event_types: type[DomainEvent]) -> None:
+        """Daftarkan class event agar bisa di-decode (otomatis oleh subscribe)."""
+        for event_type in event_types:
+            self._event_types[event_type.event_type] = event_type
+
+    def subscribe(self, event_type: type[DomainEvent], handler: EventHandler) -> None:
+        self.register(event_type)
+        channel = event_channel(event_type.event_type)
+        self._handlers.setdefault(channel, []).append(handler)
+        if self.retry is not None:
+            self.retry.register(handler)
+
+    def subscribe_pattern(self, pattern: str, handler: EventHandler) -> None:
+        """
+        Subscribe pattern (glob Redis), misal 'events:*'.
+        Hanya event yang class-nya terdaftar (register/subscribe) yang di-dispatch.
+        """
+        self._pattern_handlers.setdefault(pattern, []).append(handler)
+        if self.retry is not None:
+            self.retry.register(handler)
+
+    # --- LIFECYCLE ---
+    async def start(self) -> None:
+        if not self._handlers and not self._pattern_handlers:
+            raise RuntimeError(
+                "Belum ada handler. Panggil subscribe() sebelum start()."
+            )
+        self._pubsub = self.redis.get_binary_client().pubsub()
+        if self._handlers:
+            await self._pubsub.subscribe(*self._handlers)
+        if self._pattern_handlers:
+            await self._pubsub.psubscribe(*self._pattern_handlers)
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        self._started_at = time.monotonic()
+        self._reader = loop.create_task(self._read())
+        self._workers = [
+            loop.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+        self._lanes = {
+            event_type: asyncio.Queue(maxsize=self.queue_size)
+            for event_type in self._type_limits
+        }
+        for event_type, lane in self._lanes.items():
+            self._workers += [
+                loop.create_task(self._work_lane(lane))
+                for _ in range(self._type_limits[event_type])
+            ]
+        logger.info(
+            "event_subscriber_started",
+            channels=list(self._handlers),
+            patterns=list(self._pattern_handlers),
+            concurrency=self.concurrency,
+        )
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Shutdown rapi:
+        1. Berhenti menerima pesan baru (reader dihentikan, unsubscribe).
+        2. Tunggu antrian habis diproses (maksimal drain_timeout detik).
+        3. Hentikan worker.
+        """
+        if self._reader is None:
+            return
+        await _cancel(self._reader)
+        self._reader = None
+        await self._pubsub.aclose()
+        self._pubsub = None
+
+        try:
+            await asyncio.wait_for(self._drain(), drain_timeout)
+        except TimeoutError:
+            logger.warning("event_subscriber_drain_timeout", remaining=self._depth())
+
+        for worker in self._workers:
+            await _cancel(worker)
+        self._workers = []
+        logger.info("event_subscriber_stopped", **self.stats())
+
+    # --- READER & WORKER ---
+    async def _read(self) -> None:
+        assert self._queue is not None
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.poll_timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("event_subscriber_read_failed", error=str(e))
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            if message is None:
+                continue
+            self.received += 1
+            # Antrian penuh -> menunggu di sini (backpressure)
+            await self._queue.put(message)
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._dispatch(message)
+            finally:
+                self._queue.task_done()
+
+    async def _work_lane(
+        self, lane: asyncio.Queue[tuple[DomainEvent, list[EventHandler]]]
+    ) -> None:
+        while True:
+            event, handlers = await lane.get()
+            try:
+                await self._run_handlers(event, handlers)
+            finally:
+                lane.task_done()
+
+    async def _drain(self) -> None:
+        assert self._queue is not None
+        await self._queue.join()
+        # Antrian utama kosong -> tidak ada lagi event yang masuk ke lane
+        for lane in self._lanes.values():
+            await lane.join()
+
+    def _depth(self) -> int:
+        depth = self._queue.qsize() if self._queue is not None else 0
+        return depth + sum(lane.qsize() for lane in self._lanes.values())
+
+    def _decode(self, channel: str, data: Any) -> DomainEvent | None:
+        if self.event_codec is not None:
+            # Envelope membawa tipe & versi: semua event terdaftar bisa di-decode
+            return self.event_codec.decode(data)
+        event_type = self._event_types.get(channel[len(CHANNEL_PREFIX):])
+        if event_type is None:
+            return None
+        if self.codec is None:
+            return event_type.model_validate_json(data)
+        return event_type.model_validate(self.codec.decode(data))
+
+    async def _dispatch(self, message: dict[str, Any]) -> None:
+        channel = _text(message["channel"])
+        handlers = list(self._handlers.get(channel, ()))
+        if message.get("pattern") is not None:
+            handlers = list(self._pattern_handlers.get(_text(message["pattern"]), ()))
+
+        try:
+            event = self._decode(channel, message["data"])
+        except Exception as e:
+            self.failed += 1
+            logger.error("event_decode_failed", channel=channel, error=str(e))
+            return
+        if event is None:
+            logger.debug("event_type_unregistered", channel=channel)
+            return
+
+        self._record_lag(event)
+        lane = self._lanes.get(event.event_type)
+        if lane is None:
+            await self._run_handlers(event, handlers)
+        else:
+            await lane.put((event, handlers))
+
+    async def _run_handlers(
+        self, event: DomainEvent, handlers: list[EventHandler]
+    ) -> None:
+        ok = True
+        for handler in handlers:
+            try:
+                await handler(event)
+            except Exception as e:
+                ok = False
+                logger.error(
+                    "event_handler_failed",
+                    event_type=event.event_type,
+                    handler=getattr(handler, "__name__", repr(handler)),
+                    error=str(e),
+                )
+                if self.retry is not None:
+                    await self.retry.schedule(handler, event, e)
+        if ok:
+            self.processed += 1
+        else:
+            self.failed += 1
+
+    def _record_lag(self, event: DomainEvent) -> None:
+        occurred_at = event.occurred_at
+        if occurred_at.tzinfo is None:
+            occurred_at = occurred_at.replace(tzinfo=UTC)
+        lag = max(0.0, (datetime.now(UTC) - occurred_at).total_seconds())
+        self.lag_last = lag
+        self.lag_max = max(self.lag_max, lag)
+        self._lag_total += lag
+        self._lag_samples += 1
+
+    # --- METRICS ---
+    def stats(self) -> dict[str, Any]:
+        """
+        lag_*: selisih waktu terbit event (occurred_at) sampai mulai diproses.
+        throughput: event selesai diproses per detik sejak start.
+        """
+        handled = self.processed + self.failed
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        samples = self._lag_samples
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_depth": self._depth(),
+            "lag_last_seconds": self.lag_last,
+            "lag_max_seconds": self.lag_max,
+            "lag_avg_seconds": self._lag_total / samples if samples else 0.0,
+            "throughput_per_second": handled / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+async def _cancel(task: asyncio.Task[Any]) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -3,9 +3,44 @@ Security Module.
 Menyediakan alat autentikasi, otorisasi (RBAC), token management, 
 dan utilitas keamanan lainnya.
 """
-from .password import hash_password, verify_password
-from .token import TokenHelper
-from .sanitization import InputSanitizer
+from .password import (
+    AsyncPasswordHasher,
+    hash_password,
+    verify_password,
+    needs_rehash,
+    check_password,
+    hash_password_async,
+    verify_password_async,
+    check_password_async,
+    get_password_hasher,
+    get_password_policy,
+    set_password_hasher,
+)
+from .hashers import (
+    PasswordHasher,
+    BcryptHasher,
+    Argon2Hasher,
+    PasswordPolicy,
+    PasswordCheck,
+    build_hasher,
+    register_hasher,
+)
+from .token import (
+    TokenHelper,
+    ITokenVerifier,
+    VerifiedTokenCache,
+    get_token_verifier,
+    set_token_verifier,
+)
+from .jwks import JWKSKeySet, load_public_jwk, public_jwk
+from .jwt_backend import (
+    CryptographyBackend,
+    JWTBackend,
+    JoseBackend,
+    PyJWTBackend,
+    get_jwt_backend,
+)
+from .sanitization import InputSanitizer, SanitizationIssue
 from .obfuscation import IDObfuscator
 from .scheme import (
     oauth2_scheme, 
@@ -13,21 +48,87 @@ from .scheme import (
     get_current_user, 
     IAuthUser
 )
-from .rbac import PermissionDependency
-from .rate_limit import RateLimiter, TooManyRequestsError
+from .rbac import (
+    PermissionDependency,
+    PermissionResolver,
+    get_permission_resolver,
+    set_permission_resolver,
+    permission_candidates,
+)
+from .rate_limit import (
+    RateLimiter,
+    TooManyRequestsError,
+    parse_limits,
+    key_by_ip,
+    key_by_user,
+    key_by_api_key,
+    route_template,
+    rate_limit_headers,
+)
+from .rate_limit_algorithms import (
+    RateLimitAlgorithm,
+    RateLimitResult,
+    get_rate_limit_algorithm,
+    load_rate_limit_scripts,
+)
+from .rate_limit_local import LocalTokenBuckets
 
 __all__ = [
     "hash_password",
     "verify_password",
+    "needs_rehash",
+    "check_password",
+    "AsyncPasswordHasher",
+    "hash_password_async",
+    "verify_password_async",
+    "check_password_async",
+    "get_password_hasher",
+    "get_password_policy",
+    "set_password_hasher",
+    "PasswordHasher",
+    "BcryptHasher",
+    "Argon2Hasher",
+    "PasswordPolicy",
+    "PasswordCheck",
+    "build_hasher",
+    "register_hasher",
     "TokenHelper",
+    "ITokenVerifier",
+    "VerifiedTokenCache",
+    "JWKSKeySet",
+    "public_jwk",
+    "load_public_jwk",
+    "JWTBackend",
+    "JoseBackend",
+    "PyJWTBackend",
+    "CryptographyBackend",
+    "get_jwt_backend",
+    "get_token_verifier",
+    "set_token_verifier",
     "InputSanitizer",
+    "SanitizationIssue",
     "IDObfuscator",
     "oauth2_scheme",
     "get_current_token_payload",
     "get_current_user",
     "IAuthUser",
     "PermissionDependency",
+    "PermissionResolver",
+    "get_permission_resolver",
+    "set_permission_resolver",
+    "permission_candidates",
     "RateLimiter",
     "TooManyRequestsError",
+    "parse_limits",
+    "key_by_ip",
+    "key_by_user",
+    "key_by_api_key",
+    "route_template",
+    "rate_limit_headers",
+    "RateLimitAlgorithm",
+    "RateLimitResult",
+    "get_rate_limit_algorithm",
+    "load_rate_limit_scripts",
+    "LocalTokenBuckets",
 
 ]
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+Password Hashers.
+Registry algoritma hash password + profil parameter.
+
+Hash tersimpan dikenali dari prefix-nya ($2b$ = bcrypt, $argon2id$ = argon2id),
+jadi beberapa algoritma / parameter bisa hidup berdampingan selama migrasi:
+hash baru memakai hasher default PasswordPolicy, hash lama tetap bisa
+diverifikasi dan check() melaporkan needs_rehash -> upgrade saat login.
+
+argon2id butuh dependency opsional: pip install argon2-cffi
+"""
+import statistics
+import time
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple, Protocol
+
+import bcrypt
+
+try:
+    import argon2
+    from argon2.exceptions import (
+        InvalidHashError,
+        VerificationError,
+        VerifyMismatchError,
+    )
+except ImportError:  # pragma: no cover
+    argon2 = None # type: ignore
+
+
+class PasswordHasher(Protocol):
+    """Kontrak satu algoritma hash password."""
+    scheme: str
+    prefixes: tuple[str, ...]
+
+    def hash(self, password: str) -> str: ...
+    def verify(self, password: str, hashed: str) -> bool: ...
+    def needs_rehash(self, hashed: str) -> bool: ...
+
+
+class BcryptHasher:
+    scheme = "bcrypt"
+    prefixes = ("$2b$", "$2a$", "$2y$")
+
+    def __init__(self, rounds: int = 12):
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds harus 4..31")
+        self.rounds = rounds
+
+    @property
+    def params(self) -> dict[str, int]:
+        return {"rounds": self.rounds}
+
+    def hash(self, password: str) -> str:
+        # Bcrypt butuh bytes, jadi kita encode dulu
+        return bcrypt.hashpw(
+            password.encode("utf-8"), bcrypt.gensalt(self.rounds)
+        ).decode("utf-8")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        # Format: $2b$<cost>$<salt+hash>; varian lama $2a$ / $2y$ ikut di-upgrade
+        parts = hashed.split("$")
+        if len(parts) != 4 or parts[1] != "2b" or not parts[2].isdigit():
+            return True
+        return int(parts[2]) != self.rounds
+
+
+class Argon2Hasher:
+    scheme = "argon2id"
+    prefixes = ("$argon2id$",)
+
+    def __init__(
+        self, time_cost: int = 3, memory_cost: int = 65_536, parallelism: int = 4
+    ):
+        if argon2 is None:  # pragma: no cover
+            raise ImportError(
+                "argon2-cffi belum terinstall. Jalankan: pip install argon2-cffi"
+            )
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,  # KiB
+            parallelism=parallelism,
+            type=argon2.Type.ID,
+        )
+
+    @property
+    def params(self) -> dict[str, int]:
+        p = self._hasher
+        return {
+            "time_cost": p.time_cost,
+            "memory_cost": p.memory_cost,
+            "parallelism": p.parallelism,
+        }
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return self._hasher.verify(hashed, password)
+        except VerifyMismatchError:
+            return False
+        except (VerificationError, InvalidHashError) as e:
+            # Hash rusak -> ValueError, sama seperti bcrypt
+            raise ValueError(f"Hash argon2 tidak valid: {e}") from e
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed)
+
+
+_HASHERS: dict[str, Callable[..., PasswordHasher]] = {
+    "bcrypt": BcryptHasher,
+    "argon2id": Argon2Hasher,
+}
+
+# Profil parameter siap pakai. Gunakan calibrate() untuk menyesuaikan dengan CPU server.
+PROFILES: dict[str, tuple[str, dict[str, int]]] = {
+    "bcrypt-interactive": ("bcrypt", {"rounds": 12}),
+    "bcrypt-sensitive": ("bcrypt", {"rounds": 14}),
+    # OWASP minimum: 19 MiB, 2 iterasi, 1 lane
+    "argon2id-interactive": (
+        "argon2id",
+        {"time_cost": 2, "memory_cost": 19_456, "parallelism": 1},
+    ),
+    # RFC 9106 "low memory": 64 MiB, 3 iterasi, 4 lane
+    "argon2id-moderate": (
+        "argon2id",
+        {"time_cost": 3, "memory_cost": 65_536, "parallelism": 4},
+    ),
+    "argon2id-sensitive": (
+        "argon2id",
+        {"time_cost": 4, "memory_cost": 262_144, "parallelism": 4},
+    ),
+}
+
+
+def register_hasher(scheme: str, factory: Callable[..., PasswordHasher]) -> None:
+    """
+    Daftarkan algoritma tambahan (misal scrypt) agar bisa dipakai
+    build_hasher / PasswordPolicy.
+    """
+    _HASHERS[scheme] = factory
+
+
+def build_hasher(name: str, **params: Any) -> PasswordHasher:
+    """
+    name: nama profil ("argon2id-interactive") atau scheme ("bcrypt").
+    params menimpa parameter profil: build_hasher("bcrypt-interactive", rounds=13).
+    """
+    if name in PROFILES:
+        scheme, defaults = PROFILES[name]
+        params = {**defaults, **params}
+    else:
+        scheme = name
+    try:
+        factory = _HASHERS[scheme]
+    except KeyError:
+        known = ", ".join([*PROFILES, *_HASHERS])
+        raise ValueError(f"Hasher '{name}' tidak dikenal. Pilihan: {known}") from None
+    return factory(**params)
+
+
+class PasswordCheck(NamedTuple):
+    valid: bool
+    needs_rehash: bool  # Hanya True jika valid: simpan hash baru selagi plaintext ada
+
+
+class PasswordPolicy:
+    """
+    Hasher default untuk hash baru + hasher lain yang masih diterima saat verify.
+
+        policy = PasswordPolicy(build_hasher("argon2id-interactive"))
+        check = policy.check(password, user.password_hash)
+        if check.valid and check.needs_rehash:
+            user.password_hash = policy.hash(password)
+
+    Hash dengan scheme terdaftar yang tidak disebut di `legacy` tetap bisa
+    diverifikasi (parameter dibaca dari hash-nya sendiri).
+    """
+
+    def __init__(self, default: PasswordHasher, legacy: Iterable[PasswordHasher] = ()):
+        self.default = default
+        self._hashers: list[PasswordHasher] = [default, *legacy]
+
+    def identify(self, hashed: str) -> PasswordHasher:
+        for hasher in self._hashers:
+            if hashed.startswith(hasher.prefixes):
+                return hasher
+        for factory in _HASHERS.values():
+            if hashed.startswith(getattr(factory, "prefixes", ())):
+                hasher = factory()
+                self._hashers.append(hasher)
+                return hasher
+        raise ValueError("Format hash password tidak dikenal")
+
+    def hash(self, password: str) -> str:
+        return self.default.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.identify(hashed).verify(password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        hasher = self.identify(hashed)
+        return hasher.scheme != self.default.scheme or self.default.needs_rehash(hashed)
+
+    def check(self, password: str, hashed: str) -> PasswordCheck:
+        if not self.verify(password, hashed):
+            return PasswordCheck(False, False)
+        return PasswordCheck(True, self.needs_rehash(hashed))
+
+
+# --- KALIBRASI ---
+class Calibration(NamedTuple):
+    scheme: str
+    params: dict[str, int]
+    seconds: float  # Median latency verify dengan params ini
+
+
+def measure_verify(hasher: PasswordHasher, samples: int = 3) -> float:
+    """Median latency verify (detik) untuk hasher ini."""
+    hashed = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(
+    scheme: str, target_seconds: float, samples: int = 3, **fixed: int
+) -> Calibration:
+    """
+    Cari parameter terkuat dengan latency verify <= target_seconds di mesin ini.
+
+    - bcrypt  : naikkan rounds (biaya x2 per rounds).
+    - argon2id: memory_cost & parallelism tetap (default profil interactive,
+      bisa ditimpa via `fixed`), naikkan time_cost. Jika time_cost=1 pun
+      melebihi target, memory_cost dibagi dua sampai masuk (min 8 MiB).
+    Jika parameter minimum pun melebihi target, parameter minimum yang dikembalikan.
+    """
+    if scheme == "bcrypt":
+        rounds = 4
+        best = Calibration(
+            scheme, {"rounds": rounds}, measure_verify(BcryptHasher(rounds), samples)
+        )
+        while best.seconds <= target_seconds and rounds < 31:
+            rounds += 1
+            seconds = measure_verify(BcryptHasher(rounds), samples)
+            if seconds > target_seconds:
+                break
+            best = Calibration(scheme, {"rounds": rounds}, seconds)
+        return best
+
+    if scheme == "argon2id":
+        params = {**PROFILES["argon2id-interactive"][1], "time_cost": 1, **fixed}
+        seconds = measure_verify(Argon2Hasher(**params), samples)
+        while seconds > target_seconds and params["memory_cost"] // 2 >= 8_192:
+            params["memory_cost"] //= 2
+            seconds = measure_verify(Argon2Hasher(**params), samples)
+        best = Calibration(scheme, dict(params), seconds)
+        while seconds <= target_seconds:
+            params["time_cost"] += 1
+            seconds = measure_verify(Argon2Hasher(**params), samples)
+            if seconds <= target_seconds:
+                best = Calibration(scheme, dict(params), seconds)
+        return best
+
+    raise ValueError(f"Kalibrasi untuk scheme '{scheme}' belum didukung")
@@ -0,0 +1,223 @@
+"""
+JWKS (JSON Web Key Set).
+Service penerbit token memegang private key; service lain cukup memegang
+public key (JWKS) untuk verifikasi -> SECRET_KEY tidak perlu disebar.
+
+Rotasi key berbasis `kid`:
+1. Issuer menambahkan public key baru ke JWKS (key lama tetap ada),
+   lalu mulai menandatangani token dengan kid baru.
+2. Verifier yang menerima kid belum dikenal me-refetch JWKS SEKALI
+   (single-flight: satu thread fetch, thread lain memakai hasilnya).
+3. Setelah token lama kedaluwarsa, key lama dihapus dari JWKS.
+"""
+import base64
+import threading
+import time
+import urllib.request
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+import orjson
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+_EC_CURVES = {"secp256r1": "P-256", "secp384r1": "P-384", "secp521r1": "P-521"}
+_JWK_CURVES = {"P-256": ec.SECP256R1, "P-384": ec.SECP384R1, "P-521": ec.SECP521R1}
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64_int(value: int, length: int | None = None) -> str:
+    length = length or max(1, (value.bit_length() + 7) // 8)
+    return _b64(value.to_bytes(length, "big"))
+
+
+def _b64_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def load_public_jwk(jwk: Mapping[str, Any]) -> Any:
+    """Kebalikan public_jwk(): JWK publik -> public key `cryptography`."""
+    try:
+        kty = jwk["kty"]
+        if kty == "RSA":
+            n, e = (int.from_bytes(_b64_decode(jwk[k]), "big") for k in ("n", "e"))
+            return rsa.RSAPublicNumbers(e, n).public_key()
+        if kty == "EC":
+            x, y = (int.from_bytes(_b64_decode(jwk[k]), "big") for k in ("x", "y"))
+            return ec.EllipticCurvePublicNumbers(
+                x, y, _JWK_CURVES[jwk["crv"]]()
+            ).public_key()
+        if kty == "OKP" and jwk.get("crv") == "Ed25519":
+            return ed25519.Ed25519PublicKey.from_public_bytes(_b64_decode(jwk["x"]))
+    except (KeyError, ValueError, TypeError) as e:
+        raise ValueError(f"JWK tidak valid: {e}") from e
+    raise ValueError(f"Tipe JWK {jwk.get('kty')}/{jwk.get('crv')} tidak didukung")
+
+
+def public_jwk(key: str | bytes, kid: str | None, alg: str) -> dict[str, Any]:
+    """
+    JWK publik (untuk dipublikasikan di JWKS) dari PEM private / public key.
+    Mendukung RSA, EC (P-256/384/521) dan Ed25519.
+    """
+    data = key.encode("utf-8") if isinstance(key, str) else key
+    try:
+        public = serialization.load_pem_private_key(data, password=None).public_key()
+    except ValueError:
+        public = serialization.load_pem_public_key(data)
+
+    if isinstance(public, rsa.RSAPublicKey):
+        numbers = public.public_numbers()
+        jwk: dict[str, Any] = {
+            "kty": "RSA",
+            "n": _b64_int(numbers.n),
+            "e": _b64_int(numbers.e),
+        }
+    elif isinstance(public, ec.EllipticCurvePublicKey):
+        size = (public.curve.key_size + 7) // 8
+        numbers = public.public_numbers()
+        jwk = {
+            "kty": "EC",
+            "crv": _EC_CURVES[public.curve.name],
+            "x": _b64_int(numbers.x, size),
+            "y": _b64_int(numbers.y, size),
+        }
+    elif isinstance(public, ed25519.Ed25519PublicKey):
+        raw = public.public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        jwk = {"kty": "OKP", "crv": "Ed25519", "x": _b64(raw)}
+    else:
+        raise TypeError(f"Tipe key {type(public).__name__} tidak didukung")
+
+    jwk.update({"use": "sig", "alg": alg})
+    if kid is not None:
+        jwk["kid"] = kid
+    return jwk
+
+
+class JWKSKeySet:
+    """
+    Cache public key dari dokumen JWKS.
+
+    Source:
+    - dict                : dokumen statis (tidak pernah di-refresh)
+    - "http(s)://..."     : endpoint lokal/internal (GET, stdlib urllib)
+    - path file           : file JSON JWKS
+    - callable            : fungsi tanpa argumen yang me-return dokumen
+
+    - Dokumen di-refresh setelah `refresh_interval` detik.
+    - kid tidak dikenal -> refetch sekali (single-flight), dibatasi
+      `min_refetch_interval` agar kid acak dari penyerang tidak membanjiri JWKS.
+    - Refresh gagal tapi key lama masih ada -> key lama tetap dipakai.
+    Thread-safe (decode_token dipanggil dari threadpool FastAPI).
+    """
+
+    def __init__(
+        self,
+        source: Mapping[str, Any] | str | Path | Callable[[], Mapping[str, Any]],
+        refresh_interval: float = 300.0,
+        min_refetch_interval: float = 30.0,
+        timeout: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self.clock = clock
+        self._static = isinstance(source, Mapping)
+        self._keys: dict[str | None, dict[str, Any]] = {}
+        self._fetched_at: float | None = None
+        self._generation = 0  # Naik setiap fetch selesai (untuk single-flight)
+        self._lock = threading.Lock()
+        self.fetches = 0
+        if self._static:
+            self._keys = self._parse(source)
+            self._fetched_at = clock()
+
+    @property
+    def static(self) -> bool:
+        """True jika dokumen statis (dict): get() tidak pernah melakukan I/O."""
+        return self._static
+
+    @property
+    def kids(self) -> list[str | None]:
+        return list(self._keys)
+
+    def get(self, kid: str | None) -> dict[str, Any]:
+        """JWK untuk `kid`. Raise ValueError jika tidak ada walau sudah refetch."""
+        seen = self._generation
+        if not self._static and (
+            self._fetched_at is None
+            or self.clock() - self._fetched_at >= self.refresh_interval
+        ):
+            self._refresh(seen)
+            seen = self._generation
+
+        key = self._find(kid)
+        if (
+            key is None
+            and not self._static
+            and self.clock() - self._fetched_at >= self.min_refetch_interval
+        ):
+            # Kemungkinan key baru hasil rotasi
+            self._refresh(seen)
+            key = self._find(kid)
+        if key is None:
+            raise ValueError(f"Key dengan kid '{kid}' tidak ada di JWKS")
+        return key
+
+    def _find(self, kid: str | None) -> dict[str, Any] | None:
+        key = self._keys.get(kid)
+        if key is None and kid is None and len(self._keys) == 1:
+            # Token tanpa kid + JWKS satu key -> tidak ambigu
+            key = next(iter(self._keys.values()))
+        return key
+
+    def _refresh(self, seen: int) -> None:
+        with self._lock:
+            if self._generation != seen:
+                return  # Thread lain baru saja fetch; pakai hasilnya
+            try:
+                keys = self._parse(self._fetch())
+            except Exception as e:
+                self._generation += 1
+                if not self._keys:
+                    raise ValueError(f"Gagal memuat JWKS: {e}") from e
+                # Backoff: key lama dipakai sampai interval berikutnya
+                self._fetched_at = self.clock()
+                logger.warning(
+                    "jwks_refresh_failed", error=str(e), kept_keys=len(self._keys)
+                )
+                return
+            self._keys = keys
+            self._fetched_at = self.clock()
+            self._generation += 1
+            self.fetches += 1
+            logger.info("jwks_refreshed", keys=len(keys))
+
+    def _fetch(self) -> Mapping[str, Any]:
+        source = self.source
+        if callable(source):
+            return source()
+        location = str(source)
+        if location.startswith(("http://", "https://")):
+            with urllib.request.urlopen(location, timeout=self.timeout) as response:
+                return orjson.loads(response.read())
+        return orjson.loads(Path(location).read_bytes())
+
+    @staticmethod
+    def _parse(document: Mapping[str, Any]) -> dict[str | None, dict[str, Any]]:
+        return {
+            key.get("kid"): dict(key)
+            for key in document["keys"]
+            if key.get("use", "sig") == "sig"
+        }
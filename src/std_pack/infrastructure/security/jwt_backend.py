@@ -0,0 +1,338 @@
+"""
+JWT Backend.
+Lapisan tipis di atas library JWT agar TokenHelper tidak terikat ke satu library.
+
+- JoseBackend : python-jose (default, dependency wajib). HS*/RS*/ES*, tanpa EdDSA.
+- PyJWTBackend: PyJWT (opsional, `pip install "pyjwt[crypto]"`). Mendukung EdDSA.
+- CryptographyBackend: JWS compact langsung di atas `cryptography` + orjson
+  (tanpa lapisan generik JOSE). Paling cepat; HS*/RS*/ES*/EdDSA.
+
+Key (private PEM / JWK) di-parse sekali lewat load_private_key / load_jwk,
+bukan per token: parse PEM RSA jauh lebih mahal daripada sign-nya sendiri.
+
+Semua backend me-raise ValueError untuk token/key yang tidak valid, sehingga
+pemanggil cukup menangkap satu jenis exception.
+"""
+import base64
+import hashlib
+import hmac
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any, Protocol
+
+import orjson
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+from jose import jwk, jwt
+from jose.constants import ALGORITHMS
+from jose.exceptions import JOSEError
+
+from .jwks import load_public_jwk
+
+try:
+    import jwt as pyjwt
+except ImportError: # pragma: no cover
+    pyjwt = None # type: ignore
+
+
+class JWTBackend(Protocol):
+    """Kontrak backend JWT yang dipakai TokenHelper."""
+    name: str
+    algorithms: frozenset[str]
+
+    def encode(
+        self,
+        claims: dict[str, Any],
+        key: Any,
+        algorithm: str,
+        headers: dict[str, Any] | None = None,
+    ) -> str: ...
+    def decode(
+        self, token: str, key: Any, algorithms: Iterable[str]
+    ) -> dict[str, Any]: ...
+    def unverified_header(self, token: str) -> dict[str, Any]: ...
+    def unverified_claims(self, token: str) -> dict[str, Any]: ...
+    def load_jwk(self, key: dict[str, Any]) -> Any: ...
+    def load_private_key(self, pem: str | bytes, algorithm: str) -> Any: ...
+
+
+class JoseBackend:
+    name = "jose"
+    algorithms = frozenset(ALGORITHMS.HMAC | ALGORITHMS.RSA_DS | ALGORITHMS.EC_DS)
+
+    def encode(
+        self,
+        claims: dict[str, Any],
+        key: Any,
+        algorithm: str,
+        headers: dict[str, Any] | None = None,
+    ) -> str:
+        return jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: Any, algorithms: Iterable[str]) -> dict[str, Any]:
+        try:
+            return jwt.decode(token, key, algorithms=list(algorithms))
+        except JOSEError as e:
+            raise ValueError(str(e)) from e
+
+    def unverified_header(self, token: str) -> dict[str, Any]:
+        try:
+            return jwt.get_unverified_header(token)
+        except JOSEError as e:
+            raise ValueError(str(e)) from e
+
+    def unverified_claims(self, token: str) -> dict[str, Any]:
+        try:
+            return jwt.get_unverified_claims(token)
+        except JOSEError as e:
+            raise ValueError(str(e)) from e
+
+    def load_jwk(self, key: dict[str, Any]) -> Any:
+        try:
+            return jwk.construct(key, algorithm=key.get("alg"))
+        except JOSEError as e:
+            raise ValueError(f"JWK tidak valid untuk backend jose: {e}") from e
+
+    def load_private_key(self, pem: str | bytes, algorithm: str) -> Any:
+        try:
+            return jwk.construct(pem, algorithm=algorithm)
+        except JOSEError as e:
+            raise ValueError(f"Private key tidak valid: {e}") from e
+
+
+class PyJWTBackend:
+    name = "pyjwt"
+
+    def __init__(self):
+        if pyjwt is None: # pragma: no cover
+            raise ImportError(
+                "PyJWT belum terinstall. Jalankan: pip install 'pyjwt[crypto]'"
+            )
+        algorithms = pyjwt.algorithms.get_default_algorithms()
+        self.algorithms = frozenset(algorithms) - {"none"}
+
+    def encode(
+        self,
+        claims: dict[str, Any],
+        key: Any,
+        algorithm: str,
+        headers: dict[str, Any] | None = None,
+    ) -> str:
+        return pyjwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: Any, algorithms: Iterable[str]) -> dict[str, Any]:
+        try:
+            return pyjwt.decode(token, key, algorithms=list(algorithms))
+        except pyjwt.PyJWTError as e:
+            raise ValueError(str(e)) from e
+
+    def unverified_header(self, token: str) -> dict[str, Any]:
+        try:
+            return pyjwt.get_unverified_header(token)
+        except pyjwt.PyJWTError as e:
+            raise ValueError(str(e)) from e
+
+    def unverified_claims(self, token: str) -> dict[str, Any]:
+        try:
+            return pyjwt.decode(token, options={"verify_signature": False})
+        except pyjwt.PyJWTError as e:
+            raise ValueError(str(e)) from e
+
+    def load_jwk(self, key: dict[str, Any]) -> Any:
+        try:
+            return pyjwt.PyJWK(key).key
+        except pyjwt.PyJWTError as e:
+            raise ValueError(f"JWK tidak valid untuk backend pyjwt: {e}") from e
+
+    def load_private_key(self, pem: str | bytes, algorithm: str) -> Any:
+        try:
+            return pyjwt.get_algorithm_by_name(algorithm).prepare_key(pem)
+        except (pyjwt.PyJWTError, ValueError) as e:
+            raise ValueError(f"Private key tidak valid: {e}") from e
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _numeric_dates(claims: dict[str, Any]) -> dict[str, Any]:
+    """datetime -> NumericDate (detik epoch) seperti jose/PyJWT, bukan ISO orjson."""
+    return {
+        k: int(v.timestamp()) if isinstance(v, datetime) else v
+        for k, v in claims.items()
+    }
+
+
+class CryptographyBackend:
+    """
+    JWS compact (header.payload.signature) tanpa library JOSE.
+    Klaim waktu yang divalidasi: exp & nbf (sama seperti jose/PyJWT default).
+    """
+    name = "cryptography"
+
+    _HASHES = {
+        "256": (hashlib.sha256, hashes.SHA256),
+        "384": (hashlib.sha384, hashes.SHA384),
+        "512": (hashlib.sha512, hashes.SHA512),
+    }
+    algorithms = frozenset({
+        "HS256", "HS384", "HS512",
+        "RS256", "RS384", "RS512",
+        "ES256", "ES384", "ES512",
+        "EdDSA",
+    })
+
+    def __init__(self, clock: Any = time.time):
+        self.clock = clock
+        # Header ter-encode per (alg, kid)
+        self._headers: dict[tuple[str, str | None], bytes] = {}
+
+    # --- SIGN / VERIFY ---
+    def _sign(self, message: bytes, key: Any, algorithm: str) -> bytes:
+        family, bits = algorithm[:2], algorithm[2:]
+        if family == "HS":
+            secret = key.encode("utf-8") if isinstance(key, str) else key
+            return hmac.new(secret, message, self._HASHES[bits][0]).digest()
+        if family == "RS":
+            return key.sign(message, padding.PKCS1v15(), self._HASHES[bits][1]())
+        if family == "ES":
+            der = key.sign(message, ec.ECDSA(self._HASHES[bits][1]()))
+            r, s = decode_dss_signature(der)
+            size = (key.curve.key_size + 7) // 8
+            return r.to_bytes(size, "big") + s.to_bytes(size, "big")
+        return key.sign(message)  # EdDSA
+
+    def _verify(
+        self, message: bytes, signature: bytes, key: Any, algorithm: str
+    ) -> bool:
+        family, bits = algorithm[:2], algorithm[2:]
+        try:
+            if family == "HS":
+                if not isinstance(key, (str, bytes)):
+                    return False  # Public key bukan secret HMAC (alg confusion)
+                expected = self._sign(message, key, algorithm)
+                return hmac.compare_digest(expected, signature)
+            if family == "RS" and isinstance(key, rsa.RSAPublicKey):
+                digest = self._HASHES[bits][1]()
+                key.verify(signature, message, padding.PKCS1v15(), digest)
+            elif family == "ES" and isinstance(key, ec.EllipticCurvePublicKey):
+                size = (key.curve.key_size + 7) // 8
+                if len(signature) != 2 * size:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:size], "big"),
+                    int.from_bytes(signature[size:], "big"),
+                )
+                key.verify(der, message, ec.ECDSA(self._HASHES[bits][1]()))
+            elif algorithm == "EdDSA" and isinstance(key, ed25519.Ed25519PublicKey):
+                key.verify(signature, message)
+            else:
+                return False
+        except InvalidSignature:
+            return False
+        return True
+
+    # --- JWT ---
+    def encode(
+        self,
+        claims: dict[str, Any],
+        key: Any,
+        algorithm: str,
+        headers: dict[str, Any] | None = None,
+    ) -> str:
+        headers = headers or {}
+        if headers.keys() <= {"kid"}:
+            # Header hampir selalu sama (alg + kid): encode sekali saja
+            cache_key = (algorithm, headers.get("kid"))
+            header = self._headers.get(cache_key)
+            if header is None:
+                header = self._encode_header(algorithm, headers)
+                self._headers[cache_key] = header
+        else:
+            header = self._encode_header(algorithm, headers)
+        message = header + b"." + _b64encode(orjson.dumps(_numeric_dates(claims)))
+        signature = _b64encode(self._sign(message, key, algorithm))
+        return (message + b"." + signature).decode("ascii")
+
+    @staticmethod
+    def _encode_header(algorithm: str, headers: dict[str, Any]) -> bytes:
+        return _b64encode(orjson.dumps({"alg": algorithm, "typ": "JWT", **headers}))
+
+    def _split(self, token: str) -> tuple[dict[str, Any], bytes, bytes, bytes]:
+        try:
+            header_b64, payload_b64, signature_b64 = token.encode("ascii").split(b".")
+            header = orjson.loads(_b64decode(header_b64))
+            if not isinstance(header, dict):
+                raise ValueError("header bukan object")
+            message = header_b64 + b"." + payload_b64
+            return header, message, payload_b64, _b64decode(signature_b64)
+        except (ValueError, UnicodeError, orjson.JSONDecodeError) as e:
+            raise ValueError(f"Token tidak valid: {e}") from e
+
+    def decode(self, token: str, key: Any, algorithms: Iterable[str]) -> dict[str, Any]:
+        header, message, payload_b64, signature = self._split(token)
+        algorithm = header.get("alg")
+        if algorithm not in algorithms or algorithm not in self.algorithms:
+            raise ValueError("The specified alg value is not allowed")
+        if not self._verify(message, signature, key, algorithm):
+            raise ValueError("Signature verification failed.")
+        try:
+            claims = orjson.loads(_b64decode(payload_b64))
+        except (ValueError, orjson.JSONDecodeError) as e:
+            raise ValueError(f"Payload tidak valid: {e}") from e
+        if not isinstance(claims, dict):
+            raise ValueError("Payload bukan object")
+
+        now = self.clock()
+        exp, nbf = claims.get("exp"), claims.get("nbf")
+        if exp is not None and (not isinstance(exp, (int, float)) or now >= exp):
+            raise ValueError("Signature has expired.")
+        if nbf is not None and (not isinstance(nbf, (int, float)) or now < nbf):
+            raise ValueError("The token is not yet valid (nbf)")
+        return claims
+
+    def unverified_header(self, token: str) -> dict[str, Any]:
+        return self._split(token)[0]
+
+    def unverified_claims(self, token: str) -> dict[str, Any]:
+        try:
+            return orjson.loads(_b64decode(self._split(token)[2]))
+        except (ValueError, orjson.JSONDecodeError) as e:
+            raise ValueError(f"Payload tidak valid: {e}") from e
+
+    def load_jwk(self, key: dict[str, Any]) -> Any:
+        return load_public_jwk(key)
+
+    def load_private_key(self, pem: str | bytes, algorithm: str) -> Any:
+        data = pem.encode("utf-8") if isinstance(pem, str) else pem
+        try:
+            return serialization.load_pem_private_key(data, password=None)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Private key tidak valid: {e}") from e
+
+
+_BACKENDS: dict[str, type] = {
+    "jose": JoseBackend,
+    "pyjwt": PyJWTBackend,
+    "cryptography": CryptographyBackend,
+}
+
+
+def get_jwt_backend(name: str = "jose") -> JWTBackend:
+    """Backend berdasarkan nama ('jose' | 'pyjwt' | 'cryptography')."""
+    try:
+        return _BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"JWT backend '{name}' tidak dikenal. Pilihan: {', '.join(_BACKENDS)}"
+        ) from None
@@ -1,16 +1,223 @@
-"""Password hashing utilities using native bcrypt."""
-import bcrypt
+"""
+Password hashing utilities.
 
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt."""
-    # Bcrypt butuh bytes, jadi kita encode dulu
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed.decode('utf-8')
+Algoritma & parameter diatur PasswordPolicy (lihat hashers.py); default
+bcrypt cost 12. verify_password mengenali algoritma dari prefix hash, jadi
+hash lama tetap valid setelah policy diganti.
+
+Hash/verify sengaja lambat (~100-300 ms). Dipanggil langsung dari handler
+async, event loop ikut berhenti selama itu dan semua request lain di worker
+yang sama tertahan. Untuk handler async pakai varian *_async: dijalankan di
+thread pool khusus (bcrypt & argon2 melepas GIL, jadi thread benar-benar
+paralel) dengan batas antrian.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from std_pack.config import BaseAppSettings, get_settings
+from std_pack.domain.exceptions import TooManyRequestsError
+from std_pack.infrastructure.logging import get_logger
+from .hashers import BcryptHasher, PasswordCheck, PasswordPolicy, build_hasher
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_ROUNDS = 12 # Sama dengan default bcrypt.gensalt()
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    """Hash password dengan policy aktif (atau bcrypt cost `rounds` jika diisi)."""
+    if rounds is not None:
+        return BcryptHasher(rounds).hash(password)
+    return get_password_policy().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash."""
-    pwd_bytes = plain_password.encode('utf-8')
-    hash_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(pwd_bytes, hash_bytes)
\ No newline at end of file
+    """Verify password against hash (bcrypt / argon2id, dikenali dari prefix)."""
+    return get_password_policy().verify(plain_password, hashed_password)
+
+def check_password(plain_password: str, hashed_password: str) -> PasswordCheck:
+    """
+    Seperti verify_password, plus laporan needs_rehash (algoritma / parameter
+    hash berbeda dari policy aktif) untuk migrasi bertahap saat login.
+    """
+    return get_password_policy().check(plain_password, hashed_password)
+
+def needs_rehash(hashed_password: str, rounds: int | None = None) -> bool:
+    """
+    True jika hash dibuat dengan algoritma / parameter lain dari policy
+    (atau bcrypt `rounds`).
+    """
+    if rounds is not None:
+        return BcryptHasher(rounds).needs_rehash(hashed_password)
+    return get_password_policy().needs_rehash(hashed_password)
+
+
+class AsyncPasswordHasher:
+    """
+    Hash / verify password tanpa memblokir event loop.
+
+    Penggunaan (login):
+        hasher = get_password_hasher()
+        valid, new_hash = await hasher.verify_and_update(
+            form.password, user.password_hash
+        )
+        # Algoritma / cost berubah -> upgrade hash selagi plaintext tersedia
+        if new_hash:
+            user.password_hash = new_hash
+
+    - Thread pool KHUSUS (max_workers): tidak berbagi dengan default executor,
+      jadi dependency sync FastAPI / asyncio.to_thread tidak ikut kelaparan.
+    - Maksimal max_workers + max_waiting operasi di dalam sistem; sisanya
+      langsung ditolak TooManyRequestsError (429) daripada menumpuk antrian
+      tak terbatas saat login flood.
+    """
+
+    def __init__(
+        self,
+        rounds: int = DEFAULT_ROUNDS,
+        max_workers: int = 4,
+        max_waiting: int = 64,
+        policy: PasswordPolicy | None = None,
+    ):
+        if max_workers < 1 or max_waiting < 0:
+            raise ValueError(
+                "max_workers minimal 1 dan max_waiting tidak boleh negatif"
+            )
+        self.policy = policy or PasswordPolicy(BcryptHasher(rounds))
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_waiting)
+        self.rejected = 0
+        self.rehashed = 0
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            logger.warning(
+                "password_hasher_saturated",
+                capacity=self.max_workers + self.max_waiting,
+            )
+            raise TooManyRequestsError(
+                retry_after=1,
+                message="Terlalu banyak permintaan login, coba lagi sebentar",
+            )
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.policy.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.policy.verify, plain_password, hashed_password)
+
+    async def check(self, plain_password: str, hashed_password: str) -> PasswordCheck:
+        return await self._run(self.policy.check, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self.policy.needs_rehash(hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Verify lalu (jika valid & algoritma / parameter berbeda dari policy)
+        buat hash baru. Return (valid, hash_baru | None). Simpan hash_baru ke
+        DB jika tidak None.
+        """
+        check = await self.check(plain_password, hashed_password)
+        if not check.valid or not check.needs_rehash:
+            return check.valid, None
+        self.rehashed += 1
+        return True, await self.hash(plain_password)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "scheme": self.policy.default.scheme,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+
+    def close(self) -> None:
+        # Tanpa cancel_futures: verify yang sudah antri (misal saat hasher
+        # diganti karena refresh settings) tetap diselesaikan, bukan dibatalkan
+        self._executor.shutdown(wait=False)
+
+
+# --- HASHER PROVIDER (Process-wide) ---
+_hasher: AsyncPasswordHasher | None = None
+_hasher_settings: BaseAppSettings | None = None  # None = hasher di-inject manual
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> AsyncPasswordHasher:
+    """
+    Hasher aktif. Default dibangun dari PASSWORD_HASH_PROFILE (atau bcrypt
+    PASSWORD_BCRYPT_ROUNDS), PASSWORD_HASH_WORKERS & PASSWORD_HASH_MAX_WAITING.
+    """
+    global _hasher, _hasher_settings
+    hasher = _hasher
+    if hasher is not None and (
+        _hasher_settings is None or _hasher_settings is get_settings()
+    ):
+        return hasher
+    with _hasher_lock:
+        settings = get_settings()
+        if _hasher is None or (
+            _hasher_settings is not None and _hasher_settings is not settings
+        ):
+            previous = _hasher
+            profile = settings.PASSWORD_HASH_PROFILE
+            default = (
+                build_hasher(profile)
+                if profile
+                else BcryptHasher(settings.PASSWORD_BCRYPT_ROUNDS)
+            )
+            _hasher = AsyncPasswordHasher(
+                policy=PasswordPolicy(default),
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                max_waiting=settings.PASSWORD_HASH_MAX_WAITING,
+            )
+            _hasher_settings = settings
+            if previous is not None:
+                previous.close()
+        return _hasher
+
+
+def get_password_policy() -> PasswordPolicy:
+    """Policy aktif (dipakai juga oleh fungsi sync hash_password / verify_password)."""
+    return get_password_hasher().policy
+
+
+def set_password_hasher(hasher: AsyncPasswordHasher | None) -> None:
+    """
+    Pasang hasher sendiri (misal cost rendah di testing).
+    None = kembali ke default.
+    """
+    global _hasher, _hasher_settings
+    with _hasher_lock:
+        _hasher = hasher
+        _hasher_settings = None
+
+
+async def hash_password_async(password: str) -> str:
+    return await get_password_hasher().hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await get_password_hasher().verify(plain_password, hashed_password)
+
+
+async def check_password_async(
+    plain_password: str, hashed_password: str
+) -> PasswordCheck:
+    return await get_password_hasher().check(plain_password, hashed_password)
@@ -1,57 +1,320 @@
 """
 Rate Limiting Module.
-Membatasi jumlah request menggunakan Redis (Fixed Window Algorithm).
+Membatasi jumlah request menggunakan Redis. Algoritma (fixed window,
+sliding log, sliding window, GCRA) dijalankan sebagai script Lua:
+satu round trip atomic per request (lihat rate_limit_algorithms.py).
+
+Satu engine untuk dua cara pakai:
+- Dependency : Depends(RateLimiter(...)) -> header RateLimit-* ikut di response.
+- Middleware : RateLimitMiddleware (presentation.http) -> request yang ditolak
+  tidak pernah sampai ke routing / dependency resolution.
+
+Identity diambil dari key function (default: user dari bearer token, lalu IP),
+bukan dari get_current_user, jadi endpoint anonim (login, register) juga
+bisa dibatasi.
 """
-from typing import Annotated
+import asyncio
+import hashlib
+import inspect
+import math
+import re
+from typing import Any, Awaitable, Callable, Collection, Sequence
 
-from fastapi import Depends, Request
-from redis import asyncio as aioredis
+from fastapi import Request, Response
+from redis.exceptions import RedisError
+from starlette.routing import Match
 
-from std_pack.infrastructure.security.scheme import get_current_user, IAuthUser
 from std_pack.domain.exceptions import TooManyRequestsError
+from std_pack.infrastructure.cache.keys import rate_limit_key
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.logging import get_logger
+from .rate_limit_algorithms import RateLimitResult, get_rate_limit_algorithm
+from .rate_limit_local import LocalTokenBuckets
+from .token import get_token_verifier
 
-class RateLimiter:
+logger = get_logger(__name__)
+
+# Key function boleh sync atau async (async untuk yang butuh I/O, misal key_by_user)
+KeyFunc = Callable[[Request], "str | None | Awaitable[str | None]"]
+
+# Scope untuk request yang tidak cocok dengan route mana pun (404). Path mentah
+# tidak dipakai: path acak akan membuat key Redis baru per request.
+UNMATCHED_ROUTE = "<unmatched>"
+
+_UNITS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+?)s?\s*$")
+
+
+def parse_limits(spec: str) -> list[tuple[int, float]]:
+    """
+    "10/second; 1000/hour" -> [(10, 1), (1000, 3600)].
+    Unit: s/sec/second, m/min/minute, h/hour, d/day (boleh jamak), opsional
+    dengan pengali: "100/5m" = 100 per 5 menit. Pemisah: ';' atau ','.
+    """
+    limits = []
+    for part in re.split(r"[;,]", spec):
+        if not part.strip():
+            continue
+        match = _LIMIT_RE.match(part.lower())
+        if match is None or match.group(3) not in _UNITS:
+            raise ValueError(
+                f"Format limit tidak valid: '{part.strip()}' "
+                "(contoh: '10/second', '100/5m')"
+            )
+        times, multiplier, unit = match.groups()
+        limits.append((int(times), int(multiplier or 1) * _UNITS[unit]))
+    if not limits:
+        raise ValueError("Minimal satu limit")
+    return limits
+
+
+# --- KEY FUNCTIONS ---
+def key_by_ip(request: Request) -> str | None:
+    """
+    IP klien (request.client). Di belakang reverse proxy, jalankan uvicorn
+    dengan --proxy-headers / --forwarded-allow-ips agar ini IP asli klien.
+    """
+    return request.client.host if request.client else None
+
+
+async def key_by_user(request: Request) -> str | None:
+    """
+    Claim `sub` dari bearer token (diverifikasi, di-cache oleh token verifier).
+    None jika anonim / token tidak valid -> key function berikutnya dipakai.
+
+    Verifier yang bisa I/O blocking (JWKS dari URL, atau verifier custom yang
+    tidak menyatakan `blocking = False`) dijalankan di thread, bukan di event
+    loop. HS* / JWKS statis tetap didecode langsung (CPU saja).
+    """
+    authorization = request.headers.get("authorization")
+    if not isinstance(authorization, str):
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    verifier = get_token_verifier()
+    try:
+        if getattr(verifier, "blocking", True):
+            payload = await asyncio.to_thread(verifier.decode_token, token)
+        else:
+            payload = verifier.decode_token(token)
+        sub = payload.get("sub")
+    except Exception:
+        return None  # Token ditolak nanti oleh dependency auth, bukan oleh rate limiter
+    return str(sub) if sub is not None else None
+
+
+def key_by_api_key(header: str = "X-API-Key") -> KeyFunc:
+    """
+    Key function dari header API key (di-hash: secret tidak tersimpan di
+    key Redis).
+    """
+
+    def _key(request: Request) -> str | None:
+        value = request.headers.get(header)
+        if not isinstance(value, str) or not value:
+            return None
+        return "key:" + hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+    return _key
+
+
+def route_template(request: Request) -> str:
     """
-    Dependency untuk membatasi request.
-    Penggunaan: Depends(RateLimiter(times=10, seconds=60))
+    Template route ('/orders/{order_id}') alih-alih path mentah, agar
+    /orders/1 dan /orders/2 berbagi limit. Di middleware route belum
+    di-resolve, jadi dicocokkan sendiri terhadap router aplikasi.
+    Tidak cocok dengan route mana pun -> UNMATCHED_ROUTE (satu bucket).
+    """
+    route = request.scope.get("route")
+    if route is None:
+        router = getattr(request.scope.get("app"), "router", None)
+        for candidate in getattr(router, "routes", ()):
+            match, _ = candidate.matches(request.scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    path = getattr(route, "path", None)
+    return path if isinstance(path, str) else UNMATCHED_ROUTE
+
+
+def rate_limit_headers(
+    limit: int, remaining: int, reset_after: float, policy: str | None = None
+) -> dict[str, str]:
+    """Header RateLimit-* (draft IETF httpapi-ratelimit-headers)."""
+    headers = {
+        "RateLimit-Limit": str(limit),
+        "RateLimit-Remaining": str(max(0, remaining)),
+        "RateLimit-Reset": str(max(0, math.ceil(reset_after))),
+    }
+    if policy:
+        headers["RateLimit-Policy"] = policy
+    return headers
+
+
+class RateLimiter:
     """
-    def __init__(self, times: int = 10, seconds: int = 60):
-        self.times = times
-        self.seconds = seconds
+    Pembatas request. Penggunaan:
 
-    async def __call__(
-        self, 
-        request: Request,
-        user: Annotated[IAuthUser, Depends(get_current_user)],
+        # Dependency (endpoint anonim pun bisa)
+        login_limit = RateLimiter(limits="5/minute; 50/day", key=key_by_ip)
+        @router.post("/login", dependencies=[Depends(login_limit)])
+
+        # Beberapa limit dicek dalam SATU panggilan Redis
+        # (semua atau tidak sama sekali)
+        RateLimiter(limits=[(10, 1), (1000, 3600)], algorithm="sliding_window")
+
+    - limits      : string ("10/second; 1000/hour") atau [(times, seconds)].
+                    Jika kosong dipakai (times, seconds) -> kompatibel API lama.
+    - algorithm   : 'fixed_window' (default) | 'sliding_log' |
+                    'sliding_window' | 'gcra'.
+                    Fixed window meloloskan burst hingga 2x limit di batas
+                    window; pilih sliding_window / gcra untuk login, OTP, dll.
+    - key         : key function atau urutan fallback; yang pertama bukan None
+                    dipakai. Default (key_by_user, key_by_ip).
+                    Semua None -> tidak dibatasi.
+    - scope       : route_template (default), callable lain, atau string tetap
+                    (misal "auth" agar beberapa endpoint berbagi kuota).
+    - routes/methods: filter (template route & method) untuk middleware.
+    - local_accuracy: aktifkan pre-limiter lokal (LocalTokenBuckets) yang
+                    me-lease kuota dari Redis per chunk = local_accuracy x limit.
+                    Hanya fixed_window / sliding_window; limit tidak pernah
+                    terlampaui, tapi maksimal workers x chunk request bisa
+                    ditolak lebih awal.
+    - redis       : client / RedisManager. Default: request.state.redis.
+    Redis tidak ada / error -> fail open (request lolos).
+    """
+    def __init__(
+        self,
+        times: int = 10,
+        seconds: int = 60,
+        algorithm: str = "fixed_window",
+        local_accuracy: float | None = None,
+        *,
+        limits: str | Sequence[tuple[int, float]] | None = None,
+        key: KeyFunc | Sequence[KeyFunc] = (key_by_user, key_by_ip),
+        scope: str | Callable[[Request], str] = route_template,
+        routes: Collection[str] | None = None,
+        methods: Collection[str] | None = None,
+        cost: int = 1,
+        headers: bool = True,
+        redis: Any = None,
     ):
-        # Mengambil Redis dari request.state (nanti di-inject via Middleware di Main App)
-        redis: aioredis.Redis = getattr(request.state, "redis", None)
-        
+        if limits is None:
+            limits = [(times, seconds)]
+        elif isinstance(limits, str):
+            limits = parse_limits(limits)
+        self.limits: list[tuple[int, float]] = list(limits)
+        if not self.limits:
+            raise ValueError("Minimal satu limit")
+        if any(cost > t for t, _ in self.limits):
+            raise ValueError(
+                "cost tidak boleh melebihi limit (request tidak akan pernah lolos)"
+            )
+        self.times, self.seconds = self.limits[0]
+        self.algorithm = get_rate_limit_algorithm(algorithm)
+        self.local = (
+            LocalTokenBuckets(self.algorithm, local_accuracy)
+            if local_accuracy
+            else None
+        )
+        self.key_funcs: tuple[KeyFunc, ...] = (key,) if callable(key) else tuple(key)
+        self.scope = scope
+        self.routes = frozenset(routes) if routes is not None else None
+        self.methods = (
+            frozenset(m.upper() for m in methods) if methods is not None else None
+        )
+        self.cost = cost
+        self.headers = headers
+        self.redis = redis
+        self.policy = ", ".join(f"{t};w={s:g}" for t, s in self.limits)
+
+    async def identify(self, request: Request) -> str | None:
+        for key_func in self.key_funcs:
+            identity = key_func(request)
+            if inspect.isawaitable(identity):
+                identity = await identity
+            if identity is not None:
+                return identity
+        return None
+
+    def _scope_of(self, request: Request) -> str:
+        return self.scope if isinstance(self.scope, str) else self.scope(request)
+
+    def applies_to(self, request: Request) -> bool:
+        if self.methods is not None and request.method not in self.methods:
+            return False
+        # Filter selalu pakai template route, bukan scope (scope bisa string tetap)
+        return self.routes is None or route_template(request) in self.routes
+
+    def keys_for(self, identity: str, scope: str, method: str) -> list[str]:
+        # Identity = hash tag -> semua key satu klien di slot Cluster yang sama
+        # (syarat script multi-key)
+        # Scope string tetap = kuota bersama lintas endpoint & method
+        base = (
+            rate_limit_key(identity, scope)
+            if isinstance(self.scope, str)
+            else rate_limit_key(identity, scope, method)
+        )
+        if len(self.limits) == 1:
+            return [base]
+        return [f"{base}:{s:g}s" for _, s in self.limits]
+
+    def _client(self, request: Request) -> Any:
+        redis = self.redis
+        if redis is None:
+            redis = getattr(request.state, "redis", None)
+        if isinstance(redis, RedisManager):
+            # Manager boleh dipasang sebelum startup; client diambil saat request
+            return redis.get_client() if redis.client is not None else None
+        return redis
+
+    async def check(self, request: Request) -> RateLimitResult | None:
+        """
+        Hitung request ini. None = tidak dibatasi (tanpa identity / Redis
+        tidak tersedia).
+        """
+        redis = self._client(request)
         if not redis:
-            # Jika Redis belum disetup di App, skip rate limit (Fail Open)
-            return
+            # Redis belum disetup -> skip rate limit (Fail Open)
+            return None
+        identity = await self.identify(request)
+        if identity is None:
+            return None
+        keys = self.keys_for(identity, self._scope_of(request), request.method)
+        limiter = self.local or self.algorithm
+        try:
+            return await limiter.check(redis, keys, self.limits, self.cost)
+        except RedisError as e:
+            # Redis lambat/mati/circuit open -> Fail Open, jangan tahan request
+            logger.warning("rate_limit_degraded", key=keys[0], error=str(e))
+            return None
+
+    def response_headers(self, result: RateLimitResult) -> dict[str, str]:
+        return rate_limit_headers(
+            result.limit, result.remaining, result.reset_after, self.policy
+        )
+
+    def exceeded(self, result: RateLimitResult) -> TooManyRequestsError:
+        return TooManyRequestsError(
+            retry_after=max(1, math.ceil(result.retry_after)),
+            limit=result.limit,
+            remaining=result.remaining,
+            reset_after=math.ceil(result.reset_after),
+            policy=self.policy,
+        )
 
-        # 1. Tentukan Identity (User ID jika login, atau IP Address)
-        identity = str(user.id) if user else (request.client.host if request.client else "unknown")
-        
-        # 2. Key: rl:{identity}:{path}:{method}
-        key = f"rl:{identity}:{request.url.path}:{request.method}"
-        
-        # 3. Eksekusi Redis (Atomic)
-        pipe = redis.pipeline()
-        pipe.incr(key, 1)
-        pipe.ttl(key)
-        result = await pipe.execute()
-        
-        request_count = result[0]
-        ttl = result[1]
-        
-        # 4. Set Expire jika key baru
-        if request_count == 1:
-            await redis.expire(key, self.seconds)
-            ttl = self.seconds
-        
-        # 5. Cek Limit
-        if request_count > self.times:
-            retry_after = ttl if ttl > 0 else self.seconds
-            raise TooManyRequestsError(retry_after=retry_after)
\ No newline at end of file
+    async def __call__(self, request: Request, response: Response = None):  # type: ignore[assignment]
+        if not self.applies_to(request):
+            return
+        result = await self.check(request)
+        if result is None:
+            return
+        if not result.allowed:
+            raise self.exceeded(result)
+        if response is not None and self.headers:
+            response.headers.update(self.response_headers(result))
@@ -0,0 +1,646 @@
+"""
+Rate Limit Algorithms (Redis Lua).
+Setiap cek limit = satu EVALSHA: baca, putuskan, tulis & set TTL dalam
+satu script atomic. Tidak ada race antar worker dan tidak ada key tanpa
+TTL walau proses mati di tengah jalan.
+
+Algoritma:
+- fixed_window  : counter per window. Paling murah, tapi di batas window
+                  bisa lolos 2x limit (akhir window lama + awal window baru).
+- sliding_log   : ZSET timestamp per request. Paling akurat, memori O(limit).
+- sliding_window: counter window sekarang + window sebelumnya (dibobot sisa
+                  waktu). Perkiraan sliding window dengan memori O(1).
+- gcra          : Generic Cell Rate Algorithm (token bucket tanpa timer):
+                  simpan satu timestamp (TAT). Burst maksimal = limit,
+                  lalu request tersebar rata tiap period/limit.
+
+Waktu diambil dari Redis (TIME), bukan dari worker, jadi clock skew antar
+worker tidak berpengaruh. Script di-LOAD saat startup (load_rate_limit_scripts);
+jika cache script kosong (Redis restart / failover) otomatis fallback ke EVAL.
+
+Satu panggilan bisa memeriksa beberapa limit sekaligus (KEYS[i] dengan
+limit_i & period_i): request hanya dihitung jika SEMUA limit mengizinkan.
+Semua key satu panggilan harus satu slot Cluster (pakai rate_limit_key).
+
+fixed_window & sliding_window juga punya script LEASE: ambil sekaligus
+sampai N unit kuota (sebagian jika sisa < N) untuk dibagikan lokal oleh
+LocalTokenBuckets (lihat rate_limit_local.py).
+"""
+import math
+import time
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from redis.exceptions import NoScriptError
+
+from std_pack.infrastructure.cache.memory import (
+    MemoryStore,
+    register_lua_script,
+    script_sha,
+)
+from std_pack.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int          # Limit yang paling ketat (sisa kuota terkecil)
+    remaining: int
+    reset_after: float  # Detik sampai kuota limit tsb pulih penuh
+    retry_after: float  # Detik sampai request berikutnya boleh (0 jika allowed)
+
+
+# ARGV: cost, limit_1, period_ms_1, limit_2, period_ms_2, ...
+# Return: {allowed, index limit terketat, remaining, reset_ms, retry_ms}
+FIXED_WINDOW = """
+local cost = tonumber(ARGV[1])
+local allowed, index, remaining, reset, retry = 1, 1, nil, 0, 0
+local counts, ttls = {}, {}
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local count = tonumber(redis.call('GET', key) or '0')
+  local ttl = redis.call('PTTL', key)
+  if ttl < 0 then ttl = period end
+  counts[i], ttls[i] = count, ttl
+  if count + cost > limit then
+    allowed = 0
+    if ttl > retry then retry = ttl end
+  end
+end
+for i, key in ipairs(KEYS) do
+  local left = tonumber(ARGV[2 * i]) - counts[i]
+  if allowed == 1 then
+    left = left - cost
+    redis.call('INCRBY', key, cost)
+    if redis.call('PTTL', key) < 0 then redis.call('PEXPIRE', key, ttls[i]) end
+  end
+  if remaining == nil or left < remaining then
+    index, remaining, reset = i, left, ttls[i]
+  end
+end
+return {allowed, index, math.max(remaining, 0), reset, retry}
+"""
+
+SLIDING_LOG = """
+local cost = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local allowed, index, remaining, reset, retry = 1, 1, nil, 0, 0
+local counts = {}
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now - period)
+  local count = redis.call('ZCARD', key)
+  counts[i] = count
+  if count + cost > limit then
+    allowed = 0
+    -- Tunggu sampai cukup entri lama keluar dari window
+    local wait = period
+    local nth = count + cost - limit - 1
+    local entry = redis.call('ZRANGE', key, nth, nth, 'WITHSCORES')
+    if entry[2] then wait = tonumber(entry[2]) + period - now end
+    if wait > retry then retry = wait end
+  end
+end
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local left = limit - counts[i]
+  if allowed == 1 then
+    for n = 1, cost do
+      redis.call('ZADD', key, now, t[1] .. '.' .. t[2] .. ':' .. (counts[i] + n))
+    end
+    redis.call('PEXPIRE', key, period)
+    left = left - cost
+  end
+  local full = 0
+  local newest = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+  if newest[2] then full = tonumber(newest[2]) + period - now end
+  if remaining == nil or left < remaining then
+    index, remaining, reset = i, left, full
+  end
+end
+return {allowed, index, math.max(remaining, 0), reset, retry}
+"""
+
+SLIDING_WINDOW = """
+local cost = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local allowed, index, remaining, reset, retry = 1, 1, nil, 0, 0
+local state = {}
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local window = math.floor(now / period)
+  local elapsed = now - window * period
+  local data = redis.call('HMGET', key, 'w', 'c', 'p')
+  local w = tonumber(data[1])
+  local cur, prev = tonumber(data[2]) or 0, tonumber(data[3]) or 0
+  if w == window - 1 then prev, cur = cur, 0
+  elseif w ~= window then prev, cur = 0, 0 end
+  local used = prev * (period - elapsed) / period + cur
+  state[i] = {window, cur, prev, used, elapsed}
+  if used + cost > limit + 1e-9 then
+    allowed = 0
+    -- Bobot window sebelumnya turun prev/period per ms. Jika itu pun tidak
+    -- cukup, tunggu window baru sampai bobot count sekarang (jadi prev)
+    -- cukup turun.
+    local wait = (used + cost - limit) * period / math.max(prev, 1)
+    if cur + cost > limit then
+      wait = period - elapsed + (cur + cost - limit) * period / cur
+    end
+    if wait > retry then retry = wait end
+  end
+end
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local s = state[i]
+  local cur, used = s[2], s[4]
+  if allowed == 1 then
+    cur, used = cur + cost, used + cost
+    redis.call('HSET', key, 'w', s[1], 'c', cur, 'p', s[3])
+    redis.call('PEXPIRE', key, 2 * period)
+  end
+  local full = 0
+  if cur > 0 then
+    full = 2 * period - s[5]
+  elseif s[3] > 0 then
+    full = period - s[5]
+  end
+  local left = math.floor(limit - used + 1e-9)
+  if remaining == nil or left < remaining then
+    index, remaining, reset = i, left, full
+  end
+end
+return {allowed, index, math.max(remaining, 0), math.ceil(reset), math.ceil(retry)}
+"""
+
+GCRA = """
+local cost = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local allowed, index, remaining, reset, retry = 1, 1, nil, 0, 0
+local tats = {}
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local tat = math.max(tonumber(redis.call('GET', key) or '0'), now)
+  tats[i] = tat
+  -- Toleransi 1 mikrodetik untuk pembulatan TAT yang disimpan
+  local wait = tat + cost * period / limit - period - now
+  if wait > 0.001 then
+    allowed = 0
+    if wait > retry then retry = wait end
+  end
+end
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local interval = period / limit
+  local tat = tats[i]
+  if allowed == 1 then
+    tat = tat + cost * interval
+    redis.call('SET', key, string.format('%.3f', tat), 'PX', math.ceil(tat - now))
+  end
+  local left = math.floor((now + period - tat) / interval + 1e-9)
+  if remaining == nil or left < remaining then
+    index, remaining, reset = i, left, tat - now
+  end
+end
+return {allowed, index, math.max(remaining, 0), math.ceil(reset), math.ceil(retry)}
+"""
+
+# ARGV: want, limit_1, period_ms_1, ...
+# Return: {granted, ms}. granted > 0: lease berlaku ms (sampai window habis);
+# granted = 0: tidak ada kuota, coba lagi setelah ms.
+LEASE_FIXED_WINDOW = """
+local grant = tonumber(ARGV[1])
+local retry = 0
+local ttls = {}
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local count = tonumber(redis.call('GET', key) or '0')
+  local ttl = redis.call('PTTL', key)
+  if ttl < 0 then ttl = period end
+  ttls[i] = ttl
+  grant = math.min(grant, limit - count)
+  if count >= limit and ttl > retry then retry = ttl end
+end
+if grant <= 0 then return {0, retry} end
+local valid = nil
+for i, key in ipairs(KEYS) do
+  redis.call('INCRBY', key, grant)
+  if redis.call('PTTL', key) < 0 then redis.call('PEXPIRE', key, ttls[i]) end
+  if valid == nil or ttls[i] < valid then valid = ttls[i] end
+end
+return {grant, valid}
+"""
+
+LEASE_SLIDING_WINDOW = """
+local grant = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local retry = 0
+local state = {}
+for i, key in ipairs(KEYS) do
+  local limit, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+  local window = math.floor(now / period)
+  local elapsed = now - window * period
+  local data = redis.call('HMGET', key, 'w', 'c', 'p')
+  local w = tonumber(data[1])
+  local cur, prev = tonumber(data[2]) or 0, tonumber(data[3]) or 0
+  if w == window - 1 then prev, cur = cur, 0
+  elseif w ~= window then prev, cur = 0, 0 end
+  local used = prev * (period - elapsed) / period + cur
+  local free = math.floor(limit - used + 1e-9)
+  state[i] = {window, cur, prev, elapsed}
+  grant = math.min(grant, free)
+  if free <= 0 then
+    local wait = (used + 1 - limit) * period / math.max(prev, 1)
+    if cur + 1 > limit then
+      wait = period - elapsed + (cur + 1 - limit) * period / cur
+    end
+    if wait > retry then retry = wait end
+  end
+end
+if grant <= 0 then return {0, math.ceil(retry)} end
+local valid = nil
+for i, key in ipairs(KEYS) do
+  local period = tonumber(ARGV[2 * i + 1])
+  local s = state[i]
+  redis.call('HSET', key, 'w', s[1], 'c', s[2] + grant, 'p', s[3])
+  redis.call('PEXPIRE', key, 2 * period)
+  if valid == nil or period - s[4] < valid then valid = period - s[4] end
+end
+return {grant, math.ceil(valid)}
+"""
+
+
+# ==========================================
+# EMULASI MEMORY BACKEND
+# ==========================================
+# Logika yang sama persis dengan script Lua di atas, dijalankan MemoryStore
+# untuk EVAL/EVALSHA (testing & deployment single-node tanpa Redis).
+def _redis_time() -> tuple[int, int]:
+    """(detik, mikrodetik) seperti TIME di Redis."""
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    return seconds, micros
+
+
+def _now_ms() -> float:
+    # Rumus & resolusi mikrodetik sama dengan script (bukan time.time() * 1000):
+    # pembulatan ms (ceil reset / retry, floor sliding_log) identik dengan Redis
+    seconds, micros = _redis_time()
+    return seconds * 1000 + micros / 1000
+
+
+def _limits(args: list[bytes]) -> tuple[int, list[tuple[int, float]]]:
+    numbers = [float(a) for a in args]
+    limits = [(int(numbers[i]), numbers[i + 1]) for i in range(1, len(numbers), 2)]
+    return int(numbers[0]), limits
+
+
+def _tightest(lefts: list[tuple[float, float]]) -> tuple[int, float, float]:
+    """(index 1-based, remaining, reset) untuk limit dengan sisa kuota terkecil."""
+    index = min(range(len(lefts)), key=lambda i: lefts[i][0])
+    return index + 1, lefts[index][0], lefts[index][1]
+
+
+def _fixed_window(store: MemoryStore, keys: list[str], args: list[bytes]) -> list[int]:
+    cost, limits = _limits(args)
+    allowed, retry = 1, 0
+    state = []
+    for key, (limit, period) in zip(keys, limits, strict=True):
+        count = int(store.get(key) or 0)
+        ttl = store.pttl(key)
+        if ttl < 0:
+            ttl = int(period)
+        state.append((count, ttl))
+        if count + cost > limit:
+            allowed, retry = 0, max(retry, ttl)
+    lefts = []
+    for key, (limit, _), (count, ttl) in zip(keys, limits, state, strict=True):
+        left = limit - count
+        if allowed:
+            left -= cost
+            store.incrby(key, cost)
+            if store.pttl(key) < 0:
+                store.pexpire(key, ttl)
+        lefts.append((left, ttl))
+    index, remaining, reset = _tightest(lefts)
+    return [allowed, index, max(int(remaining), 0), int(reset), int(retry)]
+
+
+def _sliding_log(store: MemoryStore, keys: list[str], args: list[bytes]) -> list[int]:
+    cost, limits = _limits(args)
+    stamp = time.time_ns() // 1000
+    now = math.floor(_now_ms())
+    allowed, retry = 1, 0.0
+    counts = []
+    for key, (limit, period) in zip(keys, limits, strict=True):
+        store.zremrangebyscore(key, "-inf", now - period)
+        count = store.zcard(key)
+        counts.append(count)
+        if count + cost > limit:
+            allowed = 0
+            wait = period
+            entry = store.zrangebyscore(
+                key,
+                "-inf",
+                "+inf",
+                start=count + cost - limit - 1,
+                num=1,
+                withscores=True,
+            )
+            if entry:
+                wait = entry[0][1] + period - now
+            retry = max(retry, wait)
+    lefts = []
+    for key, (limit, period), count in zip(keys, limits, counts, strict=True):
+        left = limit - count
+        if allowed:
+            members = {f"{stamp}:{count + n}": now for n in range(1, cost + 1)}
+            store.zadd(key, members)
+            store.pexpire(key, int(period))
+            left -= cost
+        newest = store.zrangebyscore(
+            key, "-inf", "+inf", start=-1, num=-1, withscores=True
+        )
+        lefts.append((left, newest[-1][1] + period - now if newest else 0))
+    index, remaining, reset = _tightest(lefts)
+    return [allowed, index, max(int(remaining), 0), int(reset), int(retry)]
+
+
+def _sliding_window(
+    store: MemoryStore, keys: list[str], args: list[bytes]
+) -> list[int]:
+    cost, limits = _limits(args)
+    now = _now_ms()
+    allowed, retry = 1, 0.0
+    state = []
+    for key, (limit, period) in zip(keys, limits, strict=True):
+        window, cur, prev, used, elapsed = _sliding_state(store, key, period, now)
+        state.append((window, cur, prev, used, elapsed))
+        if used + cost > limit + 1e-9:
+            allowed = 0
+            wait = (used + cost - limit) * period / max(prev, 1)
+            if cur + cost > limit:
+                wait = period - elapsed + (cur + cost - limit) * period / cur
+            retry = max(retry, wait)
+    lefts = []
+    for key, (limit, period), (window, cur, prev, used, elapsed) in zip(
+        keys, limits, state, strict=True
+    ):
+        if allowed:
+            cur, used = cur + cost, used + cost
+            store.hset(key, mapping={"w": window, "c": int(cur), "p": int(prev)})
+            store.pexpire(key, int(2 * period))
+        full = period - elapsed if prev > 0 else 0
+        if cur > 0:
+            full = 2 * period - elapsed
+        lefts.append((math.floor(limit - used + 1e-9), full))
+    index, remaining, reset = _tightest(lefts)
+    return [allowed, index, max(int(remaining), 0), math.ceil(reset), math.ceil(retry)]
+
+
+def _gcra(store: MemoryStore, keys: list[str], args: list[bytes]) -> list[int]:
+    cost, limits = _limits(args)
+    now = _now_ms()
+    allowed, retry = 1, 0.0
+    tats = []
+    for key, (limit, period) in zip(keys, limits, strict=True):
+        tat = max(float(store.get(key) or 0), now)
+        tats.append(tat)
+        wait = tat + cost * period / limit - period - now
+        if wait > 0.001:
+            allowed, retry = 0, max(retry, wait)
+    lefts = []
+    for key, (limit, period), tat in zip(keys, limits, tats, strict=True):
+        interval = period / limit
+        if allowed:
+            tat += cost * interval
+            store.set(key, f"{tat:.3f}", px=math.ceil(tat - now))
+        left = math.floor((now + period - tat) / interval + 1e-9)
+        lefts.append((left, tat - now))
+    index, remaining, reset = _tightest(lefts)
+    return [allowed, index, max(int(remaining), 0), math.ceil(reset), math.ceil(retry)]
+
+
+def _sliding_state(
+    store: MemoryStore, key: str, period: float, now: float
+) -> tuple[int, float, float, float, float]:
+    """(window, cur, prev, used, elapsed) setelah window digeser ke `now`."""
+    window = math.floor(now / period)
+    elapsed = now - window * period
+    w, cur, prev = (
+        None if v is None else float(v) for v in store.hmget(key, ["w", "c", "p"])
+    )
+    cur, prev = cur or 0, prev or 0
+    if w == window - 1:
+        prev, cur = cur, 0
+    elif w != window:
+        prev, cur = 0, 0
+    return window, cur, prev, prev * (period - elapsed) / period + cur, elapsed
+
+
+def _lease_fixed_window(
+    store: MemoryStore, keys: list[str], args: list[bytes]
+) -> list[int]:
+    grant, limits = _limits(args)
+    retry = 0
+    ttls = []
+    for key, (limit, period) in zip(keys, limits, strict=True):
+        count = int(store.get(key) or 0)
+        ttl = store.pttl(key)
+        if ttl < 0:
+            ttl = int(period)
+        ttls.append(ttl)
+        grant = min(grant, limit - count)
+        if count >= limit:
+            retry = max(retry, ttl)
+    if grant <= 0:
+        return [0, retry]
+    for key, ttl in zip(keys, ttls, strict=True):
+        store.incrby(key, grant)
+        if store.pttl(key) < 0:
+            store.pexpire(key, ttl)
+    return [grant, min(ttls)]
+
+
+def _lease_sliding_window(
+    store: MemoryStore, keys: list[str], args: list[bytes]
+) -> list[int]:
+    grant, limits = _limits(args)
+    now = _now_ms()
+    retry = 0.0
+    state = []
+    for key, (limit, period) in zip(keys, limits, strict=True):
+        window, cur, prev, used, elapsed = _sliding_state(store, key, period, now)
+        free = math.floor(limit - used + 1e-9)
+        state.append((window, cur, prev, elapsed))
+        grant = min(grant, free)
+        if free <= 0:
+            wait = (used + 1 - limit) * period / max(prev, 1)
+            if cur + 1 > limit:
+                wait = period - elapsed + (cur + 1 - limit) * period / cur
+            retry = max(retry, wait)
+    if grant <= 0:
+        return [0, math.ceil(retry)]
+    valid = []
+    for key, (_, period), (window, cur, prev, elapsed) in zip(
+        keys, limits, state, strict=True
+    ):
+        store.hset(key, mapping={"w": window, "c": int(cur + grant), "p": int(prev)})
+        store.pexpire(key, int(2 * period))
+        valid.append(period - elapsed)
+    return [grant, math.ceil(min(valid))]
+
+
+# ==========================================
+# SCRIPT
+# ==========================================
+class RateLimitAlgorithm:
+    """
+    Satu algoritma = satu script Lua (+ emulasinya untuk memory backend).
+
+        gcra = get_rate_limit_algorithm("gcra")
+        result = await gcra.check(redis, [key], [(10, 60)])
+        if not result.allowed:
+            raise TooManyRequestsError(retry_after=math.ceil(result.retry_after))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        script: str,
+        emulation: Any,
+        lease_script: str | None = None,
+        lease_emulation: Any = None,
+    ):
+        self.name = name
+        self.script = script
+        self.sha = script_sha(script)
+        register_lua_script(script, emulation)
+        self.lease_script = lease_script
+        self.lease_sha = (
+            register_lua_script(lease_script, lease_emulation) if lease_script else None
+        )
+
+    @property
+    def supports_lease(self) -> bool:
+        return self.lease_script is not None
+
+    async def load(self, redis: Any) -> None:
+        await redis.script_load(self.script)
+        if self.lease_script is not None:
+            await redis.script_load(self.lease_script)
+
+    async def _run(
+        self,
+        redis: Any,
+        sha: str,
+        script: str,
+        keys: Sequence[str],
+        args: list[Any],
+    ) -> list[Any]:
+        try:
+            return await redis.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            # Redis restart / failover / SCRIPT FLUSH: EVAL sekaligus mengisi cache
+            logger.info("rate_limit_script_reloaded", algorithm=self.name)
+            return await redis.eval(script, len(keys), *keys, *args)
+
+    @staticmethod
+    def _args(
+        first: int, keys: Sequence[str], limits: Sequence[tuple[int, float]]
+    ) -> list[Any]:
+        if len(keys) != len(limits) or not keys:
+            raise ValueError("keys dan limits harus sama panjang (minimal satu)")
+        args: list[Any] = [first]
+        for times, seconds in limits:
+            args += [times, max(1, round(seconds * 1000))]
+        return args
+
+    async def check(
+        self,
+        redis: Any,
+        keys: Sequence[str],
+        limits: Sequence[tuple[int, float]],
+        cost: int = 1,
+    ) -> RateLimitResult:
+        """
+        keys[i] dibatasi limits[i] = (jumlah request, periode detik).
+        Satu round trip (EVALSHA); EVAL hanya jika script belum ada di Redis.
+        """
+        args = self._args(cost, keys, limits)
+        if any(cost > times for times, _ in limits):
+            raise ValueError(
+                "cost tidak boleh melebihi limit (request tidak akan pernah lolos)"
+            )
+        raw = await self._run(redis, self.sha, self.script, keys, args)
+        allowed, index, remaining, reset_ms, retry_ms = (int(v) for v in raw)
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=limits[index - 1][0],
+            remaining=remaining,
+            reset_after=reset_ms / 1000,
+            retry_after=retry_ms / 1000,
+        )
+
+    async def lease(
+        self,
+        redis: Any,
+        keys: Sequence[str],
+        limits: Sequence[tuple[int, float]],
+        want: int,
+    ) -> tuple[int, float]:
+        """
+        Ambil sampai `want` unit kuota sekaligus (dihitung terpakai di Redis).
+        Return (granted, detik): granted > 0 -> lease berlaku selama `detik`;
+        granted = 0 -> kuota habis, coba lagi setelah `detik`.
+        """
+        if self.lease_script is None or self.lease_sha is None:
+            raise ValueError(
+                f"Algoritma '{self.name}' tidak mendukung lease "
+                "(pakai fixed_window / sliding_window)"
+            )
+        args = self._args(want, keys, limits)
+        raw = await self._run(redis, self.lease_sha, self.lease_script, keys, args)
+        granted, ms = (int(v) for v in raw)
+        return granted, ms / 1000
+
+
+ALGORITHMS: dict[str, RateLimitAlgorithm] = {
+    "fixed_window": RateLimitAlgorithm(
+        "fixed_window",
+        FIXED_WINDOW,
+        _fixed_window,
+        LEASE_FIXED_WINDOW,
+        _lease_fixed_window,
+    ),
+    "sliding_log": RateLimitAlgorithm("sliding_log", SLIDING_LOG, _sliding_log),
+    "sliding_window": RateLimitAlgorithm(
+        "sliding_window",
+        SLIDING_WINDOW,
+        _sliding_window,
+        LEASE_SLIDING_WINDOW,
+        _lease_sliding_window,
+    ),
+    "gcra": RateLimitAlgorithm("gcra", GCRA, _gcra),
+}
+
+
+def get_rate_limit_algorithm(name: str) -> RateLimitAlgorithm:
+    """Algoritma: 'fixed_window' | 'sliding_log' | 'sliding_window' | 'gcra'."""
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(
+            f"Algoritma rate limit '{name}' tidak dikenal. "
+            f"Pilihan: {', '.join(ALGORITHMS)}"
+        ) from None
+
+
+async def load_rate_limit_scripts(redis: Any) -> None:
+    """SCRIPT LOAD semua algoritma (panggil saat startup, setelah Redis terhubung)."""
+    for algorithm in ALGORITHMS.values():
+        await algorithm.load(redis)
+    logger.info("rate_limit_scripts_loaded", algorithms=list(ALGORITHMS))
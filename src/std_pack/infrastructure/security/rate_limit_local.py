@@ -0,0 +1,185 @@
+"""
+Local Rate Limit Pre-Limiter.
+Token bucket per worker di depan Redis: kuota diambil dari Redis per chunk
+(LEASE), lalu dibagikan dari memori. Hanya request yang menghabiskan chunk
+yang menyentuh Redis -> QPS Redis turun kira-kira `chunk` kali.
+
+Akurasi (accuracy = fraksi limit per lease, default 0.1):
+- chunk = max(1, floor(limit * accuracy)).
+- Total yang lolos TIDAK PERNAH melebihi limit: setiap token sudah dihitung
+  di Redis saat di-lease.
+- Kesalahannya ke arah ketat: token yang di-lease worker A tapi belum
+  terpakai tidak bisa dipakai worker B. Maksimal `workers x chunk` request
+  ditolak padahal kuota global masih ada (mis. 4 worker, limit 1000,
+  accuracy 0.05 -> maksimal 200 request per window).
+- Penolakan dari Redis juga di-cache lokal sampai retry_after, jadi klien
+  yang terus menembak saat limit habis tidak menambah beban Redis.
+
+Cocok untuk limit bervolume besar / berisiko rendah (API publik, search).
+Untuk limit kecil & sensitif (login, OTP) pakai RateLimiter tanpa lease.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from std_pack.infrastructure.logging import get_logger
+
+from .rate_limit_algorithms import (
+    RateLimitAlgorithm,
+    RateLimitResult,
+    get_rate_limit_algorithm,
+)
+
+logger = get_logger(__name__)
+
+
+class _Lease:
+    __slots__ = ("tokens", "expires_at", "denied")
+
+    def __init__(self, tokens: int, expires_at: float, denied: bool):
+        self.tokens = tokens
+        self.expires_at = expires_at
+        self.denied = denied  # True: Redis menolak, tolak lokal sampai expires_at
+
+
+class LocalTokenBuckets:
+    """
+    Penggunaan:
+        buckets = LocalTokenBuckets("sliding_window", accuracy=0.05)
+        result = await buckets.check(redis, [key], [(1000, 60)])
+
+    Satu instance per worker (jangan dibagi antar proses). Jumlah key yang
+    disimpan dibatasi max_keys (LRU); key yang terbuang hanya kehilangan
+    sisa token lokalnya (lebih ketat, tidak pernah lebih longgar).
+    """
+
+    def __init__(
+        self,
+        algorithm: str | RateLimitAlgorithm = "fixed_window",
+        accuracy: float = 0.1,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < accuracy <= 1:
+            raise ValueError("accuracy harus di antara 0 (eksklusif) dan 1")
+        if max_keys < 1:
+            raise ValueError("max_keys minimal 1")
+        self.algorithm = (
+            get_rate_limit_algorithm(algorithm)
+            if isinstance(algorithm, str)
+            else algorithm
+        )
+        if not self.algorithm.supports_lease:
+            raise ValueError(
+                f"Algoritma '{self.algorithm.name}' tidak mendukung lease "
+                "(pakai fixed_window / sliding_window)"
+            )
+        self.accuracy = accuracy
+        self.max_keys = max_keys
+        self.clock = clock
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[None]] = {}
+        self.local_hits = 0
+        self.local_rejects = 0
+        self.leases = 0
+
+    def chunk_for(self, limits: Sequence[tuple[int, float]]) -> int:
+        return max(1, math.floor(min(times for times, _ in limits) * self.accuracy))
+
+    def _local(self, name: str, limit: int, cost: int) -> RateLimitResult | None:
+        """Jawab dari memori jika bisa; None = perlu lease baru."""
+        lease = self._leases.get(name)
+        if lease is None:
+            return None
+        remaining = lease.expires_at - self.clock()
+        if remaining <= 0:
+            del self._leases[name]
+            return None
+        self._leases.move_to_end(name)
+        if lease.tokens >= cost:
+            lease.tokens -= cost
+            self.local_hits += 1
+            return RateLimitResult(True, limit, lease.tokens, remaining, 0.0)
+        if lease.denied:
+            self.local_rejects += 1
+            return RateLimitResult(False, limit, 0, remaining, remaining)
+        return None
+
+    async def check(
+        self,
+        redis: Any,
+        keys: Sequence[str],
+        limits: Sequence[tuple[int, float]],
+        cost: int = 1,
+    ) -> RateLimitResult:
+        """
+        Seperti RateLimitAlgorithm.check, tapi sebagian besar dijawab lokal.
+        remaining = token lokal tersisa (batas bawah sisa kuota global).
+        """
+        if any(cost > times for times, _ in limits):
+            raise ValueError(
+                "cost tidak boleh melebihi limit (request tidak akan pernah lolos)"
+            )
+        name = keys[0] if len(keys) == 1 else "|".join(keys)
+        limit = min(times for times, _ in limits)
+        while True:
+            result = self._local(name, limit, cost)
+            if result is not None:
+                return result
+            pending = self._inflight.get(name)
+            if pending is None:
+                break
+            # Single-flight: tunggu lease yang sedang berjalan, lalu cek lokal lagi
+            await pending
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            return await self._lease(redis, name, keys, limits, limit, cost)
+        finally:
+            del self._inflight[name]
+            future.set_result(None)
+
+    async def _lease(
+        self,
+        redis: Any,
+        name: str,
+        keys: Sequence[str],
+        limits: Sequence[tuple[int, float]],
+        limit: int,
+        cost: int,
+    ) -> RateLimitResult:
+        lease = self._leases.get(name)
+        now = self.clock()
+        leftover = lease.tokens if lease is not None and lease.expires_at > now else 0
+        granted, seconds = await self.algorithm.lease(
+            redis, keys, limits, max(self.chunk_for(limits), cost - leftover)
+        )
+        self.leases += 1
+
+        lease = _Lease(leftover + granted, now + seconds, denied=granted == 0)
+        self._leases[name] = lease
+        self._leases.move_to_end(name)
+        if len(self._leases) > self.max_keys:
+            self._leases.popitem(last=False)
+
+        if lease.tokens < cost:
+            # Sisa kuota global < cost: token tetap disimpan untuk request
+            # yang lebih kecil
+            lease.denied = True
+            return RateLimitResult(False, limit, lease.tokens, seconds, seconds)
+        lease.tokens -= cost
+        return RateLimitResult(True, limit, lease.tokens, seconds, 0.0)
+
+    def stats(self) -> dict[str, Any]:
+        checks = self.local_hits + self.local_rejects + self.leases
+        return {
+            "keys": len(self._leases),
+            "local_hits": self.local_hits,
+            "local_rejects": self.local_rejects,
+            "leases": self.leases,
+            "redis_ratio": self.leases / checks if checks else 0.0,
+        }
@@ -1,29 +1,367 @@
 """
 Role Based Access Control (RBAC).
 Mendukung pengecekan permission dinamis.
+
+Definisi role dikompilasi SEKALI menjadi frozenset permission (inheritance
+sudah di-expand), sehingga cek permission di hot path hanya lookup set,
+tanpa I/O:
+
+    resolver = PermissionResolver({
+        "viewer": ["orders:read", "products:read"],
+        "editor": ["viewer", "orders:*"],       # Nama role lain = inherit
+        "admin":  ["*"],
+    })
+    set_permission_resolver(resolver)
+
+    can_delete = Depends(PermissionDependency("orders:delete"))
+    @router.delete("/orders/{id}", dependencies=[can_delete])
+
+Wildcard hierarkis (pemisah ':'): 'orders:*' memberi 'orders:read' dan
+'orders:items:delete'; '*' memberi semuanya. Permission yang diminta
+dipecah sekali saat dependency dibuat menjadi kandidat
+('orders:delete', 'orders:*', '*'), jadi cek = isdisjoint terhadap set.
+
+Role user diambil dari `user.roles`, atau dari `loader(user_id)` (misal
+query DB) jika dipasang. Hasil loader di-cache dua lapis: in-process (TTL)
+lalu Redis. Setelah role user berubah, panggil `invalidate(user_id)`.
+
+Loader dipanggil single-flight per user (request bersamaan menunggu satu
+loader). Tulis ke Redis dijaga generation key: invalidate() menaikkan
+generation, jadi loader yang mulai SEBELUM invalidate tidak bisa menulis
+role basi kembali ke Redis (cek & SET dalam satu script Lua).
 """
-from typing import Annotated
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Annotated, Any, Awaitable, Callable, Iterable, Mapping
+
 from fastapi import Depends
+from redis.exceptions import NoScriptError, RedisError
+
+from std_pack.infrastructure.cache.keys import make_key
+from std_pack.infrastructure.cache.memory import MemoryStore, register_lua_script
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.logging import get_logger
 from .scheme import get_current_user, IAuthUser
 
 # Import Custom Exception
 from std_pack.domain.exceptions import ForbiddenError, UnauthorizedError
 
+logger = get_logger(__name__)
+
+WILDCARD = "*"
+RoleLoader = Callable[[Any], Awaitable[Iterable[str]]]
+
+# KEYS: roles, generation. ARGV: generation saat dibaca, roles (JSON), ttl.
+# SET hanya jika generation belum dinaikkan invalidate() sejak dibaca.
+_STORE_ROLES_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def _store_roles(store: MemoryStore, keys: list[str], args: list[bytes]) -> int:
+    roles_key, generation_key = keys
+    if (store.get(generation_key) or b"0") != args[0]:
+        return 0
+    store.set(roles_key, args[1], ex=int(args[2]))
+    return 1
+
+
+_STORE_ROLES_SHA = register_lua_script(_STORE_ROLES_SCRIPT, _store_roles)
+
+
+def permission_candidates(permission: str) -> frozenset[str]:
+    """
+    'orders:items:delete'
+        -> {'orders:items:delete', 'orders:items:*', 'orders:*', '*'}.
+    """
+    parts = permission.split(":")
+    candidates = {permission, WILDCARD}
+    for i in range(1, len(parts)):
+        candidates.add(":".join(parts[:i]) + ":" + WILDCARD)
+    return frozenset(candidates)
+
+
+class PermissionResolver:
+    """
+    Resolver role -> permission efektif.
+
+    - roles     : {role: [permission | role lain]}. Role yang tidak terdaftar
+                  tetap dihitung sebagai permission dengan nama yang sama
+                  (kompatibel dengan pola lama `required in user.roles`).
+    - loader    : async loader(user_id) -> nama role. Opsional; tanpa loader
+                  role dibaca dari `user.roles`.
+    - redis     : client / RedisManager untuk cache lapis kedua (antar worker).
+    - ttl       : umur cache in-process (detik). Ini juga batas maksimal data
+                  basi di worker LAIN setelah invalidate().
+    - redis_ttl : umur cache Redis (detik).
+    """
+
+    def __init__(
+        self,
+        roles: Mapping[str, Iterable[str]] | None = None,
+        *,
+        loader: RoleLoader | None = None,
+        redis: Any = None,
+        ttl: float = 5.0,
+        redis_ttl: int = 300,
+        max_users: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_users < 1:
+            raise ValueError("max_users minimal 1")
+        self.loader = loader
+        self.redis = redis
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.max_users = max_users
+        self.clock = clock
+        self._compiled: dict[str, frozenset[str]] = {}
+        self._expanded: dict[frozenset[str], frozenset[str]] = {}
+        self._users: OrderedDict[Any, tuple[float, frozenset[str]]] = OrderedDict()
+        # Single-flight: satu load per user; invalidate() melepas entry-nya
+        self._inflight: dict[Any, asyncio.Task[frozenset[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.compile(roles or {})
+
+    # --- DEFINISI ROLE ---
+    def compile(self, roles: Mapping[str, Iterable[str]]) -> None:
+        """
+        Kompilasi (ulang) definisi role. Cache role user tetap berlaku, hasil
+        expand dibuang.
+        """
+        definitions = {name: tuple(grants) for name, grants in roles.items()}
+        compiled: dict[str, frozenset[str]] = {}
+
+        def expand(name: str, visiting: frozenset[str]) -> frozenset[str]:
+            if name in compiled:
+                return compiled[name]
+            permissions = {name}
+            for grant in definitions[name]:
+                if grant in visiting:
+                    raise ValueError(f"Inheritance role melingkar: {name} -> {grant}")
+                if grant in definitions:
+                    permissions |= expand(grant, visiting | {grant})
+                else:
+                    permissions.add(grant)
+            compiled[name] = frozenset(permissions)
+            return compiled[name]
+
+        for name in definitions:
+            expand(name, frozenset({name}))
+        self._compiled = compiled
+        self._expanded = {}
+
+    def expand(self, roles: frozenset[str]) -> frozenset[str]:
+        """Permission efektif untuk sekumpulan role (di-memo per kombinasi role)."""
+        permissions = self._expanded.get(roles)
+        if permissions is None:
+            grants = (self._compiled.get(r, (r,)) for r in roles)
+            permissions = frozenset().union(*grants)
+            if len(self._expanded) >= self.max_users:
+                # Kombinasi role normalnya sedikit; ini hanya pengaman memori
+                self._expanded.clear()
+            self._expanded[roles] = permissions
+        return permissions
+
+    @staticmethod
+    def allows(permissions: frozenset[str], candidates: frozenset[str]) -> bool:
+        return not permissions.isdisjoint(candidates)
+
+    def has_permission(self, roles: Iterable[str], permission: str) -> bool:
+        permissions = self.expand(frozenset(roles))
+        return self.allows(permissions, permission_candidates(permission))
+
+    # --- ROLE PER USER (loader + cache) ---
+    def _client(self) -> Any:
+        if isinstance(self.redis, RedisManager):
+            return self.redis.get_client() if self.redis.client is not None else None
+        return self.redis
+
+    @staticmethod
+    def _redis_key(user_id: Any) -> str:
+        # Hash tag user: roles & generation satu slot Cluster (syarat script)
+        return make_key("perm", tag=user_id)
+
+    @staticmethod
+    def _generation_key(user_id: Any) -> str:
+        return make_key("perm", "gen", tag=user_id)
+
+    async def roles_for(self, user_id: Any) -> frozenset[str]:
+        """Role user: in-process -> Redis -> loader. Redis error -> langsung loader."""
+        now = self.clock()
+        entry = self._users.get(user_id)
+        if entry is not None and entry[0] > now:
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(user_id, now))
+            self._inflight[user_id] = task
+            task.add_done_callback(partial(self._settled, user_id))
+        # shield: request yang dibatalkan tidak ikut membatalkan load milik bersama
+        return await asyncio.shield(task)
+
+    def _settled(self, user_id: Any, task: "asyncio.Task[frozenset[str]]") -> None:
+        if self._inflight.get(user_id) is task:
+            del self._inflight[user_id]
+        if not task.cancelled():
+            task.exception()  # Ditandai terbaca walau semua penunggu sudah batal
+
+    async def _fetch(self, user_id: Any, now: float) -> frozenset[str]:
+        roles = None
+        fresh = True  # False jika invalidate() terjadi selama load
+        generation: str | bytes = "0"
+        redis = self._client()
+        if redis is not None:
+            try:
+                cached, current = await redis.mget(
+                    self._redis_key(user_id), self._generation_key(user_id)
+                )
+                generation = current if current is not None else "0"
+                if cached is not None:
+                    roles = frozenset(json.loads(cached))
+            except RedisError as e:
+                self._degraded(user_id, e)
+                redis = None
+        if roles is None:
+            if self.loader is None:
+                raise RuntimeError(
+                    "PermissionResolver tanpa loader tidak bisa memuat role per user"
+                )
+            roles = frozenset(await self.loader(user_id))
+            if redis is not None:
+                try:
+                    fresh = await self._store(redis, user_id, roles, generation)
+                except RedisError as e:
+                    self._degraded(user_id, e)
+
+        if fresh and self._inflight.get(user_id) is asyncio.current_task():
+            # Tidak di-invalidate selama load (di worker mana pun) -> cache lokal
+            self._users[user_id] = (now + self.ttl, roles)
+            self._users.move_to_end(user_id)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return roles
+
+    async def _store(
+        self, redis: Any, user_id: Any, roles: frozenset[str], generation: str | bytes
+    ) -> bool:
+        """SET role jika generation tidak berubah. False = di-invalidate, dibuang."""
+        keys = (self._redis_key(user_id), self._generation_key(user_id))
+        args = (generation, json.dumps(sorted(roles)), self.redis_ttl)
+        try:
+            stored = await redis.evalsha(_STORE_ROLES_SHA, len(keys), *keys, *args)
+        except NoScriptError:
+            stored = await redis.eval(_STORE_ROLES_SCRIPT, len(keys), *keys, *args)
+        if not stored:
+            logger.info("permission_cache_stale_write_skipped", user_id=str(user_id))
+        return bool(stored)
+
+    @staticmethod
+    def _degraded(user_id: Any, error: Exception) -> None:
+        logger.warning(
+            "permission_cache_degraded", user_id=str(user_id), error=str(error)
+        )
+
+    async def permissions_for(self, user_id: Any) -> frozenset[str]:
+        return self.expand(await self.roles_for(user_id))
+
+    async def invalidate(self, user_id: Any) -> None:
+        """
+        Panggil setelah role user berubah (di worker yang melakukan perubahan).
+        Generation dinaikkan sebelum key role dihapus: load yang sedang jalan
+        (di worker mana pun) tidak bisa menulis role lama kembali ke Redis.
+        """
+        self._users.pop(user_id, None)
+        self._inflight.pop(user_id, None)  # Load yang sedang jalan tidak di-cache lokal
+        redis = self._client()
+        if redis is not None:
+            generation_key = self._generation_key(user_id)
+            pipe = redis.pipeline(transaction=True)
+            pipe.incr(generation_key)
+            # Cukup hidup lebih lama dari load mana pun yang sedang jalan
+            pipe.expire(generation_key, max(self.redis_ttl, 3600))
+            pipe.delete(self._redis_key(user_id))
+            try:
+                await pipe.execute()
+            except RedisError as e:
+                self._degraded(user_id, e)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "roles": len(self._compiled),
+            "combinations": len(self._expanded),
+            "users": len(self._users),
+            "loading": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_resolver: PermissionResolver | None = None
+
+
+def get_permission_resolver() -> PermissionResolver:
+    """
+    Resolver aktif (process-wide). Default: tanpa definisi role
+    (role = permission).
+    """
+    global _resolver
+    if _resolver is None:
+        _resolver = PermissionResolver()
+    return _resolver
+
+
+def set_permission_resolver(resolver: PermissionResolver | None) -> None:
+    """Pasang resolver aplikasi saat startup. None = kembali ke default."""
+    global _resolver
+    _resolver = resolver
+
+
 class PermissionDependency:
-    def __init__(self, required_permission: str):
+    """
+    Urutan sumber permission:
+    1. Resolver punya loader  -> role dari cache/loader (user.id).
+    2. User punya `roles`     -> role di-expand lewat resolver (tanpa I/O).
+    3. User punya `has_permission` -> dipanggil (jalur lambat, misal query DB).
+    """
+
+    def __init__(
+        self, required_permission: str, resolver: PermissionResolver | None = None
+    ):
         self.required_permission = required_permission
+        self.candidates = permission_candidates(required_permission)
+        self.resolver = resolver
 
     async def __call__(self, user: Annotated[IAuthUser, Depends(get_current_user)]):
-        
+
         if not user.is_active:
              # Ini domain rule: User tidak aktif tidak boleh akses
              raise UnauthorizedError("Inactive user")
 
-        # Fallback Logic: Cek roles
-        if hasattr(user, "roles") and self.required_permission not in user.roles:
-             raise ForbiddenError(f"Missing permission: {self.required_permission}")
-             
-        # Smart Logic (jika ada method has_permission)
-        if hasattr(user, "has_permission"):
+        resolver = self.resolver or get_permission_resolver()
+        if resolver.loader is not None:
+            permissions = await resolver.permissions_for(user.id)
+        elif hasattr(user, "roles"):
+            permissions = resolver.expand(frozenset(user.roles))
+        elif hasattr(user, "has_permission"):
+            # Smart Logic (jika ada method has_permission)
             if not await user.has_permission(self.required_permission): # type: ignore
-                raise ForbiddenError(f"Missing permission: {self.required_permission}")
\ No newline at end of file
+                raise ForbiddenError(f"Missing permission: {self.required_permission}")
+            return
+        else:
+            permissions = frozenset()
+
+        if not resolver.allows(permissions, self.candidates):
+             raise ForbiddenError(f"Missing permission: {self.required_permission}")
@@ -1,46 +1,208 @@
 """
 Security Sanitization Module.
 Versi Aggressive: Validasi input string dengan deteksi Tautology (1=1).
+
+Semua rule dikompilasi SEKALI menjadi satu regex alternation (satu scan
+per value, bukan satu re.search per pattern). Value yang hanya berisi
+huruf/angka ASCII & spasi (mayoritas input) tidak menyentuh regex sama
+sekali: satu-satunya rule yang bisa cocok di sana adalah keyword SQL, dan
+itu cukup dicek dengan lookup set per kata.
+
+Extension point: override RULES (disarankan), atau UNSAFE_PATTERNS (cara
+lama). Subclass yang meng-override UNSAFE_PATTERNS memakai daftar itu apa
+adanya, tanpa prefilter. Pattern yang tidak bisa digabung (flag global
+seperti "(?i)" di tengah, backreference bernomor) ditolak dengan TypeError
+saat subclass dibuat, bukan diam-diam diabaikan.
 """
 import re
-from typing import ClassVar, List
+from typing import Any, ClassVar, Iterable, Iterator, List, NamedTuple
+
+# Karakter kontrol (< 32) kecuali \n dan \t -> dihapus
+# (str.translate, bukan loop per char)
+_CONTROL_CHARS = {code: None for code in range(32) if chr(code) not in "\n\t"}
+
+# \1..\9 (bukan \\1): nomor group bergeser setelah pattern digabung
+_NUMBERED_BACKREF = re.compile(r"(?<!\\)\\[1-9]")
+
+
+class SanitizationIssue(NamedTuple):
+    path: str   # Lokasi di payload, misal "items[0].name"
+    rule: str   # Nama rule yang cocok, misal "sql_tautology"
+
 
 class InputSanitizer:
-    # Menggunakan List Regex agar lebih mudah dibaca dan dimaintain
-    UNSAFE_PATTERNS: ClassVar[List[str]] = [
+    SQL_KEYWORDS: ClassVar[frozenset[str]] = frozenset(
+        {
+            "union", "select", "insert", "update", "delete",
+            "drop", "alter", "truncate", "exec",
+        }
+    )
+
+    # (nama, pattern). Pattern harus aman digabung: flag pakai bentuk scoped (?i:...)
+    # dan backreference pakai named group (nomor group bergeser setelah digabung).
+    RULES: ClassVar[tuple[tuple[str, str], ...]] = (
         # 1. SQL Injection Keywords (Case Insensitive)
-        r"(?i)\b(UNION|SELECT|INSERT|UPDATE|DELETE|DROP|ALTER|TRUNCATE|EXEC)\b",
-        
+        (
+            "sql_keyword",
+            r"(?i:\b(?:UNION|SELECT|INSERT|UPDATE|DELETE|DROP|ALTER|TRUNCATE|EXEC)\b)",
+        ),
+
         # 2. SQL Comments
-        r"--", 
-        r"/\*",
-        
+        ("sql_line_comment", r"--"),
+        ("sql_block_comment", r"/\*"),
+
         # 3. SQL Tautologies (Logic 1=1, a=a, x=x)
-        # Penjelasan: \b(\w+) menangkap kata/angka, \s*=\s* menangkap =, \1 mengecek apakah sama dengan kata pertama
-        r"(?i)\b(\w+)\s*=\s*\1\b", 
-        
+        # Penjelasan: \b(\w+) menangkap kata/angka, \s*=\s* menangkap =,
+        # (?P=...) mengecek apakah sama dengan kata pertama
+        (
+            "sql_tautology",
+            r"(?i:\b(?P<tautology_operand>\w+)\s*=\s*(?P=tautology_operand)\b)",
+        ),
+
         # 4. OR based injection (' OR '1'='1)
-        r"(?i)['\"]\s*OR\s*['\"]?\w+['\"]?\s*=\s*['\"]?\w+",
-        
+        ("sql_or_injection", r"(?i:['\"]\s*OR\s*['\"]?\w+['\"]?\s*=\s*['\"]?\w+)"),
+
         # 5. XSS Patterns
-        r"(?i)(<script|<iframe|javascript:|onerror=|onload=|alert\()",
-    ]
+        ("xss", r"(?i:<script|<iframe|javascript:|onerror=|onload=|alert\()"),
+    )
+
+    # Kompatibilitas: daftar pattern mentah (dulu dipakai is_safe satu per satu).
+    # Subclass lama yang meng-override ini tetap dihormati (lihat _rules).
+    UNSAFE_PATTERNS: ClassVar[List[str]] = [pattern for _, pattern in RULES]
+
+    # Prefilter hanya valid selama rule yang bisa cocok di teks alnum + spasi
+    # hanyalah keyword SQL. Subclass yang menambah rule seperti itu: set False.
+    PREFILTER: ClassVar[bool] = True
+
+    # cls -> (RULES, UNSAFE_PATTERNS, regex gabungan, prefilter aktif)
+    _compiled: ClassVar[dict[type, tuple[Any, Any, "re.Pattern[str]", bool]]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._state()  # Pattern yang tidak valid -> TypeError saat class dibuat
+
+    @classmethod
+    def _legacy(cls) -> bool:
+        """True jika UNSAFE_PATTERNS di-override lebih spesifik daripada RULES."""
+        for klass in cls.__mro__:
+            if "UNSAFE_PATTERNS" in vars(klass):
+                return "RULES" not in vars(klass)
+            if "RULES" in vars(klass):
+                return False
+        return False  # pragma: no cover - InputSanitizer mendefinisikan keduanya
+
+    @classmethod
+    def _rules(cls) -> tuple[tuple[str, str], ...]:
+        if not cls._legacy():
+            return cls.RULES
+        known = {pattern: name for name, pattern in cls.RULES}
+        rules: list[tuple[str, str]] = []
+        for index, pattern in enumerate(cls.UNSAFE_PATTERNS):
+            if _NUMBERED_BACKREF.search(pattern):
+                raise TypeError(
+                    f"{cls.__name__}.UNSAFE_PATTERNS[{index}] memakai backreference "
+                    "bernomor; pakai named group (?P<nama>...) / (?P=nama)"
+                )
+            name = known.get(pattern, f"pattern_{index}")
+            if any(name == used for used, _ in rules):
+                name = f"pattern_{index}"
+            rules.append((name, pattern))
+        return tuple(rules)
+
+    @classmethod
+    def _state(cls) -> tuple["re.Pattern[str]", bool]:
+        entry = cls._compiled.get(cls)
+        if (
+            entry is None
+            or entry[0] is not cls.RULES
+            or entry[1] is not cls.UNSAFE_PATTERNS
+        ):
+            rules = cls._rules()
+            joined = "|".join(f"(?P<{name}>{rule})" for name, rule in rules)
+            try:
+                pattern = re.compile(joined)
+            except re.error as e:
+                raise TypeError(
+                    f"Rule {cls.__name__} tidak bisa digabung jadi satu regex: {e}. "
+                    "Pakai flag scoped (?i:...) dan named group."
+                ) from e
+            # Pattern lama bisa cocok di teks alnum -> prefilter tidak aman
+            prefilter = cls.PREFILTER and not cls._legacy()
+            entry = (cls.RULES, cls.UNSAFE_PATTERNS, pattern, prefilter)
+            cls._compiled[cls] = entry
+        return entry[2], entry[3]
+
+    @classmethod
+    def _pattern(cls) -> "re.Pattern[str]":
+        return cls._state()[0]
+
+    @classmethod
+    def _plain(cls, value: str) -> bool:
+        """
+        True jika value hanya huruf/angka ASCII & spasi (hasil regex bisa
+        ditebak tanpa scan).
+        """
+        return cls._state()[1] and value.isascii() and value.replace(" ", "").isalnum()
+
+    @classmethod
+    def find_rule(cls, value: str) -> str | None:
+        """Nama rule pertama yang cocok, None jika bersih."""
+        if not value:
+            return None
+        if cls._plain(value):
+            keywords = cls.SQL_KEYWORDS
+            return None if keywords.isdisjoint(value.lower().split()) else "sql_keyword"
+        match = cls._pattern().search(value)
+        return match.lastgroup if match else None
 
     @classmethod
     def is_safe(cls, value: str) -> bool:
         """Return True jika bersih, False jika terdeteksi pola berbahaya."""
-        if not value:
-            return True
-            
-        # Loop semua pattern, jika ada satu saja yang cocok -> UNSAFE
-        for pattern in cls.UNSAFE_PATTERNS:
-            if re.search(pattern, value):
+        return cls.find_rule(value) is None
+
+    @classmethod
+    def is_safe_many(cls, values: Iterable[str]) -> bool:
+        """
+        True jika SEMUA value bersih. Value non-plain digabung (dipisah \\x00,
+        yang tidak bisa dilewati rule mana pun) dan di-scan sekali.
+        """
+        pending = []
+        for value in values:
+            if not value:
+                continue
+            if not cls._plain(value):
+                pending.append(value)
+            elif cls.find_rule(value) is not None:
                 return False
-                
-        return True
+        return not pending or cls._pattern().search("\x00".join(pending)) is None
+
+    @classmethod
+    def iter_issues(cls, data: Any, path: str = "") -> Iterator[SanitizationIssue]:
+        """
+        Telusuri payload (dict / list / str bersarang) dan yield setiap string
+        yang tidak aman.
+        """
+        if isinstance(data, str):
+            rule = cls.find_rule(data)
+            if rule is not None:
+                yield SanitizationIssue(path, rule)
+        elif isinstance(data, dict):
+            for key, item in data.items():
+                yield from cls.iter_issues(item, f"{path}.{key}" if path else str(key))
+        elif isinstance(data, (list, tuple)):
+            for index, item in enumerate(data):
+                yield from cls.iter_issues(item, f"{path}[{index}]")
+
+    @classmethod
+    def scan_dict(cls, data: dict[str, Any]) -> list[SanitizationIssue]:
+        """
+        Semua masalah di payload request, misal
+        [SanitizationIssue('items[0].name', 'xss')].
+        """
+        return list(cls.iter_issues(data))
 
     @classmethod
     def clean(cls, value: str) -> str:
         """Membersihkan karakter kontrol (Null bytes, dll)."""
         # Hapus null bytes dan karakter kontrol non-printable
-        return "".join(ch for ch in value if ord(ch) >= 32 or ch in "\n\t")
\ No newline at end of file
+        return value.translate(_CONTROL_CHARS)
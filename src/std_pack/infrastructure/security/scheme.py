@@ -10,8 +10,7 @@ from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 
 # Import Helper Token & Exception Domain
-from .token import TokenHelper
-from std_pack.config import BaseAppSettings
+from .token import TokenHelper, get_token_verifier  # noqa: F401 (TokenHelper: kompatibilitas import lama)
 from std_pack.domain.exceptions import UnauthorizedError
 
 # Setup OAuth2 Scheme (Agar muncul tombol 'Authorize' di Swagger)
@@ -34,11 +33,10 @@ def get_current_token_payload(
     Validasi Token JWT. 
     Jika gagal, raise UnauthorizedError (bukan HTTPException).
     """
-    # Load Settings & Helper
-    # Di aplikasi nyata, settings bisa di-inject via Dependency Override jika perlu
-    settings = BaseAppSettings() 
-    helper = TokenHelper(settings)
-    
+    # Verifier process-wide (settings dibaca sekali, bukan per request).
+    # Ganti via set_token_verifier() jika butuh verifier lain.
+    helper = get_token_verifier()
+
     try:
         # Decode & Verify Signature
         payload = helper.decode_token(token)
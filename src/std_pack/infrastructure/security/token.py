@@ -1,17 +1,224 @@
 """
 Security Token Module.
 Menangani pembuatan dan verifikasi JWT (JSON Web Token).
+
+- HS256 (default): sign & verify dengan SECRET_KEY.
+- RS256 / ES256 / EdDSA: sign dengan private key (kid di header), verify
+  dengan public key dari JWKS -> service verifier tidak memegang secret.
 """
+import contextlib
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable, Protocol
+
+from std_pack.config import BaseAppSettings, get_settings
+from .jwks import JWKSKeySet, public_jwk
+from .jwt_backend import JWTBackend, get_jwt_backend
+
+
+class ITokenVerifier(Protocol):
+    """Kontrak verifier yang dipakai dependency auth (cukup decode_token)."""
+    def decode_token(self, token: str) -> dict[str, Any]: ...  # pragma: no cover
+
+
+class VerifiedTokenCache:
+    """
+    LRU terbatas berisi payload token yang SUDAH lolos verifikasi signature.
+    Klien memakai token yang sama berkali-kali (sampai 30 menit), jadi decode
+    + HMAC cukup sekali per token.
+
+    - Key: digest SHA-256 token (token mentah tidak disimpan di memori).
+    - Entry kedaluwarsa tepat di `exp` milik token. Token tanpa `exp` tidak di-cache.
+    - revoke(token): buang dari cache DAN tolak token itu sampai `exp`-nya.
+      Denylist TIDAK ikut batas maxsize: revokasi yang belum kedaluwarsa
+      tidak pernah dibuang (token bocor tidak boleh valid lagi). Yang
+      dibersihkan hanya entry yang exp-nya sudah lewat.
+      Revokasi bersifat PROCESS-LOCAL: worker / instance lain tetap menerima
+      token itu sampai exp. Untuk revokasi lintas instance pakai denylist
+      bersama (misal Redis) atau umur token yang pendek.
+    - evict_subject(sub): buang semua entry milik satu user (misal ganti password),
+      sehingga request berikutnya diverifikasi ulang penuh.
+    Thread-safe (dependency sync FastAPI berjalan di threadpool).
+    """
+
+    def __init__(self, maxsize: int = 10_000, clock: Callable[[], float] = time.time):
+        if maxsize < 1:
+            raise ValueError("maxsize minimal 1")
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._revoked: dict[bytes, float] = {}  # digest -> exp
+        self._purge_at = maxsize  # Purge entry kedaluwarsa saat denylist melewati ini
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self.digest(token)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])  # Salinan: pemanggil bebas memodifikasi
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= self.clock():
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (float(exp), dict(payload))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        key = self.digest(token)
+        with self._lock:
+            exp = self._revoked.get(key)
+            if exp is None:
+                return False
+            if exp <= self.clock():
+                del self._revoked[key]
+                return False
+            return True
+
+    def revoke(self, token: str, exp: float | None = None) -> None:
+        """
+        Hook revokasi (logout, token bocor). `exp` default diambil dari entry
+        cache; jika token tidak ada di cache, isi `exp` dari payload token.
+        Tanpa exp sama sekali -> ditolak selamanya (di proses ini).
+        """
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            until = exp if exp is not None else (entry[0] if entry else math.inf)
+            self._revoked[key] = float(until)
+            if len(self._revoked) > self._purge_at:
+                self._purge_revoked()
+
+    def _purge_revoked(self) -> None:
+        """Buang revokasi yang exp-nya lewat. Dipanggil dengan lock dipegang."""
+        now = self.clock()
+        self._revoked = {k: until for k, until in self._revoked.items() if until > now}
+        # Amortisasi: jika masih banyak yang aktif, purge berikutnya menunggu 2x lipat
+        self._purge_at = max(self.maxsize, 2 * len(self._revoked))
+
+    def revoked_count(self) -> int:
+        with self._lock:
+            return len(self._revoked)
+
+    def evict_subject(self, subject: Any) -> int:
+        with self._lock:
+            keys = [
+                k
+                for k, (_, payload) in self._entries.items()
+                if payload.get("sub") == str(subject)
+            ]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
-from jose import jwt, JWTError
-from std_pack.config import BaseAppSettings
 
 class TokenHelper:
-    def __init__(self, settings: BaseAppSettings):
+    """
+    Penggunaan:
+        TokenHelper(settings)                                   # HS256 + SECRET_KEY
+        TokenHelper(settings, algorithm="RS256",                # issuer
+                    private_key=pem, key_id="2025-01")
+        TokenHelper(settings, algorithm="RS256",                # verifier
+                    key_set=JWKSKeySet("http://auth.internal/.well-known/jwks.json"))
+        TokenHelper.from_settings(settings)                     # dari JWT_* di settings
+
+    backend: "jose" (default) atau "pyjwt" (lebih cepat, mendukung EdDSA).
+    """
+
+    def __init__(
+        self,
+        settings: BaseAppSettings,
+        cache: VerifiedTokenCache | None = None,
+        *,
+        algorithm: str = "HS256", # Default algorithm yang aman dan cepat
+        private_key: str | bytes | None = None,
+        key_id: str | None = None,
+        key_set: JWKSKeySet | None = None,
+        backend: JWTBackend | str = "jose",
+    ):
         self.secret_key = settings.SECRET_KEY
-        self.algorithm = "HS256" # Default algorithm yang aman dan cepat
+        self.algorithm = algorithm
+        self.cache = cache
+        self.backend = get_jwt_backend(backend) if isinstance(backend, str) else backend
+        if algorithm not in self.backend.algorithms:
+            raise ValueError(
+                f"Algoritma {algorithm} tidak didukung backend '{self.backend.name}'"
+            )
+
+        self.private_key = private_key
+        self._signing_key = (
+            None
+            if private_key is None or algorithm.startswith("HS")
+            else self.backend.load_private_key(private_key, algorithm)
+        )
+        self.key_id = key_id
+        self.symmetric = algorithm.startswith("HS")
+        if not self.symmetric and key_set is None:
+            if private_key is None:
+                raise ValueError(
+                    f"{algorithm} butuh private_key (issuer) atau key_set (verifier)"
+                )
+            # Issuer tanpa JWKS: verifikasi token sendiri pakai public key-nya
+            key_set = JWKSKeySet({"keys": [public_jwk(private_key, key_id, algorithm)]})
+        self.key_set = key_set
+        # kid -> (jwk, key siap pakai)
+        self._keys: dict[str | None, tuple[dict[str, Any], Any]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: BaseAppSettings) -> "TokenHelper":
+        """Bangun helper dari JWT_* + TOKEN_CACHE_SIZE di settings."""
+        size = settings.TOKEN_CACHE_SIZE
+        private_key = (
+            Path(settings.JWT_PRIVATE_KEY_FILE).read_bytes()
+            if settings.JWT_PRIVATE_KEY_FILE
+            else None
+        )
+        key_set = None
+        if settings.JWT_JWKS_URL:
+            key_set = JWKSKeySet(
+                settings.JWT_JWKS_URL,
+                refresh_interval=settings.JWT_JWKS_REFRESH_SECONDS,
+            )
+        return cls(
+            settings,
+            cache=VerifiedTokenCache(size) if size > 0 else None,
+            algorithm=settings.JWT_ALGORITHM,
+            private_key=private_key,
+            key_id=settings.JWT_KEY_ID,
+            key_set=key_set,
+            backend=settings.JWT_BACKEND,
+        )
 
     def create_access_token(
         self, 
@@ -35,25 +242,110 @@ class TokenHelper:
             "iat": datetime.now(timezone.utc)
         }
         
-        encoded_jwt = jwt.encode(
-            to_encode, 
-            self.secret_key, 
-            algorithm=self.algorithm
+        if self.symmetric:
+            return self.backend.encode(to_encode, self.secret_key, self.algorithm)
+        if self._signing_key is None:
+            raise ValueError(
+                "Private key tidak tersedia: helper ini hanya untuk verifikasi"
+            )
+        headers = {"kid": self.key_id} if self.key_id else None
+        return self.backend.encode(
+            to_encode, self._signing_key, self.algorithm, headers
         )
-        return encoded_jwt
+
+    @property
+    def blocking(self) -> bool:
+        """
+        True jika decode_token bisa melakukan I/O blocking (JWKS dari URL /
+        file / callable di-refresh saat interval habis atau kid baru).
+        Pemanggil async sebaiknya menjalankannya di thread.
+        """
+        return self.key_set is not None and not self.key_set.static
+
+    def _verification_key(self, token: str) -> Any:
+        if self.symmetric:
+            return self.secret_key
+        kid = self.backend.unverified_header(token).get("kid")
+        jwk = self.key_set.get(kid)
+        cached = self._keys.get(kid)
+        if cached is None or cached[0] is not jwk:
+            # Parse JWK sekali per kid (dibangun ulang jika JWKS di-refresh)
+            cached = (jwk, self.backend.load_jwk(jwk))
+            self._keys[kid] = cached
+        return cached[1]
 
     def decode_token(self, token: str) -> dict[str, Any]:
         """
         Decode token dan verifikasi signature.
         Raise ValueError jika token invalid atau expired.
         """
-        try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm]
+        if self.cache is not None:
+            if self.cache.is_revoked(token):
+                raise ValueError("Token has been revoked")
+            cached = self.cache.get(token)
+            if cached is not None:
+                return cached
+        # Backend me-raise ValueError agar pesan error bersih.
+        # algorithms dikunci ke satu algoritma: mencegah alg confusion
+        # (HS256 + public key)
+        payload = self.backend.decode(
+            token, self._verification_key(token), [self.algorithm]
+        )
+        if self.cache is not None:
+            self.cache.put(token, payload)
+        return payload
+
+    def revoke_token(self, token: str) -> None:
+        """
+        Hook revokasi: token ditolak sampai exp-nya. Butuh cache aktif
+        (TOKEN_CACHE_SIZE > 0); tanpa cache raise RuntimeError, bukan diam.
+        Process-local: lihat VerifiedTokenCache.
+        """
+        if self.cache is None:
+            raise RuntimeError(
+                "revoke_token butuh VerifiedTokenCache (TOKEN_CACHE_SIZE > 0)"
             )
-            return payload
-        except JWTError as e:
-            # Re-raise sebagai ValueError agar pesan error bersih
-            raise ValueError(str(e))
\ No newline at end of file
+        exp = None
+        with contextlib.suppress(ValueError):
+            exp = self.backend.unverified_claims(token).get("exp")
+        self.cache.revoke(token, exp=exp)
+
+
+# --- VERIFIER PROVIDER (Process-wide) ---
+# Dependency auth memakai satu verifier yang sudah jadi: per request hanya
+# verifikasi signature, tanpa membangun settings / helper baru.
+_verifier: ITokenVerifier | None = None
+_verifier_settings: BaseAppSettings | None = None  # None = verifier di-inject manual
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier() -> ITokenVerifier:
+    """
+    Verifier aktif. Default: TokenHelper dari get_settings(), dibangun ulang
+    otomatis jika settings di-refresh (refresh_settings / set_settings).
+    """
+    global _verifier, _verifier_settings
+    verifier = _verifier
+    if verifier is not None and (
+        _verifier_settings is None or _verifier_settings is get_settings()
+    ):
+        return verifier
+    with _verifier_lock:
+        settings = get_settings()
+        if _verifier is None or (
+            _verifier_settings is not None and _verifier_settings is not settings
+        ):
+            _verifier = TokenHelper.from_settings(settings)
+            _verifier_settings = settings
+        return _verifier
+
+
+def set_token_verifier(verifier: ITokenVerifier | None) -> None:
+    """
+    Pasang verifier sendiri (misal JWKS / RS256, atau fake di testing).
+    None = kembali ke default dari settings.
+    """
+    global _verifier, _verifier_settings
+    with _verifier_lock:
+        _verifier = verifier
+        _verifier_settings = None
\ No newline at end of file
@@ -1,5 +1,6 @@
 from .setup import setup_cors, setup_common_middleware
 from .handlers import domain_exception_handler
+from .middleware import RateLimitMiddleware
 from .dependencies import (
     get_current_user, 
     get_current_token_payload, 
@@ -15,6 +16,7 @@ __all__ = [
     "get_current_user",
     "get_current_token_payload",
     "RateLimiter",
+    "RateLimitMiddleware",
     "IAuthUser",
     "oauth2_scheme"
 ]
\ No newline at end of file
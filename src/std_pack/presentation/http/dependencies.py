@@ -4,14 +4,13 @@ Reusable dependencies untuk Route (Auth, Rate Limit, dll).
 """
 from typing import Annotated, Protocol
 
-from fastapi import Depends, Request
+from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from redis import asyncio as aioredis
 
-from std_pack.config import BaseAppSettings
-from std_pack.domain.exceptions import UnauthorizedError, TooManyRequestsError
-from std_pack.infrastructure.security.token import TokenHelper
+from std_pack.domain.exceptions import UnauthorizedError
+from std_pack.infrastructure.security.rate_limit import RateLimiter  # noqa: F401
+from std_pack.infrastructure.security.token import get_token_verifier
 
 # --- AUTH DEPENDENCIES ---
 
@@ -25,9 +24,10 @@ def get_current_token_payload(
     token: Annotated[str, Depends(oauth2_scheme)],
 ) -> dict:
     """Validasi Token JWT dari Header."""
-    settings = BaseAppSettings() 
-    helper = TokenHelper(settings)
-    
+    # Verifier process-wide (settings dibaca sekali, bukan per request).
+    # Ganti via set_token_verifier() jika butuh verifier lain.
+    helper = get_token_verifier()
+
     try:
         payload = helper.decode_token(token)
         return payload
@@ -48,46 +48,3 @@ async def get_current_user(
     app.dependency_overrides[get_current_user] = get_real_user
     """
     raise NotImplementedError("Dependency 'get_current_user' must be overridden in main app!")
-
-
-# --- RATE LIMIT DEPENDENCIES ---
-
-class RateLimiter:
-    """
-    Dependency untuk membatasi request (Throttling).
-    Penggunaan: Depends(RateLimiter(times=10, seconds=60))
-    """
-    def __init__(self, times: int = 10, seconds: int = 60):
-        self.times = times
-        self.seconds = seconds
-
-    async def __call__(
-        self, 
-        request: Request,
-        user: Annotated[IAuthUser, Depends(get_current_user)],
-    ):
-        # Ambil Redis dari app.state (yang diset oleh Bootstrap)
-        redis: aioredis.Redis = getattr(request.state, "redis", None)
-        
-        if not redis:
-            return # Fail open jika Redis mati/tidak ada
-
-        identity = str(user.id) if user else (request.client.host if request.client else "unknown")
-        key = f"rl:{identity}:{request.url.path}:{request.method}"
-        
-        # Atomic Increment & TTL
-        pipe = redis.pipeline()
-        pipe.incr(key, 1)
-        pipe.ttl(key)
-        result = await pipe.execute()
-        
-        request_count = result[0]
-        ttl = result[1]
-        
-        if request_count == 1:
-            await redis.expire(key, self.seconds)
-            ttl = self.seconds
-        
-        if request_count > self.times:
-            retry_after = ttl if ttl > 0 else self.seconds
-            raise TooManyRequestsError(retry_after=retry_after)
\ No newline at end of file
@@ -13,6 +13,7 @@ from std_pack.domain.exceptions import (
     ForbiddenError,
     TooManyRequestsError
 )
+from std_pack.infrastructure.security.rate_limit import rate_limit_headers
 
 async def domain_exception_handler(request: Request, exc: DomainException):
     """
@@ -20,6 +21,7 @@ async def domain_exception_handler(request: Request, exc: DomainException):
     Otomatis memetakan tipe exception ke HTTP Status Code.
     """
     status_code = status.HTTP_400_BAD_REQUEST  # Default fallback
+    headers: dict[str, str] | None = None
     
     match exc:
         case EntityNotFoundError():
@@ -34,7 +36,15 @@ async def domain_exception_handler(request: Request, exc: DomainException):
             status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
         case TooManyRequestsError():
             status_code = status.HTTP_429_TOO_MANY_REQUESTS
-            
+            headers = {"Retry-After": str(exc.retry_after)}
+            if exc.limit is not None:
+                reset_after = exc.reset_after or exc.retry_after
+                headers.update(
+                    rate_limit_headers(
+                        exc.limit, exc.remaining, reset_after, exc.policy
+                    )
+                )
+
     return JSONResponse(
         status_code=status_code,
         content={
@@ -44,6 +54,7 @@ async def domain_exception_handler(request: Request, exc: DomainException):
                 "path": request.url.path
             }
         },
+        headers=headers,
     )
 
 
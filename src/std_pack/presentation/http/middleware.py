@@ -0,0 +1,78 @@
+"""
+HTTP Middleware.
+RateLimitMiddleware: rate limit sebelum routing & dependency resolution,
+jadi request yang ditolak tidak membuka session DB / decode body sama sekali.
+"""
+from collections.abc import Sequence
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from std_pack.infrastructure.security.rate_limit import RateLimiter
+
+from .handlers import domain_exception_handler
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware (bukan BaseHTTPMiddleware: tanpa task tambahan per request).
+
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiters=[
+                RateLimiter(
+                    limits="5/minute",
+                    key=key_by_ip,
+                    routes={"/auth/login"},
+                    methods={"POST"},
+                ),
+                RateLimiter(limits="20/second; 5000/hour", redis=redis_manager),
+            ],
+        )
+
+    Semua limiter yang cocok dicek berurutan; yang pertama menolak -> 429.
+    Jika lolos, header RateLimit-* dari limiter dengan sisa kuota paling
+    sedikit ditambahkan ke response.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: Sequence[RateLimiter]):
+        self.app = app
+        self.limiters = list(limiters)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        tightest: dict[str, str] | None = None
+        remaining = None
+        for limiter in self.limiters:
+            if not limiter.applies_to(request):
+                continue
+            result = await limiter.check(request)
+            if result is None:
+                continue
+            if not result.allowed:
+                response = await domain_exception_handler(
+                    request, limiter.exceeded(result)
+                )
+                await response(scope, receive, send)
+                return
+            if limiter.headers and (remaining is None or result.remaining < remaining):
+                remaining = result.remaining
+                tightest = limiter.response_headers(result)
+
+        if tightest is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in tightest.items():
+                    headers.setdefault(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
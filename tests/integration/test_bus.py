@@ -41,4 +41,241 @@ async def test_memory_bus_dispatch():
 
     # 5. Assert
     assert len(received_data) == 1
-    assert received_data[0] == "user-123"
\ No newline at end of file
+    assert received_data[0] == "user-123"
+
+# --- MRO DISPATCH & KONKURENSI ---
+class AccountEvent(DomainEvent):
+    account_id: str
+
+class AccountOpenedEvent(AccountEvent):
+    pass
+
+@pytest.mark.asyncio
+async def test_memory_bus_mro_dispatch():
+    bus = MemoryMessageBus()
+    calls = []
+
+    async def on_any(event: DomainEvent):
+        calls.append(("any", type(event).__name__))
+
+    async def on_account(event: AccountEvent):
+        calls.append(("account", type(event).__name__))
+
+    bus.subscribe(DomainEvent, on_any)
+    bus.subscribe(AccountEvent, on_account)
+    # Duplikat via MRO -> dipanggil sekali
+    bus.subscribe(AccountOpenedEvent, on_account)
+
+    await bus.publish(AccountOpenedEvent(account_id="a-1"))
+    assert sorted(calls) == [
+        ("account", "AccountOpenedEvent"),
+        ("any", "AccountOpenedEvent"),
+    ]
+    # Handler spesifik lebih dulu di index
+    assert bus.handlers_for(AccountOpenedEvent) == (on_account, on_any)
+
+    # Index di-reset saat subscribe
+    bus.subscribe(AccountOpenedEvent, on_any)
+    assert bus.handlers_for(AccountOpenedEvent) == (on_account, on_any)
+    assert bus.handlers_for(UserCreatedEvent) == (on_any,)
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_concurrent_handlers_with_limit_and_timeout(capsys):
+    bus = MemoryMessageBus(concurrency=2, handler_timeout=0.05)
+    active = 0
+    peak = 0
+
+    def make_slow():
+        async def slow(event):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        return slow
+
+    async def hangs(event):
+        await asyncio.sleep(10)
+
+    for _ in range(4):
+        bus.subscribe(UserCreatedEvent, make_slow())
+    bus.subscribe(UserCreatedEvent, lambda e: None)  # Handler sync tetap didukung
+    bus.subscribe(AccountEvent, hangs)
+
+    await bus.publish(UserCreatedEvent(user_id="u-1"))
+    assert peak == 2
+
+    started = asyncio.get_running_loop().time()
+    await bus.publish(AccountEvent(account_id="a-2"))
+    assert asyncio.get_running_loop().time() - started < 1
+    assert "event_handler_timeout" in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_handler_publishing_does_not_deadlock():
+    # Regresi: handler yang publish event lain dulu menunggu slot semaphore
+    # yang sedang ia pegang sendiri (concurrency=1 -> macet selamanya)
+    bus = MemoryMessageBus(concurrency=1)
+    calls = []
+
+    async def on_user(event: UserCreatedEvent):
+        calls.append("user")
+        await bus.publish(AccountOpenedEvent(account_id=event.user_id))
+
+    async def on_account(event: AccountEvent):
+        calls.append("account")
+
+    bus.subscribe(UserCreatedEvent, on_user)
+    bus.subscribe(AccountEvent, on_account)
+    bus.subscribe(AccountEvent, lambda e: calls.append("sync"))
+
+    await asyncio.wait_for(bus.publish(UserCreatedEvent(user_id="u-1")), 1)
+    assert calls == ["user", "account", "sync"]
+
+    # Slot dilepas: publish dari luar handler tetap dibatasi & tidak macet
+    await asyncio.wait_for(bus.publish(AccountOpenedEvent(account_id="a-1")), 1)
+    assert calls[-2:] == ["account", "sync"]
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_queued_handler_publishing_into_full_queue():
+    # Satu worker, antrian 1: nested publish saat antrian penuh dijalankan inline
+    bus = MemoryMessageBus(queue_size=1, workers=1)
+    seen = []
+
+    async def on_user(event: UserCreatedEvent):
+        for i in range(3):
+            await bus.publish(AccountOpenedEvent(account_id=f"{event.user_id}-{i}"))
+
+    async def on_account(event: AccountEvent):
+        seen.append(event.account_id)
+
+    bus.subscribe(UserCreatedEvent, on_user)
+    bus.subscribe(AccountEvent, on_account)
+    await bus.publish(UserCreatedEvent(user_id="u"))
+    await asyncio.wait_for(bus.stop(), 1)
+    assert sorted(seen) == ["u-0", "u-1", "u-2"]
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_publish_batch_fan_out():
+    bus = MemoryMessageBus(fan_out=True, batch_concurrency=5)
+    active = 0
+    peak = 0
+
+    async def handler(event):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    bus.subscribe(UserCreatedEvent, handler)
+    events = [UserCreatedEvent(user_id=str(i)) for i in range(20)]
+
+    await bus.publish_batch(events)
+    assert peak == 5
+
+    peak = 0
+    await bus.publish_batch(events[:3], fan_out=False)
+    assert peak == 1
+
+
+# --- MODE ANTRIAN (BACKGROUND WORKER) ---
+@pytest.mark.asyncio
+async def test_memory_bus_queued_mode_returns_immediately_and_drains():
+    bus = MemoryMessageBus(queue_size=100, workers=2)
+    done = []
+
+    async def send_email(event: UserCreatedEvent):
+        await asyncio.sleep(0.02)
+        done.append(event.user_id)
+
+    bus.subscribe(UserCreatedEvent, send_email)
+
+    started = asyncio.get_running_loop().time()
+    await bus.publish(UserCreatedEvent(user_id="u-1"))
+    await bus.publish_batch([UserCreatedEvent(user_id=f"u-{i}") for i in range(2, 6)])
+    # Publisher tidak menunggu handler
+    assert asyncio.get_running_loop().time() - started < 0.02
+    assert done == []
+
+    await bus.start()  # Sudah jalan (lazy) -> no-op
+    await bus.stop()   # Drain
+    assert sorted(done) == [f"u-{i}" for i in range(1, 6)]
+    stats = bus.stats()
+    assert stats["enqueued"] == stats["processed"] == 5
+    assert stats["queue_depth"] == 0
+    assert stats["latency_max_seconds"] >= stats["latency_avg_seconds"] > 0
+
+    # Setelah stop: event dijalankan inline (tidak hilang)
+    await bus.publish(UserCreatedEvent(user_id="late"))
+    assert done[-1] == "late"
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_queue_overflow_policies(capsys):
+    from std_pack.infrastructure.events import EventQueueFullError
+
+    with pytest.raises(ValueError):
+        MemoryMessageBus(overflow="explode")
+    with pytest.raises(ValueError):
+        MemoryMessageBus(queue_size=0)
+
+    gate = asyncio.Event()
+    seen = []
+
+    async def blocked(event: UserCreatedEvent):
+        await gate.wait()
+        seen.append(event.user_id)
+
+    # reject: worker sibuk + antrian penuh -> error ke publisher
+    bus = MemoryMessageBus(queue_size=1, workers=1, overflow="reject")
+    bus.subscribe(UserCreatedEvent, blocked)
+    await bus.publish(UserCreatedEvent(user_id="1"))
+    await asyncio.sleep(0)  # Worker mengambil event pertama
+    await bus.publish(UserCreatedEvent(user_id="2"))
+    with pytest.raises(EventQueueFullError):
+        await bus.publish(UserCreatedEvent(user_id="3"))
+    assert bus.stats()["rejected"] == 1
+
+    # drop_oldest: event lama dibuang, yang baru masuk
+    dropper = MemoryMessageBus(queue_size=1, workers=1, overflow="drop_oldest")
+    dropper.subscribe(UserCreatedEvent, blocked)
+    await dropper.publish(UserCreatedEvent(user_id="a"))
+    await asyncio.sleep(0)
+    await dropper.publish(UserCreatedEvent(user_id="b"))
+    await dropper.publish(UserCreatedEvent(user_id="c"))
+    assert dropper.stats()["dropped"] == 1
+    assert "memory_bus_event_dropped" in capsys.readouterr().out
+
+    # block: publisher menunggu slot
+    blocker = MemoryMessageBus(queue_size=1, workers=1)
+    blocker.subscribe(UserCreatedEvent, blocked)
+    await blocker.publish(UserCreatedEvent(user_id="x"))
+    await asyncio.sleep(0)
+    await blocker.publish(UserCreatedEvent(user_id="y"))
+    waiting = asyncio.create_task(blocker.publish(UserCreatedEvent(user_id="z")))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    gate.set()
+    await asyncio.wait_for(waiting, 1)
+    for b in (bus, dropper, blocker):
+        await b.stop()
+    assert sorted(seen) == ["1", "2", "a", "c", "x", "y", "z"]
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_drain_timeout(capsys):
+    bus = MemoryMessageBus(queue_size=10, workers=1)
+
+    async def forever(event):
+        await asyncio.sleep(10)
+
+    bus.subscribe(UserCreatedEvent, forever)
+    await bus.publish(UserCreatedEvent(user_id="stuck"))
+    await bus.stop(drain_timeout=0.01)
+    assert "memory_bus_drain_timeout" in capsys.readouterr().out
@@ -0,0 +1,198 @@
+# tests/integration/test_event_store.py
+import os
+import subprocess
+import sys
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from std_pack.domain import ConcurrencyConflictError
+from std_pack.domain.events import DomainEvent
+from std_pack.infrastructure.events.store import SqlEventStore, event_store_models
+
+# Opt-in: daftarkan tabel sebelum fixture db_engine menjalankan create_all
+StoredEventModel, SnapshotModel = event_store_models()
+
+
+class AccountOpened(DomainEvent):
+    owner: str
+
+
+class MoneyDeposited(DomainEvent):
+    amount: int
+
+
+class Account(BaseModel):
+    owner: str = ""
+    balance: int = 0
+
+    def apply(self, event: DomainEvent) -> "Account":
+        if isinstance(event, AccountOpened):
+            return self.model_copy(update={"owner": event.owner})
+        return self.model_copy(update={"balance": self.balance + event.amount})
+
+
+# ==========================================
+# 1. APPEND & READ
+# ==========================================
+@pytest.mark.asyncio
+async def test_append_batch_and_read_stream_in_chunks(db_session):
+    store = SqlEventStore(db_session, chunk_size=2)
+    deposits = [MoneyDeposited(amount=i) for i in range(1, 5)]
+    events = [AccountOpened(owner="budi"), *deposits]
+
+    assert await store.append("acc-1", events[:1], expected_version=0) == 1
+    assert await store.append("acc-1", events[1:]) == 5
+    assert await store.append("acc-1", []) == 5
+    assert await store.current_version("acc-1") == 5
+
+    # Chunk 2 -> 3 query keyset; hasil tetap urut sequence & bertipe benar
+    read = [e async for e in store.read_stream("acc-1")]
+    assert read == events
+    assert [e.amount async for e in store.read_stream("acc-1", after=3)] == [3, 4]
+
+    query = select(StoredEventModel.id, StoredEventModel.sequence)
+    rows = (await db_session.execute(query)).all()
+    assert {row.id for row in rows} == {e.event_id for e in events}
+
+
+@pytest.mark.asyncio
+async def test_optimistic_concurrency(db_session):
+    store = SqlEventStore(db_session)
+    await store.append("acc-2", [AccountOpened(owner="ani")])
+
+    with pytest.raises(ConcurrencyConflictError) as exc:
+        await store.append("acc-2", [MoneyDeposited(amount=1)], expected_version=0)
+    assert exc.value.expected == 0
+    assert exc.value.actual == 1
+    assert exc.value.code == "CONCURRENCY_CONFLICT"
+
+    # Writer lain sudah menulis sequence 2 di antara baca versi & insert
+    original = store.current_version
+    calls = 0
+
+    async def stale_version(stream_id):
+        nonlocal calls
+        calls += 1
+        return 1 if calls == 1 else await original(stream_id)
+
+    await store.append("acc-2", [MoneyDeposited(amount=5)])
+    store.current_version = stale_version
+    with pytest.raises(ConcurrencyConflictError) as exc:
+        await store.append("acc-2", [MoneyDeposited(amount=7)])
+    assert exc.value.actual == 2
+
+    # Savepoint di-rollback: data sebelumnya tetap utuh
+    assert [e.amount async for e in store.read_stream("acc-2", after=1)] == [5]
+
+
+@pytest.mark.asyncio
+async def test_replay_all_streams_with_checkpoint_and_filter(db_session):
+    store = SqlEventStore(db_session, chunk_size=2)
+    first = [AccountOpened(owner="a"), MoneyDeposited(amount=1)]
+    second = [
+        AccountOpened(owner="b"),
+        MoneyDeposited(amount=2),
+        MoneyDeposited(amount=3),
+    ]
+    await store.append("replay-a", first)
+    await store.append("replay-b", second)
+
+    items = [item async for item in store.replay()]
+    ours = [i for i in items if i.stream_id.startswith("replay-")]
+    assert [i.event for i in ours] == first + second  # Urut position (append)
+    assert [i.position for i in ours] == sorted(i.position for i in ours)
+
+    checkpoint = ours[1].position
+    rest = [
+        i.event
+        async for i in store.replay(after=checkpoint)
+        if i.stream_id.startswith("replay-")
+    ]
+    assert rest == second
+
+    deposits = [i.event async for i in store.replay(event_types=["MoneyDeposited"])]
+    assert all(isinstance(e, MoneyDeposited) for e in deposits)
+
+    with pytest.raises(ValueError):
+        SqlEventStore(db_session, chunk_size=0)
+
+
+@pytest.mark.asyncio
+async def test_replay_checkpoint_follows_append_order_not_event_id(db_session):
+    store = SqlEventStore(db_session)
+    # Event dibuat lebih dulu (UUIDv7 lebih kecil) tapi di-append belakangan
+    late = MoneyDeposited(amount=99)
+    await store.append("order-x", [AccountOpened(owner="x")])
+    checkpoint = [item async for item in store.replay()][-1].position
+    assert late.event_id < [i async for i in store.replay()][-1].event.event_id
+
+    await store.append("order-y", [late])
+    resumed = [item async for item in store.replay(after=checkpoint)]
+    assert [item.event for item in resumed] == [late]
+    assert resumed[0].position > checkpoint
+
+
+# ==========================================
+# 2. SNAPSHOT
+# ==========================================
+@pytest.mark.asyncio
+async def test_rehydrate_uses_and_creates_snapshots(db_session):
+    store = SqlEventStore(db_session, snapshot_every=3)
+    await store.append("acc-3", [AccountOpened(owner="citra")])
+    await store.append("acc-3", [MoneyDeposited(amount=10) for _ in range(3)])
+
+    kwargs = dict(
+        initial=Account(),
+        apply=Account.apply,
+        snapshot=lambda a: a.model_dump(mode="json"),
+        restore=Account.model_validate,
+    )
+    state, version = await store.rehydrate("acc-3", **kwargs)
+    assert (state.owner, state.balance, version) == ("citra", 30, 4)
+
+    snapshot = await store.load_snapshot("acc-3")
+    assert snapshot.version == 4
+    assert snapshot.state == {"owner": "citra", "balance": 30}
+
+    # Berikutnya: mulai dari snapshot, hanya event baru yang di-replay
+    await store.append("acc-3", [MoneyDeposited(amount=5)])
+    applied = []
+
+    def counting_apply(account, event):
+        applied.append(event)
+        return account.apply(event)
+
+    state, version = await store.rehydrate(
+        "acc-3", **{**kwargs, "apply": counting_apply}
+    )
+    assert (state.balance, version) == (35, 5)
+    assert len(applied) == 1
+
+    # Snapshot lama tidak menimpa yang lebih baru; update ke versi lebih baru
+    await store.save_snapshot("acc-3", 2, {"owner": "x", "balance": 0})
+    await store.save_snapshot("acc-3", 5, state.model_dump(mode="json"))
+    query = select(SnapshotModel).where(SnapshotModel.stream_id == "acc-3")
+    rows = (await db_session.execute(query)).scalars().all()
+    assert [(r.version, r.state["balance"]) for r in rows] == [(5, 35)]
+
+    # Tanpa restore -> replay penuh dari awal
+    state, version = await store.rehydrate("acc-3", Account(), Account.apply)
+    assert (state.balance, version) == (35, 5)
+    assert await store.load_snapshot("tidak-ada") is None
+
+
+def test_event_store_tables_are_opt_in():
+    # Import paket events / store saja tidak menambah tabel ke metadata bersama
+    code = (
+        "from std_pack.infrastructure.events import MemoryMessageBus, SqlEventStore\n"
+        "from std_pack.infrastructure.persistence.models import BaseDBModel\n"
+        "tables = BaseDBModel.metadata.tables\n"
+        "assert 'event_store' not in tables and 'event_snapshots' not in tables\n"
+        "from std_pack.infrastructure.events.store import event_store_models\n"
+        "assert event_store_models() is event_store_models()\n"
+        "assert 'event_store' in tables and 'event_snapshots' in tables\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
@@ -0,0 +1,164 @@
+# tests/integration/test_rate_limit_lua.py
+"""
+Script Lua rate limit asli (dijalankan Lua 5.1 via lupa, versi yang sama
+dengan Redis) vs emulasi Python di memory backend, pada timeline yang sama.
+Hasil (allowed, index, remaining, reset_ms, retry_ms / lease) harus identik
+sampai ke pembulatan milidetik.
+"""
+import random
+import time
+from typing import Any
+
+import pytest
+
+from std_pack.infrastructure.cache import memory
+from std_pack.infrastructure.cache.memory import MemoryStore
+from std_pack.infrastructure.security import rate_limit_algorithms
+from std_pack.infrastructure.security.rate_limit_algorithms import ALGORITHMS
+
+lua51 = pytest.importorskip("lupa.lua51")
+
+LIMITS = [(5, 1000), (20, 7000)]  # (limit, period_ms) untuk KEYS[1], KEYS[2]
+
+CASES = [
+    (name, lease)
+    for name, algorithm in ALGORITHMS.items()
+    for lease in ((False, True) if algorithm.supports_lease else (False,))
+]
+
+
+class FakeClock:
+    """Jam palsu (mikrodetik) untuk TIME Lua, emulasi & TTL MemoryStore."""
+
+    def __init__(self) -> None:
+        self.us = 1_760_000_000_123_000
+
+    def time_ns(self) -> int:
+        return self.us * 1000
+
+    def time(self) -> float:
+        return self.us / 1_000_000
+
+    def monotonic(self) -> float:
+        return self.us / 1_000_000
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(time, name)
+
+
+def _arg(value: Any) -> str:
+    # Redis mengubah number Lua -> string dengan %.17g
+    return format(value, ".17g") if isinstance(value, float) else str(value)
+
+
+class LuaRedis:
+    """redis.call minimal di atas MemoryStore untuk menjalankan script asli."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.store = MemoryStore()
+        self.lua = lua51.LuaRuntime()
+        self.lua.globals().redis = self.lua.table_from({"call": self.call})
+
+    @staticmethod
+    def _bulk(value: bytes | None) -> Any:
+        return False if value is None else value.decode()  # nil reply -> false
+
+    def call(self, command: str, *raw: Any) -> Any:
+        args = [_arg(a) for a in raw]
+        store, table = self.store, self.lua.table_from
+        match command.upper():
+            case "TIME":
+                return table([str(v) for v in divmod(self.clock.us, 1_000_000)])
+            case "GET":
+                return self._bulk(store.get(args[0]))
+            case "SET":  # SET key value PX ms
+                store.set(args[0], args[1], px=int(args[3]))
+                return table({"ok": "OK"})
+            case "PTTL":
+                return store.pttl(args[0])
+            case "PEXPIRE":
+                return int(store.pexpire(args[0], int(args[1])))
+            case "INCRBY":
+                return store.incrby(args[0], int(args[1]))
+            case "HMGET":
+                return table([self._bulk(v) for v in store.hmget(args[0], args[1:])])
+            case "HSET":
+                fields = dict(zip(args[1::2], args[2::2], strict=True))
+                return store.hset(args[0], mapping=fields)
+            case "ZADD":
+                return store.zadd(args[0], {args[2]: float(args[1])})
+            case "ZCARD":
+                return store.zcard(args[0])
+            case "ZREMRANGEBYSCORE":
+                return store.zremrangebyscore(args[0], args[1], args[2])
+            case "ZRANGE":  # ZRANGE key start stop WITHSCORES
+                entries = store.zrangebyscore(args[0], "-inf", "+inf", withscores=True)
+                start, stop = (int(v) for v in args[1:3])
+                start += len(entries) if start < 0 else 0
+                stop += len(entries) if stop < 0 else 0
+                flat = []
+                for member, score in entries[max(start, 0) : stop + 1]:
+                    flat += [member.decode(), format(score, ".17g")]
+                return table(flat)
+        raise NotImplementedError(command)
+
+    def eval(self, script: str, keys: list[str], args: list[Any]) -> list[int]:
+        function = self.lua.eval(f"function(KEYS, ARGV)\n{script}\nend")
+        reply = function(self.lua.table_from(keys), self.lua.table_from(args))
+        # Redis memotong number Lua jadi integer reply
+        return [int(reply[i]) for i in range(1, len(reply) + 1)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memory, "time", clock)
+    monkeypatch.setattr(rate_limit_algorithms, "time", clock)
+    return clock
+
+
+def _replay(
+    name: str, lease: bool, clock: FakeClock, timeline: list[tuple[int, int]]
+) -> set[bool]:
+    """
+    Jalankan timeline [(maju_us, cost / jumlah lease)] di script Lua & emulasi.
+    Return outcome yang muncul (True = lolos / dapat lease).
+    """
+    algorithm = ALGORITHMS[name]
+    script = algorithm.lease_script if lease else algorithm.script
+    lua, emulated = LuaRedis(clock), MemoryStore()
+    keys = ["rl:{client}:second", "rl:{client}:minute"]
+    outcomes = set()
+    for step, (advance, first) in enumerate(timeline):
+        clock.us += advance
+        args = [str(first)] + [str(v) for limit in LIMITS for v in limit]
+        expected = lua.eval(script, keys, args)
+        actual = [int(v) for v in emulated.eval(script, len(keys), *keys, *args)]
+        assert actual == expected, f"step {step}, args {args}"
+        outcomes.add(expected[0] > 0)
+    return outcomes
+
+
+@pytest.mark.parametrize(("name", "lease"), CASES)
+@pytest.mark.parametrize("seed", range(5))
+def test_lua_script_and_emulation_agree_on_same_timeline(name, lease, seed, clock):
+    rng = random.Random(seed)
+    timeline = []
+    for _ in range(300):
+        # Maju tepat di / sekitar batas ms & window, plus lompatan acak
+        jumps = [1000 * rng.randrange(1, 400), rng.randrange(400_000)]
+        advance = rng.choice([0, 1, 999, 1000, 1001, *jumps])
+        timeline.append((advance, rng.choice([1, 1, 2, 3])))
+    assert _replay(name, lease, clock, timeline) == {True, False}
+
+
+@pytest.mark.parametrize(("name", "lease"), CASES)
+def test_lua_script_and_emulation_agree_at_whole_ms(name, lease, clock):
+    # Burst di satu mikrodetik lalu maju kelipatan ms: reset / retry di Lua
+    # tepat bilangan bulat, emulasi tidak boleh meleset 1 ms karena float
+    clock.us = 1_760_000_000_000_006
+    timeline = [(0, 1)] * 6 + [
+        (1000 * ms, 1) for ms in (1, 7, 13, 50, 101, 199, 200, 201, 333, 500)
+    ]
+    assert _replay(name, lease, clock, timeline) == {True, False}
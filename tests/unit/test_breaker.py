@@ -0,0 +1,323 @@
+# tests/unit/test_breaker.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ResponseError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from std_pack.config.settings import BaseAppSettings
+from std_pack.domain.events import DomainEvent
+from std_pack.infrastructure.cache import breaker as breaker_module
+from std_pack.infrastructure.cache.breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    GuardedRedisClient,
+    blocking_seconds,
+)
+from std_pack.infrastructure.cache.pipelining import AutoPipelineClient
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.cache.store import RedisCache
+from std_pack.infrastructure.events.redis_bus import RedisMessageBus
+from std_pack.infrastructure.security.rate_limit import RateLimiter
+
+
+class PingEvent(DomainEvent):
+    pass
+
+
+# ==========================================
+# 1. STATE MACHINE
+# ==========================================
+def test_breaker_opens_on_error_rate_and_recovers():
+    breaker = CircuitBreaker(min_calls=4, error_rate_threshold=0.5, reset_timeout=0.0)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_success(0.001)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+
+    # reset_timeout=0 -> langsung half-open, hanya 1 probe
+    assert breaker.allow() is True
+    assert breaker.state == "half_open"
+    assert breaker.allow() is False
+    breaker.record_success(0.001)
+    assert breaker.state == "closed"
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_breaker_half_open_failure_and_slow_probe():
+    breaker = CircuitBreaker(
+        min_calls=1, error_rate_threshold=1.0, reset_timeout=0.0, slow_call_duration=0.1
+    )
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    # Probe gagal -> open lagi
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    # Probe sukses tapi lambat -> tetap dianggap belum pulih
+    assert breaker.allow()
+    breaker.record_success(1.0)
+    assert breaker.state == "open"
+
+
+def test_breaker_opens_on_slow_calls_and_rejects():
+    breaker = CircuitBreaker(
+        min_calls=3,
+        slow_call_duration=0.1,
+        slow_call_rate_threshold=0.6,
+        reset_timeout=60,
+    )
+    for duration in (0.5, 0.5, 0.01):
+        breaker.allow()
+        breaker.record_success(duration)
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+    stats = breaker.stats()
+    assert stats["rejected"] == 1
+    assert stats["slow_rate"] == pytest.approx(2 / 3)
+    assert CircuitBreaker().stats()["error_rate"] == 0.0
+
+
+# ==========================================
+# 2. GUARDED CLIENT
+# ==========================================
+@pytest.mark.asyncio
+async def test_guarded_client_timeouts_and_fail_fast():
+    raw = AsyncMock()
+
+    async def _slow_get(key):
+        await asyncio.sleep(1)
+
+    raw.get.side_effect = _slow_get
+    breaker = CircuitBreaker(min_calls=2, error_rate_threshold=0.5, reset_timeout=60)
+    client = GuardedRedisClient(
+        raw, breaker, default_timeout=1.0, operation_timeouts={"get": 0.01}
+    )
+
+    # Timeout per operasi -> redis TimeoutError
+    for _ in range(2):
+        with pytest.raises(RedisTimeoutError):
+            await client.get("k")
+    assert breaker.state == "open"
+
+    # Open -> ditolak tanpa I/O (coroutine command tidak pernah di-await)
+    with pytest.raises(CircuitOpenError):
+        await client.set("k", "v")
+    raw.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_guarded_client_error_classification_and_passthrough():
+    raw = MagicMock()
+    raw.get = AsyncMock(side_effect=ResponseError("WRONGTYPE"))
+    raw.ping = AsyncMock(side_effect=RedisConnectionError("refused"))
+    raw.pubsub = MagicMock(return_value="pubsub")
+    raw.connection_pool = "pool"
+    raw.echo_sync = MagicMock(return_value="sync")
+    breaker = CircuitBreaker(min_calls=1, error_rate_threshold=0.5)
+    client = GuardedRedisClient(raw, breaker)
+
+    # Error level command tidak dihitung sebagai Redis sakit
+    with pytest.raises(ResponseError):
+        await client.get("k")
+    assert breaker.state == "closed"
+
+    assert client.pubsub() == "pubsub"
+    assert client.connection_pool == "pool"
+    assert client.echo_sync() == "sync"
+    assert client.raw_client is raw
+
+    with pytest.raises(RedisConnectionError):
+        await client.ping()
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_guarded_pipeline_execute():
+    raw = MagicMock()
+    pipe = MagicMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    pipe.execute = AsyncMock(return_value=[1, 60])
+    raw.pipeline = MagicMock(return_value=pipe)
+    breaker = CircuitBreaker()
+    client = GuardedRedisClient(raw, breaker)
+
+    async with client.pipeline() as guarded:
+        guarded.incr("k")
+        assert await guarded.execute() == [1, 60]
+    pipe.incr.assert_called_once_with("k")
+    pipe.__aexit__.assert_awaited_once()
+
+    breaker.state = "open"
+    breaker._opened_at = float("inf")
+    with pytest.raises(CircuitOpenError):
+        await client.pipeline().execute()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_never_builds_the_command():
+    raw = MagicMock()
+    raw.pipeline = MagicMock()
+    pipelined = AutoPipelineClient(raw)
+    breaker = CircuitBreaker(reset_timeout=60)
+    breaker._transition("open")
+    client = GuardedRedisClient(pipelined, breaker)
+
+    # Auto-pipeline: command tidak pernah masuk antrian saat circuit open
+    with pytest.raises(CircuitOpenError):
+        await client.get("k")
+    await asyncio.sleep(0)
+    assert pipelined._pending == []
+    raw.pipeline.assert_not_called()
+
+    # Method sync tetap diteruskan
+    raw.lock = MagicMock(return_value="lock")
+    assert client.lock("k") == "lock"
+
+
+@pytest.mark.asyncio
+async def test_blocking_reads_are_not_slow_calls(monkeypatch):
+    now = {"t": 0.0}
+    monkeypatch.setattr(breaker_module.time, "monotonic", lambda: now["t"])
+    raw = MagicMock()
+
+    async def _idle_read(*args, **kwargs):
+        now["t"] += 1.0  # Tidak ada event selama BLOCK 1000 ms
+        return []
+
+    raw.xreadgroup = MagicMock(side_effect=_idle_read)
+    raw.blpop = MagicMock(side_effect=_idle_read)
+    breaker = CircuitBreaker(
+        min_calls=1, slow_call_duration=0.5, slow_call_rate_threshold=0.5
+    )
+    client = GuardedRedisClient(raw, breaker, default_timeout=0.2)
+
+    for _ in range(5):
+        assert await client.xreadgroup("g", "c", {"s": ">"}, count=10, block=1000) == []
+        assert await client.blpop(["q"], timeout=0) == []
+    assert breaker.state == "closed"
+    assert breaker.stats()["slow_rate"] == 0.0
+
+    assert blocking_seconds("xread", ({"s": "$"}, 10, 250), {}) == 0.25
+    assert blocking_seconds("xreadgroup", ("g", "c", {"s": ">"}), {}) is None
+    assert blocking_seconds("brpoplpush", ("a", "b", 3), {}) == 3.0
+    assert blocking_seconds("get", ("k",), {}) is None
+
+
+@pytest.mark.asyncio
+async def test_blocking_timeout_is_block_plus_margin():
+    raw = MagicMock()
+
+    async def _hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    raw.xread = MagicMock(side_effect=_hang)
+    breaker = CircuitBreaker(min_calls=10)
+    client = GuardedRedisClient(raw, breaker, default_timeout=0.01)
+    with pytest.raises(RedisTimeoutError):
+        await client.xread({"s": "$"}, block=10)  # 10 ms + 10 ms margin
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_releases_half_open_slot():
+    raw = MagicMock()
+    raw.get = MagicMock(side_effect=lambda key: asyncio.sleep(10))
+    raw.set = AsyncMock(return_value=True)
+    breaker = CircuitBreaker(reset_timeout=0.0)
+    breaker._transition("open")
+    client = GuardedRedisClient(raw, breaker)
+
+    probe = asyncio.create_task(client.get("k"))
+    await asyncio.sleep(0)
+    assert breaker.state == "half_open"
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    # Slot probe kembali: panggilan berikutnya boleh mencoba (tidak macet di half-open)
+    assert await client.set("k", "v") is True
+    assert breaker.state == "closed"
+
+    # Error saat membangun command juga mengembalikan slot
+    breaker._transition("open")
+    raw.get = MagicMock(side_effect=TypeError("argumen salah"))
+    with pytest.raises(TypeError):
+        client.get()
+    assert breaker.allow() is True
+
+
+# ==========================================
+# 3. MANAGER & CONSUMERS
+# ==========================================
+@pytest.mark.asyncio
+async def test_redis_manager_with_breaker():
+    mock_client = AsyncMock()
+    settings = BaseAppSettings(
+        REDIS_CIRCUIT_BREAKER=True,
+        REDIS_BREAKER_RESET_SECONDS=30,
+        REDIS_OPERATION_TIMEOUT=0.2,
+        REDIS_OPERATION_TIMEOUTS={"get": 0.05},
+    )
+    with patch("redis.asyncio.from_url", return_value=mock_client):
+        manager = RedisManager.from_settings(settings)
+        await manager.init_cache()
+
+        client = manager.get_client()
+        assert isinstance(client, GuardedRedisClient)
+        assert client.operation_timeouts == {"get": 0.05}
+        assert client.default_timeout == 0.2
+        assert manager.get_client() is client  # View di-cache
+        assert isinstance(manager.get_binary_client(), GuardedRedisClient)
+        assert manager.is_available() is True
+        assert manager.pool_stats()["circuit"]["state"] == "closed"
+
+        manager.breaker.state = "open"
+        assert manager.is_available() is False
+        await manager.close()
+
+
+def _open_breaker_client():
+    breaker = CircuitBreaker(reset_timeout=60)
+    breaker._transition("open")
+    raw = AsyncMock()
+    raw.pipeline = MagicMock()
+    return GuardedRedisClient(raw, breaker), raw
+
+
+@pytest.mark.asyncio
+async def test_consumers_degrade_when_circuit_open():
+    client, raw = _open_breaker_client()
+
+    # Rate limiter: fail open (request tetap lolos)
+    request = MagicMock()
+    request.state.redis = client
+    request.client.host = "127.0.0.1"
+    request.url.path = "/login"
+    request.method = "POST"
+    await RateLimiter(times=1)(request, None)
+
+    # Cache: read = miss, write = skip
+    manager = MagicMock()
+    manager.mode = "standalone"
+    manager.get_binary_client.return_value = client
+    cache = RedisCache(manager)
+    assert await cache.get("k", default="fallback") == "fallback"
+    assert await cache.get_many(["a", "b"]) == {}
+    await cache.set("k", 1)
+    await cache.set_many({"k": 1})
+    raw.get.assert_not_awaited()
+    raw.set.assert_not_awaited()
+
+    # Bus: gagal seketika (tidak menunggu timeout)
+    bus_manager = MagicMock()
+    bus_manager.get_client.return_value = client
+    with pytest.raises(CircuitOpenError):
+        await RedisMessageBus(bus_manager).publish(PingEvent())
@@ -1,6 +1,10 @@
 # tests/unit/test_cache.py
+import asyncio
+import inspect
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from std_pack.infrastructure.cache.pipelining import AutoPipelineClient
 from std_pack.infrastructure.cache.redis import RedisManager
 
 @pytest.fixture
@@ -53,4 +57,268 @@ async def test_redis_operations(mock_redis_client):
 
         # 2. Test GET
         val = await client.get("key")
-        assert val == '{"id": 1, "name": "Kayez"}'
\ No newline at end of file
+        assert val == '{"id": 1, "name": "Kayez"}'
+
+# ==========================================
+# AUTO PIPELINING
+# ==========================================
+def _make_pipeline_client(results=None, error=None):
+    """Mock client + pipeline yang mencatat command yang di-queue."""
+    mock_client = AsyncMock()
+    mock_pipe = MagicMock()
+    mock_pipe.__aenter__ = AsyncMock(return_value=mock_pipe)
+    mock_pipe.__aexit__ = AsyncMock(return_value=None)
+    queued = []
+
+    def _record(name):
+        return lambda *args, **kwargs: queued.append((name, args))
+
+    mock_pipe.get = MagicMock(side_effect=_record("get"))
+    mock_pipe.incr = MagicMock(side_effect=_record("incr"))
+
+    async def _execute(raise_on_error=True):
+        if error:
+            raise error
+        return results if results is not None else [f"r{i}" for i in range(len(queued))]
+
+    mock_pipe.execute = AsyncMock(side_effect=_execute)
+    mock_client.pipeline = MagicMock(return_value=mock_pipe)
+    return mock_client, queued
+
+
+@pytest.mark.asyncio
+async def test_autopipeline_batches_concurrent_commands():
+    mock_client, queued = _make_pipeline_client()
+    client = AutoPipelineClient(mock_client, max_batch=100)
+
+    # 3 coroutine berbeda dalam satu tick -> 1 pipeline
+    results = await asyncio.gather(client.get("a"), client.get("b"), client.incr("c"))
+
+    assert results == ["r0", "r1", "r2"]
+    assert queued == [("get", ("a",)), ("get", ("b",)), ("incr", ("c",))]
+    mock_client.pipeline.assert_called_once_with(transaction=False)
+    assert client.batches_sent == 1
+    assert client.commands_sent == 3
+
+
+@pytest.mark.asyncio
+async def test_autopipeline_max_batch_flushes_early():
+    mock_client, _ = _make_pipeline_client()
+    client = AutoPipelineClient(mock_client, max_batch=2)
+
+    await asyncio.gather(*(client.get(str(i)) for i in range(5)))
+    # 5 command dengan max_batch=2 -> 3 pipeline
+    assert mock_client.pipeline.call_count == 3
+
+    with pytest.raises(ValueError):
+        AutoPipelineClient(mock_client, max_batch=0)
+
+
+@pytest.mark.asyncio
+async def test_autopipeline_error_fan_out():
+    # Error per-command hanya dilempar ke pemanggilnya sendiri
+    mock_client, _ = _make_pipeline_client(results=["ok", ValueError("wrong type")])
+    client = AutoPipelineClient(mock_client)
+    ok, bad = await asyncio.gather(
+        client.get("a"), client.get("b"), return_exceptions=True
+    )
+    assert ok == "ok"
+    assert isinstance(bad, ValueError)
+
+    # Error koneksi dilempar ke semua pemanggil di batch tersebut
+    mock_client, _ = _make_pipeline_client(error=ConnectionError("down"))
+    client = AutoPipelineClient(mock_client)
+    results = await asyncio.gather(
+        client.get("a"), client.get("b"), return_exceptions=True
+    )
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_autopipeline_passthrough_and_cancelled_caller():
+    mock_client, _ = _make_pipeline_client()
+    client = AutoPipelineClient(mock_client)
+
+    # Command non-batch diteruskan apa adanya
+    assert client.pipeline is mock_client.pipeline
+    assert client.raw_client is mock_client
+    await client.ping()
+    mock_client.ping.assert_awaited_once()
+
+    # Command batch berupa coroutine biasa (create_task / inspect aman dipakai)
+    coro = client.get("a")
+    assert inspect.iscoroutine(coro)
+    assert await asyncio.create_task(coro) == "r0"
+
+    # Pemanggil yang cancel tidak membuat fan-out crash
+    task = asyncio.create_task(client.get("a"))
+    await asyncio.sleep(0)  # Command sudah masuk antrian
+    task.cancel()
+    assert await client.get("b") == "r1"
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_auto_pipeline(mock_redis_client):
+    with patch("redis.asyncio.from_url", return_value=mock_redis_client):
+        manager = RedisManager("redis://fake", auto_pipeline=True, pipeline_max_batch=8)
+        await manager.init_cache()
+
+        client = manager.get_client()
+        assert isinstance(client, AutoPipelineClient)
+        assert client.raw_client is mock_redis_client
+
+        await manager.close()
+        mock_redis_client.aclose.assert_awaited_once()
+        assert manager.pipelined_client is None
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_binary_client(mock_redis_client):
+    binary = AsyncMock()
+    with patch(
+        "redis.asyncio.from_url", side_effect=[mock_redis_client, binary]
+    ) as mock_from_url:
+        manager = RedisManager("redis://fake")
+
+        # Belum init -> error
+        with pytest.raises(RuntimeError):
+            manager.get_binary_client()
+
+        await manager.init_cache()
+        assert manager.get_binary_client() is binary
+        assert manager.get_binary_client() is binary  # Dibuat sekali saja
+        assert mock_from_url.call_args.kwargs["decode_responses"] is False
+
+        await manager.close()
+        binary.aclose.assert_awaited_once()
+        assert manager.binary_client is None
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_binary_client_auto_pipeline(mock_redis_client):
+    binary = AsyncMock()
+    with patch("redis.asyncio.from_url", side_effect=[mock_redis_client, binary]):
+        manager = RedisManager("redis://fake", auto_pipeline=True)
+        await manager.init_cache()
+        client = manager.get_binary_client()
+        assert isinstance(client, AutoPipelineClient)
+        assert client.raw_client is binary
+        await manager.close()
+        binary.aclose.assert_awaited_once()
+
+
+# ==========================================
+# TOPOLOGY (Cluster / Sentinel), POOL & KEYS
+# ==========================================
+from redis.asyncio.cluster import RedisCluster
+from std_pack.config.settings import BaseAppSettings
+from std_pack.infrastructure.cache.keys import (
+    cache_key,
+    hash_tag,
+    key_slot,
+    make_key,
+    rate_limit_key,
+)
+
+
+def test_key_builders_hash_tags():
+    assert hash_tag("user-1") == "{user-1}"
+    assert hash_tag("{evil}") == "{evil}"  # Kurung kurawal bawaan dibuang
+    assert make_key("cache", "users", 42) == "cache:users:42"
+    assert make_key("cache", "users", tag="t1") == "cache:{t1}:users"
+    assert make_key(tag="only") == "{only}"
+    assert cache_key("products", "1") == "products:1"
+
+    # Semua limit satu identity di slot yang sama
+    k1 = rate_limit_key("user-42", "/orders", "GET")
+    k2 = rate_limit_key("user-42", "/login", "POST")
+    assert k1 == "rl:{user-42}:/orders:GET"
+    assert key_slot(k1) == key_slot(k2) == key_slot(b"user-42")
+
+
+def test_redis_manager_invalid_mode():
+    with pytest.raises(ValueError):
+        RedisManager("redis://fake", mode="proxy")
+    with pytest.raises(ValueError):
+        RedisManager("redis://fake", mode="sentinel")
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_from_settings_standalone_pool_stats():
+    settings = BaseAppSettings(
+        REDIS_URL="redis://localhost:6379/2",
+        REDIS_MAX_CONNECTIONS=20,
+        REDIS_SOCKET_TIMEOUT=1.5,
+    )
+    manager = RedisManager.from_settings(settings, auto_pipeline=True)
+    assert manager.max_connections == 20
+    assert manager.auto_pipeline is True
+
+    # Client asli (tanpa koneksi) untuk membaca pool
+    client = manager._create_client(decode_responses=True)
+    pool = client.connection_pool
+    assert pool.max_connections == 20
+    assert pool.connection_kwargs["socket_timeout"] == 1.5
+    manager.client = client
+
+    stats = manager.pool_stats()
+    assert stats["mode"] == "standalone"
+    assert stats["pools"]["text"] == {"created": 0, "in_use": 0, "idle": 0, "max": 20}
+
+    # Standalone: replica = client utama
+    assert manager.get_replica_client() is client
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_cluster_mode():
+    manager = RedisManager(
+        "redis://localhost:7000/0",
+        mode="cluster",
+        read_from_replicas=True,
+        max_connections=8,
+    )
+    client = manager._create_client(decode_responses=False)
+    assert isinstance(client, RedisCluster)
+    assert client.load_balancing_strategy is not None
+
+    manager.client = client
+    # Belum initialize -> belum ada node
+    assert manager.pool_stats()["pools"]["text"]["nodes"] == 0
+
+    # Simulasi 1 node dengan 3 koneksi (1 idle)
+    node = MagicMock(_connections=[object(), object(), object()], _free=[object()])
+    with patch.object(client, "get_nodes", return_value=[node]):
+        stats = manager.pool_stats()
+    assert stats["pools"]["text"] == {"nodes": 1, "created": 3, "in_use": 2, "idle": 1}
+    # Cluster: replica read diatur oleh client cluster itu sendiri
+    assert manager.get_replica_client() is client
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_sentinel_mode():
+    manager = RedisManager(
+        "redis://:secret@ignored:6379/3",
+        mode="sentinel",
+        sentinel_nodes=["10.0.0.1:26379", "10.0.0.2:26379"],
+        sentinel_master="primary",
+        read_from_replicas=True,
+    )
+    sentinel = manager._get_sentinel()
+    hosts = [s.connection_pool.connection_kwargs["host"] for s in sentinel.sentinels]
+    assert hosts == ["10.0.0.1", "10.0.0.2"]
+    assert sentinel.connection_kwargs["password"] == "secret"
+    assert sentinel.connection_kwargs["db"] == 3
+
+    manager.client = manager._create_client(decode_responses=True)
+    assert manager.client.connection_pool.service_name == "primary"
+    assert manager.client.connection_pool.is_master is True
+
+    replica = manager.get_replica_client()
+    assert replica.connection_pool.is_master is False
+    assert manager.get_replica_client() is replica
+    assert set(manager.pool_stats()["pools"]) == {"text", "replica"}
+
+    await manager.close()
+    assert manager.replica_client is None
@@ -0,0 +1,296 @@
+# tests/unit/test_client_cache.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ResponseError
+
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.cache.tracking import INVALIDATION_CHANNEL, ClientSideCache
+
+
+def _make_client(tracking_supported=True):
+    """Mock Redis client lengkap dengan pubsub & connection pool."""
+    store = {"flags:a": "1", "flags:b": "2", "other": "x"}
+    client = AsyncMock()
+    client.get.side_effect = lambda key: store.get(key)
+    client.mget.side_effect = lambda keys: [store.get(k) for k in keys]
+
+    # Koneksi pubsub: CLIENT ID -> 42
+    pubsub_conn = AsyncMock()
+    pubsub_conn.read_response.return_value = 42
+    messages: asyncio.Queue = asyncio.Queue()
+
+    async def _get_message(timeout=None):
+        try:
+            async with asyncio.timeout(timeout):
+                msg = await messages.get()
+        except TimeoutError:
+            return None
+        if isinstance(msg, Exception):
+            raise msg
+        return msg
+
+    pubsub = MagicMock()
+    pubsub.connect = AsyncMock()
+    pubsub.connection = pubsub_conn
+    pubsub.subscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.get_message = _get_message
+    client.pubsub = MagicMock(return_value=pubsub)
+
+    # Koneksi tracking: jawaban tergantung command terakhir
+    tracking_conn = AsyncMock()
+    tracking_conn.info = [
+        "flags",
+        ["on", "bcast"],
+        "redirect",
+        42,
+        "prefixes",
+        ["flags:"],
+    ]
+
+    async def _read_response():
+        command = tracking_conn.send_command.await_args.args
+        if command[:2] == ("CLIENT", "TRACKINGINFO"):
+            if isinstance(tracking_conn.info, Exception):
+                raise tracking_conn.info
+            return tracking_conn.info
+        if not tracking_supported and command[:3] == ("CLIENT", "TRACKING", "ON"):
+            raise ResponseError("unknown subcommand 'TRACKING'")
+        return "OK"
+
+    tracking_conn.read_response.side_effect = _read_response
+    client.connection_pool = MagicMock()
+    client.connection_pool.get_connection = AsyncMock(return_value=tracking_conn)
+    client.connection_pool.release = AsyncMock()
+
+    client.store = store
+    client.messages = messages
+    client.tracking_conn = tracking_conn
+    return client, pubsub
+
+
+@pytest.mark.asyncio
+async def test_tracking_mode_invalidation():
+    client, pubsub = _make_client()
+    cache = ClientSideCache(client, prefixes=["flags:"], max_size=10)
+    await cache.start()
+
+    assert cache.mode == "tracking"
+    pubsub.subscribe.assert_awaited_once_with(INVALIDATION_CHANNEL)
+    tracking_args = client.tracking_conn.send_command.await_args_list[0].args
+    assert tracking_args == (
+        "CLIENT",
+        "TRACKING",
+        "ON",
+        "REDIRECT",
+        42,
+        "BCAST",
+        "PREFIX",
+        "flags:",
+    )
+
+    # Miss -> Redis, lalu Hit dari lokal
+    assert await cache.get("flags:a") == "1"
+    assert await cache.get("flags:a") == "1"
+    assert client.get.await_count == 1
+
+    # Redis mengirim invalidasi saat key berubah
+    client.store["flags:a"] = "changed"
+    await client.messages.put({"type": "subscribe", "data": 1})
+    await client.messages.put({"type": "message", "data": [b"flags:a"]})
+    await asyncio.sleep(0.01)
+    assert await cache.get("flags:a") == "changed"
+
+    # FLUSHALL (data=None) mengosongkan semua
+    await client.messages.put({"type": "message", "data": None})
+    await asyncio.sleep(0.01)
+    assert cache.stats()["size"] == 0
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["invalidations"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    await cache.stop()
+    client.connection_pool.release.assert_awaited_once_with(client.tracking_conn)
+    pubsub.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_tracking_lost_falls_back_to_ttl():
+    client, _ = _make_client()
+    cache = ClientSideCache(client, prefixes=["flags:"])
+    await cache.start()
+    await cache.get("flags:a")
+
+    # Koneksi invalidasi putus -> cache dikosongkan, mode TTL
+    await client.messages.put(ConnectionError("socket closed"))
+    await asyncio.sleep(0.01)
+    assert cache.mode == "ttl"
+    assert cache.stats()["size"] == 0
+    # Koneksi rusak tidak kembali ke pool utuh
+    client.tracking_conn.disconnect.assert_awaited()
+
+    # Error saat TRACKING OFF tidak menggagalkan stop()
+    client.tracking_conn.send_command.side_effect = ConnectionError("gone")
+    await cache.stop()
+
+
+async def _eventually(condition, timeout=2.0):
+    """Tunggu kondisi dari task background tanpa asumsi kecepatan mesin."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_tracking_reconnects_after_broken_redirect():
+    client, pubsub = _make_client()
+    cache = ClientSideCache(
+        client, prefixes=["flags:"], health_check_interval=0.01, reconnect_delay=0.01
+    )
+    await cache.start()
+    await client.messages.put({"type": "subscribe", "data": 1})
+    await cache.get("flags:a")
+
+    # Health check: REDIRECT rusak (pubsub lama mati) -> flush,
+    # lalu tracking dipasang ulang
+    client.tracking_conn.info = [
+        "flags",
+        ["on", "bcast", "broken_redirect"],
+        "redirect",
+        42,
+    ]
+    await _eventually(lambda: cache.mode == "ttl")
+    assert cache.stats()["size"] == 0
+    client.tracking_conn.info = ["flags", ["on", "bcast"], "redirect", 42]
+    await _eventually(lambda: cache.mode == "tracking")
+    assert cache.stats()["reconnects"] == 1
+    assert pubsub.subscribe.await_count == 2
+
+    # Pubsub reconnect diam-diam (SUBSCRIBE dikonfirmasi ulang) juga dianggap putus
+    await client.messages.put({"type": "subscribe", "data": 1})
+    await client.messages.put({"type": "subscribe", "data": 1})
+    await _eventually(lambda: cache.reconnects == 2)
+
+    # Redis 6.0 tanpa TRACKINGINFO: cukup bukti koneksi hidup
+    client.tracking_conn.info = ResponseError("unknown subcommand")
+    await asyncio.sleep(0.03)
+    assert cache.mode == "tracking"
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_tracking_reconnect_retries_with_backoff():
+    client, _ = _make_client()
+    cache = ClientSideCache(
+        client, prefixes=["flags:"], reconnect_delay=0.01, max_reconnect_delay=0.02
+    )
+    await cache.start()
+
+    client.pubsub.return_value.connect.side_effect = ConnectionError("redis down")
+    await client.messages.put(ConnectionError("socket closed"))
+    # Retry berulang
+    await _eventually(lambda: client.pubsub.return_value.connect.await_count >= 3)
+    assert cache.mode == "ttl"
+
+    client.pubsub.return_value.connect.side_effect = None
+    await _eventually(lambda: cache.mode == "tracking")
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_tracking_mode_entries_have_safety_ttl():
+    client, _ = _make_client()
+    cache = ClientSideCache(client, prefixes=["flags:"], tracking_ttl=0.02)
+    await cache.start()
+    assert await cache.get("flags:a") == "1"
+
+    # Invalidasi hilang -> value basi tetap kedaluwarsa setelah tracking_ttl
+    client.store["flags:a"] = "new"
+    assert await cache.get("flags:a") == "1"
+    await asyncio.sleep(0.03)
+    assert await cache.get("flags:a") == "new"
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_ttl_fallback_mode():
+    client, pubsub = _make_client(tracking_supported=False)
+    cache = ClientSideCache(client, prefixes=["flags:"], fallback_ttl=0.05)
+    await cache.start()
+
+    assert cache.mode == "ttl"
+    pubsub.aclose.assert_awaited_once()  # Resource tracking dibersihkan
+    client.connection_pool.release.assert_awaited_once()
+
+    assert await cache.get("flags:a") == "1"
+    assert await cache.get("flags:a") == "1"
+    assert client.get.await_count == 1
+
+    # Setelah TTL lewat, value diambil ulang dari Redis
+    await asyncio.sleep(0.06)
+    client.store["flags:a"] = "new"
+    assert await cache.get("flags:a") == "new"
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_get_many_bounded_and_untracked_keys():
+    client, _ = _make_client()
+    cache = ClientSideCache(client, prefixes=["flags:"], max_size=1)
+    await cache.start()
+
+    # Key tanpa prefix tidak pernah di-cache lokal
+    assert await cache.get("other") == "x"
+    assert await cache.get_many(["flags:a", "other"]) == ["1", "x"]
+    assert await cache.get_many(["flags:a", "flags:b"]) == ["1", "2"]
+    # max_size=1 -> flags:a tergusur oleh flags:b
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_inflight_get_not_cached_after_invalidation():
+    client, _ = _make_client()
+    cache = ClientSideCache(client, prefixes=["flags:"])
+    await cache.start()
+
+    async def _slow_get(key):
+        # Invalidasi datang saat GET masih in-flight
+        cache.invalidate([key])
+        return "stale"
+
+    client.get.side_effect = _slow_get
+    assert await cache.get("flags:a") == "stale"
+    assert cache.stats()["size"] == 0  # Value basi tidak disimpan
+    await cache.stop()
+
+
+def test_client_cache_requires_prefix():
+    with pytest.raises(ValueError):
+        ClientSideCache(AsyncMock(), prefixes=[])
+    assert ClientSideCache(AsyncMock(), prefixes=["a"]).stats()["hit_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_redis_manager_local_cache():
+    client, _ = _make_client()
+    with patch("redis.asyncio.from_url", return_value=client):
+        manager = RedisManager("redis://fake", client_cache_prefixes=["flags:"])
+        with pytest.raises(RuntimeError):
+            manager.get_local_cache()
+
+        await manager.init_cache()
+        local = manager.get_local_cache()
+        assert local.mode == "tracking"
+        assert await local.get("flags:b") == "2"
+
+        await manager.close()
+        assert manager.local_cache is None
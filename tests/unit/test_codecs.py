@@ -0,0 +1,190 @@
+# tests/unit/test_codecs.py
+import uuid
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from std_pack.infrastructure.cache.codecs import (
+    CompressedCodec,
+    JsonCodec,
+    MsgPackCodec,
+    get_codec,
+)
+from std_pack.infrastructure.cache.store import RedisCache
+
+
+class Product(BaseModel):
+    id: uuid.UUID
+    name: str
+    created_at: datetime
+
+
+def _sample():
+    return Product(id=uuid.uuid4(), name="Kopi", created_at=datetime.now(UTC))
+
+
+# ==========================================
+# 1. CODECS
+# ==========================================
+def test_json_codec_roundtrip_pydantic():
+    codec = JsonCodec()
+    product = _sample()
+    data = codec.encode([product, {"n": 1}])
+    assert isinstance(data, bytes)
+
+    decoded = codec.decode(data)
+    assert decoded[0]["name"] == "Kopi"
+    assert decoded[0]["id"] == str(product.id)
+    assert decoded[1] == {"n": 1}
+
+
+def test_msgpack_codec_roundtrip():
+    pytest.importorskip("msgpack")
+    codec = MsgPackCodec()
+    product = _sample()
+    payload = {
+        "items": [product],
+        "raw": b"\x00\xff",
+        "at": product.created_at,
+        "id": product.id,
+    }
+
+    decoded = codec.decode(codec.encode(payload))
+    assert decoded["items"][0]["name"] == "Kopi"
+    assert decoded["raw"] == b"\x00\xff"  # Binary aman
+    assert decoded["id"] == str(product.id)
+
+    with pytest.raises(TypeError):
+        codec.encode(object())
+
+
+@pytest.mark.parametrize("algorithm", ["zstd", "lz4"])
+def test_compressed_codec_threshold(algorithm):
+    pytest.importorskip("zstandard" if algorithm == "zstd" else "lz4")
+    codec = CompressedCodec(JsonCodec(), algorithm=algorithm, threshold=64)
+
+    # Payload kecil: tidak dikompres (header RAW)
+    small = codec.encode({"a": 1})
+    assert small[:1] == b"\x00"
+    assert codec.decode(small) == {"a": 1}
+
+    # Payload besar: dikompres dan jauh lebih kecil
+    big_value = [{"name": "produk", "stok": i % 3} for i in range(500)]
+    big = codec.encode(big_value)
+    assert big[:1] != b"\x00"
+    assert len(big) < len(JsonCodec().encode(big_value)) / 2
+    assert codec.decode(big) == big_value
+    assert codec.name == f"json+{algorithm}"
+
+
+def test_codec_invalid_config():
+    with pytest.raises(ValueError):
+        CompressedCodec(JsonCodec(), algorithm="brotli")
+    with pytest.raises(ValueError):
+        CompressedCodec(JsonCodec(), threshold=0).decode(b"\x09abc")
+    with pytest.raises(ValueError):
+        get_codec("xml")
+
+
+def test_codec_factory():
+    assert isinstance(get_codec("json"), JsonCodec)
+    pytest.importorskip("zstandard")
+    codec = get_codec("json", compression="zstd", threshold=10)
+    assert isinstance(codec, CompressedCodec)
+    assert codec.threshold == 10
+
+
+# ==========================================
+# 2. REDIS CACHE (Binary Client)
+# ==========================================
+@pytest.fixture
+def binary_client():
+    client = AsyncMock()
+    store: dict[str, bytes] = {}
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+        return True
+
+    async def _get(key):
+        return store.get(key)
+
+    async def _mget(keys):
+        return [store.get(k) for k in keys]
+
+    async def _delete(*keys):
+        return sum(1 for k in keys if store.pop(k, None) is not None)
+
+    client.set.side_effect = _set
+    client.get.side_effect = _get
+    client.mget.side_effect = _mget
+    client.delete.side_effect = _delete
+
+    pipe = MagicMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    pipe.set = MagicMock(side_effect=lambda k, v, ex=None: store.__setitem__(k, v))
+    pipe.execute = AsyncMock(return_value=[])
+    client.pipeline = MagicMock(return_value=pipe)
+    client.store = store
+    return client
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_operations(binary_client):
+    manager = MagicMock()
+    manager.get_binary_client.return_value = binary_client
+    cache = RedisCache(manager, prefix="products", default_ttl=60)
+
+    product = _sample()
+    await cache.set("1", product)
+    binary_client.set.assert_awaited_with(
+        "products:1", JsonCodec().encode(product), ex=60
+    )
+    assert (await cache.get("1"))["name"] == "Kopi"
+    assert await cache.get("missing", default="x") == "x"
+
+    await cache.set_many({"2": {"n": 2}, "3": {"n": 3}}, ttl=5)
+    binary_client.pipeline.assert_called_once_with(transaction=False)
+    assert await cache.get_many(["2", "3", "404"]) == {"2": {"n": 2}, "3": {"n": 3}}
+
+    assert await cache.delete("2", "3") == 2
+    # No-op untuk input kosong (tanpa round trip)
+    assert await cache.get_many([]) == {}
+    await cache.set_many({})
+    assert await cache.delete() == 0
+    binary_client.pipeline.assert_called_once()
+
+
+def test_codecs_missing_optional_libraries():
+    """Simulasi library opsional tidak terinstall."""
+    from unittest.mock import patch
+
+    codecs = "std_pack.infrastructure.cache.codecs"
+    with patch(f"{codecs}.msgpack", None), pytest.raises(ImportError):
+        MsgPackCodec()
+    with patch(f"{codecs}.zstandard", None), pytest.raises(ImportError):
+        CompressedCodec(JsonCodec(), algorithm="zstd")
+    with patch(f"{codecs}.lz4_frame", None), pytest.raises(ImportError):
+        CompressedCodec(JsonCodec(), algorithm="lz4")
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_cluster_mget_and_hash_tag(binary_client):
+    manager = MagicMock()
+    manager.mode = "cluster"
+    manager.get_binary_client.return_value = binary_client
+    binary_client.mget_nonatomic = AsyncMock(return_value=[None])
+
+    # Tanpa tag: key bisa beda slot -> mget_nonatomic
+    cache = RedisCache(manager, prefix="p")
+    assert await cache.get_many(["1"]) == {}
+    binary_client.mget_nonatomic.assert_awaited_once_with(["p:1"])
+
+    # Dengan tag: satu slot -> MGET biasa
+    tagged = RedisCache(manager, prefix="p", hash_tag="tenant-1")
+    assert tagged.make_key("1") == "p:{tenant-1}:1"
+    await tagged.get_many(["1"])
+    binary_client.mget.assert_awaited_once_with(["p:{tenant-1}:1"])
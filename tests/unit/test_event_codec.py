@@ -0,0 +1,174 @@
+# tests/unit/test_event_codec.py
+import asyncio
+from typing import ClassVar
+
+import pytest
+
+from std_pack.domain import get_event_class, registered_events
+from std_pack.domain.events import DomainEvent, EntityCreatedEvent
+from std_pack.infrastructure.cache.codecs import JsonCodec, MsgPackCodec
+from std_pack.infrastructure.cache.memory import reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.events import (
+    EventCodec,
+    RedisEventSubscriber,
+    RedisMessageBus,
+    RedisStreamBus,
+    StreamConsumer,
+    register_upcaster,
+    upcaster,
+)
+
+
+class CodecOrderPlaced(DomainEvent):
+    order_id: int
+    total: float
+
+
+class CodecCustomerRenamed(DomainEvent):
+    # v1: {"name": ...}, v2: {"full_name": ...}, v3: + "locale"
+    event_version: ClassVar[int] = 3
+    full_name: str
+    locale: str
+
+
+@upcaster("CodecCustomerRenamed", from_version=1)
+def _renamed_v1_to_v2(payload):
+    payload["full_name"] = payload.pop("name")
+    return payload
+
+
+register_upcaster("CodecCustomerRenamed", 2, lambda p: {**p, "locale": "id-ID"})
+
+
+class CodecUnversioned(DomainEvent):
+    event_version: ClassVar[int] = 2
+    value: int
+
+
+async def _wait_until(condition, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timeout menunggu kondisi"
+        await asyncio.sleep(0.005)
+
+
+# ==========================================
+# 1. REGISTRY
+# ==========================================
+def test_registry_filled_by_subclassing():
+    assert get_event_class("CodecOrderPlaced") is CodecOrderPlaced
+    assert registered_events()["EntityCreatedEvent"] is EntityCreatedEvent
+    with pytest.raises(KeyError, match="belum terdaftar"):
+        get_event_class("TidakAda")
+
+
+# ==========================================
+# 2. ENCODE / DECODE
+# ==========================================
+@pytest.mark.parametrize("inner", [JsonCodec(), MsgPackCodec()])
+def test_roundtrip_envelope(inner):
+    codec = EventCodec(inner)
+    event = CodecOrderPlaced(order_id=7, total=12.5)
+
+    envelope = codec.to_envelope(event)
+    assert envelope["t"] == "CodecOrderPlaced"
+    assert envelope["v"] == 1
+    assert envelope["p"]["order_id"] == 7
+
+    decoded = codec.decode(codec.encode(event))
+    assert isinstance(decoded, CodecOrderPlaced)
+    assert decoded == event
+
+    events = [event, EntityCreatedEvent(entity_type="User", entity_id=1)]
+    assert codec.decode_many(codec.encode_many(events)) == events
+
+
+def test_decode_accepts_str_payload():
+    codec = EventCodec()
+    event = CodecOrderPlaced(order_id=1, total=1.0)
+    assert codec.decode(codec.encode(event).decode("utf-8")) == event
+
+
+def test_decode_non_canonical_envelopes():
+    codec = EventCodec()
+    payload = {
+        "event_id": "0192f2a4-1e7a-7cc5-8d0c-6a3a4b2e9f10",
+        "order_id": 3,
+        "total": 1.0,
+    }
+    # Urutan key berbeda -> jalur umum
+    for envelope in (
+        {"t": "CodecOrderPlaced", "p": payload, "v": 1},
+        {"v": 1, "t": "CodecOrderPlaced", "p": payload},
+    ):
+        assert codec.decode(codec.codec.encode(envelope)).order_id == 3
+
+    with pytest.raises(KeyError):
+        codec.decode(b'{"t":"CodecOrderPlaced"}')
+    with pytest.raises(ValueError):
+        codec.decode(b'{"t":x,"p":{}}')
+
+
+# ==========================================
+# 3. VERSIONING
+# ==========================================
+def test_upcaster_chain_from_old_versions():
+    codec = EventCodec()
+    v1 = codec.codec.encode(
+        {"t": "CodecCustomerRenamed", "v": 1, "p": {"name": "Budi"}}
+    )
+    event = codec.decode(v1)
+    assert event.full_name == "Budi"
+    assert event.locale == "id-ID"
+
+    # Versi terbaru tidak melewati upcaster
+    current = CodecCustomerRenamed(full_name="Ani", locale="en-US")
+    assert codec.to_envelope(current)["v"] == 3
+    assert codec.decode(codec.encode(current)) == current
+
+
+def test_missing_upcaster_raises():
+    codec = EventCodec()
+    with pytest.raises(ValueError, match="Tidak ada upcaster"):
+        codec.from_envelope({"t": "CodecUnversioned", "p": {"value": 1}})
+
+
+# ==========================================
+# 4. INTEGRASI BUS
+# ==========================================
+@pytest.mark.asyncio
+async def test_buses_use_event_codec():
+    reset_memory_stores()
+    manager = RedisManager("memory://event-codec")
+    await manager.init_cache()
+    codec = EventCodec(MsgPackCodec())
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    # Pub/Sub: pattern handler menerima event tanpa register() class
+    subscriber = RedisEventSubscriber(manager, event_codec=codec, poll_timeout=0.01)
+    subscriber.subscribe_pattern("events:Codec*", handler)
+    await subscriber.start()
+    await RedisMessageBus(manager, event_codec=codec).publish(
+        CodecOrderPlaced(order_id=1, total=2.0)
+    )
+    await _wait_until(lambda: len(received) == 1)
+    await subscriber.stop()
+    assert isinstance(received[0], CodecOrderPlaced)
+
+    # Streams
+    consumer = StreamConsumer(manager, group="g", block_ms=10, event_codec=codec)
+    consumer.subscribe(CodecOrderPlaced, handler)
+    await consumer.start()
+    await RedisStreamBus(manager, event_codec=codec).publish(
+        CodecOrderPlaced(order_id=2, total=3.0)
+    )
+    await _wait_until(lambda: len(received) == 2)
+    await consumer.stop()
+    assert received[1].order_id == 2
+
+    await manager.close()
+    reset_memory_stores()
@@ -0,0 +1,147 @@
+# tests/unit/test_hashers.py
+import pytest
+
+from std_pack.config import BaseAppSettings, refresh_settings, set_settings
+from std_pack.infrastructure.security import (
+    Argon2Hasher,
+    AsyncPasswordHasher,
+    BcryptHasher,
+    PasswordCheck,
+    PasswordPolicy,
+    build_hasher,
+    check_password,
+    check_password_async,
+    hash_password,
+    needs_rehash,
+    register_hasher,
+    set_password_hasher,
+    verify_password,
+)
+from std_pack.infrastructure.security.hashers import _HASHERS, PROFILES, calibrate
+
+# Parameter murah agar test cepat
+FAST_ARGON = {"time_cost": 1, "memory_cost": 1_024, "parallelism": 1}
+
+
+class PlainHasher:
+    """Hasher custom untuk test registry (JANGAN dipakai di produksi)."""
+    scheme = "plain"
+    prefixes = ("$plain$",)
+
+    def hash(self, password):
+        return f"$plain${password}"
+
+    def verify(self, password, hashed):
+        return hashed == f"$plain${password}"
+
+    def needs_rehash(self, hashed):
+        return False
+
+
+# ==========================================
+# 1. HASHER
+# ==========================================
+def test_argon2id_hash_verify_and_params():
+    hasher = Argon2Hasher(**FAST_ARGON)
+    hashed = hasher.hash("rahasia")
+    assert hashed.startswith("$argon2id$v=19$m=1024,t=1,p=1$")
+    assert hasher.verify("rahasia", hashed) is True
+    assert hasher.verify("salah", hashed) is False
+    assert hasher.needs_rehash(hashed) is False
+    assert Argon2Hasher(**{**FAST_ARGON, "time_cost": 2}).needs_rehash(hashed) is True
+    assert hasher.params == FAST_ARGON
+    assert BcryptHasher(5).params == {"rounds": 5}
+    with pytest.raises(ValueError):
+        hasher.verify("rahasia", "$argon2id$rusak")
+
+
+def test_build_hasher_from_profiles_and_registry():
+    assert build_hasher("bcrypt-interactive").rounds == 12
+    assert build_hasher("bcrypt-interactive", rounds=4).rounds == 4
+    _, params = PROFILES["argon2id-interactive"]
+    assert build_hasher("argon2id-interactive").params == params
+    assert isinstance(build_hasher("argon2id", **FAST_ARGON), Argon2Hasher)
+    with pytest.raises(ValueError, match="tidak dikenal"):
+        build_hasher("md5")
+
+    register_hasher("plain", PlainHasher)
+    try:
+        policy = PasswordPolicy(BcryptHasher(4))
+        # Dikenali dari prefix walau tidak di policy
+        assert policy.verify("x", "$plain$x") is True
+        assert isinstance(policy.identify("$plain$x"), PlainHasher)
+    finally:
+        _HASHERS.pop("plain")
+
+
+# ==========================================
+# 2. POLICY & MIGRASI
+# ==========================================
+def test_policy_reports_rehash_for_gradual_migration():
+    legacy = BcryptHasher(4)
+    policy = PasswordPolicy(Argon2Hasher(**FAST_ARGON), legacy=[legacy])
+    old_hash = legacy.hash("rahasia")
+    new_hash = policy.hash("rahasia")
+
+    assert policy.identify(old_hash) is legacy
+    # bcrypt -> argon2id
+    assert policy.check("rahasia", old_hash) == PasswordCheck(True, True)
+    assert policy.check("rahasia", new_hash) == PasswordCheck(True, False)
+    assert policy.check("salah", old_hash) == PasswordCheck(False, False)
+
+    # Parameter argon2 dinaikkan -> hash argon2 lama juga perlu rehash
+    stronger = PasswordPolicy(Argon2Hasher(**{**FAST_ARGON, "memory_cost": 2_048}))
+    assert stronger.check("rahasia", new_hash) == PasswordCheck(True, True)
+
+    with pytest.raises(ValueError, match="tidak dikenal"):
+        policy.verify("rahasia", "5f4dcc3b5aa765d61d8327deb882cf99")
+
+
+@pytest.mark.asyncio
+async def test_process_wide_policy_from_settings_profile():
+    bcrypt_hash = hash_password("rahasia", rounds=4)
+    try:
+        set_settings(BaseAppSettings(PASSWORD_HASH_PROFILE="argon2id-interactive"))
+        hashed = hash_password("rahasia")
+        assert hashed.startswith("$argon2id$")
+        assert verify_password("rahasia", hashed) is True
+        assert verify_password("rahasia", bcrypt_hash) is True  # Hash lama tetap valid
+        assert check_password("rahasia", bcrypt_hash) == PasswordCheck(True, True)
+        assert needs_rehash(hashed) is False
+        assert needs_rehash(bcrypt_hash) is True
+        assert await check_password_async("rahasia", hashed) == PasswordCheck(
+            True, False
+        )
+
+        # Login memakai hasher async -> bcrypt lama di-upgrade ke argon2id
+        hasher = AsyncPasswordHasher(policy=PasswordPolicy(Argon2Hasher(**FAST_ARGON)))
+        valid, upgraded = await hasher.verify_and_update("rahasia", bcrypt_hash)
+        assert valid is True
+        assert upgraded.startswith("$argon2id$v=19$m=1024")
+        assert hasher.needs_rehash(upgraded) is False
+        assert hasher.stats()["scheme"] == "argon2id"
+        hasher.close()
+    finally:
+        set_password_hasher(None)
+        refresh_settings(BaseAppSettings)
+
+
+# ==========================================
+# 3. KALIBRASI
+# ==========================================
+def test_calibrate_picks_strongest_params_within_target():
+    # Target mustahil -> parameter minimum
+    assert calibrate("bcrypt", target_seconds=0, samples=1).params == {"rounds": 4}
+    tiny = calibrate("argon2id", target_seconds=0, samples=1, memory_cost=32_768)
+    assert tiny.params == {"time_cost": 1, "memory_cost": 8_192, "parallelism": 1}
+
+    fast = calibrate("bcrypt", target_seconds=0.02, samples=1)
+    assert fast.params["rounds"] >= 4
+    assert fast.seconds <= 0.02 or fast.params["rounds"] == 4
+
+    argon = calibrate("argon2id", target_seconds=0.03, samples=1, memory_cost=8_192)
+    assert argon.params["time_cost"] >= 1
+    assert argon.scheme == "argon2id"
+
+    with pytest.raises(ValueError):
+        calibrate("scrypt", target_seconds=0.1)
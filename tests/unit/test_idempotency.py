@@ -0,0 +1,229 @@
+# tests/unit/test_idempotency.py
+import asyncio
+import os
+import subprocess
+import sys
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from std_pack.domain.events import DomainEvent
+from std_pack.infrastructure.cache.memory import reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.events import (
+    BloomFilter,
+    RedisIdempotencyStore,
+    RedisStreamBus,
+    SqlIdempotencyStore,
+    StreamConsumer,
+    idempotent,
+)
+from std_pack.infrastructure.events.idempotency import (
+    IdempotencyStore,
+    processed_event_model,
+)
+
+# Opt-in: daftarkan tabel processed_events sebelum fixture db_engine create_all
+ProcessedEventModel = processed_event_model()
+
+
+class ProjectionRequested(DomainEvent):
+    account_id: int
+
+
+@pytest.fixture
+async def manager():
+    reset_memory_stores()
+    manager = RedisManager("memory://idempotency")
+    await manager.init_cache()
+    yield manager
+    await manager.close()
+    reset_memory_stores()
+
+
+async def _wait_until(condition, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timeout menunggu kondisi"
+        await asyncio.sleep(0.005)
+
+
+# ==========================================
+# 1. BLOOM FILTER
+# ==========================================
+def test_bloom_filter_membership_and_validation():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [str(uuid.uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)  # Tidak ada false negative
+
+    # False positive mendekati error_rate
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(5000))
+    assert false_positives < 5000 * 0.03
+
+    bloom.clear()
+    assert bloom.count == 0
+    assert keys[0] not in bloom
+
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
+    with pytest.raises(ValueError):
+        BloomFilter(error_rate=1.0)
+
+
+# ==========================================
+# 2. REDIS STORE
+# ==========================================
+@pytest.mark.asyncio
+async def test_redis_store_batch_check_and_ttl(manager):
+    store = RedisIdempotencyStore(manager, ttl=60)
+    a, b = uuid.uuid4(), uuid.uuid4()
+
+    assert await store.seen_many([a, b], scope="proj") == set()
+    await store.mark_many([a], scope="proj")
+    await store.mark_many([], scope="proj")
+    assert await store.seen_many([a, b, a], scope="proj") == {str(a)}
+    assert await store.seen(a, scope="proj") is True
+    assert await store.seen(a, scope="lain") is False  # Scope terpisah
+
+    client = manager.get_binary_client()
+    assert 0 < await client.ttl(f"idem:proj:{a}") <= 60
+    assert await store.warm() == 0  # Tanpa bloom tidak ada yang dimuat
+
+
+@pytest.mark.asyncio
+async def test_redis_store_bloom_short_circuit_and_warm(manager):
+    store = RedisIdempotencyStore(manager, bloom=BloomFilter(capacity=100))
+    ids = [uuid.uuid4() for _ in range(10)]
+
+    # Belum ada yang di bloom -> tidak ada round trip ke Redis
+    assert await store.seen_many(ids, scope="a:b") == set()
+    assert store.stats() == {"lookups": 0, "bloom_skips": 10, "bloom_count": 0}
+
+    await store.mark(ids[0], scope="a:b")
+    assert await store.seen_many(ids, scope="a:b") == {str(ids[0])}
+    assert store.lookups == 1
+
+    # Proses baru (bloom kosong) memuat ulang id dari Redis
+    fresh = RedisIdempotencyStore(manager, bloom=BloomFilter(capacity=100))
+    assert await fresh.warm() == 1
+    assert await fresh.seen(ids[0], scope="a:b") is True
+
+
+# ==========================================
+# 3. SQL STORE
+# ==========================================
+@pytest.mark.asyncio
+async def test_sql_store_mark_seen_warm_and_purge(db_engine):
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    store = SqlIdempotencyStore(
+        session_factory, ttl=3600, bloom=BloomFilter(capacity=100)
+    )
+    a, b = uuid.uuid4(), uuid.uuid4()
+
+    await store.mark_many([a, b], scope="sql")
+    await store.mark(a, scope="sql")  # Duplikat diabaikan (ON CONFLICT DO NOTHING)
+    assert await store.seen_many([a, b, uuid.uuid4()], scope="sql") == {str(a), str(b)}
+
+    fresh = SqlIdempotencyStore(
+        session_factory, ttl=3600, bloom=BloomFilter(capacity=100)
+    )
+    assert await fresh.warm() == 2
+    assert await fresh.seen(b, scope="sql") is True
+
+    # Baris a dibuat "kemarin" -> dihapus purge()
+    async with session_factory() as session:
+        await session.execute(
+            update(ProcessedEventModel)
+            .where(ProcessedEventModel.event_id == str(a))
+            .values(created_at=datetime.now(UTC) - timedelta(days=1))
+        )
+        await session.commit()
+    assert await store.purge() == 1
+    reader = SqlIdempotencyStore(session_factory)
+    assert await reader.seen_many([a, b], scope="sql") == {str(b)}
+
+
+def test_processed_events_table_is_opt_in_and_backends_are_abstract():
+    # Import paket events saja tidak menambah tabel ke metadata bersama
+    code = (
+        "import std_pack.infrastructure.events\n"
+        "from std_pack.infrastructure.persistence.models import BaseDBModel\n"
+        "assert 'processed_events' not in BaseDBModel.metadata.tables\n"
+        "from std_pack.infrastructure.events.idempotency import processed_event_model\n"
+        "assert processed_event_model() is processed_event_model()\n"
+        "assert 'processed_events' in BaseDBModel.metadata.tables\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+    class Incomplete(IdempotencyStore):
+        async def _seen(self, ids, scope):
+            return set()
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+# ==========================================
+# 4. HANDLER & CONSUMER
+# ==========================================
+@pytest.mark.asyncio
+async def test_idempotent_decorator_skips_processed_events(manager):
+    store = RedisIdempotencyStore(manager)
+    calls = []
+
+    @idempotent(store)
+    async def rebuild(event):
+        if event.account_id < 0:
+            raise ValueError("Boom!")
+        calls.append(event.account_id)
+
+    event = ProjectionRequested(account_id=1)
+    await rebuild(event)
+    await rebuild(event)
+    assert calls == [1]
+
+    # Handler gagal -> tidak di-mark, bisa di-retry
+    failing = ProjectionRequested(account_id=-1)
+    with pytest.raises(ValueError):
+        await rebuild(failing)
+    assert await store.seen(failing.event_id, scope=rebuild.__qualname__) is False
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_dedupes_whole_batch(manager):
+    store = RedisIdempotencyStore(manager)
+    handled = []
+
+    async def handler(event):
+        handled.append(event.account_id)
+
+    events = [ProjectionRequested(account_id=i) for i in range(3)]
+    await store.mark(events[0].event_id, scope="projector")  # Sudah diproses sebelumnya
+
+    bus = RedisStreamBus(manager)
+    await bus.publish_batch(events + [events[1]])  # events[1] terkirim dua kali
+    await manager.get_binary_client().xadd(
+        "stream:events:ProjectionRequested", {"payload": b"{"}
+    )
+
+    consumer = StreamConsumer(
+        manager, group="projector", block_ms=10, idempotency=store
+    )
+    consumer.subscribe(ProjectionRequested, handler)
+    await consumer.start()
+    await _wait_until(lambda: consumer.stats()["acked"] == 5)
+    await consumer.stop()
+
+    # Duplikat dari store maupun di dalam batch yang sama di-skip
+    assert sorted(handled) == [1, 2]
+    assert consumer.stats()["duplicates"] == 2
+    assert store.lookups == 1  # Satu round trip untuk seluruh batch
+    assert await store.seen_many([e.event_id for e in events], scope="projector") == {
+        str(e.event_id) for e in events
+    }
@@ -0,0 +1,415 @@
+# tests/unit/test_jwks.py
+import base64
+import hashlib
+import hmac
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import orjson
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+
+from std_pack.config import BaseAppSettings
+from std_pack.infrastructure.security import (
+    JoseBackend,
+    JWKSKeySet,
+    PyJWTBackend,
+    TokenHelper,
+    get_jwt_backend,
+    public_jwk,
+)
+
+SETTINGS = MagicMock(SECRET_KEY="rahasia-yang-cukup-panjang-untuk-hmac-sha256")
+
+
+def _pem(key) -> bytes:
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+@pytest.fixture(scope="module")
+def rsa_keys():
+    return [
+        _pem(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        for _ in range(2)
+    ]
+
+
+def _public_pem(private_pem: bytes) -> bytes:
+    public = serialization.load_pem_private_key(private_pem, None).public_key()
+    return public.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class RotatingSource:
+    """Endpoint JWKS palsu: menghitung fetch & bisa dibuat lambat / gagal."""
+
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.calls = 0
+        self.delay = 0.0
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("jwks down")
+        return {"keys": self.keys}
+
+
+# ==========================================
+# 1. ISSUER & VERIFIER ASIMETRIS
+# ==========================================
+def test_rs256_issuer_and_jwks_verifier(rsa_keys):
+    issuer = TokenHelper(
+        SETTINGS, algorithm="RS256", private_key=rsa_keys[0], key_id="k1"
+    )
+    token = issuer.create_access_token("u-1")
+    assert issuer.backend.unverified_header(token)["kid"] == "k1"
+    # Verifikasi pakai public key sendiri
+    assert issuer.decode_token(token)["sub"] == "u-1"
+
+    # Verifier hanya memegang JWKS, tidak bisa menerbitkan token
+    jwks = {"keys": [public_jwk(rsa_keys[0], "k1", "RS256")]}
+    verifier = TokenHelper(SETTINGS, algorithm="RS256", key_set=JWKSKeySet(jwks))
+    assert verifier.decode_token(token)["sub"] == "u-1"
+    # JWK sudah di-parse, dipakai ulang
+    assert verifier.decode_token(token)["sub"] == "u-1"
+    with pytest.raises(ValueError, match="hanya untuk verifikasi"):
+        verifier.create_access_token("u-1")
+
+    # Alg confusion: token HS256 yang ditandatangani dengan public key ditolak
+    public_pem = _public_pem(rsa_keys[0])
+    forged_header = _b64url(orjson.dumps({"alg": "HS256", "kid": "k1"}))
+    signing_input = f"{forged_header}.{_b64url(orjson.dumps({'sub': 'admin'}))}"
+    signature = hmac.new(public_pem, signing_input.encode(), hashlib.sha256).digest()
+    forged = f"{signing_input}.{_b64url(signature)}"
+    with pytest.raises(ValueError):
+        verifier.decode_token(forged)
+
+    # Token tanpa kid + JWKS satu key -> key itu dipakai
+    anonymous = TokenHelper(SETTINGS, algorithm="RS256", private_key=rsa_keys[0])
+    assert verifier.decode_token(anonymous.create_access_token("u-2"))["sub"] == "u-2"
+
+    with pytest.raises(ValueError, match="butuh private_key"):
+        TokenHelper(SETTINGS, algorithm="RS256")
+
+
+def test_pyjwt_backend_ecdsa_and_eddsa():
+    ec_pem = _pem(ec.generate_private_key(ec.SECP256R1()))
+    ed_pem = _pem(ed25519.Ed25519PrivateKey.generate())
+
+    for algorithm, pem in (("ES256", ec_pem), ("EdDSA", ed_pem)):
+        issuer = TokenHelper(
+            SETTINGS, algorithm=algorithm, private_key=pem, key_id="k", backend="pyjwt"
+        )
+        token = issuer.create_access_token(42)
+        jwks = JWKSKeySet({"keys": [public_jwk(pem, "k", algorithm)]})
+        verifier = TokenHelper(
+            SETTINGS, algorithm=algorithm, key_set=jwks, backend=PyJWTBackend()
+        )
+        assert verifier.decode_token(token)["sub"] == "42"
+
+    # Backend jose juga bisa verifikasi ES256 dari JWK
+    jose_verifier = TokenHelper(
+        SETTINGS, algorithm="ES256", private_key=ec_pem, key_id="k"
+    )
+    token = jose_verifier.create_access_token(1)
+    assert jose_verifier.decode_token(token)["sub"] == "1"
+
+    with pytest.raises(ValueError, match="tidak didukung"):
+        TokenHelper(SETTINGS, algorithm="EdDSA", private_key=ed_pem)
+    with pytest.raises(ValueError, match="tidak dikenal"):
+        get_jwt_backend("nope")
+    with pytest.raises(TypeError):
+        public_jwk(_pem(ed448.Ed448PrivateKey.generate()), "k", "EdDSA")
+
+
+def test_backends_normalize_errors_to_value_error(rsa_keys):
+    token = TokenHelper(SETTINGS, backend="pyjwt").create_access_token("u")
+    # Kompatibel lintas backend
+    assert TokenHelper(SETTINGS).decode_token(token)["sub"] == "u"
+
+    for backend in (JoseBackend(), PyJWTBackend()):
+        for call in (backend.unverified_header, backend.unverified_claims):
+            with pytest.raises(ValueError):
+                call("bukan.jwt")
+        with pytest.raises(ValueError):
+            backend.decode(
+                token, "secret-lain-yang-cukup-panjang-untuk-hmac", ["HS256"]
+            )
+        with pytest.raises(ValueError):
+            backend.load_jwk({"kty": "RSA", "alg": "nope"})
+
+    # public_jwk juga menerima PEM public key
+    public_pem = _public_pem(rsa_keys[1])
+    assert public_jwk(public_pem, None, "RS256") == {
+        **public_jwk(rsa_keys[1], None, "RS256")
+    }
+
+
+# ==========================================
+# 2. ROTASI KEY & CACHE JWKS
+# ==========================================
+def test_unknown_kid_triggers_single_flight_refetch(rsa_keys):
+    source = RotatingSource(public_jwk(rsa_keys[0], "k1", "RS256"))
+    key_set = JWKSKeySet(source, min_refetch_interval=0)
+    verifier = TokenHelper(SETTINGS, algorithm="RS256", key_set=key_set)
+
+    old = TokenHelper(SETTINGS, algorithm="RS256", private_key=rsa_keys[0], key_id="k1")
+    assert verifier.decode_token(old.create_access_token("a"))["sub"] == "a"
+    assert source.calls == 1
+
+    # Issuer rotasi ke k2: JWKS dipublikasikan dengan kedua key
+    source.keys.append(public_jwk(rsa_keys[1], "k2", "RS256"))
+    new_token = TokenHelper(
+        SETTINGS, algorithm="RS256", private_key=rsa_keys[1], key_id="k2"
+    ).create_access_token("b")
+
+    source.delay = 0.05
+    barrier = threading.Barrier(8)
+    results = []
+
+    def verify():
+        barrier.wait()
+        results.append(verifier.decode_token(new_token)["sub"])
+
+    threads = [threading.Thread(target=verify) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["b"] * 8
+    assert source.calls == 2  # 8 request bersamaan, satu refetch
+    assert sorted(key_set.kids) == ["k1", "k2"]
+
+
+def test_refresh_interval_refetch_budget_and_failures(rsa_keys):
+    now = [0.0]
+    source = RotatingSource(public_jwk(rsa_keys[0], "k1", "RS256"))
+    key_set = JWKSKeySet(
+        source, refresh_interval=300, min_refetch_interval=30, clock=lambda: now[0]
+    )
+
+    key_set.get("k1")
+    key_set.get("k1")
+    assert source.calls == 1
+
+    # kid acak dalam min_refetch_interval -> tidak fetch ulang
+    now[0] = 10
+    with pytest.raises(ValueError, match="kid 'acak'"):
+        key_set.get("acak")
+    assert source.calls == 1
+    now[0] = 40
+    with pytest.raises(ValueError):
+        key_set.get("acak")
+    assert source.calls == 2
+
+    # Refresh periodik gagal -> key lama tetap dipakai
+    source.fail = True
+    now[0] = 400
+    assert key_set.get("k1")["kid"] == "k1"
+    assert key_set.fetches == 2
+
+    # Belum pernah berhasil fetch -> error
+    with pytest.raises(ValueError, match="Gagal memuat JWKS"):
+        JWKSKeySet(source).get("k1")
+
+
+def test_jwks_from_file_and_http_endpoint(tmp_path, rsa_keys):
+    document = orjson.dumps(
+        {"keys": [public_jwk(rsa_keys[0], "k1", "RS256"), {"kty": "RSA", "use": "enc"}]}
+    )
+    path = tmp_path / "jwks.json"
+    path.write_bytes(document)
+    assert JWKSKeySet(path).kids == []  # Lazy: belum fetch
+    file_set = JWKSKeySet(str(path))
+    assert file_set.get("k1")["alg"] == "RS256"
+    assert file_set.kids == ["k1"]  # Key "enc" diabaikan
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(document)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+        assert JWKSKeySet(url).get("k1")["kid"] == "k1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_from_settings_builds_asymmetric_helpers(tmp_path, rsa_keys):
+    key_file = tmp_path / "private.pem"
+    key_file.write_bytes(rsa_keys[0])
+    jwks_file = tmp_path / "jwks.json"
+    jwks_file.write_bytes(
+        orjson.dumps({"keys": [public_jwk(rsa_keys[0], "k1", "RS256")]})
+    )
+
+    issuer = TokenHelper.from_settings(
+        BaseAppSettings(
+            JWT_ALGORITHM="RS256", JWT_PRIVATE_KEY_FILE=str(key_file), JWT_KEY_ID="k1"
+        )
+    )
+    verifier = TokenHelper.from_settings(
+        BaseAppSettings(
+            SECRET_KEY="tidak-dipakai",
+            JWT_ALGORITHM="RS256",
+            JWT_JWKS_URL=str(jwks_file),
+            JWT_BACKEND="pyjwt",
+            TOKEN_CACHE_SIZE=0,
+        )
+    )
+    assert verifier.cache is None
+    assert verifier.decode_token(issuer.create_access_token("u-9"))["sub"] == "u-9"
+
+
+# ==========================================
+# 3. BACKEND CRYPTOGRAPHY (NATIVE)
+# ==========================================
+def test_cryptography_backend_interoperates_with_jose_and_pyjwt(rsa_keys):
+    ec_pem = _pem(ec.generate_private_key(ec.SECP384R1()))
+    ed_pem = _pem(ed25519.Ed25519PrivateKey.generate())
+    cases = [
+        ("HS256", None, "jose"),
+        ("RS256", rsa_keys[0], "jose"),
+        ("ES384", ec_pem, "jose"),
+        ("EdDSA", ed_pem, "pyjwt"),
+    ]
+
+    for algorithm, pem, other in cases:
+        native = TokenHelper(
+            SETTINGS,
+            algorithm=algorithm,
+            private_key=pem,
+            key_id="k",
+            backend="cryptography",
+        )
+        reference = TokenHelper(
+            SETTINGS, algorithm=algorithm, private_key=pem, key_id="k", backend=other
+        )
+        # Dua arah: token native diterima library lain & sebaliknya
+        assert reference.decode_token(native.create_access_token("n"))["sub"] == "n"
+        assert native.decode_token(reference.create_access_token("r"))["sub"] == "r"
+
+
+def test_cryptography_backend_rejects_invalid_tokens(rsa_keys):
+    now = [1_000.0]
+    backend = get_jwt_backend("cryptography")
+    backend.clock = lambda: now[0]
+    secret = SETTINGS.SECRET_KEY
+    token = backend.encode(
+        {"sub": "u", "exp": 1_010, "nbf": 990},
+        secret,
+        "HS256",
+        {"kid": "k", "cty": "x"},
+    )
+    assert backend.unverified_header(token) == {
+        "alg": "HS256",
+        "typ": "JWT",
+        "kid": "k",
+        "cty": "x",
+    }
+    assert backend.unverified_claims(token)["sub"] == "u"
+    assert backend.decode(token, secret, ["HS256"])["exp"] == 1_010
+
+    header, payload, signature = token.split(".")
+    none_header, es_header = _b64url(b'{"alg":"none"}'), _b64url(b'{"alg":"ES256"}')
+    public_key = serialization.load_pem_private_key(rsa_keys[0], None).public_key()
+    ec_public = ec.generate_private_key(ec.SECP256R1()).public_key()
+    invalid = {
+        "alg tidak diizinkan": (token, secret, ["RS256"]),
+        "alg none": (f"{none_header}.{payload}.", secret, ["none"]),
+        "signature salah": (
+            f"{header}.{payload}.{_b64url(b'x' * 32)}",
+            secret,
+            ["HS256"],
+        ),
+        "HS256 + public key": (token, public_key, ["HS256"]),
+        "RS256 + secret": (
+            backend.encode({}, backend.load_private_key(rsa_keys[0], "RS256"), "RS256"),
+            secret,
+            ["RS256"],
+        ),
+        "ES256 panjang salah": (
+            f"{es_header}.{payload}.{_b64url(b'x')}",
+            ec_public,
+            ["ES256"],
+        ),
+        "ES256 signature salah": (
+            f"{es_header}.{payload}.{_b64url(b'x' * 64)}",
+            ec_public,
+            ["ES256"],
+        ),
+        "bukan 3 bagian": ("a.b", secret, ["HS256"]),
+        "header bukan object": (
+            f"{_b64url(b'[1]')}.{payload}.{signature}",
+            secret,
+            ["HS256"],
+        ),
+    }
+    for case, (bad, key, algorithms) in invalid.items():
+        with pytest.raises(ValueError):
+            backend.decode(bad, key, algorithms)
+            pytest.fail(case)
+
+    def signed(raw_payload: bytes) -> str:
+        message = f"{header}.{_b64url(raw_payload)}"
+        mac = hmac.new(secret.encode(), message.encode(), hashlib.sha256).digest()
+        return f"{message}.{_b64url(mac)}"
+
+    for raw, message in (
+        (b"[1]", "bukan object"),
+        (b'{"exp":"besok"}', "expired"),
+        (b'{"nbf":2000}', "not yet valid"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            backend.decode(signed(raw), secret, ["HS256"])
+    now[0] = 1_010
+    with pytest.raises(ValueError, match="expired"):
+        backend.decode(token, secret, ["HS256"])
+
+    # Payload bukan JSON (signature valid)
+    broken = signed(b"{rusak")
+    for call in (
+        lambda: backend.decode(broken, secret, ["HS256"]),
+        lambda: backend.unverified_claims(broken),
+    ):
+        with pytest.raises(ValueError, match="Payload"):
+            call()
+
+    with pytest.raises(ValueError, match="Private key"):
+        backend.load_private_key("bukan pem", "RS256")
+    for bad_jwk in (
+        {"kty": "oct"},
+        {"kty": "RSA"},
+        {"kty": "OKP", "crv": "Ed448", "x": "AA"},
+    ):
+        with pytest.raises(ValueError):
+            backend.load_jwk(bad_jwk)
+    for backend_name in ("jose", "pyjwt"):
+        with pytest.raises(ValueError, match="Private key"):
+            get_jwt_backend(backend_name).load_private_key("bukan pem", "RS256")
@@ -0,0 +1,359 @@
+# tests/unit/test_memory_backend.py
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import DataError, ResponseError
+
+from std_pack.domain.events import DomainEvent
+from std_pack.domain.exceptions import TooManyRequestsError
+from std_pack.infrastructure.cache.memory import MemoryRedis, reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.cache.store import RedisCache
+from std_pack.infrastructure.events.redis_bus import RedisMessageBus
+from std_pack.infrastructure.security.rate_limit import RateLimiter
+
+
+class OrderPlaced(DomainEvent):
+    order_id: int
+
+
+@pytest.fixture(autouse=True)
+def clean_stores():
+    reset_memory_stores()
+    yield
+    reset_memory_stores()
+
+
+# ==========================================
+# 1. STRING, TTL & TIPE DATA
+# ==========================================
+@pytest.mark.asyncio
+async def test_memory_strings_and_ttl():
+    client = MemoryRedis.from_url("memory://", decode_responses=True)
+
+    assert await client.ping() is True
+    assert await client.set("a", 1) is True
+    assert await client.get("a") == "1"
+    assert await client.set("a", 2, nx=True) is None
+    assert await client.set("missing", 2, xx=True) is None
+    assert await client.set("a", "x", get=True) == "1"
+    assert await client.mget(["a", "nope"]) == ["x", None]
+    await client.mset({"b": 1.5, "c": b"raw"})
+    assert await client.mget("b", "c") == ["1.5", "raw"]
+    assert await client.getdel("c") == "raw"
+    assert await client.exists("a", "b", "c") == 2
+
+    # INCR + error seperti Redis
+    assert await client.incr("n") == 1
+    assert await client.incrby("n", 5) == 6
+    assert await client.decr("n") == 5
+    with pytest.raises(ResponseError):
+        await client.incr("a")
+    with pytest.raises(DataError):
+        await client.set("flag", True)
+
+    # TTL nyata
+    assert await client.ttl("n") == -1
+    assert await client.ttl("ghost") == -2
+    assert await client.expire("ghost", 10) is False
+    await client.set("short", "v", px=30)
+    assert 0 < await client.pttl("short") <= 30
+    await client.set("short", "v2", keepttl=True)
+    assert await client.pttl("short") > 0
+    await asyncio.sleep(0.05)
+    assert await client.get("short") is None
+
+    await client.setex("s", 10, "v")
+    assert await client.ttl("s") == 10
+    assert await client.persist("s") is True
+    assert await client.ttl("s") == -1
+    assert await client.pexpire("s", 0) is True
+    assert await client.exists("s") == 0
+    assert await client.setnx("s", "again") is True
+
+    assert sorted(await client.keys("*")) == ["a", "b", "n", "s"]
+    assert await client.delete("a", "ghost") == 1
+    assert await client.dbsize() == 3
+    await client.flushdb()
+    assert await client.dbsize() == 0
+
+    with pytest.raises(AttributeError):
+        await client.lpush("queue", 1)
+
+
+@pytest.mark.asyncio
+async def test_memory_hash_set_zset_and_wrongtype():
+    client = MemoryRedis.from_url("memory://types")
+
+    assert await client.hset("h", "f", 1, mapping={"g": "x"}) == 2
+    assert await client.hget("h", "f") == b"1"
+    assert await client.hmget("h", ["f", "nope"]) == [b"1", None]
+    assert await client.hincrby("h", "f", 2) == 3
+    assert await client.hgetall("h") == {b"f": b"3", b"g": b"x"}
+    assert await client.hdel("h", "f", "g") == 2
+    assert await client.exists("h") == 0  # Hash kosong otomatis dihapus
+    with pytest.raises(DataError):
+        await client.hset("h")
+
+    assert await client.sadd("s", "a", "b", "a") == 2
+    assert await client.sismember("s", "a") is True
+    assert await client.smismember("s", ["a", "z"]) == [True, False]
+    assert await client.smembers("s") == {b"a", b"b"}
+    assert await client.srem("s", "a", "z") == 1
+    assert await client.scard("s") == 1
+
+    assert await client.zadd("z", {"late": 30, "early": 10, "mid": 20}) == 3
+    assert await client.zadd("z", {"early": 5}, nx=True) == 0
+    assert await client.zscore("z", "early") == 10.0
+    assert await client.zrangebyscore("z", "-inf", 20) == [b"early", b"mid"]
+    assert await client.zrangebyscore(
+        "z", 0, "+inf", start=1, num=1, withscores=True
+    ) == [(b"mid", 20.0)]
+    assert await client.zremrangebyscore("z", "(0", 15) == 1
+    assert await client.zcard("z") == 2
+
+    # Tipe salah -> WRONGTYPE
+    with pytest.raises(ResponseError, match="WRONGTYPE"):
+        await client.get("z")
+    with pytest.raises(ResponseError, match="WRONGTYPE"):
+        await client.hget("z", "late")
+
+
+# ==========================================
+# 2. PIPELINE & PUB/SUB
+# ==========================================
+@pytest.mark.asyncio
+async def test_memory_pipeline_is_atomic_and_reports_errors():
+    client = MemoryRedis.from_url("memory://pipe", decode_responses=True)
+    await client.set("text", "abc")
+
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.incr("counter").ttl("counter")
+        pipe.incr("text")
+        assert len(pipe) == 3
+        results = await pipe.execute(raise_on_error=False)
+    assert results[:2] == [1, -1]
+    assert isinstance(results[2], ResponseError)
+
+    pipe = client.pipeline()
+    pipe.multi()
+    pipe.incr("text")
+    pipe.incr("counter")
+    with pytest.raises(ResponseError):
+        await pipe.execute()
+    # Command lain tetap dijalankan (semantik Redis)
+    assert await client.get("counter") == "2"
+
+    with pytest.raises(AttributeError):
+        client.pipeline().lpush("queue", 1)
+
+
+@pytest.mark.asyncio
+async def test_memory_pubsub_channels_and_patterns():
+    client = MemoryRedis.from_url("memory://bus", decode_responses=True)
+    pubsub = client.pubsub()
+    await pubsub.connect()
+    await pubsub.subscribe("events:A")
+    await pubsub.psubscribe("events:*")
+    assert pubsub.subscribed
+
+    assert await client.publish("events:A", "hello") == 2
+    assert await client.publish("other", "x") == 0
+
+    ack = await pubsub.get_message()
+    assert ack["type"] == "subscribe"
+    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+    assert message == {
+        "type": "message",
+        "pattern": None,
+        "channel": "events:A",
+        "data": "hello",
+    }
+    pmessage = await pubsub.get_message(timeout=None)
+    assert pmessage["type"] == "pmessage" and pmessage["pattern"] == "events:*"
+    assert await pubsub.get_message(timeout=0.01) is None
+
+    await pubsub.unsubscribe()
+    await pubsub.punsubscribe("events:*")
+    assert not pubsub.subscribed
+    await pubsub.aclose()
+    assert await client.publish("events:A", "gone") == 0
+
+    quiet = client.pubsub(ignore_subscribe_messages=True)
+    await quiet.subscribe("c")
+    await client.publish("c", "only-data")
+    listener = quiet.listen()
+    assert (await listener.__anext__())["data"] == "only-data"
+    await quiet.aclose()
+
+
+# ==========================================
+# 3. STREAMS
+# ==========================================
+@pytest.mark.asyncio
+async def test_memory_streams_consumer_group():
+    client = MemoryRedis.from_url("memory://streams", decode_responses=True)
+    with pytest.raises(ResponseError):
+        await client.xgroup_create("s", "g")
+    assert await client.xgroup_create("s", "g", id="0", mkstream=True) is True
+    with pytest.raises(ResponseError, match="BUSYGROUP"):
+        await client.xgroup_create("s", "g")
+
+    first = await client.xadd("s", {"n": 1})
+    await client.xadd("s", {"n": 2})
+    await client.xadd("s", {"n": 3}, maxlen=2)
+    assert await client.xlen("s") == 2
+    assert await client.xadd("nostream", {"n": 1}, nomkstream=True) is None
+    with pytest.raises(ResponseError):
+        await client.xadd("s", {"n": 4}, id=first)
+
+    entries = await client.xrange("s", count=1)
+    assert entries[0][1] == {"n": "2"}
+
+    read = await client.xreadgroup("g", "c1", {"s": ">"}, count=10)
+    assert [fields["n"] for _, fields in read[0][1]] == ["2", "3"]
+    # History pending untuk consumer yang sama (redelivery)
+    pending = await client.xreadgroup("g", "c1", {"s": "0"})
+    assert len(pending[0][1]) == 2
+    assert await client.xack("s", "g", read[0][1][0][0], "0-1") == 1
+    assert await client.xreadgroup("g", "c1", {"s": ">"}, block=10) == []
+    with pytest.raises(ResponseError, match="NOGROUP"):
+        await client.xreadgroup("nope", "c1", {"s": ">"})
+
+    # BLOCK: dibangunkan oleh XADD dari coroutine lain
+    reader = asyncio.create_task(client.xreadgroup("g", "c2", {"s": ">"}, block=0))
+    await asyncio.sleep(0)
+    await client.xadd("s", {"n": 5})
+    result = await asyncio.wait_for(reader, 1)
+    assert result[0][1][0][1] == {"n": "5"}
+
+    tail = asyncio.create_task(client.xread({"s": "$"}, block=1000))
+    await asyncio.sleep(0)
+    last = await client.xadd("s", {"n": 6}, id="99999999999999-0")
+    assert (await asyncio.wait_for(tail, 1))[0][1][0][0] == last
+    assert await client.xread({"s": last}) == []
+    assert await client.xread({"ghost": "0"}) == []
+    assert await client.xdel("s", last, "1-1") == 1
+    assert await client.xdel("ghost", "1-1") == 0
+
+
+# ==========================================
+# 4. INTEGRASI DENGAN KOMPONEN STD_PACK
+# ==========================================
+@pytest.mark.asyncio
+async def test_redis_manager_memory_url_end_to_end():
+    manager = RedisManager(
+        "memory://app", auto_pipeline=True, client_cache_prefixes=["flags:"]
+    )
+    await manager.init_cache()
+    assert isinstance(manager.client, MemoryRedis)
+    # CLIENT TRACKING tidak ada -> client-side cache turun ke mode TTL
+    assert manager.get_local_cache().mode == "ttl"
+
+    # Text & binary client berbagi keyspace
+    text = manager.get_client()
+    await text.set("flags:checkout", "on")
+    assert await manager.get_binary_client().get("flags:checkout") == b"on"
+    assert await manager.get_local_cache().get("flags:checkout") == "on"
+
+    cache = RedisCache(manager, prefix="users")
+    await cache.set_many({"1": {"name": "A"}, "2": {"name": "B"}}, ttl=60)
+    assert await cache.get_many(["1", "2", "3"]) == {
+        "1": {"name": "A"},
+        "2": {"name": "B"},
+    }
+    assert await cache.delete("1") == 1
+
+    assert manager.pool_stats()["pools"]["text"]["max"] is None
+    await manager.close()
+
+    with pytest.raises(ValueError):
+        RedisManager("memory://", mode="cluster")
+    with pytest.raises(ValueError):
+        MemoryRedis.from_url("redis://localhost")
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_and_bus_on_memory_backend():
+    manager = RedisManager("memory://svc")
+    await manager.init_cache()
+
+    request = MagicMock()
+    request.state.redis = manager.get_client()
+    request.client.host = "10.0.0.1"
+    request.scope = {"route": MagicMock(path="/login")}  # Route sudah di-resolve
+    request.method = "POST"
+    limiter = RateLimiter(times=2, seconds=60)
+    await limiter(request, None)
+    await limiter(request, None)
+    with pytest.raises(TooManyRequestsError):
+        await limiter(request, None)
+    assert await manager.get_client().ttl("rl:{10.0.0.1}:/login:POST") == 60
+
+    pubsub = manager.get_client().pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe("events:OrderPlaced")
+    bus = RedisMessageBus(manager)
+    await bus.publish(OrderPlaced(order_id=7))
+    await bus.publish_batch([OrderPlaced(order_id=8)])
+    first = await pubsub.get_message(timeout=0.1)
+    second = await pubsub.get_message(timeout=0.1)
+    assert OrderPlaced.model_validate_json(first["data"]).order_id == 7
+    assert OrderPlaced.model_validate_json(second["data"]).order_id == 8
+    await pubsub.aclose()
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_expiry_sweep():
+    client = MemoryRedis.from_url("memory://sweep")
+    with patch("std_pack.infrastructure.cache.memory._SWEEP_EVERY", 4):
+        for i in range(3):
+            await client.set(f"k{i}", i, px=1)
+        await asyncio.sleep(0.01)
+        await client.set("trigger", 1)  # Write ke-4 memicu sweep
+    assert client.store._data.keys() == {"trigger"}
+
+
+@pytest.mark.asyncio
+async def test_memory_xautoclaim_and_xpending():
+    client = MemoryRedis.from_url("memory://claim")
+    await client.xgroup_create("s", "g", id="0", mkstream=True)
+    for i in range(3):
+        await client.xadd("s", {"n": i})
+    await client.xreadgroup("g", "dead", {"s": ">"})
+    summary = await client.xpending("s", "g")
+    assert summary["pending"] == 3
+    assert summary["consumers"] == [{"name": b"dead", "pending": 3}]
+
+    # Entry pertama di-trim -> dilaporkan sebagai deleted
+    first = (await client.xrange("s", count=1))[0][0]
+    await client.xdel("s", first)
+    next_id, claimed, deleted = await client.xautoclaim("s", "g", "alive", 0, count=1)
+    assert deleted == [first] and claimed == []
+    next_id, claimed, deleted = await client.xautoclaim(
+        "s", "g", "alive", 0, start_id=next_id, justid=True
+    )
+    assert len(claimed) == 2 and isinstance(claimed[0], bytes)
+    assert next_id == b"0-0"
+    # Belum idle cukup lama -> tidak diambil
+    assert (await client.xautoclaim("s", "g", "other", 60_000))[1] == []
+    assert (await client.xpending("s", "g"))["consumers"] == [
+        {"name": b"alive", "pending": 2}
+    ]
+
+    # XPENDING rentang: times_delivered naik setiap kali di-claim
+    details = await client.xpending_range("s", "g", min="-", max="+", count=10)
+    assert [d["message_id"] for d in details] == claimed
+    assert [d["times_delivered"] for d in details] == [2, 2]
+    assert details[0]["consumer"] == b"alive"
+    assert len(await client.xpending_range("s", "g", "-", "+", 1)) == 1
+    assert (
+        await client.xpending_range("s", "g", "-", "+", 10, consumername="dead") == []
+    )
+    assert await client.xpending_range("s", "g", "-", "+", 10, idle=60_000) == []
+    # time_since_delivered ikut jam dinding -> bandingkan ID saja
+    tail = await client.xpending_range("s", "g", claimed[1], "+", 10)
+    assert [d["message_id"] for d in tail] == claimed[1:]
+    await client.xack("s", "g", *claimed)
+    assert (await client.xpending("s", "g"))["min"] is None
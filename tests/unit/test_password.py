@@ -0,0 +1,179 @@
+# tests/unit/test_password.py
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from std_pack.config import BaseAppSettings, refresh_settings, set_settings
+from std_pack.domain.exceptions import TooManyRequestsError
+from std_pack.infrastructure.security import (
+    AsyncPasswordHasher,
+    get_password_hasher,
+    hash_password,
+    hash_password_async,
+    needs_rehash,
+    set_password_hasher,
+    verify_password,
+    verify_password_async,
+)
+
+
+async def _heartbeat(
+    stop: asyncio.Event, alive: threading.Event, ticks: list[int]
+) -> None:
+    """Request 'lain' di worker yang sama: hitung tick event loop."""
+    while not stop.is_set():
+        await asyncio.sleep(0)
+        ticks[0] += 1
+        if ticks[0] >= 3:
+            alive.set()
+
+
+# ==========================================
+# 1. LATENCY: EVENT LOOP TIDAK TERBLOKIR
+# ==========================================
+@pytest.mark.asyncio
+async def test_login_burst_does_not_stall_event_loop():
+    hasher = AsyncPasswordHasher(rounds=4, max_workers=2)
+    stored = hash_password("rahasia", rounds=4)
+    verify = hasher.policy.verify
+    threads: list[str] = []
+    loop_progressed: list[bool] = []
+    alive = threading.Event()
+
+    def recording_verify(plain: str, hashed: str) -> bool:
+        threads.append(threading.current_thread().name)
+        # Tunggu sampai event loop bergerak SELAMA hash berjalan. Jika verify
+        # jalan di thread loop, heartbeat tidak pernah tick dan wait timeout.
+        loop_progressed.append(alive.wait(timeout=5))
+        return verify(plain, hashed)
+
+    # Burst 6 login lewat thread pool khusus: loop tetap jalan
+    stop = asyncio.Event()
+    ticks = [0]
+    beat = asyncio.create_task(_heartbeat(stop, alive, ticks))
+    with patch.object(hasher.policy, "verify", recording_verify):
+        results = await asyncio.gather(
+            *(hasher.verify("rahasia", stored) for _ in range(6))
+        )
+    stop.set()
+    await beat
+
+    assert results == [True] * 6
+    assert len(threads) == 6
+    assert all(name.startswith("password-hash") for name in threads)
+    assert threading.current_thread().name not in threads
+    assert loop_progressed == [True] * 6
+    assert ticks[0] >= 3
+    hasher.close()
+
+
+@pytest.mark.asyncio
+async def test_flood_is_rejected_instead_of_queued_forever():
+    hasher = AsyncPasswordHasher(rounds=4, max_workers=1, max_waiting=1)
+    stored = hash_password("x", rounds=4)
+
+    results = await asyncio.gather(
+        *(hasher.verify("x", stored) for _ in range(4)), return_exceptions=True
+    )
+    assert sum(r is True for r in results) == 2
+    assert sum(isinstance(r, TooManyRequestsError) for r in results) == 2
+    assert hasher.stats()["rejected"] == 2
+
+    # Slot dikembalikan setelah selesai (juga saat error)
+    with pytest.raises(ValueError):
+        await hasher.verify("x", "bukan-hash")
+    assert await hasher.verify("x", stored) is True
+    hasher.close()
+
+    for kwargs in ({"rounds": 3}, {"max_workers": 0}, {"max_waiting": -1}):
+        with pytest.raises(ValueError):
+            AsyncPasswordHasher(**kwargs)
+
+
+# ==========================================
+# 2. COST & UPGRADE HASH SAAT LOGIN
+# ==========================================
+@pytest.mark.asyncio
+async def test_verify_and_update_upgrades_old_cost():
+    old_hash = hash_password("rahasia", rounds=4)
+    assert old_hash.startswith("$2b$04$")
+    assert needs_rehash(old_hash, rounds=5) is True
+    assert needs_rehash(old_hash, rounds=4) is False
+    assert needs_rehash("$2a$04$abc", rounds=4) is True
+    assert needs_rehash("plaintext", rounds=4) is True
+
+    hasher = AsyncPasswordHasher(rounds=5)
+    assert await hasher.verify_and_update("salah", old_hash) == (False, None)
+
+    valid, new_hash = await hasher.verify_and_update("rahasia", old_hash)
+    assert valid is True
+    assert new_hash.startswith("$2b$05$")
+    assert verify_password("rahasia", new_hash) is True
+
+    # Sudah sesuai konfigurasi -> tidak di-hash ulang
+    assert await hasher.verify_and_update("rahasia", new_hash) == (True, None)
+    assert hasher.stats() == {"scheme": "bcrypt", "rejected": 0, "rehashed": 1}
+    hasher.close()
+
+
+@pytest.mark.asyncio
+async def test_process_wide_hasher_follows_settings():
+    try:
+        set_settings(BaseAppSettings(PASSWORD_BCRYPT_ROUNDS=4, PASSWORD_HASH_WORKERS=1))
+        hasher = get_password_hasher()
+        assert get_password_hasher() is hasher
+        hashed = await hash_password_async("rahasia")
+        assert hashed.startswith("$2b$04$")
+        assert await verify_password_async("rahasia", hashed) is True
+
+        # Settings di-refresh -> hasher dibangun ulang dengan cost baru
+        set_settings(BaseAppSettings(PASSWORD_BCRYPT_ROUNDS=5))
+        assert get_password_hasher() is not hasher
+        assert get_password_hasher().policy.default.rounds == 5
+
+        custom = AsyncPasswordHasher(rounds=6)
+        set_password_hasher(custom)
+        assert get_password_hasher() is custom
+    finally:
+        set_password_hasher(None)
+        refresh_settings(BaseAppSettings)
+
+
+@pytest.mark.asyncio
+async def test_settings_refresh_during_burst_does_not_cancel_queued_verifies():
+    try:
+        set_settings(BaseAppSettings(PASSWORD_BCRYPT_ROUNDS=4, PASSWORD_HASH_WORKERS=4))
+        hasher = get_password_hasher()
+        stored = hash_password("rahasia", rounds=4)
+        verify = hasher.policy.verify
+        started: list[str] = []
+        release = threading.Event()
+
+        def gated_verify(plain: str, hashed: str) -> bool:
+            started.append(threading.current_thread().name)
+            release.wait(5)
+            return verify(plain, hashed)
+
+        with patch.object(hasher.policy, "verify", gated_verify):
+            burst = asyncio.gather(
+                *(verify_password_async("rahasia", stored) for _ in range(12)),
+                return_exceptions=True,
+            )
+            # 4 worker sibuk, 8 verify masih antri di executor lama
+            while len(started) < 4:
+                await asyncio.sleep(0.01)
+
+            # Refresh settings di tengah burst -> hasher lama ditutup
+            set_settings(BaseAppSettings(PASSWORD_BCRYPT_ROUNDS=5))
+            assert get_password_hasher() is not hasher
+            release.set()
+            results = await burst
+
+        # Antrian lama tetap diselesaikan, tidak ada yang di-cancel
+        assert results == [True] * 12
+        assert len(started) == 12
+    finally:
+        set_password_hasher(None)
+        refresh_settings(BaseAppSettings)
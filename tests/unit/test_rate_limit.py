@@ -0,0 +1,502 @@
+# tests/unit/test_rate_limit.py
+import asyncio
+import hashlib
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from redis.exceptions import (
+    ConnectionError as RedisConnectionError,
+)
+from redis.exceptions import (
+    NoScriptError,
+    ResponseError,
+)
+
+from std_pack.domain.exceptions import DomainException, TooManyRequestsError
+from std_pack.infrastructure.cache.memory import MemoryRedis, reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.security import rate_limit_algorithms
+from std_pack.infrastructure.security.jwks import JWKSKeySet
+from std_pack.infrastructure.security.rate_limit import (
+    RateLimiter,
+    key_by_api_key,
+    key_by_ip,
+    key_by_user,
+    parse_limits,
+)
+from std_pack.infrastructure.security.rate_limit_algorithms import (
+    ALGORITHMS,
+    get_rate_limit_algorithm,
+    load_rate_limit_scripts,
+)
+from std_pack.infrastructure.security.rate_limit_local import LocalTokenBuckets
+from std_pack.infrastructure.security.token import TokenHelper, set_token_verifier
+from std_pack.presentation.http import RateLimitMiddleware, domain_exception_handler
+
+SLIDING = ["sliding_log", "sliding_window", "gcra"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Jam palsu (ms) untuk emulasi script di memory backend."""
+    now = {"ms": 1_760_000_000_000.0}
+    monkeypatch.setattr(rate_limit_algorithms, "_now_ms", lambda: now["ms"])
+    return now
+
+
+@pytest.fixture
+def redis():
+    reset_memory_stores()
+    yield MemoryRedis.from_url("memory://rate-limit", decode_responses=True)
+    reset_memory_stores()
+
+
+async def _burst(algorithm, redis, n, limit=10, seconds=10):
+    return [
+        await algorithm.check(redis, ["rl:{u}:/x"], [(limit, seconds)])
+        for _ in range(n)
+    ]
+
+
+# ==========================================
+# 1. ALGORITMA
+# ==========================================
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+async def test_allows_limit_then_rejects_with_quota_info(name, redis, clock):
+    algorithm = get_rate_limit_algorithm(name)
+    results = await _burst(algorithm, redis, 11)
+
+    assert [r.allowed for r in results] == [True] * 10 + [False]
+    assert [r.remaining for r in results[:10]] == list(range(9, -1, -1))
+    assert results[-1].remaining == 0
+    # Sliding window: count window sekarang baru hilang penuh satu window kemudian
+    assert 0 < results[-1].retry_after <= 2 * 10
+    assert all(r.limit == 10 and 0 < r.reset_after <= 2 * 10 for r in results)
+    # Key selalu punya TTL (dibuat di dalam script yang sama)
+    assert 0 < await redis.pttl("rl:{u}:/x") <= 20_000
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", SLIDING)
+async def test_no_double_burst_at_window_edge(name, redis, clock):
+    algorithm = get_rate_limit_algorithm(name)
+    clock["ms"] = 1_760_000_009_000.0  # 90% window fixed [..000, ..010)
+    assert all(r.allowed for r in await _burst(algorithm, redis, 10))
+
+    clock["ms"] += 2_000  # Window fixed baru sudah mulai
+    allowed = sum(r.allowed for r in await _burst(algorithm, redis, 10))
+    assert allowed <= 2  # Fixed window akan meloloskan 10 lagi
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", SLIDING)
+async def test_retry_after_is_accurate(name, redis, clock):
+    algorithm = get_rate_limit_algorithm(name)
+    await _burst(algorithm, redis, 10)
+    rejected = (await _burst(algorithm, redis, 1))[0]
+    assert not rejected.allowed
+
+    clock["ms"] += rejected.retry_after * 1000 - 5
+    assert not (await _burst(algorithm, redis, 1))[0].allowed
+    clock["ms"] += 5
+    assert (await _burst(algorithm, redis, 1))[0].allowed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+async def test_multiple_limits_are_all_or_nothing(name, redis, clock):
+    algorithm = get_rate_limit_algorithm(name)
+    keys = ["rl:{u}:burst", "rl:{u}:hour"]
+    limits = [(2, 1), (3, 3600)]
+
+    first = await algorithm.check(redis, keys, limits)
+    assert first.allowed and first.limit == 2 and first.remaining == 1
+    second = await algorithm.check(redis, keys, limits, cost=2)
+    assert not second.allowed  # Limit burst habis -> limit jam tidak ikut terpakai
+    third = await algorithm.check(redis, keys, limits)
+    assert third.allowed and third.remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_arguments(redis):
+    algorithm = get_rate_limit_algorithm("gcra")
+    with pytest.raises(ValueError, match="tidak dikenal"):
+        get_rate_limit_algorithm("leaky")
+    with pytest.raises(ValueError):
+        await algorithm.check(redis, ["a", "b"], [(1, 1)])
+    with pytest.raises(ValueError):
+        await algorithm.check(redis, ["a"], [(1, 1)], cost=2)
+
+
+# ==========================================
+# 2. SCRIPT CACHE
+# ==========================================
+@pytest.mark.asyncio
+async def test_scripts_loaded_at_startup_and_reloaded_after_flush(redis, clock):
+    shas = [a.sha for a in ALGORITHMS.values()]
+    assert await redis.script_exists(*shas) == [False] * 4
+    await load_rate_limit_scripts(redis)
+    assert await redis.script_exists(*shas) == [True] * 4
+
+    # Redis restart / SCRIPT FLUSH -> NOSCRIPT -> fallback EVAL, cache terisi lagi
+    await redis.script_flush()
+    with pytest.raises(NoScriptError):
+        await redis.evalsha(shas[0], 1, "k", 1, 1, 1000)
+    result = await ALGORITHMS["gcra"].check(redis, ["rl:{u}:x"], [(5, 1)])
+    assert result.allowed and result.remaining == 4
+    assert await redis.script_exists(ALGORITHMS["gcra"].sha) == [True]
+
+    # Script tanpa emulasi tidak bisa jalan di memory backend
+    with pytest.raises(ResponseError, match="emulasi"):
+        await redis.eval("return 1", 0)
+
+
+# ==========================================
+# 3. PRE-LIMITER LOKAL (LEASE)
+# ==========================================
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["fixed_window", "sliding_window"])
+async def test_local_buckets_cut_redis_calls_without_exceeding_limit(
+    name, redis, clock
+):
+    # Dua worker berbagi satu Redis; chunk = 5% x 1000 = 50
+    workers = [LocalTokenBuckets(name, accuracy=0.05) for _ in range(2)]
+    results = [
+        await workers[i % 2].check(redis, ["rl:{api}:/search"], [(1000, 60)])
+        for i in range(1200)
+    ]
+
+    allowed = sum(r.allowed for r in results)
+    assert 1000 - 2 * 50 <= allowed <= 1000  # Tidak pernah lebih dari limit
+    leases = sum(w.stats()["leases"] for w in workers)
+    assert leases <= 1000 // 50 + 4  # vs 1200 EVALSHA tanpa pre-limiter
+    assert workers[0].stats()["redis_ratio"] < 0.05
+
+    # Setelah ditolak Redis, penolakan dijawab lokal sampai retry_after
+    before = workers[0].leases
+    rejected = await workers[0].check(redis, ["rl:{api}:/search"], [(1000, 60)])
+    assert not rejected.allowed and rejected.retry_after > 0
+    assert workers[0].leases == before and workers[0].local_rejects > 0
+
+
+@pytest.mark.asyncio
+async def test_local_lease_is_single_flight_and_expires(redis):
+    now = {"s": 0.0}
+    buckets = LocalTokenBuckets(accuracy=0.5, clock=lambda: now["s"])
+    key, limits = ["rl:{u}:/feed"], [(10, 60)]
+
+    results = await asyncio.gather(
+        *(buckets.check(redis, key, limits) for _ in range(5))
+    )
+    assert all(r.allowed for r in results)
+    assert buckets.leases == 1  # 5 coroutine, satu lease (chunk 5)
+    assert [r.remaining for r in results] == [4, 3, 2, 1, 0]
+
+    # Lease habis masa berlakunya (window Redis sudah lewat) -> lease ulang
+    await buckets.check(redis, key, limits)
+    assert buckets.leases == 2
+    now["s"] += 61
+    await buckets.check(redis, key, limits)
+    assert buckets.leases == 3
+
+
+@pytest.mark.asyncio
+async def test_local_lease_partial_grant_and_eviction(redis):
+    buckets = LocalTokenBuckets(accuracy=0.5, max_keys=1)
+    key, limits = ["rl:{u}:/bulk"], [(10, 60)]
+    for _ in range(4):
+        # 10 token di-lease
+        assert (await buckets.check(redis, key, limits, cost=2)).allowed
+    # Sisa lokal 2 < cost 3 dan Redis sudah habis -> ditolak, token tetap disimpan
+    assert not (await buckets.check(redis, key, limits, cost=3)).allowed
+    assert (await buckets.check(redis, key, limits, cost=2)).allowed
+
+    await buckets.check(redis, ["rl:{other}:/bulk"], limits)
+    assert buckets.stats()["keys"] == 1  # LRU: key lama dibuang
+
+    with pytest.raises(ValueError):
+        await buckets.check(redis, key, limits, cost=11)
+    for kwargs in (
+        {"accuracy": 0},
+        {"accuracy": 1.5},
+        {"max_keys": 0},
+        {"algorithm": "gcra"},
+    ):
+        with pytest.raises(ValueError):
+            LocalTokenBuckets(**kwargs)
+    with pytest.raises(ValueError, match="lease"):
+        await get_rate_limit_algorithm("gcra").lease(redis, key, limits, 5)
+
+
+# ==========================================
+# 4. DEPENDENCY
+# ==========================================
+@pytest.mark.asyncio
+async def test_rate_limiter_dependency_uses_selected_algorithm(redis, clock):
+    request = MagicMock()
+    request.state.redis = redis
+    request.client.host = "10.0.0.9"
+    request.method = "POST"
+
+    limiter = RateLimiter(times=2, seconds=30, algorithm="gcra", scope="otp")
+    await limiter(request, None)
+    await limiter(request, None)
+    with pytest.raises(TooManyRequestsError) as exc:
+        await limiter(request, None)
+    assert exc.value.retry_after == 15  # GCRA: satu slot pulih tiap 30/2 detik
+
+    # Dengan pre-limiter lokal: limit tetap ditegakkan, Redis hanya disentuh per chunk
+    local = RateLimiter(times=100, seconds=60, local_accuracy=0.1, scope="search")
+    for _ in range(100):
+        await local(request, None)
+    with pytest.raises(TooManyRequestsError):
+        await local(request, None)
+    assert local.local.leases == 11
+
+
+# ==========================================
+# 5. KEY FUNCTION, HEADER, MIDDLEWARE
+# ==========================================
+def _app(*limiters, dependency=None):
+    app = FastAPI()
+    app.add_exception_handler(DomainException, domain_exception_handler)
+    if limiters:
+        app.add_middleware(RateLimitMiddleware, limiters=list(limiters))
+    deps = [Depends(dependency)] if dependency else []
+
+    @app.post("/login", dependencies=deps)
+    async def login():
+        return {"ok": True}
+
+    @app.get("/orders/{order_id}", dependencies=deps)
+    async def order(order_id: int):
+        return {"id": order_id}
+
+    return app
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_parse_limits():
+    assert parse_limits("10/second; 1000/hour") == [(10, 1), (1000, 3600)]
+    assert parse_limits("100/5m, 5/days") == [(100, 300), (5, 86400)]
+    for spec in ("", "10/fortnight", "sepuluh/second"):
+        with pytest.raises(ValueError):
+            parse_limits(spec)
+    with pytest.raises(ValueError):
+        RateLimiter(limits=[])
+    with pytest.raises(ValueError):
+        RateLimiter(times=1, cost=2)
+
+
+@pytest.mark.asyncio
+async def test_dependency_on_anonymous_endpoint_sets_headers(redis, clock):
+    # Endpoint login tanpa get_current_user: identity dari IP
+    limiter = RateLimiter(
+        limits="2/minute; 3/hour", algorithm="sliding_window", redis=redis
+    )
+    client = _client(_app(dependency=limiter))
+
+    first = await client.post("/login")
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60, 3;w=3600"
+    assert (await client.post("/login")).status_code == 200
+
+    rejected = await client.post("/login")
+    assert rejected.status_code == 429
+    assert rejected.json()["error"]["code"] == "RATE_LIMIT_EXCEEDED"
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert rejected.headers["RateLimit-Remaining"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_route_template_shares_quota_and_key_functions(redis, clock):
+    limiter = RateLimiter(times=2, key=(key_by_api_key(), key_by_ip), redis=redis)
+    client = _client(_app(dependency=limiter))
+
+    assert (await client.get("/orders/1")).status_code == 200
+    assert (await client.get("/orders/2")).status_code == 200
+    # Satu kuota untuk /orders/{order_id}
+    assert (await client.get("/orders/3")).status_code == 429
+
+    # API key -> identity sendiri (di-hash), kuota terpisah dari IP
+    with_key = await client.get("/orders/1", headers={"X-API-Key": "rahasia"})
+    assert with_key.status_code == 200
+    digest = hashlib.sha256(b"rahasia").hexdigest()[:32]
+    key = "rl:{key:" + digest + "}:/orders/{order_id}:GET"
+    assert key in redis.store._data
+
+
+@pytest.mark.asyncio
+async def test_unmatched_paths_share_one_bucket(redis, clock):
+    # Path acak (scan 404) tidak boleh membuat key Redis baru per path
+    client = _client(_app(RateLimiter(times=2, key=key_by_ip, redis=redis)))
+    assert (await client.get("/tidak-ada/1")).status_code == 404
+    assert (await client.get("/tidak-ada/2")).status_code == 404
+    assert (await client.get("/lain")).status_code == 429
+    assert list(redis.store._data) == ["rl:{127.0.0.1}:<unmatched>:GET"]
+
+
+def _request(authorization=None):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/x",
+        "headers": headers,
+        "client": ("1.2.3.4", 1),
+    })
+
+
+@pytest.mark.asyncio
+async def test_key_by_user_falls_back_to_ip():
+    threads = []
+
+    def decode(token):
+        threads.append(threading.current_thread())
+        return {"sub": "u-7"} if token == "baik" else 1 / 0
+
+    fake = MagicMock()
+    fake.decode_token.side_effect = decode
+    set_token_verifier(fake)
+    try:
+        limiter = RateLimiter()
+        assert await limiter.identify(_request("Bearer baik")) == "u-7"
+        assert await limiter.identify(_request("Bearer rusak")) == "1.2.3.4"
+        assert await limiter.identify(_request("Basic abc")) == "1.2.3.4"
+        assert await limiter.identify(_request()) == "1.2.3.4"
+        assert await RateLimiter(key=key_by_user).identify(_request()) is None
+        # Verifier custom (bisa I/O) -> decode di thread, bukan di event loop
+        assert threads and threading.current_thread() not in threads
+    finally:
+        set_token_verifier(None)
+
+
+@pytest.mark.asyncio
+async def test_key_by_user_decodes_non_blocking_verifier_inline():
+    settings = MagicMock(SECRET_KEY="rahasia")
+    helper = TokenHelper(settings)
+    assert helper.blocking is False  # HS256: CPU saja
+    set_token_verifier(helper)
+    try:
+        token = helper.create_access_token("u-9")
+        with patch.object(asyncio, "to_thread") as to_thread:
+            assert await key_by_user(_request(f"Bearer {token}")) == "u-9"
+        to_thread.assert_not_called()
+    finally:
+        set_token_verifier(None)
+
+    # JWKS dari URL bisa fetch HTTP saat refresh -> blocking
+    remote = TokenHelper(
+        settings, algorithm="RS256", key_set=JWKSKeySet("http://auth.internal/jwks")
+    )
+    assert remote.blocking is True
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_before_dependency_resolution(redis, clock):
+    calls = []
+
+    async def expensive_dependency():
+        calls.append(1)  # Misal: buka session DB
+
+    app = _app(
+        RateLimiter(
+            times=1, key=key_by_ip, routes={"/login"}, methods={"POST"}, redis=redis
+        ),
+        RateLimiter(
+            limits="5/second; 100/hour", key=key_by_ip, scope="global", redis=redis
+        ),
+        dependency=expensive_dependency,
+    )
+    client = _client(app)
+
+    ok = await client.post("/login")
+    assert ok.status_code == 200
+    # Header dari limiter dengan sisa paling sedikit
+    assert ok.headers["RateLimit-Limit"] == "1"
+    assert ok.headers["RateLimit-Remaining"] == "0"
+    assert (await client.post("/login")).status_code == 429
+    assert len(calls) == 1
+
+    # Route lain hanya kena limiter global
+    assert (await client.get("/orders/1")).headers["RateLimit-Remaining"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_routes_filter_matches_route_template_with_string_scope(redis, clock):
+    # Scope string tetap: beberapa route berbagi satu kuota, filter tetap per route
+    shared = RateLimiter(
+        times=2,
+        key=key_by_ip,
+        scope="auth",
+        routes={"/login", "/orders/{order_id}"},
+        redis=redis,
+    )
+    client = _client(_app(shared))
+    assert (await client.post("/login")).headers["RateLimit-Remaining"] == "1"
+    assert (await client.get("/orders/1")).headers["RateLimit-Remaining"] == "0"
+    assert (await client.get("/orders/2")).status_code == 429
+
+    login_only = RateLimiter(
+        times=1, key=key_by_ip, scope="login", routes={"/login"}, redis=redis
+    )
+    client = _client(_app(login_only))
+    assert (await client.post("/login")).status_code == 200
+    assert (await client.post("/login")).status_code == 429
+    orders = await client.get("/orders/1")
+    assert orders.status_code == 200
+    assert "RateLimit-Limit" not in orders.headers
+
+
+@pytest.mark.asyncio
+async def test_middleware_passthrough_without_redis_or_http(clock):
+    app = _app(RateLimiter(times=1))  # Tanpa redis -> fail open, tanpa header
+    client = _client(app)
+    response = await client.post("/login")
+    assert response.status_code == 200
+    assert "RateLimit-Limit" not in response.headers
+    assert (await client.post("/login")).status_code == 200
+
+    # Scope non-http (lifespan / websocket) dilewatkan apa adanya
+    inner = MagicMock()
+    inner.return_value = asyncio.sleep(0)
+    middleware = RateLimitMiddleware(inner, [RateLimiter(times=1)])
+    scope = {"type": "lifespan"}
+    await middleware(scope, None, None)
+    inner.assert_called_once_with(scope, None, None)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_resolves_manager_and_fails_open_on_redis_error(clock):
+    manager = RedisManager("memory://rl-manager")
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/x",
+            "headers": [],
+            "client": ("9.9.9.9", 1),
+        }
+    )
+    limiter = RateLimiter(times=1, redis=manager)
+    assert await limiter.check(request) is None  # Manager belum init_cache
+
+    await manager.init_cache()
+    try:
+        assert (await limiter.check(request)).allowed
+        assert not (await limiter.check(request)).allowed
+    finally:
+        await manager.close()
+
+    broken = MagicMock()
+    broken.evalsha.side_effect = RedisConnectionError("down")
+    assert await RateLimiter(redis=broken).check(request) is None
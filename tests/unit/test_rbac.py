@@ -0,0 +1,216 @@
+# tests/unit/test_rbac.py
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from std_pack.domain.exceptions import ForbiddenError
+from std_pack.infrastructure.cache.memory import MemoryRedis, reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.security.rbac import (
+    PermissionDependency,
+    PermissionResolver,
+    get_permission_resolver,
+    permission_candidates,
+    set_permission_resolver,
+)
+
+ROLES = {
+    "viewer": ["orders:read", "products:read"],
+    "editor": ["viewer", "orders:*"],
+    "admin": ["*"],
+}
+
+
+@pytest.fixture
+def redis():
+    reset_memory_stores()
+    yield MemoryRedis.from_url("memory://rbac", decode_responses=True)
+    reset_memory_stores()
+
+
+def _user(user_id="u-1", roles=None):
+    user = MagicMock()
+    user.id = user_id
+    user.is_active = True
+    if roles is None:
+        del user.roles
+    else:
+        user.roles = roles
+    del user.has_permission
+    return user
+
+
+# ==========================================
+# 1. KOMPILASI ROLE & WILDCARD
+# ==========================================
+def test_roles_compiled_with_inheritance_and_wildcards():
+    resolver = PermissionResolver(ROLES)
+
+    assert permission_candidates("orders:items:delete") == {
+        "orders:items:delete",
+        "orders:items:*",
+        "orders:*",
+        "*",
+    }
+    assert resolver.has_permission(["viewer"], "orders:read")
+    assert not resolver.has_permission(["viewer"], "orders:delete")
+    assert resolver.has_permission(["editor"], "products:read")  # Inherit dari viewer
+    assert resolver.has_permission(["editor"], "orders:items:delete")  # orders:*
+    assert not resolver.has_permission(["editor"], "users:delete")
+    assert resolver.has_permission(["admin"], "users:delete")
+    # Role tak terdaftar = permission dengan nama sama (pola lama)
+    assert resolver.has_permission(["delete_user"], "delete_user")
+
+    # Kombinasi role di-expand sekali, lalu dipakai ulang (set yang sama)
+    first = resolver.expand(frozenset({"viewer", "editor"}))
+    assert first is resolver.expand(frozenset({"editor", "viewer"}))
+    assert resolver.stats()["roles"] == 3
+
+    with pytest.raises(ValueError, match="melingkar"):
+        PermissionResolver({"a": ["b"], "b": ["a"]})
+    with pytest.raises(ValueError):
+        PermissionResolver(max_users=0)
+
+    # Definisi role berubah -> compile ulang, memo dibuang
+    resolver.compile({"viewer": ["orders:read"]})
+    assert not resolver.has_permission(["editor"], "orders:delete")
+
+
+@pytest.mark.asyncio
+async def test_dependency_uses_compiled_roles_without_io():
+    user = _user(roles=["editor"])
+    # Jalur lambat tidak boleh dipanggil
+    user.has_permission = AsyncMock(return_value=False)
+
+    set_permission_resolver(PermissionResolver(ROLES))
+    try:
+        await PermissionDependency("orders:delete")(user)
+        with pytest.raises(ForbiddenError):
+            await PermissionDependency("users:delete")(user)
+        user.has_permission.assert_not_called()
+
+        # User tanpa roles & tanpa has_permission -> ditolak (deny by default)
+        with pytest.raises(ForbiddenError):
+            await PermissionDependency("orders:read")(_user())
+    finally:
+        set_permission_resolver(None)
+    assert get_permission_resolver().stats()["roles"] == 0
+
+
+# ==========================================
+# 2. LOADER + CACHE DUA LAPIS
+# ==========================================
+@pytest.mark.asyncio
+async def test_loader_results_cached_in_process_and_in_redis(redis):
+    now = {"s": 0.0}
+    db = {"u-1": ["viewer"]}
+    loader = AsyncMock(side_effect=lambda user_id: db[user_id])
+    options = {"loader": loader, "redis": redis, "ttl": 5, "clock": lambda: now["s"]}
+    worker_a = PermissionResolver(ROLES, **options)
+    worker_b = PermissionResolver(ROLES, **options)
+    dependency = PermissionDependency("orders:delete", resolver=worker_a)
+
+    with pytest.raises(ForbiddenError):
+        await dependency(_user())
+    with pytest.raises(ForbiddenError):
+        await dependency(_user())
+    assert loader.await_count == 1 and worker_a.hits == 1
+
+    # Worker lain: miss lokal, hit Redis, loader tidak dipanggil
+    viewer = worker_a.expand(frozenset({"viewer"}))
+    assert await worker_b.permissions_for("u-1") == viewer
+    assert loader.await_count == 1
+
+    # Role berubah -> invalidate di worker A langsung berlaku;
+    # worker B setelah TTL lokal
+    db["u-1"] = ["editor"]
+    await worker_a.invalidate("u-1")
+    await dependency(_user())
+    assert loader.await_count == 2
+    assert "orders:*" not in await worker_b.permissions_for("u-1")
+    now["s"] += 5
+    assert "orders:*" in await worker_b.permissions_for("u-1")
+
+
+@pytest.mark.asyncio
+async def test_loader_cache_degrades_without_redis():
+    loader = AsyncMock(return_value=["admin"])
+    broken = MagicMock()
+    down = RedisConnectionError("down")
+    broken.mget = AsyncMock(side_effect=down)
+    broken.pipeline.return_value.execute = AsyncMock(side_effect=down)
+    resolver = PermissionResolver(ROLES, loader=loader, redis=broken, max_users=1)
+
+    # Redis error -> langsung loader
+    assert "*" in await resolver.permissions_for("u-1")
+    await resolver.permissions_for("u-2")
+    assert resolver.stats()["users"] == 1  # LRU
+    await resolver.invalidate("u-2")
+
+    broken.mget = AsyncMock(return_value=[None, None])
+    broken.evalsha = AsyncMock(side_effect=down)
+    assert "*" in await resolver.permissions_for("u-3")
+
+    # RedisManager belum init_cache -> tanpa lapis Redis
+    managed = PermissionResolver(loader=loader, redis=RedisManager("memory://rbac-manager"))
+    assert await managed.permissions_for("u-1") == {"admin"}
+    await managed.invalidate("u-1")
+
+    with pytest.raises(RuntimeError):
+        await PermissionResolver().roles_for("u-1")
+
+
+@pytest.mark.asyncio
+async def test_loader_is_single_flight_per_user(redis):
+    release = asyncio.Event()
+
+    async def slow_loader(user_id):
+        await release.wait()
+        return ["viewer"]
+
+    loader = AsyncMock(side_effect=slow_loader)
+    resolver = PermissionResolver(ROLES, loader=loader, redis=redis)
+    waiters = [asyncio.create_task(resolver.roles_for("u-1")) for _ in range(10)]
+    await asyncio.sleep(0)
+    assert resolver.stats()["loading"] == 1
+
+    # Satu request dibatalkan: load bersama tetap jalan untuk yang lain
+    waiters[0].cancel()
+    release.set()
+    results = await asyncio.gather(*waiters[1:])
+    assert results == [frozenset({"viewer"})] * 9
+    assert loader.await_count == 1
+    assert resolver.stats()["loading"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_load_does_not_cache_stale_roles(redis):
+    db = {"u-1": ["admin"]}
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def loader(user_id):
+        roles = list(db[user_id])  # Dibaca dari DB sebelum role dicabut
+        started.set()
+        await release.wait()
+        return roles
+
+    worker_a = PermissionResolver(ROLES, loader=loader, redis=redis)
+    worker_b = PermissionResolver(ROLES, loader=loader, redis=redis)
+    stale = asyncio.create_task(worker_a.roles_for("u-1"))
+    await started.wait()
+
+    # Role dicabut & di-invalidate di worker lain selagi load lama masih jalan
+    db["u-1"] = ["viewer"]
+    await worker_b.invalidate("u-1")
+    release.set()
+    assert await stale == {"admin"}  # Request yang sudah jalan selesai apa adanya
+
+    # ... tapi hasil basi tidak masuk Redis maupun cache lokal
+    assert await redis.get("perm:{u-1}") is None
+    assert worker_a.stats()["users"] == 0
+    assert await worker_a.roles_for("u-1") == {"viewer"}
+    assert await worker_b.roles_for("u-1") == {"viewer"}
+    assert json.loads(await redis.get("perm:{u-1}")) == ["viewer"]
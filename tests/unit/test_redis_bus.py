@@ -45,4 +45,183 @@ async def test_redis_bus_publish():
     # Verifikasi
     mock_client.pipeline.assert_called_once() # Sync call
     assert mock_pipeline_obj.publish.call_count == 2 # Sync call (tidak perlu await)
-    mock_pipeline_obj.execute.assert_awaited_once() # Async call
\ No newline at end of file
+    mock_pipeline_obj.execute.assert_awaited_once() # Async call
+
+@pytest.mark.asyncio
+async def test_redis_bus_publish_with_codec():
+    from std_pack.infrastructure.cache.codecs import JsonCodec
+
+    mock_manager = MagicMock()
+    mock_client = AsyncMock()
+    mock_manager.get_client.return_value = mock_client
+
+    bus = RedisMessageBus(redis_manager=mock_manager, codec=JsonCodec())
+    event = DummyEvent(data="bytes")
+    await bus.publish(event)
+
+    channel, payload = mock_client.publish.await_args.args
+    assert channel == "events:DummyEvent"
+    assert isinstance(payload, bytes)
+    assert JsonCodec().decode(payload)["data"] == "bytes"
+
+
+# ==========================================
+# LINGER BATCHING
+# ==========================================
+@pytest.mark.asyncio
+async def test_redis_bus_linger_batches_concurrent_publishes():
+    import asyncio
+    from std_pack.infrastructure.cache.memory import reset_memory_stores
+    from std_pack.infrastructure.cache.redis import RedisManager
+
+    reset_memory_stores()
+    manager = RedisManager("memory://linger")
+    await manager.init_cache()
+    pubsub = manager.get_client().pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe("events:DummyEvent")
+
+    bus = RedisMessageBus(
+        manager, linger_ms=5, max_batch=4, max_buffer=8, wait_for_delivery=True
+    )
+    # 6 publish dari coroutine berbeda -> batch penuh (4) + sisa via linger (2)
+    await asyncio.gather(*(bus.publish(DummyEvent(data=str(i))) for i in range(6)))
+    assert bus.batches_sent == 2
+    assert bus.events_sent == 6
+
+    # enqueue() -> future per event, flush manual saat shutdown
+    bus.wait_for_delivery = False
+    await bus.publish(DummyEvent(data="fire-and-forget"))
+    future = await bus.enqueue(DummyEvent(data="tracked"))
+    assert not future.done()
+    await bus.aclose()
+    assert future.done() and future.exception() is None
+
+    received = []
+    while (message := await pubsub.get_message(timeout=0.01)) is not None:
+        received.append(DummyEvent.model_validate_json(message["data"]).data)
+    assert sorted(received[:6]) == [str(i) for i in range(6)]
+    assert received[6:] == ["fire-and-forget", "tracked"]
+    await pubsub.aclose()
+    await manager.close()
+    reset_memory_stores()
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_linger_backpressure_and_failures():
+    import asyncio
+
+    with pytest.raises(ValueError):
+        RedisMessageBus(MagicMock(), linger_ms=1, max_batch=10, max_buffer=5)
+    with pytest.raises(RuntimeError):
+        await RedisMessageBus(MagicMock()).enqueue(DummyEvent(data="x"))
+
+    release = asyncio.Event()
+    pipe = MagicMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+
+    async def slow_execute(raise_on_error=True):
+        await release.wait()
+        return [1, ValueError("per-event error")]
+
+    pipe.execute = slow_execute
+    manager = MagicMock()
+    manager.get_client.return_value.pipeline = MagicMock(return_value=pipe)
+    lost = []
+
+    async def on_delivery_failure(event, error):
+        lost.append((event.data, type(error)))
+        raise RuntimeError("Hook ikut gagal")  # Dicatat, tidak merusak pengiriman
+
+    bus = RedisMessageBus(
+        manager,
+        linger_ms=1000,
+        max_batch=2,
+        max_buffer=2,
+        retry_backoff=0.001,
+        on_delivery_failure=on_delivery_failure,
+    )
+
+    first = await bus.enqueue(DummyEvent(data="a"))
+    second = await bus.enqueue(DummyEvent(data="b"))  # Batch penuh -> dikirim
+    # Buffer penuh selama batch belum selesai -> publish ke-3 tertahan
+    third = asyncio.create_task(bus.enqueue(DummyEvent(data="c")))
+    await asyncio.sleep(0.01)
+    assert not third.done()
+
+    release.set()
+    assert await first is None
+    # Error per command bersifat final (tidak di-retry) -> hook dipanggil
+    with pytest.raises(ValueError):
+        await second
+    assert lost == [("b", ValueError)]
+    await asyncio.wait_for(third, 1)
+
+    # Pipeline gagal sesaat -> batch (c, d) dicoba ulang, tetap terkirim
+    pipe.execute = AsyncMock(side_effect=[ConnectionError("blip"), [1, 1]])
+    recovered = await bus.enqueue(DummyEvent(data="d"))
+    await bus.flush()
+    assert recovered.exception() is None
+    assert pipe.execute.await_count == 2
+
+    # Pipeline gagal terus -> setelah max_retries, future error & hook dipanggil
+    pipe.execute = AsyncMock(side_effect=ConnectionError("down"))
+    failed = await bus.enqueue(DummyEvent(data="e"))
+    await bus.flush()
+    assert isinstance(failed.exception(), ConnectionError)
+    assert pipe.execute.await_count == 1 + bus.max_retries
+    assert lost[-1] == ("e", ConnectionError)
+    assert bus.batches_sent == 2
+    assert bus.events_failed == 2
+    with pytest.raises(ValueError):
+        RedisMessageBus(MagicMock(), max_retries=-1)
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_enqueue_serialize_error_keeps_buffer_slot():
+    import asyncio
+
+    codec = MagicMock()
+    codec.encode.side_effect = TypeError("tidak bisa di-encode")
+    bus = RedisMessageBus(
+        MagicMock(), codec=codec, linger_ms=1000, max_batch=2, max_buffer=2
+    )
+    # Error codec berulang melebihi max_buffer tidak boleh menghabiskan slot
+    for _ in range(3):
+        with pytest.raises(TypeError):
+            await asyncio.wait_for(bus.enqueue(DummyEvent(data="x")), 1)
+
+    codec.encode.side_effect = None
+    codec.encode.return_value = b"{}"
+    pending = await asyncio.wait_for(bus.enqueue(DummyEvent(data="ok")), 1)
+    assert not pending.done() and len(bus._buffer) == 1
+    bus._buffer.clear()
+
+
+@pytest.mark.asyncio
+async def test_standard_lifespan_flushes_buses_before_closing_redis():
+    from std_pack.bootstrap.lifespan import standard_lifespan
+    from std_pack.infrastructure.cache.memory import reset_memory_stores
+    from std_pack.infrastructure.cache.redis import RedisManager
+
+    reset_memory_stores()
+    manager = RedisManager("memory://lifespan-bus")
+    db_manager = MagicMock()
+    db_manager.close = AsyncMock()
+    # linger panjang: tanpa flush di shutdown event ini akan hilang
+    bus = RedisMessageBus(manager, linger_ms=60_000)
+
+    async with standard_lifespan(
+        MagicMock(), db_manager, redis_manager=manager, buses=[bus]
+    ):
+        pubsub = manager.get_client().pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe("events:DummyEvent")
+        await bus.publish(DummyEvent(data="buffered"))
+        assert bus.events_sent == 0
+
+    assert bus.events_sent == 1
+    message = await pubsub.get_message(timeout=0.01)
+    assert DummyEvent.model_validate_json(message["data"]).data == "buffered"
+    db_manager.close.assert_awaited_once()
+    await pubsub.aclose()
+    reset_memory_stores()
@@ -0,0 +1,246 @@
+# tests/unit/test_retry.py
+import asyncio
+import time
+
+import pytest
+
+from std_pack.domain.events import DomainEvent
+from std_pack.infrastructure.cache.keys import key_slot
+from std_pack.infrastructure.cache.memory import reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.events import (
+    MemoryMessageBus,
+    MemoryRetryScheduler,
+    RedisEventSubscriber,
+    RedisMessageBus,
+    RedisRetryScheduler,
+    RetryPolicy,
+    RetryScheduler,
+)
+
+FAR_FUTURE = 10**12
+
+
+class PaymentCaptured(DomainEvent):
+    payment_id: int
+
+
+class Flaky:
+    """Handler yang gagal `failures` kali sebelum sukses."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls: list[int] = []
+
+    async def __call__(self, event):
+        self.calls.append(event.payment_id)
+        if len(self.calls) <= self.failures:
+            raise ConnectionError("downstream 503")
+
+
+@pytest.fixture
+async def manager():
+    reset_memory_stores()
+    manager = RedisManager("memory://retry")
+    await manager.init_cache()
+    yield manager
+    await manager.close()
+    reset_memory_stores()
+
+
+# ==========================================
+# 1. POLICY
+# ==========================================
+def test_policy_exponential_backoff_with_cap_and_jitter():
+    policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=5, jitter=0)
+    assert [policy.delay(a) for a in range(1, 6)] == [1, 2, 4, 5, 5]
+
+    jittered = RetryPolicy(base_delay=10, jitter=0.2)
+    assert all(8 <= jittered.delay(1) <= 12 for _ in range(50))
+
+    for kwargs in ({"max_attempts": 0}, {"multiplier": 0.5}, {"jitter": 1.0}):
+        with pytest.raises(ValueError):
+            RetryPolicy(**kwargs)
+
+
+# ==========================================
+# 2. MEMORY BUS + HEAP
+# ==========================================
+@pytest.mark.asyncio
+async def test_memory_bus_schedules_failed_handler_until_success():
+    retry = MemoryRetryScheduler(RetryPolicy(max_attempts=3, base_delay=60, jitter=0))
+    bus = MemoryMessageBus(retry=retry)
+    flaky = Flaky(failures=1)
+    healthy = []
+    bus.subscribe(PaymentCaptured, flaky)
+    bus.subscribe(PaymentCaptured, lambda e: healthy.append(e.payment_id))
+
+    await bus.publish(PaymentCaptured(payment_id=1))
+    assert await retry.pending() == 1
+    assert await retry.run_due() == 0  # Belum jatuh tempo (60 detik)
+
+    # Hanya handler yang gagal yang dijalankan ulang
+    assert await retry.run_due(now=FAR_FUTURE) == 1
+    assert flaky.calls == [1, 1]
+    assert healthy == [1]
+    assert retry.stats() == {
+        "scheduled": 1,
+        "succeeded": 1,
+        "dead_lettered": 0,
+        "redriven": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_memory_dead_letter_inspect_and_redrive():
+    retry = MemoryRetryScheduler(RetryPolicy(max_attempts=2, base_delay=0, jitter=0))
+    bus = MemoryMessageBus(retry=retry, handler_timeout=0.01)
+    flaky = Flaky(failures=2)
+
+    async def slow(event):
+        await asyncio.sleep(1)
+
+    bus.subscribe(PaymentCaptured, flaky)
+    bus.subscribe(PaymentCaptured, slow)
+    await bus.publish(PaymentCaptured(payment_id=7))
+
+    retry.register(slow)  # Register ulang: nama sama, tidak bentrok
+    retry._handlers.pop(next(n for n, h in retry._handlers.items() if h is slow))
+    await retry.run_due(now=FAR_FUTURE)  # flaky gagal lagi; slow sudah tidak terdaftar
+
+    dead = await retry.dead_letters()
+    assert sorted(job.attempt for job in dead) == [2, 2]
+    assert {job.event_type for job in dead} == {"PaymentCaptured"}
+    assert any("belum di-register" in job.error for job in dead)
+    assert await retry.pending() == 0
+
+    # Redrive hanya job milik flaky: attempt di-reset, kali ini sukses
+    flaky_job = next(job for job in dead if "Flaky" in job.handler)
+    assert await retry.redrive([flaky_job.id, "tidak-ada"]) == 1
+    await retry.run_due()
+    assert flaky.calls == [7, 7, 7]
+    assert len(await retry.dead_letters()) == 1
+    assert retry.stats()["redriven"] == 1
+
+
+@pytest.mark.asyncio
+async def test_register_resolves_name_collisions_and_background_loop():
+    retry = MemoryRetryScheduler(
+        RetryPolicy(base_delay=0, jitter=0), poll_interval=0.01
+    )
+    first, second = (lambda e: None), (lambda e: None)
+    name = retry.register(first)
+    assert retry.register(first) == name
+    assert retry.register(second) == f"{name}#2"
+
+    flaky = Flaky(failures=0)
+    await retry.schedule(flaky, PaymentCaptured(payment_id=3), ConnectionError())
+    await retry.start()
+    await retry.start()
+    deadline = time.monotonic() + 1
+    while retry.succeeded == 0:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.005)
+    await retry.stop()
+    await retry.stop()
+    assert flaky.calls == [3]
+
+    # Error di backend tidak mematikan loop
+    async def broken(now, limit):
+        raise RuntimeError("backend down")
+
+    retry._pop_due = broken
+    await retry.start()
+    await asyncio.sleep(0.03)
+    await retry.stop()
+
+
+# ==========================================
+# 3. REDIS ZSET + DEAD-LETTER STREAM
+# ==========================================
+@pytest.mark.asyncio
+async def test_redis_scheduler_via_subscriber(manager):
+    retry = RedisRetryScheduler(
+        manager, RetryPolicy(max_attempts=2, base_delay=0, jitter=0)
+    )
+    flaky = Flaky(failures=5)
+    subscriber = RedisEventSubscriber(manager, poll_timeout=0.01, retry=retry)
+    subscriber.subscribe(PaymentCaptured, flaky)
+    subscriber.subscribe_pattern("events:Payment*", flaky)
+    await subscriber.start()
+
+    await RedisMessageBus(manager).publish(PaymentCaptured(payment_id=9))
+    deadline = time.monotonic() + 1
+    while await retry.pending() < 2:
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.005)
+    await subscriber.stop()
+
+    assert await retry.run_due(now=FAR_FUTURE) == 2
+    assert await retry.run_due(now=FAR_FUTURE) == 0  # Sudah diambil (ZREM)
+    assert await retry.pending() == 0
+
+    dead = await retry.dead_letters(limit=10)
+    assert len(dead) == 2
+    assert all(job.attempt == 2 and job.error == "downstream 503" for job in dead)
+
+    flaky.failures = 0
+    assert await retry.redrive([dead[0].id]) == 1
+    assert await retry.redrive([]) == 0
+    assert await retry.run_due(now=FAR_FUTURE) == 1
+    assert retry.succeeded == 1
+    assert [job.id for job in await retry.dead_letters()] == [dead[1].id]
+    assert await retry.redrive() == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_scheduler_claim_is_exclusive_and_survives_crash(manager):
+    flaky = Flaky(0)
+    retry = RedisRetryScheduler(manager, RetryPolicy(base_delay=0, jitter=0), lease=30)
+    other = RedisRetryScheduler(manager, RetryPolicy(base_delay=0, jitter=0), lease=30)
+    for scheduler in (retry, other):
+        scheduler.register(flaky)
+    await retry.schedule(flaky, PaymentCaptured(payment_id=1), "boom")
+    client = manager.get_binary_client()
+    now = time.time()
+
+    # Instance A mengambil job lalu crash sebelum handler selesai
+    [job] = await retry._pop_due(now, 10)
+    assert await other.run_due(now=now) == 0  # Sudah di-lease A, B tidak ikut mengambil
+    assert await client.hget(retry.jobs_key, job.id) is not None  # Belum dihapus
+    assert await client.zscore(retry.processing_key, job.id) == pytest.approx(now + 30)
+
+    # Lease habis -> job kembali ke jadwal & dijalankan instance lain
+    assert await other.run_due(now=now + 31) == 1
+    assert flaky.calls == [1]
+    assert other.succeeded == 1
+    assert await client.hget(retry.jobs_key, job.id) is None
+    assert await client.zcard(retry.processing_key) == 0
+
+    with pytest.raises(TypeError):
+        RetryScheduler()  # Backend abstrak
+    assert await retry.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_scheduler_dead_letter_and_reload_script(manager):
+    retry = RedisRetryScheduler(
+        manager, RetryPolicy(max_attempts=2, base_delay=0, jitter=0)
+    )
+    # Semua key satu slot Cluster (claim script & pipeline transaksi multi-key)
+    keys = (retry.schedule_key, retry.processing_key, retry.jobs_key, retry.dead_key)
+    assert retry.schedule_key == "{retry}:schedule"
+    assert len({key_slot(key) for key in keys}) == 1
+    await retry.schedule(Flaky(5), PaymentCaptured(payment_id=2), "boom")
+    client = manager.get_binary_client()
+    await client.script_flush()  # Redis restart: EVALSHA -> NOSCRIPT -> EVAL
+
+    assert await retry.run_due(now=FAR_FUTURE) == 1
+    [dead] = await retry.dead_letters()
+    assert dead.attempt == 2
+    # Job hanya ada di dead-letter, tidak tertinggal di hash / processing
+    assert await client.hgetall(retry.jobs_key) == {}
+    assert await client.zcard(retry.processing_key) == 0
+
+    with pytest.raises(TypeError):
+        RetryScheduler()  # Backend abstrak
@@ -0,0 +1,111 @@
+# tests/unit/test_sanitization.py
+import pytest
+
+from std_pack.infrastructure.security.sanitization import (
+    InputSanitizer,
+    SanitizationIssue,
+)
+
+
+@pytest.mark.parametrize(
+    "value, rule",
+    [
+        ("Hello World", None),
+        ("ORD2024001", None),
+        ("Jl. Sudirman No. 5", None),
+        ("DROP TABLE users", "sql_keyword"),
+        ("select", "sql_keyword"),  # Lewat prefilter (alnum), tetap terdeteksi
+        ("admin'--", "sql_line_comment"),
+        ("a /* komentar */", "sql_block_comment"),
+        ("x = x", "sql_tautology"),
+        ("1=1", "sql_tautology"),
+        ("1=2", None),
+        ("' OR 'a'='b", "sql_or_injection"),
+        ("<IFRAME src=x>", "xss"),
+        ("<img onerror=alert(1)>", "xss"),
+    ],
+)
+def test_find_rule_reports_matching_rule(value, rule):
+    assert InputSanitizer.find_rule(value) == rule
+    assert InputSanitizer.is_safe(value) is (rule is None)
+
+
+def test_batch_and_payload_scan():
+    values = ["John", "", "john@example.com", "Jl. Merdeka 1"]
+    assert InputSanitizer.is_safe_many(values) is True
+    assert InputSanitizer.is_safe_many(["John", "union"]) is False
+    assert InputSanitizer.is_safe_many(["catatan:", "<script>"]) is False
+    # Value digabung untuk satu scan, tapi match tidak boleh menyeberang antar value
+    assert InputSanitizer.is_safe_many(["a-", "-b", "x", "= x"]) is True
+
+    payload = {
+        "name": "Budi",
+        "items": [{"sku": "A1", "note": "<script>x</script>"}, {"sku": "1=1"}],
+        "meta": {"tags": ("ok", "admin'--"), "count": 3},
+    }
+    assert InputSanitizer.scan_dict(payload) == [
+        SanitizationIssue("items[0].note", "xss"),
+        SanitizationIssue("items[1].sku", "sql_tautology"),
+        SanitizationIssue("meta.tags[1]", "sql_line_comment"),
+    ]
+    # Streaming: berhenti di masalah pertama tanpa menelusuri sisa payload
+    assert next(InputSanitizer.iter_issues(payload)).path == "items[0].note"
+
+
+def test_clean_strips_control_characters_only():
+    assert InputSanitizer.clean("a\x00b\x1bc\x7f\n\td é") == "abc\x7f\n\td é"
+
+
+def test_subclass_rules_compiled_separately():
+    class StrictSanitizer(InputSanitizer):
+        RULES = InputSanitizer.RULES + (("path_traversal", r"\.\./"),)
+        PREFILTER = False
+
+    assert StrictSanitizer.find_rule("../etc/passwd") == "path_traversal"
+    assert StrictSanitizer.find_rule("select") == "sql_keyword"
+    assert InputSanitizer.find_rule("../etc/passwd") is None
+
+
+def test_legacy_unsafe_patterns_override_is_honoured():
+    # Extension point lama: override UNSAFE_PATTERNS, bukan RULES
+    class MongoSanitizer(InputSanitizer):
+        UNSAFE_PATTERNS = InputSanitizer.UNSAFE_PATTERNS + [r"\$where"]
+
+    payload = "{'$where': 'sleep(1000)'}"
+    assert InputSanitizer.is_safe(payload)
+    assert not MongoSanitizer.is_safe(payload)
+    assert MongoSanitizer.find_rule(payload) == "pattern_6"
+    assert MongoSanitizer.find_rule("1=1") == "sql_tautology"  # Nama rule bawaan tetap
+    assert not MongoSanitizer.is_safe_many(["aman", payload])
+
+    # Pattern custom bisa cocok di teks alnum -> prefilter tidak dipakai
+    class WordSanitizer(InputSanitizer):
+        UNSAFE_PATTERNS = ["password"]
+
+    assert not WordSanitizer.is_safe("my password")
+    assert WordSanitizer.is_safe("select name")  # Hanya daftar milik subclass
+
+    class Duplicate(InputSanitizer):
+        UNSAFE_PATTERNS = ["--", "--"]  # Nama group tidak boleh dobel
+
+    assert Duplicate.find_rule("a -- b") == "sql_line_comment"
+
+    # Override RULES di subclass lebih bawah kembali memakai RULES
+    class RulesAgain(MongoSanitizer):
+        RULES = (("path_traversal", r"\.\./"),)
+        PREFILTER = False
+
+    assert RulesAgain.find_rule("../etc") == "path_traversal"
+    assert RulesAgain.is_safe(payload)
+
+
+@pytest.mark.parametrize(
+    "patterns, message",
+    [
+        ([r"(?i)\b(\w+)\s*=\s*\1\b"], "backreference"),  # \1 bergeser setelah digabung
+        (["abc", r"(?i)select"], "tidak bisa digabung"),  # Flag global di tengah
+    ],
+)
+def test_legacy_patterns_that_cannot_be_combined_fail_loudly(patterns, message):
+    with pytest.raises(TypeError, match=message):
+        type("Legacy", (InputSanitizer,), {"UNSAFE_PATTERNS": patterns})
@@ -40,12 +40,8 @@ async def test_rate_limiter_logic():
     limiter = RateLimiter(times=2, seconds=60)
     mock_request = MagicMock()
     mock_redis = AsyncMock() 
-    mock_pipe = MagicMock()
-    
-    mock_pipe.incr = MagicMock()
-    mock_pipe.ttl = MagicMock()
-    mock_pipe.execute = AsyncMock(return_value=[1, 60]) 
-    mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+    # Satu EVALSHA per request: [allowed, index, remaining, reset_ms, retry_ms]
+    mock_redis.evalsha = AsyncMock(return_value=[1, 1, 1, 60000, 0])
     
     mock_request.state.redis = mock_redis
     mock_request.client.host = "127.0.0.1"
@@ -56,7 +52,7 @@ async def test_rate_limiter_logic():
     await limiter(mock_request, None)
     
     # Case 2: Over Limit
-    mock_pipe.execute = AsyncMock(return_value=[3, 50]) 
+    mock_redis.evalsha = AsyncMock(return_value=[0, 1, 0, 50000, 49200]) 
     with pytest.raises(TooManyRequestsError) as exc:
         await limiter(mock_request, None)
     assert exc.value.retry_after == 50
@@ -222,4 +218,136 @@ async def test_scheme_placeholders():
         await get_current_user({})
     
     with pytest.raises(UnauthorizedError):
-        get_current_token_payload("token_ngawur")
\ No newline at end of file
+        get_current_token_payload("token_ngawur")
+
+# ==========================================
+# 7. TEST SETTINGS & VERIFIER PROVIDER
+# ==========================================
+def test_settings_and_verifier_are_built_once(monkeypatch):
+    from std_pack.config import (
+        BaseAppSettings,
+        get_settings,
+        refresh_settings,
+        set_settings,
+    )
+    from std_pack.infrastructure.security.token import (
+        get_token_verifier,
+        set_token_verifier,
+    )
+
+    class AppSettings(BaseAppSettings):
+        APP_NAME: str = "Billing"
+
+    monkeypatch.setenv("SECRET_KEY", "secret-v1")
+    refresh_settings(AppSettings)
+    try:
+        # Settings & verifier di-cache: tidak dibangun ulang per request
+        assert get_settings() is get_settings()
+        assert get_settings().APP_NAME == "Billing"
+        verifier = get_token_verifier()
+        assert get_token_verifier() is verifier
+
+        token = TokenHelper(get_settings()).create_access_token("u-1")
+        assert get_current_token_payload(token)["sub"] == "u-1"
+
+        # Rotasi secret: refresh_settings -> verifier ikut dibangun ulang
+        monkeypatch.setenv("SECRET_KEY", "secret-v2")
+        assert isinstance(refresh_settings(), AppSettings)
+        assert get_token_verifier() is not verifier
+        with pytest.raises(UnauthorizedError):
+            get_current_token_payload(token)
+
+        # Verifier custom (misal fake di testing) dipakai apa adanya
+        fake = MagicMock()
+        fake.decode_token.return_value = {"sub": "fake"}
+        set_token_verifier(fake)
+        set_settings(BaseAppSettings())
+        assert get_current_token_payload("apa-saja") == {"sub": "fake"}
+        set_token_verifier(None)
+        assert get_token_verifier() is not fake
+    finally:
+        set_token_verifier(None)
+        refresh_settings(BaseAppSettings)
+
+
+# ==========================================
+# 8. TEST VERIFIED TOKEN CACHE
+# ==========================================
+def test_verified_token_cache_hits_expiry_and_lru():
+    from std_pack.infrastructure.security.token import VerifiedTokenCache
+
+    now = [1_000.0]
+    cache = VerifiedTokenCache(maxsize=2, clock=lambda: now[0])
+    cache.put("a", {"sub": "1", "exp": 1_010})
+    cache.put("b", {"sub": "2", "exp": 1_020})
+    cache.put("tanpa-exp", {"sub": "3"})  # Tidak di-cache
+    cache.put("sudah-lewat", {"sub": "3", "exp": 999})
+    assert len(cache) == 2
+
+    payload = cache.get("a")
+    payload["sub"] = "diubah"  # Salinan, cache tidak ikut berubah
+    assert cache.get("a")["sub"] == "1"
+
+    # LRU: "b" paling lama tidak dipakai -> dibuang saat "c" masuk
+    cache.put("c", {"sub": "1", "exp": 1_030})
+    assert cache.get("b") is None
+
+    # Entry kedaluwarsa tepat di exp token
+    now[0] = 1_010
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    assert cache.evict_subject(1) == 1
+    assert len(cache) == 0
+
+    # Revoke: ditolak sampai exp, lalu dilupakan
+    cache.put("d", {"sub": "4", "exp": 1_050})
+    cache.revoke("d")
+    cache.revoke("tidak-dikenal")  # Tanpa exp -> ditolak selamanya
+    cache.revoke("e", exp=1_040)
+    cache.revoke("f", exp=1_040)  # Melebihi maxsize -> revoke aktif TIDAK dibuang
+    assert cache.get("d") is None
+    assert all(cache.is_revoked(t) for t in ("d", "e", "f", "tidak-dikenal"))
+    now[0] = 1_041
+    assert not cache.is_revoked("e")
+    # Purge hanya membuang revokasi yang exp-nya lewat
+    cache.revoke("g", exp=1_100)
+    cache.revoke("h", exp=1_100)
+    assert cache.revoked_count() == 5  # d, f (kedaluwarsa, belum di-purge), dst.
+    now[0] = 1_060
+    cache.revoke("i", exp=1_100)
+    cache.revoke("j", exp=1_100)  # Lewat ambang purge -> d & f dibuang
+    assert cache.revoked_count() == 5  # tidak-dikenal, g, h, i, j
+    assert all(cache.is_revoked(t) for t in ("tidak-dikenal", "g", "h", "i", "j"))
+    cache.clear()
+
+    with pytest.raises(ValueError):
+        VerifiedTokenCache(maxsize=0)
+
+
+def test_token_helper_uses_cache_and_revocation():
+    from std_pack.infrastructure.security.token import VerifiedTokenCache
+
+    settings = MagicMock(SECRET_KEY="rahasia")
+    cache = VerifiedTokenCache()
+    helper = TokenHelper(settings, cache=cache)
+    token = helper.create_access_token("u-9")
+
+    with patch.object(helper.backend, "decode", wraps=helper.backend.decode) as decode:
+        assert helper.decode_token(token)["sub"] == "u-9"
+        assert helper.decode_token(token)["sub"] == "u-9"
+        assert decode.call_count == 1  # Request kedua dari cache
+
+    helper.revoke_token(token)
+    with pytest.raises(ValueError, match="revoked"):
+        helper.decode_token(token)
+
+    # Token rusak: revoke tanpa exp (ditolak selamanya), decode tetap gagal
+    helper.revoke_token("bukan.jwt")
+    with pytest.raises(ValueError):
+        helper.decode_token("bukan.jwt")
+
+    # Tanpa cache: revoke_token gagal keras, bukan no-op diam
+    with pytest.raises(RuntimeError, match="TOKEN_CACHE_SIZE"):
+        TokenHelper(settings).revoke_token(token)
@@ -0,0 +1,264 @@
+# tests/unit/test_streams.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ResponseError
+
+from std_pack.domain.events import DomainEvent
+from std_pack.infrastructure.cache.codecs import MsgPackCodec
+from std_pack.infrastructure.cache.memory import reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.events.streams import (
+    RedisStreamBus,
+    StreamConsumer,
+    dead_letter_key,
+    stream_key,
+)
+
+
+class InvoiceIssued(DomainEvent):
+    invoice_id: int
+
+
+@pytest.fixture
+async def manager():
+    reset_memory_stores()
+    manager = RedisManager("memory://streams-bus")
+    await manager.init_cache()
+    yield manager
+    await manager.close()
+    reset_memory_stores()
+
+
+async def _wait_until(condition, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timeout menunggu kondisi"
+        await asyncio.sleep(0.005)
+
+
+# ==========================================
+# 1. PUBLISH
+# ==========================================
+@pytest.mark.asyncio
+async def test_stream_bus_publish_trims_with_maxlen(manager):
+    bus = RedisStreamBus(manager, maxlen=3, approximate=False)
+    for i in range(5):
+        await bus.publish(InvoiceIssued(invoice_id=i))
+    await bus.publish_batch([InvoiceIssued(invoice_id=5)])
+    await bus.publish_batch([])
+
+    client = manager.get_binary_client()
+    key = stream_key("InvoiceIssued")
+    assert await client.xlen(key) == 3
+    entries = await client.xrange(key)
+    assert entries[-1][1][b"type"] == b"InvoiceIssued"
+    assert InvoiceIssued.model_validate_json(entries[-1][1][b"payload"]).invoice_id == 5
+
+
+# ==========================================
+# 2. CONSUMER GROUP
+# ==========================================
+@pytest.mark.asyncio
+async def test_stream_consumer_processes_and_acks_in_batches(manager):
+    bus = RedisStreamBus(manager, codec=MsgPackCodec())
+    # Event yang terbit sebelum consumer jalan tetap diproses (tidak hilang)
+    await bus.publish_batch([InvoiceIssued(invoice_id=i) for i in range(10)])
+
+    received = []
+    active = 0
+    peak = 0
+
+    async def handler(event):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        received.append(event.invoice_id)
+        active -= 1
+
+    consumer = StreamConsumer(
+        manager,
+        group="billing",
+        codec=MsgPackCodec(),
+        batch_size=5,
+        block_ms=10,
+        concurrency=3,
+    )
+    consumer.subscribe(InvoiceIssued, handler)
+    await consumer.start()
+    await _wait_until(lambda: len(received) == 10)
+    await consumer.stop()
+
+    assert sorted(received) == list(range(10))
+    assert peak == 3  # Dibatasi oleh concurrency
+    assert consumer.stats()["acked"] == 10
+    assert consumer.stats()["batches"] == 2
+    assert await consumer.pending() == {stream_key("InvoiceIssued"): 0}
+
+    # Start ulang: group sudah ada (BUSYGROUP diabaikan)
+    await consumer.start()
+    await consumer.stop()
+    await consumer.stop()  # Idempotent
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_failed_message_is_reclaimed(manager):
+    bus = RedisStreamBus(manager)
+    await bus.publish(InvoiceIssued(invoice_id=1))
+    client = manager.get_binary_client()
+    await client.xadd(
+        stream_key("InvoiceIssued"), {"type": "InvoiceIssued", "payload": "not-json"}
+    )
+
+    attempts = []
+
+    async def flaky(event):
+        attempts.append(event.invoice_id)
+        if len(attempts) == 1:
+            raise ValueError("Boom!")
+
+    consumer = StreamConsumer(
+        manager,
+        group="mailer",
+        consumer="worker-1",
+        block_ms=10,
+        claim_idle_ms=1,
+        claim_interval=0.02,
+    )
+    consumer.subscribe(InvoiceIssued, flaky)
+    await consumer.start()
+    await _wait_until(lambda: len(attempts) == 2)
+    await _wait_until(lambda: consumer.stats()["acked"] == 2)
+    await consumer.stop()
+
+    stats = consumer.stats()
+    assert stats["failed"] == 1
+    assert stats["processed"] == 1
+    assert stats["reclaimed"] == 1
+    assert await consumer.pending() == {stream_key("InvoiceIssued"): 0}
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_reclaim_resumes_from_cursor(manager):
+    bus = RedisStreamBus(manager)
+    for i in range(3):
+        await bus.publish(InvoiceIssued(invoice_id=i))
+    client = manager.get_binary_client()
+    key = stream_key("InvoiceIssued")
+    await client.xgroup_create(key, "mailer", id="0")
+    # Consumer lain membaca lalu crash: 3 pesan pending, lebih dari batch_size
+    await client.xreadgroup("mailer", "crashed", {key: ">"})
+
+    seen = []
+
+    async def handler(event):
+        seen.append(event.invoice_id)
+
+    consumer = StreamConsumer(manager, group="mailer", batch_size=2, claim_idle_ms=1)
+    consumer.subscribe(InvoiceIssued, handler)
+    await asyncio.sleep(0.005)
+
+    # Putaran kedua melanjutkan cursor, bukan mengulang dari "0-0"
+    await consumer._reclaim(client)
+    assert seen == [0, 1]
+    await consumer._reclaim(client)
+    assert seen == [0, 1, 2]
+    assert consumer._claim_cursors[key] == b"0-0"
+    assert consumer.stats()["reclaimed"] == 3
+    assert await consumer.pending() == {key: 0}
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_dead_letters_poison_message(manager):
+    bus = RedisStreamBus(manager)
+    await bus.publish(InvoiceIssued(invoice_id=7))
+    attempts = []
+
+    async def poison(event):
+        attempts.append(event.invoice_id)
+        raise ValueError("Boom!")
+
+    consumer = StreamConsumer(
+        manager,
+        group="mailer",
+        block_ms=10,
+        claim_idle_ms=1,
+        claim_interval=0.01,
+        max_deliveries=2,
+    )
+    consumer.subscribe(InvoiceIssued, poison)
+    await consumer.start()
+    await _wait_until(lambda: consumer.stats()["dead_lettered"] == 1)
+    await consumer.stop()
+
+    # Dikirim 2x (awal + 1 reclaim), pengiriman ke-3 langsung ke dead-letter
+    assert attempts == [7, 7]
+    key = stream_key("InvoiceIssued")
+    assert await consumer.pending() == {key: 0}
+    client = manager.get_binary_client()
+    [(_, fields)] = await client.xrange(dead_letter_key(key))
+    assert fields[b"group"] == b"mailer"
+    assert fields[b"deliveries"] == b"3"
+    assert fields[b"type"] == b"InvoiceIssued"
+    assert InvoiceIssued.model_validate_json(fields[b"payload"]).invoice_id == 7
+
+    with pytest.raises(ValueError):
+        StreamConsumer(manager, group="g", max_deliveries=0)
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_without_delivery_limit_keeps_retrying(manager):
+    bus = RedisStreamBus(manager)
+    await bus.publish(InvoiceIssued(invoice_id=1))
+    attempts = []
+
+    async def poison(event):
+        attempts.append(event.invoice_id)
+        raise ValueError("Boom!")
+
+    consumer = StreamConsumer(
+        manager,
+        group="mailer",
+        block_ms=10,
+        claim_idle_ms=1,
+        claim_interval=0.01,
+        max_deliveries=None,
+    )
+    consumer.subscribe(InvoiceIssued, poison)
+    await consumer.start()
+    await _wait_until(lambda: len(attempts) >= 4)
+    await consumer.stop()
+    assert consumer.stats()["dead_lettered"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_validation_and_error_backoff(manager):
+    consumer = StreamConsumer(manager, group="g")
+    with pytest.raises(RuntimeError):
+        await consumer.start()
+    with pytest.raises(ValueError):
+        StreamConsumer(manager, group="g", concurrency=0)
+
+    # Error selain BUSYGROUP saat membuat group diteruskan
+    broken = MagicMock()
+    broken.get_binary_client.return_value.xgroup_create = AsyncMock(
+        side_effect=ResponseError("NOPERM")
+    )
+    consumer = StreamConsumer(broken, group="g")
+    consumer.subscribe(InvoiceIssued, AsyncMock())
+    with pytest.raises(ResponseError):
+        await consumer.start()
+
+    # Error di loop -> dicatat lalu backoff, loop tetap hidup
+    flaky_client = MagicMock()
+    flaky_client.xgroup_create = AsyncMock(return_value=True)
+    flaky_client.xreadgroup = AsyncMock(side_effect=ConnectionError("down"))
+    flaky = MagicMock()
+    flaky.get_binary_client.return_value = flaky_client
+    consumer = StreamConsumer(flaky, group="g", claim_idle_ms=0, error_backoff=0.01)
+    consumer.subscribe(InvoiceIssued, AsyncMock())
+    await consumer.start()
+    await _wait_until(lambda: flaky_client.xreadgroup.await_count >= 2)
+    await consumer.stop()
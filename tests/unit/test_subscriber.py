@@ -0,0 +1,186 @@
+# tests/unit/test_subscriber.py
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from std_pack.application.interfaces.ports import IEventConsumer
+from std_pack.domain.events import DomainEvent
+from std_pack.infrastructure.cache.codecs import MsgPackCodec
+from std_pack.infrastructure.cache.memory import reset_memory_stores
+from std_pack.infrastructure.cache.redis import RedisManager
+from std_pack.infrastructure.events.redis_bus import RedisMessageBus
+from std_pack.infrastructure.events.subscriber import RedisEventSubscriber
+
+
+class UserSignedUp(DomainEvent):
+    user_id: int
+
+
+class UserDeleted(DomainEvent):
+    user_id: int
+
+
+@pytest.fixture
+async def manager():
+    reset_memory_stores()
+    manager = RedisManager("memory://subscriber")
+    await manager.init_cache()
+    yield manager
+    await manager.close()
+    reset_memory_stores()
+
+
+async def _wait_until(condition, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timeout menunggu kondisi"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_dispatch_with_type_limit_and_drain(manager):
+    active = 0
+    peak = 0
+    seen = []
+
+    async def slow_handler(event):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        seen.append(event.user_id)
+        active -= 1
+
+    audit = AsyncMock()
+    subscriber = RedisEventSubscriber(
+        manager, concurrency=8, type_limits={UserSignedUp: 2}, poll_timeout=0.01
+    )
+    assert isinstance(subscriber, IEventConsumer)
+    subscriber.subscribe(UserSignedUp, slow_handler)
+    subscriber.subscribe_pattern("events:User*", audit)
+    await subscriber.start()
+
+    bus = RedisMessageBus(manager)
+    await bus.publish_batch([UserSignedUp(user_id=i) for i in range(6)])
+    await bus.publish(UserDeleted(user_id=99))  # Tidak terdaftar -> di-skip
+    await _wait_until(lambda: subscriber.received == 13)
+
+    # stop() menunggu antrian selesai diproses (drain)
+    await subscriber.stop()
+    await subscriber.stop()
+    assert sorted(seen) == list(range(6))
+    assert peak == 2  # Dibatasi type_limits
+    assert audit.await_count == 6  # Via pattern, hanya event terdaftar
+
+    stats = subscriber.stats()
+    assert stats["processed"] == 12
+    assert stats["failed"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["throughput_per_second"] > 0
+    assert stats["lag_max_seconds"] >= stats["lag_avg_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_subscriber_slow_limited_type_does_not_block_pool(manager):
+    release = asyncio.Event()
+    deleted = []
+
+    async def stuck(event):
+        await release.wait()
+
+    async def on_deleted(event):
+        deleted.append(event.user_id)
+
+    # Satu worker pool, tipe UserSignedUp dibatasi 1 & handler-nya macet
+    subscriber = RedisEventSubscriber(
+        manager, concurrency=1, type_limits={"UserSignedUp": 1}, poll_timeout=0.01
+    )
+    subscriber.subscribe(UserSignedUp, stuck)
+    subscriber.subscribe(UserDeleted, on_deleted)
+    await subscriber.start()
+
+    bus = RedisMessageBus(manager)
+    await bus.publish_batch([UserSignedUp(user_id=i) for i in range(3)])
+    await bus.publish(UserDeleted(user_id=99))
+
+    # Event tipe lain tetap diproses walau lane UserSignedUp penuh antrian
+    await _wait_until(lambda: deleted == [99])
+    assert subscriber.stats()["queue_depth"] == 2
+
+    release.set()
+    await subscriber.stop()
+    assert subscriber.processed == 4
+    assert subscriber.stats()["queue_depth"] == 0
+
+    with pytest.raises(ValueError):
+        RedisEventSubscriber(manager, type_limits={UserSignedUp: 0})
+
+
+@pytest.mark.asyncio
+async def test_subscriber_codec_failures_and_lag(manager):
+    async def broken(event):
+        raise ValueError("Boom!")
+
+    subscriber = RedisEventSubscriber(manager, codec=MsgPackCodec(), poll_timeout=0.01)
+    subscriber.subscribe(UserSignedUp, broken)
+    await subscriber.start()
+
+    client = manager.get_binary_client()
+    old = UserSignedUp(user_id=1, occurred_at=datetime.now() - timedelta(seconds=5))
+    await RedisMessageBus(manager, codec=MsgPackCodec()).publish(old)
+    await client.publish("events:UserSignedUp", b"\xc1")  # Bukan msgpack valid
+    await _wait_until(lambda: subscriber.failed == 2)
+    await subscriber.stop()
+
+    assert subscriber.stats()["lag_max_seconds"] >= 5
+    assert subscriber.processed == 0
+
+
+@pytest.mark.asyncio
+async def test_subscriber_validation_read_errors_and_drain_timeout():
+    with pytest.raises(ValueError):
+        RedisEventSubscriber(MagicMock(), concurrency=0)
+    with pytest.raises(RuntimeError):
+        await RedisEventSubscriber(MagicMock()).start()
+    assert RedisEventSubscriber(MagicMock()).stats()["throughput_per_second"] == 0.0
+
+    # Reader error -> dicatat & dicoba lagi; handler lambat -> drain timeout
+    release = asyncio.Event()
+
+    async def stuck(event):
+        await release.wait()
+
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    message = {
+        "type": "message",
+        "pattern": None,
+        "channel": b"events:UserSignedUp",
+        "data": UserSignedUp(
+            user_id=1, occurred_at=datetime.now(UTC)
+        ).model_dump_json(),
+    }
+    responses = [ConnectionError("down"), message]
+
+    async def get_message(**kwargs):
+        await asyncio.sleep(kwargs["timeout"])
+        item = responses.pop(0) if responses else None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    pubsub.get_message = get_message
+    manager = MagicMock()
+    manager.get_binary_client.return_value.pubsub.return_value = pubsub
+
+    subscriber = RedisEventSubscriber(manager, concurrency=1, poll_timeout=0.01)
+    subscriber.subscribe(UserSignedUp, stuck)
+    await subscriber.start()
+    await _wait_until(lambda: subscriber.received == 1)
+    await asyncio.sleep(0.01)
+    await subscriber.stop(drain_timeout=0.01)
+    release.set()
+    assert subscriber.processed == 0